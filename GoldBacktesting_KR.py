@@ -14,7 +14,10 @@ import matplotlib.dates as mdates
 from datetime import datetime, timedelta
 import warnings
 import os
+import sys
+import json
 import time
+import multiprocessing
 warnings.filterwarnings('ignore')
 
 # 🔥 yfinance 관련 코드 완전 제거 - KIS API만 사용
@@ -28,7 +31,6 @@ warnings.filterwarnings('ignore')
 # 🔥 SmartGoldTradingBot_KR.py에서 사용하는 모듈들 그대로 import
 try:
     import KIS_Common as Common
-    import KIS_API_Helper_KR as KisKR
     KIS_API_AVAILABLE = True
     print("✅ 한국투자증권 API 모듈 로드 완료")
 except ImportError as e:
@@ -36,6 +38,12 @@ except ImportError as e:
     print(f"❌ KIS API 모듈 로드 실패: {str(e)}")
     print("⚠️ 모의 데이터로 대체됩니다.")
 
+# 백테스트 공용 일봉 저장소 (로컬 캐시 + 증분 조회)
+from backtest_data_store import get_default_store
+
+# 체결 모델 (기본: 종가 전량 체결, 호가 소진/시장충격 모델로 교체 가능)
+from fill_model import CloseFillModel
+
 # 한글 폰트 설정 (Windows 환경 최적화)
 try:
     import matplotlib.font_manager as fm
@@ -71,8 +79,9 @@ except Exception as e:
 class GoldTradingBacktest:
     """SmartGoldTradingBot 로직을 활용한 백테스팅 시스템"""
     
-    def __init__(self, initial_capital=600000, days_back=365):
+    def __init__(self, initial_capital=600000, days_back=365, init_api=True, fill_model=None):
         self.initial_capital = initial_capital
+        self.fill_model = fill_model or CloseFillModel()  # fill_model.py 체결 모델
         self.days_back = days_back
         self.end_date = datetime.now()
         self.start_date = self.end_date - timedelta(days=days_back)
@@ -136,18 +145,24 @@ class GoldTradingBacktest:
         self.last_sell_time = {}  # {stock_code: datetime}
         
         # 🔥 KIS API 초기화 (SmartGoldTradingBot_KR.py와 동일)
-        if KIS_API_AVAILABLE:
+        # 로버스트니스 시뮬레이션 워커는 API 없이 실행 (init_api=False)
+        if KIS_API_AVAILABLE and init_api:
             try:
                 Common.SetChangeMode("REAL")  # 또는 "VIRTUAL"
                 print("✅ KIS API 초기화 완료")
             except Exception as e:
                 print(f"⚠️ KIS API 초기화 실패: {str(e)}")
     
+    def has_cached_data(self):
+        """로컬 일봉 저장소에 포트폴리오 종목 데이터가 있는지 확인"""
+        store = get_default_store()
+        return any(store.has_cache(stock_code) for stock_code in self.portfolio_config)
+    
     def fetch_korean_etf_data_from_kis(self):
         """🔥 한국투자증권 API로 실제 한국 금 ETF 데이터 수집"""
         print("🔍 한국투자증권 API로 금 ETF 데이터 수집 중...")
         
-        if not KIS_API_AVAILABLE:
+        if not KIS_API_AVAILABLE and not self.has_cached_data():
             print("❌ KIS API 사용 불가 - 모의 데이터로 대체")
             return self.generate_mock_gold_data()
         
@@ -155,10 +170,10 @@ class GoldTradingBacktest:
             for stock_code, config in self.portfolio_config.items():
                 print(f"  📊 {config['name']} ({stock_code}) 데이터 수집...")
                 
-                # 🔥 SmartGoldTradingBot_KR.py에서 사용하는 함수 그대로 사용
+                # 🔥 로컬 일봉 저장소 우선 (없거나 오래된 구간만 KIS API로 조회)
                 try:
-                    # KIS API로 일봉 데이터 조회 (최근 365일)
-                    df = KisKR.GetOhlcv(stock_code, self.days_back)
+                    # 일봉 데이터 조회 (최근 days_back일)
+                    df = get_default_store().get_daily(stock_code, start_date=self.start_date)
                     
                     if df is None or df.empty:
                         print(f"  ❌ {config['name']} 데이터 없음 - 스킵")
@@ -166,13 +181,13 @@ class GoldTradingBacktest:
                     
                     # 데이터 형식 표준화
                     if 'close' in df.columns:
-                        df.rename(columns={
+                        df = df.rename(columns={
                             'open': 'Open',
                             'high': 'High', 
                             'low': 'Low',
                             'close': 'Close',
                             'volume': 'Volume'
-                        }, inplace=True)
+                        })
                     
                     # 인덱스가 문자열이면 datetime으로 변환
                     if isinstance(df.index[0], str):
@@ -184,9 +199,6 @@ class GoldTradingBacktest:
                     
                     print(f"  ✅ {config['name']}: {len(df)}일 실제 데이터 수집 완료")
                     
-                    # API 호출 간격 (과도한 요청 방지)
-                    time.sleep(0.5)
-                    
                 except Exception as e:
                     print(f"  ❌ {config['name']} KIS API 오류: {str(e)}")
                     # 개별 종목 실패시 해당 종목만 제외하고 계속 진행
@@ -206,8 +218,8 @@ class GoldTradingBacktest:
     
     def fetch_korean_etf_data(self):
         """데이터 수집 메인 함수 - KIS API 우선, 실패시 모의 데이터"""
-        # 🔥 1순위: 한국투자증권 API 사용
-        if KIS_API_AVAILABLE:
+        # 🔥 1순위: 한국투자증권 API 사용 (로컬 저장소에 있으면 API 없이도 사용)
+        if KIS_API_AVAILABLE or self.has_cached_data():
             if self.fetch_korean_etf_data_from_kis():
                 return True
         
@@ -253,11 +265,17 @@ class GoldTradingBacktest:
         if date not in df.index:
             return False, "날짜 없음"
         
-        config = self.portfolio_config[stock_code]
         row = df.loc[date]
+        recent_high = df.loc[:date].tail(5)['High'].max()
+        
+        return self._evaluate_buy(stock_code, date, position_level,
+                                  row.get('RSI', 50), row.get('Pullback', 0), recent_high, row['Close'])
+    
+    def _evaluate_buy(self, stock_code, date, position_level, rsi, pullback, recent_high, current_price):
+        """매수 조건 판정 (지표값을 직접 받아 DataFrame 조회 없이 판정)"""
+        config = self.portfolio_config[stock_code]
         
         # RSI 조건 체크
-        rsi = row.get('RSI', 50)
         max_rsi = config['rsi_upper_bound']
         
         if position_level > 1:
@@ -269,7 +287,6 @@ class GoldTradingBacktest:
         
         # 1차수는 조정률 체크
         if position_level == 1:
-            pullback = row.get('Pullback', 0)
             min_pullback = config['min_pullback_for_reentry']
             
             if pullback < min_pullback:
@@ -280,8 +297,6 @@ class GoldTradingBacktest:
             required_drop = self.base_drops[min(position_level - 1, len(self.base_drops) - 1)]
             
             # 최근 5일 고점 대비 현재 하락률
-            recent_high = df.loc[:date].tail(5)['High'].max()
-            current_price = row['Close']
             actual_drop = (recent_high - current_price) / recent_high
             
             if actual_drop < required_drop:
@@ -327,35 +342,74 @@ class GoldTradingBacktest:
         
         return False, "", 1.0
     
-    def run_backtest(self):
+    def build_market_arrays(self, all_dates):
+        """종목별 지표를 전체 거래일 축에 맞춘 NumPy 배열로 변환 (일별 .loc 조회 제거)"""
+        date_index = pd.DatetimeIndex(all_dates)
+        market = {}
+        
+        for stock_code in self.portfolio_config.keys():
+            if stock_code not in self.price_data:
+                continue
+            
+            df = self.price_data[stock_code]
+            aligned = df.reindex(date_index)
+            missing = np.full(len(date_index), np.nan)
+            
+            market[stock_code] = {
+                'available': date_index.isin(df.index),
+                'close': aligned['Close'].values,
+                # 체결 모델용 봉 정보 (고가/저가/거래량)
+                'high': aligned['High'].values if 'High' in df.columns else missing,
+                'low': aligned['Low'].values if 'Low' in df.columns else missing,
+                'volume': aligned['Volume'].values if 'Volume' in df.columns else missing,
+                'rsi': aligned['RSI'].values if 'RSI' in df.columns else np.full(len(date_index), 50.0),
+                'pullback': aligned['Pullback'].values if 'Pullback' in df.columns else np.zeros(len(date_index)),
+                # df.loc[:date].tail(5)['High'].max()와 동일
+                'recent_high': df['High'].rolling(window=5, min_periods=1).max().reindex(date_index).values
+            }
+        
+        return market
+    
+    @staticmethod
+    def market_bar(arrays, i):
+        """체결 모델에 넘길 i번째 거래일 봉 정보"""
+        return {'high': arrays['high'][i], 'low': arrays['low'][i], 'volume': arrays['volume'][i]}
+    
+    def run_backtest(self, verbose=True):
         """백테스팅 실행 - SmartMagicSplit 5차수 로직 구현"""
-        print("🚀 SmartMagicSplit 전략 백테스팅 시작...")
+        if verbose:
+            print("🚀 SmartMagicSplit 전략 백테스팅 시작...")
         
         if not self.price_data:
             print("❌ 가격 데이터가 없습니다.")
             return False
         
         # 모든 거래일 수집
-        all_dates = set()
-        for df in self.price_data.values():
-            all_dates.update(df.index)
-        all_dates = sorted(list(all_dates))
+        all_dates = sorted(set().union(*[df.index for df in self.price_data.values()]))
         
         if not all_dates:
             print("❌ 유효한 거래일이 없습니다.")
             return False
         
+        market = self.build_market_arrays(all_dates)
+        
         # 초기 상태
         cash = self.initial_capital
         
-        # 종목별 포지션 초기화 (5차수)
+        # 종목별 포지션 초기화 (5차수) + 보유 차수 집합
+        held_levels = {}
         for stock_code in self.portfolio_config.keys():
             self.positions[stock_code] = []
+            held_levels[stock_code] = set()
+        
+        # 일별 차수 보유 현황 (T × 5, 종목 합계)
+        self.tier_usage = np.zeros((len(all_dates), 5), dtype=np.int16)
         
-        print(f"📅 {len(all_dates)}일간 백테스팅 실행...")
+        if verbose:
+            print(f"📅 {len(all_dates)}일간 백테스팅 실행...")
         
         for i, date in enumerate(all_dates):
-            if i % 30 == 0:  # 한달마다 진행률 표시
+            if verbose and i % 30 == 0:  # 한달마다 진행률 표시
                 progress = i / len(all_dates) * 100
                 print(f"  진행률: {progress:.1f}% ({date.strftime('%Y-%m-%d')})")
             
@@ -363,11 +417,13 @@ class GoldTradingBacktest:
             
             # 각 종목별 처리
             for stock_code, config in self.portfolio_config.items():
-                if stock_code not in self.price_data or date not in self.price_data[stock_code].index:
+                arrays = market.get(stock_code)
+                if arrays is None or not arrays['available'][i]:
                     continue
                 
-                current_price = self.price_data[stock_code].loc[date, 'Close']
+                current_price = arrays['close'][i]
                 positions = self.positions[stock_code]
+                levels = held_levels[stock_code]
                 
                 # 1. 매도 로직
                 positions_to_remove = []
@@ -381,17 +437,25 @@ class GoldTradingBacktest:
                         sell_amount = max(1, int(position['amount'] * sell_ratio))
                         sell_amount = min(sell_amount, position['amount'])
                         
-                        sell_value = sell_amount * current_price
+                        # 체결 모델 적용 (부분체결이면 잔량은 다음 거래일에 다시 판단)
+                        fill = self.fill_model.execute('SELL', sell_amount, current_price,
+                                                       bar=self.market_bar(arrays, i),
+                                                       stock_code=stock_code, timestamp=date)
+                        if fill.quantity <= 0:
+                            continue
+                        sell_amount, sell_price = fill.quantity, fill.price
+                        
+                        sell_value = sell_amount * sell_price
                         cash += sell_value
                         
                         # 거래 기록
-                        profit = (current_price - position['entry_price']) * sell_amount
+                        profit = (sell_price - position['entry_price']) * sell_amount
                         self.trades.append({
                             'date': date,
                             'stock_code': stock_code,
                             'type': 'SELL',
                             'level': position['level'],
-                            'price': current_price,
+                            'price': sell_price,
                             'amount': sell_amount,
                             'value': sell_value,
                             'profit': profit,
@@ -408,6 +472,7 @@ class GoldTradingBacktest:
                 
                 # 매도된 포지션 제거
                 for idx in reversed(positions_to_remove):
+                    levels.discard(positions[idx]['level'])
                     positions.pop(idx)
                 
                 # 2. 매수 로직 (5차수까지)
@@ -415,18 +480,18 @@ class GoldTradingBacktest:
                 
                 for level in range(1, 6):  # 1~5차수
                     # 해당 차수 포지션이 이미 있는지 체크
-                    level_positions = [p for p in positions if p['level'] == level]
-                    if level_positions:
+                    if level in levels:
                         continue  # 이미 해당 차수 보유 중
                     
                     # 이전 차수가 있는지 체크 (순차 진입)
-                    if level > 1:
-                        prev_level_positions = [p for p in positions if p['level'] == level - 1]
-                        if not prev_level_positions:
-                            continue  # 이전 차수가 없으면 진입 불가
+                    if level > 1 and (level - 1) not in levels:
+                        continue  # 이전 차수가 없으면 진입 불가
                     
                     # 매수 조건 체크
-                    can_buy, buy_reason = self.check_buy_conditions(stock_code, date, level)
+                    can_buy, buy_reason = self._evaluate_buy(
+                        stock_code, date, level,
+                        arrays['rsi'][i], arrays['pullback'][i], arrays['recent_high'][i], current_price
+                    )
                     if not can_buy:
                         continue
                     
@@ -437,7 +502,15 @@ class GoldTradingBacktest:
                     if buy_amount == 0:
                         continue
                     
-                    buy_value = buy_amount * current_price
+                    # 체결 모델 적용 (체결가/체결 수량)
+                    fill = self.fill_model.execute('BUY', buy_amount, current_price,
+                                                   bar=self.market_bar(arrays, i),
+                                                   stock_code=stock_code, timestamp=date)
+                    if fill.quantity <= 0:
+                        continue
+                    buy_amount, buy_price = fill.quantity, fill.price
+                    
+                    buy_value = buy_amount * buy_price
                     if cash < buy_value:
                         continue  # 현금 부족
                     
@@ -446,10 +519,11 @@ class GoldTradingBacktest:
                     
                     positions.append({
                         'level': level,
-                        'entry_price': current_price,
+                        'entry_price': buy_price,
                         'entry_date': date,
                         'amount': buy_amount
                     })
+                    levels.add(level)
                     
                     # 거래 기록
                     self.trades.append({
@@ -457,7 +531,7 @@ class GoldTradingBacktest:
                         'stock_code': stock_code,
                         'type': 'BUY',
                         'level': level,
-                        'price': current_price,
+                        'price': buy_price,
                         'amount': buy_amount,
                         'value': buy_value,
                         'profit': 0,
@@ -467,7 +541,10 @@ class GoldTradingBacktest:
                     break  # 한번에 한 차수만 매수
                 
                 # 현재 포지션 가치 계산
-                position_value = sum(pos['amount'] * current_price for pos in positions)
+                position_value = 0
+                for pos in positions:
+                    position_value += pos['amount'] * current_price
+                    self.tier_usage[i, pos['level'] - 1] += 1
                 daily_portfolio_value += position_value
             
             # 일일 포트폴리오 가치 기록
@@ -480,9 +557,11 @@ class GoldTradingBacktest:
                 'return_pct': (total_value / self.initial_capital - 1) * 100
             })
         
-        print("✅ 백테스팅 완료!")
+        if verbose:
+            print("✅ 백테스팅 완료!")
         return True
     
+
     def calculate_buy_hold_benchmark(self):
         """Buy & Hold 벤치마크 계산"""
         print("📊 Buy & Hold 벤치마크 계산 중...")
@@ -789,6 +868,332 @@ class GoldTradingBacktest:
             'csv_file': csv_file
         }
 
+################################ 로버스트니스 분석 ################################
+
+# 부트스트랩 시뮬레이션에 사용하는 OHLCV 컬럼
+ROBUSTNESS_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def stationary_bootstrap_indices(n, mean_block_length, rng):
+    """
+    Stationary Bootstrap (Politis & Romano) 인덱스 생성
+    
+    블록 길이가 평균 mean_block_length인 기하분포를 따르도록,
+    매 스텝 1/mean_block_length 확률로 새 블록을 무작위 위치에서 시작하고
+    그 외에는 직전 인덱스 다음 날로 이어간다 (끝에 도달하면 처음으로 순환).
+    """
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    p = 1.0 / max(1.0, mean_block_length)
+    new_block = rng.random(n) < p
+    new_block[0] = True
+    random_starts = rng.integers(0, n, size=n)
+    
+    indices = np.empty(n, dtype=np.int64)
+    current = 0
+    for t in range(n):
+        current = random_starts[t] if new_block[t] else (current + 1) % n
+        indices[t] = current
+    return indices
+
+def build_robustness_base(price_data):
+    """
+    부트스트랩용 기초 배열 생성
+    
+    종목 간 상관관계를 유지하도록 공통 거래일 기준으로 일간 로그수익률을 정렬하고,
+    고가/저가/시가는 같은 날 종가 대비 비율로 저장해 재표본 시 함께 가져간다.
+    """
+    codes = [code for code, df in price_data.items() if len(df) > 1]
+    if not codes:
+        return None
+    
+    common_dates = price_data[codes[0]].index
+    for code in codes[1:]:
+        common_dates = common_dates.intersection(price_data[code].index)
+    common_dates = common_dates.sort_values()
+    
+    if len(common_dates) < 2:
+        return None
+    
+    base = {'codes': codes, 'dates': common_dates, 'stocks': {}}
+    for code in codes:
+        df = price_data[code].loc[common_dates, ROBUSTNESS_COLUMNS]
+        close = df['Close'].values.astype(np.float64)
+        base['stocks'][code] = {
+            'first_close': close[0],
+            'log_return': np.diff(np.log(close)),
+            'open_ratio': (df['Open'].values / close)[1:],
+            'high_ratio': (df['High'].values / close)[1:],
+            'low_ratio': (df['Low'].values / close)[1:],
+            'volume': df['Volume'].values[1:]
+        }
+    return base
+
+def build_bootstrap_price_data(base, indices):
+    """재표본 인덱스로 종목별 합성 OHLCV 경로 생성 (모든 종목이 같은 날짜 블록을 공유)"""
+    dates = base['dates']
+    price_data = {}
+    
+    for code, arrays in base['stocks'].items():
+        close = arrays['first_close'] * np.exp(np.concatenate(([0.0], np.cumsum(arrays['log_return'][indices]))))
+        body = close[1:]
+        
+        df = pd.DataFrame({
+            'Open': np.concatenate(([close[0]], body * arrays['open_ratio'][indices])),
+            'High': np.concatenate(([close[0]], body * arrays['high_ratio'][indices])),
+            'Low': np.concatenate(([close[0]], body * arrays['low_ratio'][indices])),
+            'Close': close,
+            'Volume': np.concatenate(([arrays['volume'][indices[0]]], arrays['volume'][indices]))
+        }, index=dates)
+        price_data[code] = df
+    
+    return price_data
+
+def calculate_path_metrics(daily_values, tier_usage, initial_capital, stock_count):
+    """단일 시뮬레이션 결과에서 CAGR / 최대낙폭 / 차수 활용률 계산"""
+    if not daily_values:
+        return None
+    
+    totals = np.array([day['total'] for day in daily_values], dtype=np.float64)
+    calendar_days = max(1, (daily_values[-1]['date'] - daily_values[0]['date']).days)
+    
+    final_ratio = totals[-1] / initial_capital
+    cagr = (final_ratio ** (365.0 / calendar_days) - 1) * 100 if final_ratio > 0 else -100.0
+    
+    peaks = np.maximum.accumulate(totals)
+    max_drawdown = ((totals - peaks) / peaks).min() * 100
+    
+    metrics = {
+        'total_return': (final_ratio - 1) * 100,
+        'cagr': cagr,
+        'max_drawdown': max_drawdown
+    }
+    
+    # 차수별 활용률: 전체 (종목 × 거래일) 중 해당 차수를 보유한 비율
+    utilization = tier_usage.mean(axis=0) / max(1, stock_count) * 100
+    for level in range(5):
+        metrics[f'tier{level + 1}_utilization'] = float(utilization[level])
+    
+    return metrics
+
+# 워커 프로세스 전역 상태
+_robustness_context = {}
+
+def _init_robustness_worker(base, settings):
+    """워커 초기화 - 기초 배열과 전략 설정은 워커당 한 번만 전달"""
+    _robustness_context['base'] = base
+    _robustness_context['settings'] = settings
+
+def _run_robustness_simulation(task):
+    """단일 부트스트랩 시뮬레이션 실행 (워커 프로세스)"""
+    sim_id, seed = task
+    base = _robustness_context['base']
+    settings = _robustness_context['settings']
+    
+    try:
+        rng = np.random.default_rng([seed, sim_id])
+        n_returns = len(base['dates']) - 1
+        
+        indices = stationary_bootstrap_indices(n_returns, settings['mean_block_length'], rng)
+        start_offset = int(rng.integers(0, settings['max_start_offset'] + 1)) if settings['max_start_offset'] > 0 else 0
+        
+        backtest = GoldTradingBacktest(initial_capital=settings['initial_capital'], init_api=False,
+                                       fill_model=settings['fill_model'])
+        backtest.portfolio_config = settings['portfolio_config']
+        backtest.base_drops = settings['base_drops']
+        
+        # 지표는 전체 합성 경로로 계산하고, 진입 시점만 start_offset만큼 늦춘다
+        for code, df in build_bootstrap_price_data(base, indices).items():
+            backtest.price_data[code] = backtest.calculate_technical_indicators(df).iloc[start_offset:]
+        
+        if not backtest.run_backtest(verbose=False):
+            return {'sim_id': sim_id, 'start_offset': start_offset, 'error': 'backtest failed'}
+        
+        metrics = calculate_path_metrics(backtest.daily_values, backtest.tier_usage,
+                                         settings['initial_capital'], len(backtest.price_data))
+        metrics.update({
+            'sim_id': sim_id,
+            'start_offset': start_offset,
+            'trade_count': len(backtest.trades),
+            'error': ''
+        })
+        return metrics
+    
+    except Exception as e:
+        return {'sim_id': sim_id, 'error': str(e)}
+
+class GoldRobustnessRunner:
+    """GoldTradingBacktest 부트스트랩/몬테카를로 로버스트니스 분석
+    
+    과거 수익률을 Stationary Bootstrap으로 블록 재표본해 합성 가격 경로를 만들고,
+    진입 시점을 무작위로 늦춰가며 수천 번의 백테스트를 프로세스 풀에서 실행한다.
+    결과는 CAGR, 최대 낙폭, 차수별 활용률의 분포로 요약한다.
+    """
+    
+    PERCENTILES = [5, 25, 50, 75, 95]
+    
+    def __init__(self, backtest, n_simulations=1000, mean_block_length=10,
+                 max_start_offset=20, max_workers=None, seed=42):
+        """
+        Args:
+            backtest (GoldTradingBacktest): 가격 데이터가 로드된 백테스터 (원본 경로)
+            n_simulations (int): 시뮬레이션 횟수
+            mean_block_length (float): 부트스트랩 평균 블록 길이 (거래일)
+            max_start_offset (int): 진입 시점 지연 최대 거래일 수
+        """
+        self.backtest = backtest
+        self.n_simulations = n_simulations
+        self.mean_block_length = mean_block_length
+        self.max_start_offset = max_start_offset
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.seed = seed
+        self.results = None
+    
+    def run(self):
+        """시뮬레이션 실행 후 결과 DataFrame 반환"""
+        base = build_robustness_base(self.backtest.price_data)
+        if base is None:
+            print("❌ 부트스트랩에 사용할 공통 거래일이 부족합니다.")
+            return None
+        
+        settings = {
+            'initial_capital': self.backtest.initial_capital,
+            'portfolio_config': self.backtest.portfolio_config,
+            'base_drops': self.backtest.base_drops,
+            'fill_model': self.backtest.fill_model,
+            'mean_block_length': self.mean_block_length,
+            'max_start_offset': min(self.max_start_offset, len(base['dates']) - 2)
+        }
+        tasks = [(sim_id, self.seed) for sim_id in range(self.n_simulations)]
+        
+        print(f"🎲 로버스트니스 분석 시작: {self.n_simulations}회 시뮬레이션, "
+              f"{len(base['dates'])}거래일, 워커 {self.max_workers}개")
+        start_time = time.time()
+        
+        rows = []
+        chunksize = max(1, self.n_simulations // (self.max_workers * 8))
+        with multiprocessing.Pool(processes=self.max_workers,
+                                  initializer=_init_robustness_worker,
+                                  initargs=(base, settings)) as pool:
+            for i, row in enumerate(pool.imap_unordered(_run_robustness_simulation, tasks, chunksize=chunksize), 1):
+                rows.append(row)
+                if i % max(1, self.n_simulations // 10) == 0:
+                    print(f"  진행률: {i / self.n_simulations * 100:.0f}% ({i}/{self.n_simulations})")
+        
+        self.results = pd.DataFrame(rows).sort_values('sim_id').reset_index(drop=True)
+        
+        failed = (self.results['error'] != '').sum()
+        print(f"✅ 시뮬레이션 완료: {time.time() - start_time:.1f}초 (실패 {failed}건)")
+        return self.results
+    
+    def summarize(self, results=None):
+        """지표별 분포 요약 (평균/표준편차/분위수) + 손실 확률"""
+        results = self.results if results is None else results
+        if results is None or results.empty:
+            return {}
+        
+        valid = results[results['error'] == '']
+        if valid.empty:
+            return {}
+        
+        metric_columns = ['cagr', 'max_drawdown', 'total_return', 'trade_count'] + \
+                         [f'tier{level}_utilization' for level in range(1, 6)]
+        
+        summary = {'simulations': int(len(valid))}
+        for column in metric_columns:
+            values = valid[column].values.astype(np.float64)
+            stats = {'mean': float(values.mean()), 'std': float(values.std())}
+            for q, value in zip(self.PERCENTILES, np.percentile(values, self.PERCENTILES)):
+                stats[f'p{q}'] = float(value)
+            summary[column] = stats
+        
+        summary['probability_of_loss'] = float((valid['total_return'] < 0).mean() * 100)
+        return summary
+    
+    def print_summary(self, summary, base_metrics=None):
+        """분포 요약 출력"""
+        if not summary:
+            print("❌ 요약할 시뮬레이션 결과가 없습니다.")
+            return
+        
+        print("\n🎲 로버스트니스 분석 결과")
+        print("=" * 60)
+        print(f"유효 시뮬레이션: {summary['simulations']}회")
+        if base_metrics:
+            print(f"원본 경로: CAGR {base_metrics['cagr']:+.2f}% / 최대낙폭 {base_metrics['max_drawdown']:.2f}%")
+        
+        labels = [('cagr', 'CAGR(%)'), ('max_drawdown', '최대낙폭(%)'), ('total_return', '총수익률(%)')] + \
+                 [(f'tier{level}_utilization', f'{level}차 활용률(%)') for level in range(1, 6)]
+        
+        print(f"{'지표':<14}" + "".join(f"{f'p{q}':>9}" for q in self.PERCENTILES) + f"{'평균':>9}")
+        print("-" * 60)
+        for key, label in labels:
+            stats = summary[key]
+            print(f"{label:<14}" + "".join(f"{stats[f'p{q}']:>9.2f}" for q in self.PERCENTILES) + f"{stats['mean']:>9.2f}")
+        
+        print(f"\n손실 확률: {summary['probability_of_loss']:.1f}%")
+
+def run_gold_robustness(initial_capital=600000, days_back=365, n_simulations=1000,
+                        mean_block_length=10, max_start_offset=20, max_workers=None, seed=42):
+    """
+    금 ETF 5차수 분할매매 로버스트니스 분석 실행
+    
+    Returns:
+        dict: 원본 경로 지표, 분포 요약, 결과 파일 경로
+    """
+    backtest = GoldTradingBacktest(initial_capital=initial_capital, days_back=days_back)
+    
+    if not backtest.fetch_korean_etf_data():
+        print("❌ 데이터 수집 실패로 로버스트니스 분석 중단")
+        return None
+    
+    # 원본 경로 기준값
+    if not backtest.run_backtest(verbose=False):
+        return None
+    base_metrics = calculate_path_metrics(backtest.daily_values, backtest.tier_usage,
+                                          initial_capital, len(backtest.price_data))
+    
+    runner = GoldRobustnessRunner(
+        backtest,
+        n_simulations=n_simulations,
+        mean_block_length=mean_block_length,
+        max_start_offset=max_start_offset,
+        max_workers=max_workers,
+        seed=seed
+    )
+    results = runner.run()
+    if results is None:
+        return None
+    
+    summary = runner.summarize()
+    runner.print_summary(summary, base_metrics)
+    
+    os.makedirs('backtest_results', exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+    csv_file = f'backtest_results/gold_robustness_sims_{timestamp}.csv'
+    json_file = f'backtest_results/gold_robustness_summary_{timestamp}.json'
+    
+    results.to_csv(csv_file, index=False, encoding='utf-8-sig')
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'settings': {
+                'n_simulations': n_simulations,
+                'mean_block_length': mean_block_length,
+                'max_start_offset': max_start_offset,
+                'seed': seed
+            },
+            'base_metrics': base_metrics,
+            'summary': summary
+        }, f, ensure_ascii=False, indent=2)
+    print(f"✅ 로버스트니스 결과 저장 완료: {csv_file}, {json_file}")
+    
+    return {
+        'base_metrics': base_metrics,
+        'summary': summary,
+        'csv_file': csv_file,
+        'json_file': json_file
+    }
+
 def main():
     """메인 실행 함수"""
     print("🥇 SmartGoldTradingBot 백테스팅 시스템")
@@ -831,4 +1236,8 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python GoldBacktesting_KR.py --robustness → 부트스트랩 로버스트니스 분석
+    if "--robustness" in sys.argv:
+        run_gold_robustness()
+    else:
+        main()
\ No newline at end of file
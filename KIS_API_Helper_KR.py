@@ -646,6 +646,48 @@ def GetCurrentPrice(stock_code):
         return res.json()["msg_cd"]
 
 
+#국내 주식 현재 시세 (당일 시가/고가/저가/현재가/누적 거래량/누적 거래대금) - 일봉 메모의 오늘 봉 갱신용
+def GetCurrentQuote(stock_code):
+    time.sleep(0.2)
+    #모의계좌는 초당 2건만 허용하게 변경 - 24.04.01
+    if Common.GetNowDist() == "VIRTUAL":
+        time.sleep(0.31)
+
+    PATH = "uapi/domestic-stock/v1/quotations/inquire-price"
+    URL = f"{Common.GetUrlBase(Common.GetNowDist())}/{PATH}"
+
+    # 헤더 설정
+    headers = {"Content-Type":"application/json", 
+            "authorization": f"Bearer {Common.GetToken(Common.GetNowDist())}",
+            "appKey":Common.GetAppKey(Common.GetNowDist()),
+            "appSecret":Common.GetAppSecret(Common.GetNowDist()),
+            "tr_id":"FHKST01010100"}
+
+    params = {
+        "FID_COND_MRKT_DIV_CODE":"J",
+        "FID_INPUT_ISCD": stock_code
+    }
+
+    # 호출
+    res = requests.get(URL, headers=headers, params=params)
+
+    if res.status_code == 200 and res.json()["rt_cd"] == '0':
+        result = res.json()['output']
+
+        quoteDict = dict()
+        quoteDict['code'] = stock_code
+        quoteDict['open'] = int(result['stck_oprc'])
+        quoteDict['high'] = int(result['stck_hgpr'])
+        quoteDict['low'] = int(result['stck_lwpr'])
+        quoteDict['close'] = int(result['stck_prpr'])
+        quoteDict['volume'] = int(result['acml_vol'])
+        quoteDict['value'] = float(result['acml_tr_pbmn'])
+        return quoteDict
+    else:
+        logger.error(f"Error Code : " + str(res.status_code) + " | " + res.text)
+        return res.json()["msg_cd"]
+
+
 #국내 주식 호가 단위!
 def GetHoga(stock_code):
     time.sleep(0.2)
@@ -1617,6 +1659,9 @@ def GetOrderList(stockcode = "", side = "ALL", status = "ALL", limit = 5):
             #주문 최종 수량~
             OrderInfo["OrderResultAmt"] = int(float(order['tot_ccld_qty']) + float(order['cncl_cfrm_qty']))
 
+            #실제 체결 수량 (취소 확인 수량 제외)
+            OrderInfo["OrderExecAmt"] = int(float(order['tot_ccld_qty']))
+
 
             #주문넘버..
             OrderInfo["OrderNum"] = order['ord_gno_brno']
@@ -12,6 +12,7 @@
 from __future__ import annotations
 import Kiwoom_API_Helper_KR as KiwoomKR
 import discord_alert
+import account_snapshot
 import json
 import time
 from datetime import datetime, timedelta
@@ -54,6 +55,8 @@ console_handler.setFormatter(formatter)
 logger.addHandler(file_handler)
 logger.addHandler(console_handler)
 
+account_snapshot.set_logger(logger)
+
 ################################### 로깅 처리 끝 ##################################
 
 # 키움 API 초기화 (재시도 로직 추가)
@@ -726,6 +729,15 @@ class SignalTradingBot:
         self.running: bool = True
         self.lock: threading.Lock = threading.Lock()  # 데이터 동시 접근 방지
 
+        # 🔥 계좌 스냅샷 (예수금/보유 종목 - 자산 계산이 같은 조회 결과 공유, 주문/체결 후 바로 갱신)
+        # 조회마다 10초 제한 (초과 시 해당 항목만 실패 처리, 다음 조회에서 다시 가져옴)
+        self.account_snapshots = account_snapshot.AccountSnapshotService(
+            KiwoomAPI.GetMyStockList,
+            KiwoomAPI.GetBalance,
+            refresh_interval=config.get("account_refresh_seconds", 30),
+            fetch_timeout=10
+        )
+
         logger.info(f"봇 초기화 완료")
         logger.info(f"현재 보유 종목: {len(self.positions)}개")
         logger.info(f"미체결 주문: {len(self.pending_orders)}개")
@@ -1501,6 +1513,7 @@ class SignalTradingBot:
             order_result = KiwoomAPI.MakeBuyLimitOrder(stock_code, buy_quantity, adjusted_price)
             
             if order_result.get('success', False):
+                self.account_snapshots.on_fill(stock_code)
                 order_no = order_result.get('order_no', '')
                 
                 with self.lock:
@@ -1608,6 +1621,7 @@ class SignalTradingBot:
                     if is_filled:
                         # ✅ 체결 완료!
                         logger.info(f"✅ {stock_name} {order_type.upper()} 주문 체결 확인")
+                        self.account_snapshots.on_fill(stock_code)
                         
                         # 🔥 실제 체결가 가져오기
                         filled_price = None
@@ -3649,6 +3663,7 @@ class SignalTradingBot:
             order_result = KiwoomAPI.MakeSellLimitOrder(stock_code, quantity, adjusted_price)
             
             if order_result.get('success', False):
+                self.account_snapshots.on_fill(stock_code)
                 order_no = order_result.get('order_no', '')
                 
                 # 🔥 매도 미체결 관리: pending_orders에 추가
@@ -4003,24 +4018,14 @@ class SignalTradingBot:
         try:
             logger.info(f"💰 자산 계산 시작 (시도: {retry_count + 1}/{max_retry + 1})")
 
-            # 1️⃣ 주문가능금액 조회 (타임아웃 10초)
+            # 1️⃣ 주문가능금액 조회 (계좌 스냅샷, 조회마다 타임아웃 10초 - 초과 시 잔고 없음으로 재시도)
             logger.debug("   → 1단계: 잔고 조회 시작...")
 
-            try:
-                balance = call_with_timeout(KiwoomAPI.GetBalance, timeout=10)
-            except TimeoutError as e:
-                logger.error(f"❌ 잔고 조회 타임아웃: {e}")
-                
-                if retry_count < max_retry:
-                    logger.warning(f"🔄 {retry_count + 1}초 후 재시도...")
-                    time.sleep(retry_count + 1)
-                    return self.calculate_total_asset(retry_count + 1, max_retry)
-                else:
-                    logger.error(f"❌ 최대 재시도 초과 - 자산 계산 실패")
-                    return None
+            snapshot = self.account_snapshots.get()
+            balance = snapshot.balance
 
             if not balance:
-                logger.error("❌ 잔고 조회 실패 (응답 없음)")
+                logger.error("❌ 잔고 조회 실패 (응답 없음 또는 타임아웃)")
                 
                 if retry_count < max_retry:
                     logger.warning(f"🔄 {retry_count + 1}초 후 재시도...")
@@ -4044,7 +4049,7 @@ class SignalTradingBot:
 
             logger.debug(f"   ✅ 1단계 완료: 현금 {orderable_amt:,}원")
 
-            # 2️⃣ 보유 주식 평가금액 계산
+            # 2️⃣ 보유 주식 평가금액 계산 (스냅샷 보유 종목 현재가, 없으면 종목별 조회)
             logger.debug("   → 2단계: 보유주식 평가 시작...")
             holding_value = 0
             
@@ -4056,11 +4061,17 @@ class SignalTradingBot:
                     try:
                         logger.debug(f"      {idx}/{position_count} - {stock_code} 평가 중...")
                         
-                        stock_info = call_with_timeout(
-                            KiwoomAPI.GetStockInfo, 
-                            timeout=10,
-                            stock_code=stock_code
-                        )
+                        # 잔고 현재가는 등락 부호(+/-)가 붙어 올 수 있어 절대값 사용
+                        holding = snapshot.holding(stock_code)
+                        snapshot_price = abs(holding.get('CurrentPrice', 0)) if holding else 0
+                        if snapshot_price > 0:
+                            stock_info = {'CurrentPrice': snapshot_price}
+                        else:
+                            stock_info = call_with_timeout(
+                                KiwoomAPI.GetStockInfo, 
+                                timeout=10,
+                                stock_code=stock_code
+                            )
                         
                         if stock_info:
                             current_price = stock_info.get('CurrentPrice', 0)
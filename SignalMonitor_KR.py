@@ -204,6 +204,7 @@ MONITOR_CONFIG = {
     
     # 히스토리 관리 설정
     "history_max_days": 7,
+    "archive_file": "signal_archive.jsonl",  # 정리되는 히스토리 누적 보관 (signal_replay_backtest 분석용)
     "cache_max_size": 2000,  # 🔥 1000 → 2000으로 증가 (종목 증가 대응)
 }
 
@@ -1212,6 +1213,10 @@ class SignalMonitor:
             original_count = len(self.signal_history)
             
             # 최근 데이터만 유지
+            expired = [
+                sig for sig in self.signal_history
+                if datetime.strptime(sig['timestamp'], "%Y-%m-%d %H:%M:%S") <= cutoff_date
+            ]
             self.signal_history = [
                 sig for sig in self.signal_history
                 if datetime.strptime(sig['timestamp'], "%Y-%m-%d %H:%M:%S") > cutoff_date
@@ -1220,6 +1225,14 @@ class SignalMonitor:
             deleted_count = original_count - len(self.signal_history)
             
             if deleted_count > 0:
+                # 삭제 전에 보관 파일로 이동 (오프라인 신호 성과 분석용)
+                archive_file = MONITOR_CONFIG.get("archive_file")
+                if archive_file and expired:
+                    with open(archive_file, 'a', encoding='utf-8') as f:
+                        for sig in expired:
+                            f.write(json.dumps(sig, ensure_ascii=False, default=str) + "\n")
+                    logger.info(f"📦 히스토리 보관: {len(expired)}건 → {archive_file}")
+                
                 logger.info(f"🗑️ 오래된 히스토리 삭제: {deleted_count}건 ({max_days}일 이상)")
             
         except Exception as e:
@@ -15,6 +15,7 @@
 
 import KIS_Common as Common
 import KIS_API_Helper_KR as KisKR
+import account_snapshot
 import discord_alert
 import json
 import time
@@ -72,6 +73,7 @@ logger.addHandler(console_handler)
 try:
     KisKR.set_logger(logger)
     Common.set_logger(logger)
+    account_snapshot.set_logger(logger)
 except:
     logger.warning("API 헬퍼 모듈에 로거를 전달할 수 없습니다.")
 
@@ -725,6 +727,13 @@ class SmartMagicSplit:
     def __init__(self):
         self.split_data_list = self.load_split_data()
         self.total_money = 0
+        # 🔥 계좌 스냅샷 - 브로커 동기화 / 불일치 점검이 보유 종목·미체결 주문 조회 결과 공유 (주문 후에는 바로 갱신)
+        self.account_snapshots = account_snapshot.AccountSnapshotService(
+            KisKR.GetMyStockList,
+            KisKR.GetBalance,
+            lambda: KisKR.GetOrderList("", "ALL", "OPEN", 1),
+            refresh_interval=config.config.get("account_refresh_seconds", 30)
+        )
         self.update_budget()
         self._upgrade_json_structure_if_needed()
         # 🔥 새로 추가: 매도 이력 추적을 위한 딕셔너리
@@ -2832,9 +2841,12 @@ class SmartMagicSplit:
         try:
             discrepancies = []
             
-            # 브로커 실제 보유 정보 조회
-            my_stocks = KisKR.GetMyStockList()
-            broker_positions = {stock['StockCode']: stock for stock in my_stocks}
+            # 브로커 실제 보유 정보 (계좌 스냅샷)
+            snapshot = self.account_snapshots.get()
+            if not snapshot.holdings_ok:
+                logger.warning("⚠️ 보유 종목 조회 실패 - 포지션 불일치 점검 건너뜀")
+                return []
+            broker_positions = snapshot.holdings
             
             target_stocks = config.target_stocks
             
@@ -2849,6 +2861,11 @@ class SmartMagicSplit:
                 if not stock_data_info:
                     continue
                 
+                # 미체결 주문이 있으면 체결 전후 수량 차이를 불일치로 보지 않음
+                if snapshot.has_open_order(stock_code):
+                    logger.info(f"⏳ {stock_code} 미체결 주문 있음 - 불일치 점검 건너뜀")
+                    continue
+                
                 # 봇 관리 총 보유량 계산
                 internal_total = 0
                 internal_positions = []
@@ -3765,6 +3782,7 @@ class SmartMagicSplit:
     def handle_buy(self, stock_code, amount, price):
         """매수 주문 처리 - 개선된 버전으로 리다이렉트"""
         success, executed_amount, message = self.handle_buy_with_execution_tracking(stock_code, amount, price)
+        self.account_snapshots.on_fill(stock_code)
         
         if success and executed_amount:
             return success, executed_amount
@@ -3781,12 +3799,26 @@ class SmartMagicSplit:
             target_stocks = config.target_stocks
             sync_count = 0
             
+            # 🔥 브로커 실제 보유량 (전 종목 같은 계좌 스냅샷 사용)
+            snapshot = self.account_snapshots.get()
+            if not snapshot.holdings_ok:
+                logger.warning("⚠️ 보유 종목 조회 실패 - 브로커 동기화 건너뜀")
+                return
+            
             for stock_code in target_stocks.keys():
                 try:
-                    holdings = self.get_current_holdings(stock_code)
+                    stock_name = target_stocks[stock_code].get('name', stock_code)
+                    
+                    # 미체결 주문이 있으면 곧 보유량이 바뀌므로 이번 동기화에서 제외
+                    if snapshot.has_open_order(stock_code):
+                        logger.info(f"⏳ {stock_name} 미체결 주문 있음 - 동기화 건너뜀")
+                        continue
+                    
+                    holdings = self.get_snapshot_holdings(snapshot, stock_code)
+                    if holdings.get('api_error', False):
+                        continue
                     broker_amount = holdings.get('amount', 0)
                     broker_avg_price = holdings.get('avg_price', 0)
-                    stock_name = target_stocks[stock_code].get('name', stock_code)
                     
                     # 해당 종목 데이터 찾기
                     stock_data_info = None
@@ -4248,6 +4280,26 @@ class SmartMagicSplit:
             logger.error(f"한국주식 보유 수량 조회 중 오류: {str(e)}")
             return {'amount': 0, 'avg_price': 0, 'revenue_rate': 0, 'revenue_money': 0}
         
+    def get_snapshot_holdings(self, snapshot, stock_code):
+        """계좌 스냅샷에서 보유 수량 및 상태 조회 (get_current_holdings와 같은 형식)"""
+        if not snapshot.holdings_ok:
+            return {'amount': -1, 'avg_price': 0, 'revenue_rate': 0, 'revenue_money': 0, 'api_error': True}
+
+        stock = snapshot.holding(stock_code)
+        if stock is None:
+            return {'amount': 0, 'avg_price': 0, 'revenue_rate': 0, 'revenue_money': 0}
+
+        try:
+            return {
+                'amount': int(stock['StockAmt']),
+                'avg_price': float(stock['StockAvgPrice']),
+                'revenue_rate': float(stock['StockRevenueRate']),
+                'revenue_money': float(stock['StockRevenueMoney'])
+            }
+        except Exception as e:
+            logger.error(f"한국주식 보유 수량 조회 중 오류: {str(e)}")
+            return {'amount': -1, 'avg_price': 0, 'revenue_rate': 0, 'revenue_money': 0, 'api_error': True}
+
     def handle_sell(self, stock_code, amount, price):
         """매도 주문 처리 - 🔥 강화된 쿨다운 설정 + 체결 확인 + 미체결 추적 포함"""
         try:
@@ -4296,6 +4348,7 @@ class SmartMagicSplit:
             
             # 🔥 6. 한국주식 지정가 매도 주문 실행
             result = KisKR.MakeSellLimitOrder(stock_code, amount, order_price)
+            self.account_snapshots.on_fill(stock_code)
             
             if not result:
                 logger.error(f"❌ {stock_name} 매도 주문 응답 없음")
@@ -23,6 +23,7 @@ import os
 import schedule
 from datetime import datetime, timedelta  # timedelta 추가 (주간 계산용)
 from api_resilience import retry_manager, SafeKisUS, set_logger as set_resilience_logger
+import account_snapshot
 
 import yfinance as yf  # SLV 데이터 수집용
 import numpy as np     # 데이터 계산용
@@ -78,6 +79,7 @@ try:
     Common.set_logger(logger)
     # 🔥 API 복원력 모듈에도 로거 전달
     set_resilience_logger(logger)
+    account_snapshot.set_logger(logger)
 
     logger.info("✅ 모든 모듈에 로거 전달 완료 (KIS API, Common, API Resilience)")
 except:
@@ -912,6 +914,13 @@ class SmartMagicSplit:
     def __init__(self):
         self.split_data_list = self.load_split_data()
         self.total_money = 0
+        # 🔥 계좌 스냅샷 - 브로커 동기화 / 불일치 점검이 보유 종목·미체결 주문 조회 결과 공유 (주문 후에는 바로 갱신)
+        self.account_snapshots = account_snapshot.AccountSnapshotService(
+            lambda: SafeKisUS.safe_get_my_stock_list("USD"),
+            lambda: SafeKisUS.safe_get_balance("USD"),
+            lambda: SafeKisUS.safe_get_order_list("", "ALL", "OPEN", 1),
+            refresh_interval=config.config.get("account_refresh_seconds", 30)
+        )
         self.update_budget()
         self._upgrade_json_structure_if_needed()
         # 🔥 뉴스 캐시 초기화 추가
@@ -3501,6 +3510,26 @@ class SmartMagicSplit:
             # 🔧 새로 추가: API 오류 표시
             return {'amount': -1, 'avg_price': 0, 'revenue_rate': 0, 'revenue_money': 0, 'api_error': True}        
 
+    def get_snapshot_holdings(self, snapshot, stock_code):
+        """계좌 스냅샷에서 보유 수량 및 상태 조회 (get_current_holdings와 같은 형식)"""
+        if not snapshot.holdings_ok:
+            return {'amount': -1, 'avg_price': 0, 'revenue_rate': 0, 'revenue_money': 0, 'api_error': True}
+
+        stock = snapshot.holding(stock_code)
+        if stock is None:
+            return {'amount': 0, 'avg_price': 0, 'revenue_rate': 0, 'revenue_money': 0}
+
+        try:
+            return {
+                'amount': int(stock['StockAmt']),
+                'avg_price': float(stock['StockAvgPrice']),
+                'revenue_rate': float(stock['StockRevenueRate']),
+                'revenue_money': float(stock['StockRevenueMoney'])
+            }
+        except Exception as e:
+            logger.error(f"❌ {stock_code} 미국주식 보유 수량 조회 중 API 오류: {str(e)}")
+            return {'amount': -1, 'avg_price': 0, 'revenue_rate': 0, 'revenue_money': 0, 'api_error': True}
+
     def sync_position_after_buy_with_order_list(self, stock_code, position_num, order_price, expected_amount):
         """주문내역 조회 기반 정확한 체결가 동기화 - 차수 혼동 버그 수정 (3차수봇용)"""
         try:
@@ -4071,6 +4100,7 @@ class SmartMagicSplit:
     def handle_buy(self, stock_code, amount, price):
         """개선된 매수 주문 처리 (bb_trading.py 로직 적용)"""
         success, executed_amount, message = self.handle_buy_with_execution_tracking(stock_code, amount, price)
+        self.account_snapshots.on_fill(stock_code)
         
         if success and executed_amount:
             return success, executed_amount
@@ -4088,6 +4118,7 @@ class SmartMagicSplit:
             result = SafeKisUS.safe_make_sell_limit_order(stock_code, amount, order_price)
                         
             if result:
+                self.account_snapshots.on_fill(stock_code)
                 logger.info(f"📉 {stock_code} 매도 주문 전송: {amount}주 × ${order_price:.2f}, 예상 수수료: ${estimated_fee:.2f}")
             
             return result, None
@@ -5007,11 +5038,22 @@ class SmartMagicSplit:
             target_stocks = config.target_stocks
             discrepancies = []
             
+            # 🔍 브로커 실제 보유량 (전 종목 같은 계좌 스냅샷 사용)
+            snapshot = self.account_snapshots.get()
+            if not snapshot.holdings_ok:
+                logger.warning("⚠️ 보유 종목 조회 실패 - 포지션 불일치 점검 건너뜀")
+                return []
+            
             for stock_code in target_stocks.keys():
                 stock_name = target_stocks[stock_code].get('name', stock_code)
                 
+                # 미체결 주문이 있으면 체결 전후 수량 차이를 불일치로 보지 않음
+                if snapshot.has_open_order(stock_code):
+                    logger.info(f"⏳ {stock_name} 미체결 주문 있음 - 불일치 점검 건너뜀")
+                    continue
+                
                 # 🔍 브로커 실제 보유량 조회
-                holdings = self.get_current_holdings(stock_code)
+                holdings = self.get_snapshot_holdings(snapshot, stock_code)
                 broker_amount = holdings.get('amount', 0)
                 broker_avg_price = holdings.get('avg_price', 0)
                 broker_revenue_rate = holdings.get('revenue_rate', 0)
@@ -6934,8 +6976,19 @@ class SmartMagicSplit:
             target_stocks = config.target_stocks
             sync_count = 0
             
+            # 🔥 브로커 실제 보유량 (전 종목 같은 계좌 스냅샷 사용)
+            snapshot = self.account_snapshots.get()
+            if not snapshot.holdings_ok:
+                logger.warning("⚠️ 보유 종목 조회 실패 - 브로커 동기화 건너뜀")
+                return
+            
             for stock_code in target_stocks.keys():
-                holdings = self.get_current_holdings(stock_code)
+                # 미체결 주문이 있으면 곧 보유량이 바뀌므로 이번 동기화에서 제외
+                if snapshot.has_open_order(stock_code):
+                    logger.info(f"⏳ {stock_code} 미체결 주문 있음 - 동기화 건너뜀")
+                    continue
+                
+                holdings = self.get_snapshot_holdings(snapshot, stock_code)
                 broker_amount = holdings.get('amount', 0)
                 broker_avg_price = holdings.get('avg_price', 0)
                 
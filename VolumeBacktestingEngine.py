@@ -10,9 +10,15 @@ import KIS_Common as Common
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import os
 import json
 import logging
-import time
+import itertools
+import multiprocessing
+from multiprocessing import shared_memory
+from backtest_data_store import get_default_store
+from backtest_result_store import ColumnarBuffer, write_results
+from fill_model import CloseFillModel
 
 ################################### 로깅 설정 ##################################
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -21,21 +27,68 @@ logger = logging.getLogger(__name__)
 # KIS_Common 모듈에 로거 설정
 Common.set_logger(logger)
 
+################################### 결과 스키마 ##################################
+
+# 거래 내역 열 버퍼 스키마 (BUY 행은 매도 관련 컬럼이 비어 있음)
+TRADE_SCHEMA = {
+    'date': 'str', 'stock_code': 'str', 'type': 'str',
+    'price': 'float', 'amount': 'int', 'total_amount': 'float', 'commission': 'float',
+    'signal_type': 'str', 'profit': 'float', 'profit_rate': 'float', 'hold_days': 'int',
+    'sell_reason': 'str', 'entry_price': 'float', 'entry_date': 'str', 'cash_after': 'float'
+}
+
+# 일별 포트폴리오 열 버퍼 스키마
+EQUITY_SCHEMA = {
+    'date': 'str', 'cash': 'float', 'stock_value': 'float', 'total_value': 'float', 'return_rate': 'float'
+}
+
+################################### 가격 패널 ##################################
+
+class VolumePricePanel:
+    """전 종목 날짜 정렬 NumPy 패널 (T일 × N종목)
+
+    - dates: 전체 거래일 (문자열 'YYYY-MM-DD', 정렬)
+    - row_idx[t, j]: t일에 해당하는 j종목 DataFrame의 행 번호 (-1이면 데이터 없음)
+    - available[t, j]: 데이터 존재 여부 마스크
+    - close[t, j]: 종가 (데이터 없으면 NaN), last_close: 직전 종가로 채운 값
+    - buy_signal[t, j]: 거래량 급증/눌림목 매수 신호 (사전 계산)
+    """
+
+    def __init__(self, stock_codes, dates, row_idx, close, buy_signal, signals, frames):
+        self.stock_codes = stock_codes
+        self.col = {stock_code: j for j, stock_code in enumerate(stock_codes)}
+        self.dates = dates
+        self.row_idx = row_idx
+        self.available = row_idx >= 0
+        self.close = close
+        self.last_close = pd.DataFrame(close).ffill().values
+        self.buy_signal = buy_signal
+        self.signals = signals
+        self.frames = frames
+
+    def date_range(self, start_str, end_str):
+        """[start_str, end_str] 구간의 패널 오프셋 범위"""
+        start = int(np.searchsorted(self.dates, start_str, side='left'))
+        end = int(np.searchsorted(self.dates, end_str, side='right'))
+        return start, end
+
 ################################### 백테스팅 엔진 클래스 ##################################
 
 class VolumeBacktestingEngine:
     """거래량 기반 매매 백테스팅 엔진"""
     
-    def __init__(self, initial_capital=5000000, max_positions=5, commission_rate=0.00015):
+    def __init__(self, initial_capital=5000000, max_positions=5, commission_rate=0.00015, fill_model=None):
         """
         Args:
             initial_capital (int): 초기 투자금액 (기본 500만원)
             max_positions (int): 최대 보유 종목 수
             commission_rate (float): 거래 수수료율 (기본 0.015%)
+            fill_model: 체결 모델 (fill_model.py, 기본값 CloseFillModel - 종가 전량 체결)
         """
         self.initial_capital = initial_capital
         self.max_positions = max_positions
         self.commission_rate = commission_rate
+        self.fill_model = fill_model or CloseFillModel()
         
         # 백테스팅 설정 (기존 봇과 동일 - 원본 설정)
         self.config = {
@@ -45,6 +98,8 @@ class VolumeBacktestingEngine:
                 "volume_surge_ratio_strong": 2.5, # 강한 신호용 추가 기준
                 "consecutive_pattern_days": 3,
                 "pullback_volume_decrease": 0.75,  # 0.7 → 0.75 (눌림목 조건 완화)
+                "pullback_min_decline": -10.0,     # 눌림목 최대 조정폭 (%)
+                "pullback_max_decline": -2.0,      # 눌림목 최소 조정폭 (%)
                 "candle_body_ratio": 0.55,        # 0.6 → 0.55 (양봉 조건 완화)
                 "min_price_increase": 2.5,        # 3.0 → 2.5 (가격 상승 조건 완화)
                 "rsi_upper_limit": 70,             # 75 → 70 (과매수 구간 진입 전 매수)
@@ -74,36 +129,31 @@ class VolumeBacktestingEngine:
         # 백테스팅 상태 변수
         self.current_cash = initial_capital
         self.positions = {}  # {종목코드: {amount, entry_price, entry_date, signal_type}}
-        self.trade_history = []
-        self.daily_portfolio_value = []
+        self.trade_history = ColumnarBuffer(TRADE_SCHEMA)
+        self.daily_portfolio_value = ColumnarBuffer(EQUITY_SCHEMA)
         
         logger.info(f"백테스팅 엔진 초기화 완료 - 초기자금: {initial_capital:,}원")
 
+    def apply_config_overrides(self, overrides):
+        """설정값 덮어쓰기 ("buy_conditions.volume_surge_ratio" 형식의 키)"""
+        for key, value in overrides.items():
+            section, name = key.split(".", 1)
+            self.config[section][name] = value
+
     def get_historical_data(self, stock_code, days=365):
         """과거 데이터 조회"""
         try:
             logger.info(f"{stock_code} 데이터 조회 시작...")
             
-            # KIS API를 통한 데이터 조회 시도
+            # 로컬 일봉 저장소 우선 (없거나 오래된 구간만 KIS API로 조회)
             try:
                 import KIS_API_Helper_KR as KisKR
                 # KIS API에 로거 설정
                 KisKR.set_logger(logger)
-                
-                # # 모의계좌 모드로 설정 (데이터 조회용)
-                # Common.SetChangeMode("VIRTUAL")
-                
-                df = KisKR.GetOhlcvNew(stock_code, "D", days)
-                
-                if df is None or len(df) < 50:
-                    logger.warning(f"{stock_code}: KIS API 데이터 부족, 대체 방법 시도...")
-                    # 대체 방법으로 Common.GetOhlcv 사용
-                    df = Common.GetOhlcv("KR", stock_code, days)
-                
             except Exception as e:
-                logger.warning(f"{stock_code}: KIS API 조회 실패 ({str(e)}), 대체 방법 사용...")
-                # 대체 방법으로 Common.GetOhlcv 사용
-                df = Common.GetOhlcv("KR", stock_code, days)
+                logger.warning(f"{stock_code}: KIS API 모듈 로드 실패 ({str(e)}), 저장소 캐시만 사용...")
+            
+            df = get_default_store().get_daily(stock_code, days=days)
             
             if df is None or len(df) < 50:
                 logger.warning(f"{stock_code}: 데이터 부족 (길이: {len(df) if df is not None else 0})")
@@ -111,34 +161,222 @@ class VolumeBacktestingEngine:
             
             logger.info(f"{stock_code}: 데이터 로드 완료 ({len(df)}일치)")
             
-            # 거래량 관련 지표 계산
-            df['volume_ma5'] = df['volume'].rolling(5).mean()
-            df['volume_ma20'] = df['volume'].rolling(20).mean()
-            
-            # 0으로 나누기 방지
-            df['volume_ratio'] = df['volume'] / df['volume_ma20'].replace(0, 1)
-            df['price_change'] = (df['close'] - df['open']) / df['open'].replace(0, 0.0001) * 100
-            
-            # 고가-저가가 0인 경우 방지
-            price_range = (df['high'] - df['low']).replace(0, 0.0001)
-            df['candle_body_ratio'] = abs(df['close'] - df['open']) / price_range
-            
-            # RSI 계산
-            delta = df['close'].diff()
-            gain = delta.where(delta > 0, 0).rolling(14).mean()
-            loss = (-delta).where(delta < 0, 0).rolling(14).mean()
-            rs = gain / loss.replace(0, 1)  # 0으로 나누기 방지
-            df['rsi'] = 100 - (100 / (1 + rs))
-            
-            # NaN 값 처리 (최신 pandas 문법 사용)
-            df = df.ffill().bfill()
-            
-            return df
+            return self.prepare_frame(df)
             
         except Exception as e:
             logger.error(f"{stock_code} 데이터 조회 오류: {str(e)}")
             return None
 
+    def prepare_frame(self, df):
+        """저장소 일봉(DatetimeIndex)에 거래량/RSI 지표 추가 (포트폴리오 백테스트의 공유 일봉도 이 경로 사용)"""
+        # GetOhlcvNew와 같은 'YYYY-MM-DD' 문자열 인덱스로 통일 (가격 패널 날짜 축)
+        df = df.copy()
+        df.index = df.index.strftime('%Y-%m-%d')
+        
+        # 거래량 관련 지표 계산
+        df['volume_ma5'] = df['volume'].rolling(5).mean()
+        df['volume_ma20'] = df['volume'].rolling(20).mean()
+        
+        # 0으로 나누기 방지
+        df['volume_ratio'] = df['volume'] / df['volume_ma20'].replace(0, 1)
+        df['price_change'] = (df['close'] - df['open']) / df['open'].replace(0, 0.0001) * 100
+        
+        # 고가-저가가 0인 경우 방지
+        price_range = (df['high'] - df['low']).replace(0, 0.0001)
+        df['candle_body_ratio'] = abs(df['close'] - df['open']) / price_range
+        
+        # RSI 계산
+        delta = df['close'].diff()
+        gain = delta.where(delta > 0, 0).rolling(14).mean()
+        loss = (-delta).where(delta < 0, 0).rolling(14).mean()
+        rs = gain / loss.replace(0, 1)  # 0으로 나누기 방지
+        df['rsi'] = 100 - (100 / (1 + rs))
+        
+        # NaN 값 처리 (최신 pandas 문법 사용)
+        df = df.ffill().bfill()
+        
+        return df
+
+    def compute_signal_arrays(self, df):
+        """패턴 감지 결과를 행 단위 boolean 배열로 사전 계산
+
+        detect_volume_surge_pattern / detect_pullback_opportunity /
+        detect_distribution_pattern과 동일한 조건을 전체 행에 대해 벡터 연산으로 평가한다.
+        상세 정보(dict)는 신호가 발생한 행에서만 기존 감지 함수로 구한다.
+        """
+        buy_conditions = self.config["buy_conditions"]
+        sell_conditions = self.config["sell_conditions"]
+
+        n = len(df)
+        pos = np.arange(n)
+
+        open_ = df['open'].values.astype(float)
+        high = df['high'].values.astype(float)
+        low = df['low'].values.astype(float)
+        close = df['close'].values.astype(float)
+        volume_ratio = df['volume_ratio'].values.astype(float)
+        price_change = df['price_change'].values.astype(float)
+        candle_body_ratio = df['candle_body_ratio'].values.astype(float)
+        rsi = df['rsi'].values.astype(float)
+
+        def shifted(values, k, fill=np.nan):
+            """values[i - k] (앞부분은 fill)"""
+            out = np.full(n, fill, dtype=values.dtype)
+            if k < n:
+                out[k:] = values[:n - k]
+            return out
+
+        def rolling_window(values, window, func):
+            """values[i-window+1 : i+1]에 대한 집계 (앞부분은 NaN)"""
+            out = np.full(n, np.nan)
+            if 0 < window <= n:
+                out[window - 1:] = func(np.lib.stride_tricks.sliding_window_view(values, window), axis=1)
+            return out
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 1. 거래량 급증 패턴
+            is_strong = volume_ratio >= buy_conditions.get("volume_surge_ratio_strong", 2.5)
+            rsi_limit = np.where(is_strong, buy_conditions.get("strong_signal_rsi_limit", 75),
+                                 buy_conditions["rsi_upper_limit"])
+            surge_rsi_ok = rsi <= rsi_limit
+
+            single_day = ((volume_ratio >= buy_conditions["volume_surge_ratio"]) &
+                          (price_change >= buy_conditions["min_price_increase"]) &
+                          (candle_body_ratio >= buy_conditions["candle_body_ratio"]) &
+                          surge_rsi_ok)
+
+            vr_1 = shifted(volume_ratio, 1)
+            vr_2 = shifted(volume_ratio, 2)
+            three_day = ((vr_2 >= buy_conditions["volume_surge_ratio"]) &
+                         (shifted(price_change, 2) > 0) &
+                         (vr_1 < vr_2) &
+                         (volume_ratio > vr_1) &
+                         (price_change > 0) &
+                         surge_rsi_ok)
+
+            surge = (pos >= 20) & (single_day | three_day)
+
+            # 2. 눌림목 (최근 5일 내 가장 가까운 거래량 급증일 기준)
+            surge_flag = volume_ratio >= buy_conditions["volume_surge_ratio"]
+            surge_idx = np.full(n, -1)
+            for k in range(1, 6):
+                found = (surge_idx < 0) & shifted(surge_flag, k, False) & (pos - k >= 0)
+                surge_idx[found] = pos[found] - k
+
+            has_surge = surge_idx >= 0
+            safe_idx = np.where(has_surge, surge_idx, 0)
+            surge_close = close[safe_idx]
+            price_pullback = (close - surge_close) / surge_close * 100
+
+            pullback = ((pos >= 5) & has_surge &
+                        (volume_ratio <= volume_ratio[safe_idx] * buy_conditions["pullback_volume_decrease"]) &
+                        (price_pullback >= buy_conditions.get("pullback_min_decline", -10)) &
+                        (price_pullback <= buy_conditions.get("pullback_max_decline", -2)) &
+                        (rsi <= buy_conditions["rsi_upper_limit"]))
+
+            # 3. 상투권 분배 패턴
+            high_max20 = rolling_window(high, 20, np.max)
+            high_ratio = close / high_max20
+            upper_shadow = (high - np.maximum(open_, close)) / (high - low)
+
+            distribution = ((pos >= 20) & (high_ratio >= 0.9) &
+                            (volume_ratio >= sell_conditions["high_volume_surge"]) &
+                            (((price_change < 0) & (candle_body_ratio >= sell_conditions["negative_candle_threshold"])) |
+                             (upper_shadow > 0.3)))
+
+        volume_decrease_days = sell_conditions["volume_decrease_days"]
+
+        return {
+            'close': close,
+            'volume_ratio': volume_ratio,
+            'price_change': price_change,
+            'candle_body_ratio': candle_body_ratio,
+            'is_strong': is_strong,
+            'single_day_surge': single_day,
+            'vol_momentum': (volume_ratio > vr_1) & (vr_1 > vr_2),
+            'surge_idx': surge_idx,
+            'price_pullback': price_pullback,
+            'high_ratio': high_ratio,
+            'upper_shadow': upper_shadow,
+            'high_max5': rolling_window(high, 5, np.max),
+            'recent_volume_mean': rolling_window(volume_ratio, volume_decrease_days, np.mean),
+            'recent_price_mean': rolling_window(price_change, volume_decrease_days, np.mean),
+            'rsi': rsi,
+            'surge': surge,
+            'pullback': pullback,
+            'distribution': distribution
+        }
+
+    def get_signal_info(self, signals, idx):
+        """사전 계산 배열에서 매수 신호 상세 정보 구성 (detect_* 함수와 동일한 dict)"""
+        if signals['surge'][idx]:
+            if signals['single_day_surge'][idx]:
+                signal_strength = "Strong" if signals['is_strong'][idx] else "Normal"
+                return "거래량_급증", {
+                    'pattern_type': f'장대양봉_대량거래_{signal_strength}',
+                    'volume_surge_ratio': signals['volume_ratio'][idx],
+                    'price_change': signals['price_change'][idx],
+                    'candle_body_ratio': signals['candle_body_ratio'][idx],
+                    'rsi': signals['rsi'][idx],
+                    'signal_strength': signal_strength,
+                    'volume_momentum': bool(signals['vol_momentum'][idx])
+                }
+            
+            return "거래량_급증", {
+                'pattern_type': '3일_연속_매집_패턴_개선',
+                'volume_surge_ratio': signals['volume_ratio'][idx],
+                'price_change': signals['price_change'][idx],
+                'rsi': signals['rsi'][idx],
+                'signal_strength': "Normal"
+            }
+        
+        if signals['pullback'][idx]:
+            surge_idx = int(signals['surge_idx'][idx])
+            return "눌림목_매수", {
+                'pattern_type': '눌림목_매수_기회',
+                'surge_volume_ratio': signals['volume_ratio'][surge_idx],
+                'current_volume_ratio': signals['volume_ratio'][idx],
+                'price_pullback': signals['price_pullback'][idx],
+                'days_since_surge': idx - surge_idx,
+                'rsi': signals['rsi'][idx]
+            }
+        
+        return None, {}
+
+    def get_distribution_info(self, signals, idx):
+        """사전 계산 배열에서 분배 패턴 상세 정보 구성 (detect_distribution_pattern과 동일한 dict)"""
+        return {
+            'pattern_type': '상투권_분배_패턴',
+            'volume_surge_ratio': signals['volume_ratio'][idx],
+            'price_change': signals['price_change'][idx],
+            'upper_shadow_ratio': signals['upper_shadow'][idx],
+            'high_ratio': signals['high_ratio'][idx]
+        }
+
+    def build_price_panel(self, stock_data_dict):
+        """종목별 DataFrame을 하나의 날짜 정렬 패널로 변환 (백테스트 시작 시 1회)"""
+        stock_codes = list(stock_data_dict.keys())
+        dates = np.array(sorted(set().union(*[df.index for df in stock_data_dict.values()])), dtype=object)
+        date_pos = pd.Index(dates)
+
+        T, N = len(dates), len(stock_codes)
+        row_idx = np.full((T, N), -1, dtype=np.int64)
+        close = np.full((T, N), np.nan)
+        buy_signal = np.zeros((T, N), dtype=bool)
+        signals = {}
+
+        for j, stock_code in enumerate(stock_codes):
+            df = stock_data_dict[stock_code]
+            panel_rows = date_pos.get_indexer(df.index)
+            stock_signals = self.compute_signal_arrays(df)
+
+            row_idx[panel_rows, j] = np.arange(len(df))
+            close[panel_rows, j] = stock_signals['close']
+            buy_signal[panel_rows, j] = stock_signals['surge'] | stock_signals['pullback']
+            signals[stock_code] = stock_signals
+
+        return VolumePricePanel(stock_codes, dates, row_idx, close, buy_signal, signals, stock_data_dict)
+
     def detect_volume_surge_pattern(self, df, idx):
         """거래량 급증 패턴 감지 (개선된 버전)"""
         try:
@@ -241,7 +479,10 @@ class VolumeBacktestingEngine:
             current_rsi = df['rsi'].iloc[idx]
             rsi_ok = current_rsi <= buy_conditions["rsi_upper_limit"]
             
-            if volume_decreased and -10 <= price_pullback <= -2 and rsi_ok:
+            pullback_min = buy_conditions.get("pullback_min_decline", -10)
+            pullback_max = buy_conditions.get("pullback_max_decline", -2)
+            
+            if volume_decreased and pullback_min <= price_pullback <= pullback_max and rsi_ok:
                 return True, {
                     'pattern_type': '눌림목_매수_기회',
                     'surge_volume_ratio': surge_volume_ratio,
@@ -300,8 +541,8 @@ class VolumeBacktestingEngine:
             logger.error(f"분배 패턴 감지 오류: {str(e)}")
             return False, {}
 
-    def check_buy_conditions(self, stock_code, df, idx):
-        """매수 조건 종합 체크"""
+    def check_buy_conditions(self, stock_code, df, idx, signals=None):
+        """매수 조건 종합 체크 (signals: compute_signal_arrays 결과, 있으면 사전 계산 신호 사용)"""
         try:
             # 현재 포지션 수 체크
             if len(self.positions) >= self.max_positions:
@@ -312,10 +553,12 @@ class VolumeBacktestingEngine:
                 return False, "이미 보유 중"
             
             # 거래량 패턴 분석
-            surge_detected, surge_info = self.detect_volume_surge_pattern(df, idx)
-            pullback_detected, pullback_info = self.detect_pullback_opportunity(df, idx)
+            if signals is None:
+                signals = self.compute_signal_arrays(df)
+            
+            signal_type, signal_data = self.get_signal_info(signals, idx)
             
-            if not (surge_detected or pullback_detected):
+            if signal_type is None:
                 return False, "거래량 패턴 미감지"
             
             # 매수 가격 및 수량 계산
@@ -327,9 +570,6 @@ class VolumeBacktestingEngine:
             if self.current_cash < position_size:
                 return False, f"잔고 부족 (필요: {position_size:,.0f}원, 보유: {self.current_cash:,.0f}원)"
             
-            signal_type = "거래량_급증" if surge_detected else "눌림목_매수"
-            signal_data = surge_info if surge_detected else pullback_info
-            
             return True, {
                 'signal_type': signal_type,
                 'signal_data': signal_data,
@@ -341,12 +581,15 @@ class VolumeBacktestingEngine:
             logger.error(f"매수 조건 체크 오류 ({stock_code}): {str(e)}")
             return False, f"분석 오류: {str(e)}"
 
-    def check_sell_conditions(self, stock_code, position_info, df, idx):
-        """매도 조건 종합 체크 (개선된 버전)"""
+    def check_sell_conditions(self, stock_code, position_info, df, idx, signals=None):
+        """매도 조건 종합 체크 (개선된 버전, signals: compute_signal_arrays 결과)"""
         try:
             sell_conditions = self.config["sell_conditions"]
             
-            current_price = df['close'].iloc[idx]
+            if signals is None:
+                signals = self.compute_signal_arrays(df)
+            
+            current_price = signals['close'][idx]
             entry_price = position_info['entry_price']
             profit_rate = (current_price - entry_price) / entry_price * 100
             
@@ -389,7 +632,7 @@ class VolumeBacktestingEngine:
             if profit_rate >= sell_conditions["trailing_stop_activation"]:
                 # 최근 5일 최고가 대비 현재가 체크
                 if idx >= 5:
-                    recent_high = df['high'].iloc[idx-4:idx+1].max()
+                    recent_high = signals['high_max5'][idx]
                     trailing_ratio = current_price / recent_high
                     
                     if trailing_ratio <= sell_conditions["trailing_stop_ratio"]:
@@ -400,8 +643,8 @@ class VolumeBacktestingEngine:
                         }
             
             # 5. 분배 패턴 (기존과 동일하지만 조건 완화)
-            distribution_detected, dist_info = self.detect_distribution_pattern(df, idx)
-            if distribution_detected:
+            if signals['distribution'][idx]:
+                dist_info = self.get_distribution_info(signals, idx)
                 return True, "분배패턴_감지", {
                     'sell_type': '기술적매도',
                     'profit_rate': profit_rate,
@@ -414,8 +657,8 @@ class VolumeBacktestingEngine:
             volume_decrease_days = sell_conditions["volume_decrease_days"]
             
             if hold_days >= min_hold_days and idx >= volume_decrease_days:
-                recent_volume_trend = df['volume_ratio'].iloc[idx-volume_decrease_days+1:idx+1].mean()
-                recent_price_trend = df['price_change'].iloc[idx-volume_decrease_days+1:idx+1].mean()
+                recent_volume_trend = signals['recent_volume_mean'][idx]
+                recent_price_trend = signals['recent_price_mean'][idx]
                 
                 volume_decreasing = recent_volume_trend < 0.8  # 0.8배 이하로 감소
                 price_declining = recent_price_trend < -1.0    # 1% 이상 하락
@@ -431,7 +674,7 @@ class VolumeBacktestingEngine:
             
             # 7. RSI 과매수 (수익 상황에서만)
             if profit_rate > 10 and idx >= 14:  # 10% 이상 수익시에만
-                current_rsi = df['rsi'].iloc[idx]
+                current_rsi = signals['rsi'][idx]
                 if current_rsi >= sell_conditions["rsi_sell_threshold"]:
                     return True, "RSI_과매수", {
                         'sell_type': '기술적매도',
@@ -458,6 +701,13 @@ class VolumeBacktestingEngine:
             if buy_amount <= 0:
                 return False
             
+            # 체결 모델 적용 (체결가/체결 수량)
+            fill = self.fill_model.execute('BUY', buy_amount, current_price, bar=df.iloc[idx],
+                                           stock_code=stock_code, timestamp=date)
+            if fill.quantity <= 0:
+                return False
+            buy_amount, current_price = fill.quantity, fill.price
+            
             total_cost = buy_amount * current_price * (1 + self.commission_rate)
             
             if total_cost > self.current_cash:
@@ -497,21 +747,30 @@ class VolumeBacktestingEngine:
             logger.error(f"매수 실행 오류: {str(e)}")
             return False
 
-    def execute_sell(self, stock_code, position_info, sell_info, df, idx, date):
-        """매도 실행"""
+    def execute_sell(self, stock_code, position_info, sell_info, df, idx, date, apply_fill_model=True):
+        """매도 실행 (체결 모델에 따라 부분체결 시 잔량은 보유 유지, 종료 강제매도는 종가 전량)"""
         try:
             current_price = df['close'].iloc[idx]
             sell_amount = position_info['amount']
             
+            fill = None
+            if apply_fill_model:
+                fill = self.fill_model.execute('SELL', sell_amount, current_price, bar=df.iloc[idx],
+                                               stock_code=stock_code, timestamp=date)
+                if fill.quantity <= 0:
+                    return False
+                sell_amount, current_price = fill.quantity, fill.price
+            partial = fill is not None and fill.is_partial
+            
             # 매도 수익 계산 (수수료 차감)
             gross_proceeds = sell_amount * current_price
             commission = gross_proceeds * self.commission_rate
             net_proceeds = gross_proceeds - commission
             
-            # 손익 계산
-            entry_cost = position_info['amount'] * position_info['entry_price']
+            # 손익 계산 (진입 체결가 + 매수 수수료 기준 원가 대비 매도 체결 순수익 - 현금 증감과 일치)
+            entry_cost = sell_amount * position_info['entry_price'] * (1 + self.commission_rate)
             profit = net_proceeds - entry_cost
-            profit_rate = sell_info['profit_rate']
+            profit_rate = profit / entry_cost * 100 if entry_cost > 0 else 0
             
             # 현금 증가
             self.current_cash += net_proceeds
@@ -538,27 +797,31 @@ class VolumeBacktestingEngine:
             }
             self.trade_history.append(trade_record)
             
-            # 포지션 제거
-            del self.positions[stock_code]
+            # 포지션 제거 (부분체결이면 잔량 유지)
+            if partial:
+                position_info['amount'] -= sell_amount
+            else:
+                del self.positions[stock_code]
             
             logger.info(f"[{date}] 매도: {stock_code} {sell_amount:,}주 @ {current_price:,}원 "
-                       f"(수익률: {profit_rate:+.2f}%, 보유: {hold_days}일, 사유: {sell_info['reason']})")
+                       f"(수익률: {profit_rate:+.2f}%, 보유: {hold_days}일, 사유: {sell_info['reason']})"
+                       + (f" - 부분체결 {sell_amount:,}/{fill.requested:,}주" if partial else ""))
             return True
             
         except Exception as e:
             logger.error(f"매도 실행 오류: {str(e)}")
             return False
 
-    def calculate_portfolio_value(self, stock_data_dict, idx, date):
-        """포트폴리오 가치 계산"""
+    def calculate_portfolio_value(self, panel, t, date):
+        """포트폴리오 가치 계산 (종목별 t일 종가, 데이터 없는 날은 직전 종가)"""
         try:
             stock_value = 0
             
             for stock_code, position in self.positions.items():
-                if stock_code in stock_data_dict:
-                    df = stock_data_dict[stock_code]
-                    if idx < len(df):
-                        current_price = df['close'].iloc[idx]
+                j = panel.col.get(stock_code)
+                if j is not None:
+                    current_price = panel.last_close[t, j]
+                    if not np.isnan(current_price):
                         stock_value += position['amount'] * current_price
             
             total_value = self.current_cash + stock_value
@@ -577,8 +840,84 @@ class VolumeBacktestingEngine:
             logger.error(f"포트폴리오 가치 계산 오류: {str(e)}")
             return self.current_cash
 
-    def run_backtest(self, stock_list, start_date=None, end_date=None):
-        """백테스팅 실행"""
+    def run_day(self, panel, t, stock_data_dict):
+        """패널 t일 하루 진행 (보유 종목 매도 체크 → 신호 종목 매수 → 일일 포트폴리오 기록)"""
+        date = panel.dates[t]
+        row_idx = panel.row_idx[t]
+        
+        try:
+            # 매도 체크 (보유 종목에 대해)
+            for stock_code in list(self.positions.keys()):
+                j = panel.col.get(stock_code)
+                if j is not None and row_idx[j] >= 0:
+                    idx = int(row_idx[j])
+                    df = stock_data_dict[stock_code]
+                    position_info = self.positions[stock_code]
+                    
+                    should_sell, sell_reason, sell_info = self.check_sell_conditions(
+                        stock_code, position_info, df, idx, panel.signals[stock_code])
+                    
+                    if should_sell:
+                        self.execute_sell(stock_code, position_info, sell_info, df, idx, date)
+            
+            # 매수 체크 (신호 발생 종목만)
+            if len(self.positions) < self.max_positions:
+                for j in np.flatnonzero(panel.buy_signal[t]):
+                    stock_code = panel.stock_codes[j]
+                    if stock_code in self.positions:
+                        continue
+                    
+                    idx = int(row_idx[j])
+                    df = stock_data_dict[stock_code]
+                    
+                    can_buy, buy_info = self.check_buy_conditions(
+                        stock_code, df, idx, panel.signals[stock_code])
+                    
+                    if can_buy:
+                        success = self.execute_buy(stock_code, buy_info, df, idx, date)
+                        if success and len(self.positions) >= self.max_positions:
+                            break  # 최대 포지션 수 도달시 더 이상 매수 안함
+            
+            # 일일 포트폴리오 가치 계산
+            self.calculate_portfolio_value(panel, t, date)
+        
+        except Exception as e:
+            logger.error(f"날짜 {date} 처리 중 오류: {str(e)}")
+
+    def close_positions(self, panel, final_t, stock_data_dict):
+        """보유 포지션 전량 강제 매도 (final_t일 종가, 백테스트 종료 시)"""
+        final_date = panel.dates[final_t]
+        for stock_code in list(self.positions.keys()):
+            j = panel.col.get(stock_code)
+            if j is not None and panel.row_idx[final_t, j] >= 0:
+                idx = int(panel.row_idx[final_t, j])
+                df = stock_data_dict[stock_code]
+                position_info = self.positions[stock_code]
+                
+                # 강제 매도
+                current_price = df['close'].iloc[idx]
+                profit_rate = (current_price - position_info['entry_price']) / position_info['entry_price'] * 100
+                
+                sell_info = {
+                    'profit_rate': profit_rate,
+                    'reason': '백테스팅_종료_강제매도'
+                }
+                
+                self.execute_sell(stock_code, position_info, sell_info, df, idx, final_date, apply_fill_model=False)
+
+    def load_stock_data(self, stock_list):
+        """전 종목 과거 데이터 로드"""
+        stock_data_dict = {}
+        for stock_code in stock_list:
+            logger.info(f"데이터 로딩: {stock_code}")
+            df = self.get_historical_data(stock_code, 400)  # 여유분 포함
+            if df is not None:
+                stock_data_dict[stock_code] = df
+            # API 호출 간격은 저장소가 실제 조회 시에만 적용
+        return stock_data_dict
+
+    def run_backtest(self, stock_list, start_date=None, end_date=None, stock_data_dict=None):
+        """백테스팅 실행 (stock_data_dict를 주면 데이터 로드 생략)"""
         try:
             logger.info(f"백테스팅 시작 - 대상 종목: {len(stock_list)}개")
             
@@ -589,90 +928,38 @@ class VolumeBacktestingEngine:
                 start_date = end_date - timedelta(days=365)
             
             # 모든 종목의 데이터 로드
-            stock_data_dict = {}
-            for stock_code in stock_list:
-                logger.info(f"데이터 로딩: {stock_code}")
-                df = self.get_historical_data(stock_code, 400)  # 여유분 포함
-                if df is not None:
-                    stock_data_dict[stock_code] = df
-                time.sleep(0.1)  # API 호출 간격
+            if stock_data_dict is None:
+                stock_data_dict = self.load_stock_data(stock_list)
             
             if not stock_data_dict:
                 logger.error("사용 가능한 데이터가 없습니다.")
                 return None
             
-            # 백테스팅 기간 내의 모든 거래일 추출
-            all_dates = set()
-            for df in stock_data_dict.values():
-                all_dates.update(df.index)
-            
-            trading_dates = sorted([d for d in all_dates 
-                                  if start_date.strftime('%Y-%m-%d') <= d <= end_date.strftime('%Y-%m-%d')])
-            
-            logger.info(f"백테스팅 기간: {trading_dates[0]} ~ {trading_dates[-1]} ({len(trading_dates)}일)")
-            
-            # 일자별 시뮬레이션
-            for date_idx, date in enumerate(trading_dates):
-                try:
-                    # 매도 체크 (보유 종목에 대해)
-                    for stock_code in list(self.positions.keys()):
-                        if stock_code in stock_data_dict:
-                            df = stock_data_dict[stock_code]
-                            if date in df.index:
-                                idx = df.index.get_loc(date)
-                                position_info = self.positions[stock_code]
-                                
-                                should_sell, sell_reason, sell_info = self.check_sell_conditions(
-                                    stock_code, position_info, df, idx)
-                                
-                                if should_sell:
-                                    self.execute_sell(stock_code, position_info, sell_info, df, idx, date)
-                    
-                    # 매수 체크 (모든 종목에 대해)
-                    for stock_code, df in stock_data_dict.items():
-                        if date in df.index and stock_code not in self.positions:
-                            idx = df.index.get_loc(date)
-                            
-                            can_buy, buy_info = self.check_buy_conditions(stock_code, df, idx)
-                            
-                            if can_buy:
-                                success = self.execute_buy(stock_code, buy_info, df, idx, date)
-                                if success and len(self.positions) >= self.max_positions:
-                                    break  # 최대 포지션 수 도달시 더 이상 매수 안함
-                    
-                    # 일일 포트폴리오 가치 계산
-                    self.calculate_portfolio_value(stock_data_dict, 
-                                                 stock_data_dict[list(stock_data_dict.keys())[0]].index.get_loc(date), 
-                                                 date)
-                    
-                    # 진행률 표시 (10%씩)
-                    if (date_idx + 1) % max(1, len(trading_dates) // 10) == 0:
-                        progress = (date_idx + 1) / len(trading_dates) * 100
-                        logger.info(f"진행률: {progress:.1f}% ({date})")
+            # 날짜 정렬 패널 구성 (패턴 신호 사전 계산 포함)
+            panel = self.build_price_panel(stock_data_dict)
+            
+            # 백테스팅 기간 내의 거래일 오프셋
+            start_t, end_t = panel.date_range(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+            
+            if start_t >= end_t:
+                logger.error("백테스팅 기간 내 거래일이 없습니다.")
+                return None
+            
+            num_days = end_t - start_t
+            logger.info(f"백테스팅 기간: {panel.dates[start_t]} ~ {panel.dates[end_t - 1]} ({num_days}일)")
+            
+            # 일자별 시뮬레이션 (패널 정수 오프셋)
+            for t in range(start_t, end_t):
+                self.run_day(panel, t, stock_data_dict)
                 
-                except Exception as e:
-                    logger.error(f"날짜 {date} 처리 중 오류: {str(e)}")
-                    continue
+                # 진행률 표시 (10%씩)
+                day_count = t - start_t + 1
+                if day_count % max(1, num_days // 10) == 0:
+                    progress = day_count / num_days * 100
+                    logger.info(f"진행률: {progress:.1f}% ({panel.dates[t]})")
             
             # 최종 포지션 정리 (마지막 날 시장가 매도)
-            final_date = trading_dates[-1]
-            for stock_code in list(self.positions.keys()):
-                if stock_code in stock_data_dict:
-                    df = stock_data_dict[stock_code]
-                    if final_date in df.index:
-                        idx = df.index.get_loc(final_date)
-                        position_info = self.positions[stock_code]
-                        
-                        # 강제 매도
-                        current_price = df['close'].iloc[idx]
-                        profit_rate = (current_price - position_info['entry_price']) / position_info['entry_price'] * 100
-                        
-                        sell_info = {
-                            'profit_rate': profit_rate,
-                            'reason': '백테스팅_종료_강제매도'
-                        }
-                        
-                        self.execute_sell(stock_code, position_info, sell_info, df, idx, final_date)
+            self.close_positions(panel, end_t - 1, stock_data_dict)
             
             logger.info("백테스팅 완료!")
             return self.generate_backtest_report()
@@ -681,33 +968,51 @@ class VolumeBacktestingEngine:
             logger.error(f"백테스팅 실행 오류: {str(e)}")
             return None
 
+    def calculate_performance_metrics(self):
+        """일별 포트폴리오 기준 수치 성과 지표 (최적화 목적함수용)"""
+        if not self.daily_portfolio_value:
+            return {'total_return': 0.0, 'sharpe_ratio': 0.0, 'max_drawdown': 0.0, 'trade_count': 0}
+        
+        values = self.daily_portfolio_value.column('total_value')
+        daily_returns = np.diff(values) / values[:-1] if len(values) > 1 else np.array([])
+        std = daily_returns.std() if len(daily_returns) else 0
+        peak = np.maximum.accumulate(np.concatenate([[self.initial_capital], values]))[1:]
+        
+        return {
+            'total_return': float((values[-1] - self.initial_capital) / self.initial_capital * 100),
+            'sharpe_ratio': float(daily_returns.mean() / std * np.sqrt(252)) if std > 0 else 0.0,
+            'max_drawdown': float(((peak - values) / peak).max() * 100),
+            'trade_count': int(np.count_nonzero(np.asarray(self.trade_history.column('type'), dtype=object) == 'SELL'))
+        }
+
     def generate_backtest_report(self):
-        """백테스팅 결과 리포트 생성"""
+        """백테스팅 결과 리포트 생성 (거래/자산 열 버퍼를 DataFrame으로 변환해 벡터 연산)"""
         try:
             if not self.daily_portfolio_value:
                 return {"error": "백테스팅 데이터가 없습니다."}
             
+            trades = self.trade_history.to_frame()
+            equity = self.daily_portfolio_value.to_frame()
+            
             # 기본 통계
-            final_value = self.daily_portfolio_value[-1]['total_value']
+            final_value = equity['total_value'].iloc[-1]
             total_return = (final_value - self.initial_capital) / self.initial_capital * 100
             
             # 거래 통계
-            buy_trades = [t for t in self.trade_history if t['type'] == 'BUY']
-            sell_trades = [t for t in self.trade_history if t['type'] == 'SELL']
+            buy_count = int((trades['type'] == 'BUY').sum())
+            sell_trades = trades[trades['type'] == 'SELL']
             
-            if sell_trades:
-                winning_trades = [t for t in sell_trades if t['profit'] > 0]
-                losing_trades = [t for t in sell_trades if t['profit'] <= 0]
-                
-                win_rate = len(winning_trades) / len(sell_trades) * 100
-                avg_profit_rate = np.mean([t['profit_rate'] for t in sell_trades])
-                avg_hold_days = np.mean([t['hold_days'] for t in sell_trades])
+            if not sell_trades.empty:
+                win_rate = (sell_trades['profit'] > 0).mean() * 100
+                avg_profit_rate = sell_trades['profit_rate'].mean()
+                avg_hold_days = sell_trades['hold_days'].astype(float).mean()
                 
-                best_trade = max(sell_trades, key=lambda x: x['profit_rate'])
-                worst_trade = min(sell_trades, key=lambda x: x['profit_rate'])
+                # 동률이면 먼저 발생한 거래 (idxmax/idxmin은 첫 위치 반환)
+                best_trade = sell_trades.loc[sell_trades['profit_rate'].idxmax()]
+                worst_trade = sell_trades.loc[sell_trades['profit_rate'].idxmin()]
                 
-                total_profit = sum([t['profit'] for t in sell_trades])
-                total_commission = sum([t['commission'] for t in self.trade_history])
+                total_profit = sell_trades['profit'].sum()
+                total_commission = trades['commission'].sum()
                 
             else:
                 win_rate = 0
@@ -718,44 +1023,33 @@ class VolumeBacktestingEngine:
                 total_profit = 0
                 total_commission = 0
             
-            # 최대 낙폭 계산
-            portfolio_values = [d['total_value'] for d in self.daily_portfolio_value]
-            peak = self.initial_capital
-            max_drawdown = 0
-            
-            for value in portfolio_values:
-                if value > peak:
-                    peak = value
-                drawdown = (peak - value) / peak * 100
-                if drawdown > max_drawdown:
-                    max_drawdown = drawdown
+            # 최대 낙폭 계산 (초기자금을 첫 고점으로)
+            portfolio_values = equity['total_value'].to_numpy()
+            peak = np.maximum.accumulate(np.concatenate(([self.initial_capital], portfolio_values)))[1:]
+            max_drawdown = max(0.0, ((peak - portfolio_values) / peak * 100).max())
             
             # 샤프 비율 계산 (일간 수익률 기준)
-            daily_returns = []
-            for i in range(1, len(self.daily_portfolio_value)):
-                prev_value = self.daily_portfolio_value[i-1]['total_value']
-                curr_value = self.daily_portfolio_value[i]['total_value']
-                daily_return = (curr_value - prev_value) / prev_value
-                daily_returns.append(daily_return)
-            
-            if daily_returns:
+            daily_returns = np.diff(portfolio_values) / portfolio_values[:-1]
+            
+            if len(daily_returns) > 0:
                 avg_daily_return = np.mean(daily_returns)
                 std_daily_return = np.std(daily_returns)
                 sharpe_ratio = (avg_daily_return / std_daily_return * np.sqrt(252)) if std_daily_return > 0 else 0
+                volatility = f"{std_daily_return * np.sqrt(252) * 100:.2f}%"
             else:
                 sharpe_ratio = 0
+                volatility = "0.00%"
             
-            # 월별 수익률 계산
-            monthly_returns = {}
-            for data in self.daily_portfolio_value:
-                month_key = data['date'][:7]  # YYYY-MM
-                monthly_returns[month_key] = data['return_rate']
+            # 월별 수익률 계산 (월말 누적 수익률)
+            month_keys = equity['date'].astype(str).str[:7]  # YYYY-MM
+            monthly_returns = {month: float(rate) for month, rate in
+                               equity['return_rate'].groupby(month_keys, sort=False).last().items()}
             
             report = {
                 "백테스팅_기간": {
-                    "시작일": self.daily_portfolio_value[0]['date'],
-                    "종료일": self.daily_portfolio_value[-1]['date'],
-                    "총_거래일": len(self.daily_portfolio_value)
+                    "시작일": equity['date'].iloc[0],
+                    "종료일": equity['date'].iloc[-1],
+                    "총_거래일": len(equity)
                 },
                 "수익성_지표": {
                     "초기자금": f"{self.initial_capital:,}원",
@@ -765,7 +1059,7 @@ class VolumeBacktestingEngine:
                     "총_수수료": f"{total_commission:,.0f}원"
                 },
                 "거래_통계": {
-                    "총_매수_횟수": len(buy_trades),
+                    "총_매수_횟수": buy_count,
                     "총_매도_횟수": len(sell_trades),
                     "승률": f"{win_rate:.1f}%",
                     "평균_수익률": f"{avg_profit_rate:+.2f}%",
@@ -774,24 +1068,24 @@ class VolumeBacktestingEngine:
                 "리스크_지표": {
                     "최대_낙폭": f"{max_drawdown:.2f}%",
                     "샤프_비율": f"{sharpe_ratio:.3f}",
-                    "변동성": f"{std_daily_return * np.sqrt(252) * 100:.2f}%" if 'std_daily_return' in locals() else "0.00%"
+                    "변동성": volatility
                 },
                 "베스트_거래": {
-                    "종목": best_trade['stock_code'] if best_trade else "없음",
-                    "수익률": f"{best_trade['profit_rate']:+.2f}%" if best_trade else "0.00%",
-                    "수익금액": f"{best_trade['profit']:+,.0f}원" if best_trade else "0원",
-                    "보유기간": f"{best_trade['hold_days']}일" if best_trade else "0일"
-                } if best_trade else {"정보": "매도 거래 없음"},
+                    "종목": best_trade['stock_code'],
+                    "수익률": f"{best_trade['profit_rate']:+.2f}%",
+                    "수익금액": f"{best_trade['profit']:+,.0f}원",
+                    "보유기간": f"{best_trade['hold_days']}일"
+                } if best_trade is not None else {"정보": "매도 거래 없음"},
                 "워스트_거래": {
-                    "종목": worst_trade['stock_code'] if worst_trade else "없음",
-                    "수익률": f"{worst_trade['profit_rate']:+.2f}%" if worst_trade else "0.00%",
-                    "손실금액": f"{worst_trade['profit']:+,.0f}원" if worst_trade else "0원",
-                    "보유기간": f"{worst_trade['hold_days']}일" if worst_trade else "0일"
-                } if worst_trade else {"정보": "매도 거래 없음"},
+                    "종목": worst_trade['stock_code'],
+                    "수익률": f"{worst_trade['profit_rate']:+.2f}%",
+                    "손실금액": f"{worst_trade['profit']:+,.0f}원",
+                    "보유기간": f"{worst_trade['hold_days']}일"
+                } if worst_trade is not None else {"정보": "매도 거래 없음"},
                 "월별_수익률": monthly_returns,
                 "거래_상세": {
-                    "매수_신호별_통계": self._analyze_buy_signals(),
-                    "매도_사유별_통계": self._analyze_sell_reasons()
+                    "매수_신호별_통계": self._analyze_buy_signals(trades),
+                    "매도_사유별_통계": self._analyze_sell_reasons(trades)
                 }
             }
             
@@ -801,63 +1095,41 @@ class VolumeBacktestingEngine:
             logger.error(f"리포트 생성 오류: {str(e)}")
             return {"error": f"리포트 생성 실패: {str(e)}"}
 
-    def _analyze_buy_signals(self):
-        """매수 신호별 통계 분석"""
+    def _analyze_buy_signals(self, trades=None):
+        """매수 신호별 통계 분석 (매도 거래를 진입일 매수 거래와 조인 후 신호별 groupby)"""
         try:
+            trades = self.trade_history.to_frame() if trades is None else trades
+            sell_trades = trades[trades['type'] == 'SELL']
+            if sell_trades.empty:
+                return {}
+            
+            # 같은 종목·같은 날 매수가 여러 건이면 첫 매수 기준
+            buy_trades = trades.loc[trades['type'] == 'BUY', ['stock_code', 'date', 'signal_type']]
+            buy_trades = buy_trades.drop_duplicates(['stock_code', 'date'], keep='first')
+            matched = sell_trades.drop(columns=['signal_type']).merge(
+                buy_trades.rename(columns={'date': 'entry_date'}),
+                on=['stock_code', 'entry_date'], how='inner')
+            if matched.empty:
+                return {}
+            
+            matched['signal_type'] = matched['signal_type'].fillna('Unknown')
+            matched['hold_days'] = matched['hold_days'].astype(float)
+            grouped = matched.groupby('signal_type', sort=False).agg(
+                count=('profit', 'size'),
+                winning_count=('profit', lambda profit: int((profit > 0).sum())),
+                total_profit=('profit', 'sum'),
+                avg_profit_rate=('profit_rate', 'mean'),
+                avg_hold_days=('hold_days', 'mean'))
+            
             buy_signals = {}
-            sell_trades = [t for t in self.trade_history if t['type'] == 'SELL']
-            
-            for trade in sell_trades:
-                # 매수 거래 찾기
-                buy_trade = None
-                for bt in self.trade_history:
-                    if (bt['type'] == 'BUY' and bt['stock_code'] == trade['stock_code'] and 
-                        bt['date'] == trade['entry_date']):
-                        buy_trade = bt
-                        break
-                
-                if buy_trade:
-                    signal_type = buy_trade.get('signal_type', 'Unknown')
-                    
-                    if signal_type not in buy_signals:
-                        buy_signals[signal_type] = {
-                            'count': 0,
-                            'winning_count': 0,
-                            'total_profit': 0,
-                            'avg_profit_rate': 0,
-                            'avg_hold_days': 0
-                        }
-                    
-                    buy_signals[signal_type]['count'] += 1
-                    if trade['profit'] > 0:
-                        buy_signals[signal_type]['winning_count'] += 1
-                    buy_signals[signal_type]['total_profit'] += trade['profit']
-            
-            # 평균값 계산
-            for signal_type in buy_signals:
-                stats = buy_signals[signal_type]
-                if stats['count'] > 0:
-                    stats['win_rate'] = f"{stats['winning_count'] / stats['count'] * 100:.1f}%"
-                    
-                    # 해당 신호 타입의 거래들로 평균 계산
-                    signal_trades = []
-                    for trade in sell_trades:
-                        buy_trade = None
-                        for bt in self.trade_history:
-                            if (bt['type'] == 'BUY' and bt['stock_code'] == trade['stock_code'] and 
-                                bt['date'] == trade['entry_date']):
-                                buy_trade = bt
-                                break
-                        
-                        if buy_trade and buy_trade.get('signal_type') == signal_type:
-                            signal_trades.append(trade)
-                    
-                    if signal_trades:
-                        stats['avg_profit_rate'] = f"{np.mean([t['profit_rate'] for t in signal_trades]):+.2f}%"
-                        stats['avg_hold_days'] = f"{np.mean([t['hold_days'] for t in signal_trades]):.1f}일"
-                    
-                    # 정리를 위해 불필요한 키 제거
-                    del stats['winning_count']
+            for signal_type, row in grouped.iterrows():
+                buy_signals[signal_type] = {
+                    'count': int(row['count']),
+                    'total_profit': float(row['total_profit']),
+                    'avg_profit_rate': f"{row['avg_profit_rate']:+.2f}%",
+                    'avg_hold_days': f"{row['avg_hold_days']:.1f}일",
+                    'win_rate': f"{row['winning_count'] / row['count'] * 100:.1f}%"
+                }
             
             return buy_signals
             
@@ -865,34 +1137,30 @@ class VolumeBacktestingEngine:
             logger.error(f"매수 신호 분석 오류: {str(e)}")
             return {}
 
-    def _analyze_sell_reasons(self):
-        """매도 사유별 통계 분석"""
+    def _analyze_sell_reasons(self, trades=None):
+        """매도 사유별 통계 분석 (매도 거래 groupby)"""
         try:
-            sell_reasons = {}
-            sell_trades = [t for t in self.trade_history if t['type'] == 'SELL']
+            trades = self.trade_history.to_frame() if trades is None else trades
+            sell_trades = trades[trades['type'] == 'SELL']
+            if sell_trades.empty:
+                return {}
+            
+            reasons = sell_trades['sell_reason'].fillna('Unknown')
+            grouped = sell_trades.assign(hold_days=sell_trades['hold_days'].astype(float)).groupby(
+                reasons, sort=False).agg(
+                count=('profit', 'size'),
+                total_profit=('profit', 'sum'),
+                avg_profit_rate=('profit_rate', 'mean'),
+                avg_hold_days=('hold_days', 'mean'))
             
-            for trade in sell_trades:
-                reason = trade.get('sell_reason', 'Unknown')
-                
-                if reason not in sell_reasons:
-                    sell_reasons[reason] = {
-                        'count': 0,
-                        'total_profit': 0,
-                        'avg_profit_rate': 0,
-                        'avg_hold_days': 0
-                    }
-                
-                sell_reasons[reason]['count'] += 1
-                sell_reasons[reason]['total_profit'] += trade['profit']
-            
-            # 평균값 계산
-            for reason in sell_reasons:
-                reason_trades = [t for t in sell_trades if t.get('sell_reason') == reason]
-                
-                if reason_trades:
-                    sell_reasons[reason]['avg_profit_rate'] = f"{np.mean([t['profit_rate'] for t in reason_trades]):+.2f}%"
-                    sell_reasons[reason]['avg_hold_days'] = f"{np.mean([t['hold_days'] for t in reason_trades]):.1f}일"
-                    sell_reasons[reason]['total_profit'] = f"{sell_reasons[reason]['total_profit']:+,.0f}원"
+            sell_reasons = {}
+            for reason, row in grouped.iterrows():
+                sell_reasons[reason] = {
+                    'count': int(row['count']),
+                    'total_profit': f"{row['total_profit']:+,.0f}원",
+                    'avg_profit_rate': f"{row['avg_profit_rate']:+.2f}%",
+                    'avg_hold_days': f"{row['avg_hold_days']:.1f}일"
+                }
             
             return sell_reasons
             
@@ -901,15 +1169,23 @@ class VolumeBacktestingEngine:
             return {}
 
     def save_detailed_results(self, filename="backtest_results.json"):
-        """상세 결과를 JSON 파일로 저장"""
+        """상세 결과 저장 - 설정/최종 포지션은 JSON, 거래 내역/일별 포트폴리오는 Parquet
+
+        filename이 "volume_backtest_details.json"이면 volume_backtest_details_trades.parquet,
+        volume_backtest_details_equity.parquet를 함께 만들고 JSON에 경로를 기록한다.
+        """
         try:
+            stem = os.path.splitext(filename)[0]
+            trades_path = write_results(self.trade_history, f"{stem}_trades.parquet")
+            equity_path = write_results(self.daily_portfolio_value, f"{stem}_equity.parquet")
+            
             detailed_results = {
                 "config": self.config,
                 "initial_capital": self.initial_capital,
                 "max_positions": self.max_positions,
                 "commission_rate": self.commission_rate,
-                "trade_history": self.trade_history,
-                "daily_portfolio_value": self.daily_portfolio_value,
+                "trade_history_path": trades_path,
+                "daily_portfolio_value_path": equity_path,
                 "final_positions": self.positions
             }
             
@@ -921,6 +1197,298 @@ class VolumeBacktestingEngine:
         except Exception as e:
             logger.error(f"결과 저장 오류: {str(e)}")
 
+################################### 워크포워드 최적화 ##################################
+
+# 학습 구간에서 탐색할 기본 파라미터 그리드 ("섹션.키" 형식)
+WALK_FORWARD_PARAM_GRID = {
+    "buy_conditions.volume_surge_ratio": [1.5, 1.8, 2.2],
+    "buy_conditions.pullback_max_decline": [-2.0, -4.0],
+    "sell_conditions.profit_target_normal": [15.0, 25.0],
+    "sell_conditions.stop_loss": [-8.0, -12.0]
+}
+
+WALK_FORWARD_WARMUP_ROWS = 30  # 패턴 감지에 필요한 과거 행 (idx >= 20 + 여유분)
+
+class SharedVolumePanel:
+    """get_historical_data 결과(지표 컬럼 포함)를 공유 메모리 하나에 적재
+
+    워커는 공유 버퍼 위에 종목별 DataFrame 뷰를 만들고, 윈도우별 데이터는
+    iloc 행 슬라이스(복사 없는 뷰)로 잘라 쓴다.
+    """
+
+    def __init__(self, stock_data_dict):
+        self.columns = list(next(iter(stock_data_dict.values())).select_dtypes(include=[np.number]).columns)
+        total_rows = sum(len(df) for df in stock_data_dict.values())
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(total_rows * len(self.columns) * 8, 8))
+        buffer = np.ndarray((total_rows, len(self.columns)), dtype=np.float64, buffer=self.shm.buf)
+
+        self.layout = {}
+        offset = 0
+        for stock_code, df in stock_data_dict.items():
+            rows = len(df)
+            buffer[offset:offset + rows] = df[self.columns].values.astype(np.float64)
+            self.layout[stock_code] = {'offset': offset, 'rows': rows, 'dates': list(df.index)}
+            offset += rows
+
+        self.total_rows = total_rows
+
+    def descriptor(self):
+        return {'name': self.shm.name, 'total_rows': self.total_rows,
+                'columns': self.columns, 'layout': self.layout}
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+def attach_shared_volume_panel(descriptor):
+    """공유 메모리에 연결해 종목별 DataFrame 뷰 생성 (복사 없음)"""
+    shm = shared_memory.SharedMemory(name=descriptor['name'])
+    buffer = np.ndarray((descriptor['total_rows'], len(descriptor['columns'])), dtype=np.float64, buffer=shm.buf)
+    buffer.flags.writeable = False
+
+    stock_data_dict = {}
+    for stock_code, info in descriptor['layout'].items():
+        view = buffer[info['offset']:info['offset'] + info['rows']]
+        stock_data_dict[stock_code] = pd.DataFrame(view, index=pd.Index(info['dates']),
+                                                   columns=descriptor['columns'], copy=False)
+
+    return shm, stock_data_dict
+
+def slice_window(stock_data_dict, start_str, end_str, warmup_rows=WALK_FORWARD_WARMUP_ROWS):
+    """윈도우 구간 + 워밍업 행만 남긴 종목별 뷰 (iloc 슬라이스, 복사 없음)"""
+    window_data = {}
+    for stock_code, df in stock_data_dict.items():
+        dates = df.index.values
+        lo = int(np.searchsorted(dates, start_str, side='left'))
+        hi = int(np.searchsorted(dates, end_str, side='right'))
+        if hi <= lo:
+            continue
+        window_data[stock_code] = df.iloc[max(0, lo - warmup_rows):hi]
+    return window_data
+
+_wf_worker_state = {}
+
+def _init_walk_forward_worker(descriptor, engine_kwargs, log_level):
+    """워커 초기화: 공유 패널 연결 + 로그 최소화"""
+    logger.setLevel(log_level)
+    shm, stock_data_dict = attach_shared_volume_panel(descriptor)
+    _wf_worker_state['shm'] = shm
+    _wf_worker_state['stock_data_dict'] = stock_data_dict
+    _wf_worker_state['engine_kwargs'] = engine_kwargs
+
+def _run_walk_forward_task(task):
+    """윈도우 1개 × 파라미터 조합 1개 백테스트"""
+    engine = VolumeBacktestingEngine(**_wf_worker_state['engine_kwargs'])
+    engine.apply_config_overrides(task['params'])
+
+    window_data = slice_window(_wf_worker_state['stock_data_dict'], task['start'], task['end'])
+    result = {'window': task['window'], 'phase': task['phase'], 'params': task['params']}
+
+    if not window_data:
+        result.update({'metrics': engine.calculate_performance_metrics(), 'equity': []})
+        return result
+
+    engine.run_backtest(list(window_data.keys()),
+                        datetime.strptime(task['start'], '%Y-%m-%d'),
+                        datetime.strptime(task['end'], '%Y-%m-%d'),
+                        stock_data_dict=window_data)
+
+    result['metrics'] = engine.calculate_performance_metrics()
+    if task['phase'] == 'test':
+        equity = engine.daily_portfolio_value
+        result['equity'] = list(zip(equity.column('date'), equity.column('total_value').tolist()))
+    return result
+
+class WalkForwardOptimizer:
+    """VolumeBacktestingEngine 워크포워드 최적화
+
+    전체 기간을 [학습 train_days | 검증 test_days] 롤링 윈도우로 나누고,
+    학습 구간에서 파라미터 그리드를 병렬 탐색 → 최적 조합으로 다음 검증 구간을 실행 →
+    검증 구간 자산곡선을 이어 붙여 표본 외(OOS) 성과를 계산한다.
+    """
+
+    def __init__(self, initial_capital=5000000, max_positions=5, commission_rate=0.00015,
+                 train_days=120, test_days=40, objective="sharpe_ratio", max_workers=None, fill_model=None):
+        """
+        Args:
+            train_days (int): 학습 구간 거래일 수
+            test_days (int): 검증 구간 거래일 수 (윈도우 이동 간격)
+            objective (str): 학습 구간 최적화 기준 ("sharpe_ratio" 또는 "total_return")
+            fill_model: 엔진 체결 모델 (워커로 피클 전달, 기본값 종가 전량 체결)
+        """
+        self.engine_kwargs = {
+            'initial_capital': initial_capital,
+            'max_positions': max_positions,
+            'commission_rate': commission_rate,
+            'fill_model': fill_model
+        }
+        self.initial_capital = initial_capital
+        self.train_days = train_days
+        self.test_days = test_days
+        self.objective = objective
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.window_results = []
+
+    def build_windows(self, dates):
+        """전체 거래일을 롤링 학습/검증 윈도우로 분할"""
+        windows = []
+        start = WALK_FORWARD_WARMUP_ROWS
+        while start + self.train_days + self.test_days <= len(dates):
+            train_end = start + self.train_days
+            windows.append({
+                'window': len(windows),
+                'train_start': dates[start],
+                'train_end': dates[train_end - 1],
+                'test_start': dates[train_end],
+                'test_end': dates[train_end + self.test_days - 1]
+            })
+            start += self.test_days
+        return windows
+
+    def run(self, stock_list=None, param_grid=None, stock_data_dict=None):
+        """워크포워드 실행 → OOS 결과 dict 반환"""
+        param_grid = param_grid or WALK_FORWARD_PARAM_GRID
+        keys = list(param_grid.keys())
+        param_sets = [dict(zip(keys, values)) for values in itertools.product(*[param_grid[key] for key in keys])]
+
+        if stock_data_dict is None:
+            stock_data_dict = VolumeBacktestingEngine(**self.engine_kwargs).load_stock_data(stock_list)
+
+        if not stock_data_dict:
+            logger.error("사용 가능한 데이터가 없습니다.")
+            return None
+
+        dates = sorted(set().union(*[df.index for df in stock_data_dict.values()]))
+        windows = self.build_windows(dates)
+
+        if not windows:
+            logger.error(f"데이터 기간 부족: {len(dates)}일 (필요: {WALK_FORWARD_WARMUP_ROWS + self.train_days + self.test_days}일)")
+            return None
+
+        logger.info(f"워크포워드 시작 - 윈도우 {len(windows)}개, 파라미터 조합 {len(param_sets)}개, 워커 {self.max_workers}개")
+
+        shared = SharedVolumePanel(stock_data_dict)
+        try:
+            with multiprocessing.Pool(
+                processes=self.max_workers,
+                initializer=_init_walk_forward_worker,
+                initargs=(shared.descriptor(), self.engine_kwargs, logging.WARNING)
+            ) as pool:
+                # 1. 학습 구간 파라미터 탐색 (윈도우 × 조합 전체 병렬)
+                train_tasks = [
+                    {'window': w['window'], 'phase': 'train', 'params': params,
+                     'start': w['train_start'], 'end': w['train_end']}
+                    for w in windows for params in param_sets
+                ]
+
+                best = {}
+                for result in pool.imap_unordered(_run_walk_forward_task, train_tasks):
+                    score = result['metrics'][self.objective]
+                    current = best.get(result['window'])
+                    if current is None or score > current['score']:
+                        best[result['window']] = {'score': score, 'params': result['params'], 'metrics': result['metrics']}
+
+                # 2. 다음 검증 구간에서 최적 조합 평가
+                test_tasks = [
+                    {'window': w['window'], 'phase': 'test', 'params': best[w['window']]['params'],
+                     'start': w['test_start'], 'end': w['test_end']}
+                    for w in windows
+                ]
+                test_results = {r['window']: r for r in pool.map(_run_walk_forward_task, test_tasks)}
+        finally:
+            shared.close()
+
+        return self._stitch(windows, best, test_results)
+
+    def _stitch(self, windows, best, test_results):
+        """검증 구간 자산곡선을 이어 붙여 OOS 성과 계산"""
+        equity_curve = []
+        capital = self.initial_capital
+        self.window_results = []
+
+        for w in windows:
+            test = test_results[w['window']]
+            scale = capital / self.initial_capital
+
+            for date, value in test['equity']:
+                equity_curve.append({'date': date, 'window': w['window'], 'total_value': value * scale})
+
+            if test['equity']:
+                capital = equity_curve[-1]['total_value']
+
+            self.window_results.append({
+                **w,
+                'best_params': best[w['window']]['params'],
+                'train_metrics': best[w['window']]['metrics'],
+                'test_metrics': test['metrics']
+            })
+
+            logger.info(f"윈도우 {w['window']}: 학습 {w['train_start']}~{w['train_end']} "
+                        f"{self.objective}={best[w['window']]['score']:.3f} → "
+                        f"검증 {w['test_start']}~{w['test_end']} 수익률 {test['metrics']['total_return']:+.2f}%")
+
+        values = np.array([e['total_value'] for e in equity_curve], dtype=float)
+        if len(values) > 0:
+            daily_returns = np.diff(values) / values[:-1] if len(values) > 1 else np.array([])
+            std = daily_returns.std() if len(daily_returns) else 0
+            peak = np.maximum.accumulate(values)
+            summary = {
+                'oos_total_return': float((values[-1] - self.initial_capital) / self.initial_capital * 100),
+                'oos_sharpe_ratio': float(daily_returns.mean() / std * np.sqrt(252)) if std > 0 else 0.0,
+                'oos_max_drawdown': float(((peak - values) / peak).max() * 100),
+                'oos_days': len(values)
+            }
+        else:
+            summary = {'oos_total_return': 0.0, 'oos_sharpe_ratio': 0.0, 'oos_max_drawdown': 0.0, 'oos_days': 0}
+
+        return {
+            'summary': summary,
+            'windows': self.window_results,
+            'equity_curve': equity_curve
+        }
+
+def run_volume_walk_forward(stock_list, initial_capital=5000000, max_positions=5,
+                            train_days=120, test_days=40, param_grid=None, max_workers=None):
+    """
+    거래량 기반 워크포워드 최적화 실행
+    
+    Args:
+        stock_list (list): 대상 종목 리스트
+        train_days (int): 학습 구간 거래일 수
+        test_days (int): 검증 구간 거래일 수
+        param_grid (dict): {"buy_conditions.volume_surge_ratio": [1.5, 1.8], ...}
+    
+    Returns:
+        dict: OOS 요약, 윈도우별 결과, 이어 붙인 자산곡선
+    """
+    optimizer = WalkForwardOptimizer(
+        initial_capital=initial_capital,
+        max_positions=max_positions,
+        train_days=train_days,
+        test_days=test_days,
+        max_workers=max_workers
+    )
+    result = optimizer.run(stock_list, param_grid)
+
+    if result:
+        summary = result['summary']
+        print("\n" + "=" * 60)
+        print("🔁 워크포워드 최적화 결과 (표본 외)")
+        print("=" * 60)
+        for window in result['windows']:
+            print(f"   윈도우 {window['window']}: {window['test_start']} ~ {window['test_end']} "
+                  f"수익률 {window['test_metrics']['total_return']:+.2f}% / 파라미터 {window['best_params']}")
+        print(f"\n   OOS 총 수익률: {summary['oos_total_return']:+.2f}%")
+        print(f"   OOS 샤프 비율: {summary['oos_sharpe_ratio']:.3f}")
+        print(f"   OOS 최대 낙폭: {summary['oos_max_drawdown']:.2f}%")
+
+        with open("volume_walk_forward_results.json", 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'windows': result['windows'], 'equity_curve': result['equity_curve']},
+                      f, ensure_ascii=False, indent=2, default=str)
+
+    return result
+
 ################################### 실행 함수 ##################################
 
 def run_volume_backtest(stock_list, initial_capital=5000000, max_positions=5, 
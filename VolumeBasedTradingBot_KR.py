@@ -20,6 +20,11 @@ import pandas as pd
 import os
 import schedule
 import numpy as np
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import global_rate_limiter
+import account_snapshot
 
 ################################### 로깅 처리 ##################################
 import logging
@@ -64,12 +69,20 @@ console_handler.setFormatter(formatter)
 logger.addHandler(file_handler)
 logger.addHandler(console_handler)
 
+global_rate_limiter.set_logger(logger)
+account_snapshot.set_logger(logger)
+
 ################################### 로깅 처리 끝 ##################################
 
 # API 초기화
 Common.SetChangeMode()
 logger.info("✅ API 초기화 완료 - 모든 KIS API 사용 가능")
 
+# API 호출 제한 - 시장 스캔의 종목별 일봉 조회를 동시에 실행해도 전역 초당 호출 수 안에서 실행
+api_limiter = global_rate_limiter.get_rate_limiter(is_virtual=Common.GetNowDist() == "VIRTUAL")
+KisKR = global_rate_limiter.RateLimitedModule(KisKR, api_limiter, global_rate_limiter.KIS_KR_ENDPOINTS)
+Common = global_rate_limiter.RateLimitedModule(Common, api_limiter, global_rate_limiter.KIS_COMMON_ENDPOINTS)
+
 ################################### 설정 관리 시스템 ##################################
 
 class VolumeTradeConfig:
@@ -86,6 +99,7 @@ class VolumeTradeConfig:
             "bot_name": "VolumeBasedTradingBot",
             "trading_budget": 5000000,  # 500만원 기본 예산
             "max_positions": 5,         # 최대 5개 종목 동시 보유
+            "account_refresh_seconds": 30,  # 보유 종목/잔고 스냅샷 재사용 시간 (주문 후에는 바로 갱신)
             
             # 거래량 기반 매수 조건 (원본 설정)
             "buy_conditions": {
@@ -137,7 +151,8 @@ class VolumeTradeConfig:
                 "min_market_cap": 1000,           # 최소 시가총액 1000억
                 "min_volume": 100000,             # 최소 거래량 10만주
                 "scan_markets": ["KOSPI", "KOSDAQ"], # 스캔 대상 시장
-                "update_interval_minutes": 30      # 종목 리스트 업데이트 주기
+                "update_interval_minutes": 30,     # 종목 리스트 업데이트 주기
+                "scan_workers": 4                  # 후보 종목 일봉 동시 조회 수 (API 호출 제한 안에서)
             },
             
             # 리스크 관리
@@ -220,92 +235,184 @@ config = VolumeTradeConfig()
 
 ################################### 거래량 분석 엔진 ##################################
 
+VOLUME_FETCH_PERIOD = 60          # 종목당 한 번 조회하는 일봉 수 (탐지기가 쓰는 최대 기간)
+VOLUME_CACHE_TTL = 300            # 거래량 특성 캐시 유효 시간 (초)
+VOLUME_CACHE_MAX_ENTRIES = 300    # 거래량 특성 캐시 최대 종목 수 (초과 시 오래 안 쓴 종목부터 제거)
+
+class VolumeFeatures:
+    """종목 1개의 거래량 특성 - 일봉 1회 조회로 계산, 생성 후 변경 불가 (배열도 읽기 전용)
+
+    columns: open/high/low/close/volume과 파생 컬럼 volume_ma5, volume_ma20, volume_ratio,
+             price_change, candle_body_ratio (numpy 배열)
+    """
+
+    DERIVED_COLUMNS = ['volume_ma5', 'volume_ma20', 'volume_ratio', 'price_change', 'candle_body_ratio']
+
+    def __init__(self, stock_code, df, period):
+        columns = {}
+        for column in ['open', 'high', 'low', 'close', 'volume']:
+            columns[column] = df[column].to_numpy()
+
+        volume = df['volume']
+        volume_ma20 = volume.rolling(20).mean()
+        derived = {
+            'volume_ma5': volume.rolling(5).mean(),
+            'volume_ma20': volume_ma20,
+            'volume_ratio': volume / volume_ma20,
+            'price_change': (df['close'] - df['open']) / df['open'] * 100,
+            'candle_body_ratio': abs(df['close'] - df['open']) / (df['high'] - df['low'])
+        }
+        for column, values in derived.items():
+            columns[column] = values.to_numpy()
+        for values in columns.values():
+            values.setflags(write=False)
+
+        object.__setattr__(self, 'stock_code', stock_code)
+        object.__setattr__(self, 'period', period)
+        object.__setattr__(self, 'index', df.index)
+        object.__setattr__(self, 'columns', columns)
+        object.__setattr__(self, 'length', len(df))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("VolumeFeatures는 읽기 전용입니다")
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def to_frame(self, period=None):
+        """최근 period개 일봉 DataFrame 사본 (기존 get_volume_data 반환 형식)"""
+        start = 0 if period is None else max(0, self.length - period)
+        return pd.DataFrame({column: values[start:].copy() for column, values in self.columns.items()},
+                            index=self.index[start:])
+
 class VolumeAnalysisEngine:
-    """거래량 패턴 분석 엔진"""
+    """거래량 패턴 분석 엔진
+
+    종목별로 일봉을 한 번 조회해 VolumeFeatures를 만들고, 세 탐지기(거래량 급증/눌림목/분배)를
+    같은 특성으로 함께 계산해 캐시 (VOLUME_CACHE_TTL 동안 재사용, 최대 VOLUME_CACHE_MAX_ENTRIES 종목)
+    """
     
     def __init__(self):
-        self.volume_cache = {}  # 거래량 데이터 캐시
+        self.volume_cache = OrderedDict()  # {종목코드: {'features', 'signals', 'timestamp'}} - LRU 순서
         self.pattern_history = {}  # 패턴 이력 추적
-        
+        self._cache_lock = threading.Lock()
+        self.cache_stats = {'hits': 0, 'fetches': 0, 'evictions': 0}
+
+    def get_features(self, stock_code, period=VOLUME_FETCH_PERIOD):
+        """종목 거래량 특성 (캐시에 period 이상 조회분이 있으면 재사용), 데이터 부족/조회 실패 시 None"""
+        entry = self._get_entry(stock_code, period)
+        return entry['features'] if entry else None
+
+    def analyze(self, stock_code):
+        """세 탐지기 결과 {'surge', 'pullback', 'distribution'}: (감지 여부, 정보) - 특성 계산 시 함께 계산해 둔 값"""
+        entry = self._get_entry(stock_code, VOLUME_FETCH_PERIOD)
+        if entry is None:
+            return {name: (False, "데이터 부족") for name in ('surge', 'pullback', 'distribution')}
+        return entry['signals']
+
     def get_volume_data(self, stock_code, timeframe="daily", period=60):
-        """종목별 거래량 데이터 조회"""
+        """종목별 거래량 데이터 조회 (특성 캐시의 최근 period개 일봉 사본, 10개 미만이면 None)"""
         try:
-            cache_key = f"{stock_code}_{timeframe}_{period}"
-            current_time = time.time()
-            
-            # 캐시 확인 (5분 유효)
-            if cache_key in self.volume_cache:
-                cache_data = self.volume_cache[cache_key]
-                if current_time - cache_data['timestamp'] < 300:  # 5분
-                    return cache_data['data']
-            
-            # 데이터 조회
-            if timeframe == "daily":
-                df = Common.GetOhlcv("KR", stock_code, period)
-            else:
-                # 분봉 데이터는 별도 구현 필요 (KIS API 제약)
-                df = Common.GetOhlcv("KR", stock_code, period)
+            # 분봉 데이터는 별도 구현 필요 (KIS API 제약) - timeframe과 무관하게 일봉 사용
+            features = self.get_features(stock_code, max(period, VOLUME_FETCH_PERIOD))
+            if features is None:
+                return None
+
+            df = features.to_frame(period)
+            if len(df) < 10:
+                return None
+            return df
             
+        except Exception as e:
+            logger.error(f"거래량 데이터 조회 오류 ({stock_code}): {str(e)}")
+            return None
+
+    def _get_entry(self, stock_code, period):
+        current_time = time.time()
+        with self._cache_lock:
+            entry = self.volume_cache.get(stock_code)
+            if (entry is not None and current_time - entry['timestamp'] < VOLUME_CACHE_TTL
+                    and entry['features'].period >= period):
+                self.volume_cache.move_to_end(stock_code)
+                self.cache_stats['hits'] += 1
+                return entry
+
+        try:
+            self.cache_stats['fetches'] += 1
+            df = Common.GetOhlcv("KR", stock_code, period)
             if df is None or len(df) < 10:
                 return None
-                
-            # 거래량 관련 지표 계산
-            df['volume_ma5'] = df['volume'].rolling(5).mean()
-            df['volume_ma20'] = df['volume'].rolling(20).mean()
-            df['volume_ratio'] = df['volume'] / df['volume_ma20']
-            df['price_change'] = (df['close'] - df['open']) / df['open'] * 100
-            df['candle_body_ratio'] = abs(df['close'] - df['open']) / (df['high'] - df['low'])
-            
-            # 캐시 저장
-            self.volume_cache[cache_key] = {
-                'data': df,
+
+            features = VolumeFeatures(stock_code, df, period)
+            entry = {
+                'features': features,
+                'signals': {
+                    'surge': self._detect_volume_surge(features),
+                    'pullback': self._detect_pullback(features),
+                    'distribution': self._detect_distribution(features)
+                },
                 'timestamp': current_time
             }
-            
-            return df
-            
         except Exception as e:
             logger.error(f"거래량 데이터 조회 오류 ({stock_code}): {str(e)}")
             return None
 
+        with self._cache_lock:
+            self.volume_cache[stock_code] = entry
+            self.volume_cache.move_to_end(stock_code)
+            while len(self.volume_cache) > VOLUME_CACHE_MAX_ENTRIES:
+                self.volume_cache.popitem(last=False)
+                self.cache_stats['evictions'] += 1
+        return entry
+
     def detect_volume_surge_pattern(self, stock_code):
         """거래량 급증 패턴 감지"""
+        return self.analyze(stock_code)['surge']
+
+    def detect_pullback_opportunity(self, stock_code):
+        """눌림목 매수 기회 감지"""
+        return self.analyze(stock_code)['pullback']
+
+    def detect_distribution_pattern(self, stock_code):
+        """상투권 분배 패턴 감지 (매도 신호)"""
+        return self.analyze(stock_code)['distribution']
+
+    def _detect_volume_surge(self, features):
+        """거래량 급증 패턴 감지 (최근 60일)"""
+        stock_code = features.stock_code
         try:
-            df = self.get_volume_data(stock_code, "daily", 60)
-            if df is None or len(df) < 20:
+            if features.length < 20:
                 return False, "데이터 부족"
             
             buy_conditions = config.config["buy_conditions"]
-            
-            # 최근 3일 데이터
-            recent_data = df.tail(3)
+            volume_ratio = features['volume_ratio']
+            price_changes = features['price_change']
             
             # 1. 바닥권 매집 신호 체크
             # - 일정 기간 거래량 낮다가 급증
-            volume_ma = df['volume_ma20'].iloc[-4:-1].mean()  # 이전 3일 평균
-            current_volume = df['volume'].iloc[-1]
+            volume_ma = pd.Series(features['volume_ma20'][-4:-1]).mean()  # 이전 3일 평균
+            current_volume = features['volume'][-1]
             volume_surge_ratio = current_volume / volume_ma if volume_ma > 0 else 0
             
             # 2. 양봉 + 거래량 급증 체크
-            price_change = df['price_change'].iloc[-1]
-            candle_body_ratio = df['candle_body_ratio'].iloc[-1]
+            price_change = price_changes[-1]
+            candle_body_ratio = features['candle_body_ratio'][-1]
             
-            # 3. 연속 패턴 체크 (3일 패턴)
+            # 3. 연속 패턴 체크 (최근 3일 패턴)
             pattern_detected = False
             
-            if len(recent_data) >= 3:
-                day1_volume_surge = recent_data['volume_ratio'].iloc[0] >= buy_conditions["volume_surge_ratio"]
-                day1_positive = recent_data['price_change'].iloc[0] > 0
-                
-                day2_volume_decrease = recent_data['volume_ratio'].iloc[1] < recent_data['volume_ratio'].iloc[0]
-                
-                day3_volume_increase = recent_data['volume_ratio'].iloc[2] > recent_data['volume_ratio'].iloc[1]
-                day3_positive = recent_data['price_change'].iloc[2] > 0
-                
-                # 3일 연속 패턴 확인
-                if day1_volume_surge and day1_positive and day2_volume_decrease and day3_volume_increase and day3_positive:
-                    pattern_detected = True
-                    pattern_type = "3일_연속_매집_패턴"
+            day1_volume_surge = volume_ratio[-3] >= buy_conditions["volume_surge_ratio"]
+            day1_positive = price_changes[-3] > 0
+            
+            day2_volume_decrease = volume_ratio[-2] < volume_ratio[-3]
+            
+            day3_volume_increase = volume_ratio[-1] > volume_ratio[-2]
+            day3_positive = price_changes[-1] > 0
+            
+            # 3일 연속 패턴 확인
+            if day1_volume_surge and day1_positive and day2_volume_decrease and day3_volume_increase and day3_positive:
+                pattern_detected = True
+                pattern_type = "3일_연속_매집_패턴"
             
             # 4. 장대양봉 + 대량거래 체크
             if (volume_surge_ratio >= buy_conditions["volume_surge_ratio"] and 
@@ -330,14 +437,16 @@ class VolumeAnalysisEngine:
             logger.error(f"거래량 급증 패턴 감지 오류 ({stock_code}): {str(e)}")
             return False, f"분석 오류: {str(e)}"
 
-    def detect_pullback_opportunity(self, stock_code):
-        """눌림목 매수 기회 감지"""
+    def _detect_pullback(self, features):
+        """눌림목 매수 기회 감지 (최근 30일)"""
+        stock_code = features.stock_code
         try:
-            df = self.get_volume_data(stock_code, "daily", 30)
-            if df is None or len(df) < 10:
+            if min(features.length, 30) < 10:
                 return False, "데이터 부족"
             
             buy_conditions = config.config["buy_conditions"]
+            volume_ratio = features['volume_ratio']
+            close = features['close']
             
             # 최근 거래량 급증 이후 조정 구간 체크
             recent_volume_surge = False
@@ -345,7 +454,7 @@ class VolumeAnalysisEngine:
             
             # 최근 5일 내 거래량 급증 확인
             for i in range(5):
-                if len(df) > i and df['volume_ratio'].iloc[-(i+1)] >= buy_conditions["volume_surge_ratio"]:
+                if volume_ratio[-(i+1)] >= buy_conditions["volume_surge_ratio"]:
                     recent_volume_surge = True
                     surge_index = -(i+1)
                     break
@@ -354,14 +463,14 @@ class VolumeAnalysisEngine:
                 return False, "최근 거래량 급증 없음"
             
             # 급증 이후 거래량 감소 + 가격 조정 확인
-            current_volume_ratio = df['volume_ratio'].iloc[-1]
-            surge_volume_ratio = df['volume_ratio'].iloc[surge_index]
+            current_volume_ratio = volume_ratio[-1]
+            surge_volume_ratio = volume_ratio[surge_index]
             
             volume_decreased = current_volume_ratio <= surge_volume_ratio * buy_conditions["pullback_volume_decrease"]
             
             # 가격이 하락 조정 중인지 확인
-            surge_price = df['close'].iloc[surge_index]
-            current_price = df['close'].iloc[-1]
+            surge_price = close[surge_index]
+            current_price = close[-1]
             price_pullback = (current_price - surge_price) / surge_price * 100
             
             if volume_decreased and -10 <= price_pullback <= -2:  # 2-10% 조정
@@ -380,30 +489,31 @@ class VolumeAnalysisEngine:
             logger.error(f"눌림목 기회 감지 오류 ({stock_code}): {str(e)}")
             return False, f"분석 오류: {str(e)}"
 
-    def detect_distribution_pattern(self, stock_code):
-        """상투권 분배 패턴 감지 (매도 신호)"""
+    def _detect_distribution(self, features):
+        """상투권 분배 패턴 감지 (최근 60일)"""
+        stock_code = features.stock_code
         try:
-            df = self.get_volume_data(stock_code, "daily", 60)
-            if df is None or len(df) < 20:
+            if features.length < 20:
                 return False, "데이터 부족"
             
             sell_conditions = config.config["sell_conditions"]
+            high = features['high']
             
             # 고점 구간 확인 (최근 20일 최고가 대비)
-            recent_high = df['high'].tail(20).max()
-            current_price = df['close'].iloc[-1]
+            recent_high = pd.Series(high[-20:]).max()
+            current_price = features['close'][-1]
             high_ratio = current_price / recent_high
             
             if high_ratio < 0.9:  # 고점 대비 10% 이상 하락시 분배 패턴 아님
                 return False, "고점 구간 아님"
             
             # 대량거래 + 장대음봉 체크
-            current_volume_ratio = df['volume_ratio'].iloc[-1]
-            price_change = df['price_change'].iloc[-1]
-            candle_body_ratio = df['candle_body_ratio'].iloc[-1]
+            current_volume_ratio = features['volume_ratio'][-1]
+            price_change = features['price_change'][-1]
+            candle_body_ratio = features['candle_body_ratio'][-1]
             
             # 위꼬리 긴 캔들 체크
-            upper_shadow = (df['high'].iloc[-1] - max(df['open'].iloc[-1], df['close'].iloc[-1])) / (df['high'].iloc[-1] - df['low'].iloc[-1])
+            upper_shadow = (high[-1] - max(features['open'][-1], features['close'][-1])) / (high[-1] - features['low'][-1])
             
             # 분배 패턴 조건
             volume_surge = current_volume_ratio >= sell_conditions["high_volume_surge"]
@@ -438,6 +548,14 @@ class VolumeBasedTradingBot:
         self.last_scan_time = None
         self.target_stocks = []  # 관심 종목 리스트
         
+        # 보유 종목/잔고/미체결 주문 스냅샷 (동기화, 잔고 체크가 같은 조회 결과 공유)
+        self.account_snapshots = account_snapshot.AccountSnapshotService(
+            KisKR.GetMyStockList,
+            KisKR.GetBalance,
+            lambda: KisKR.GetOrderList("", "ALL", "OPEN", 1),
+            refresh_interval=config.config.get("account_refresh_seconds", 30)
+        )
+        
         # 데이터 로드
         self.load_trading_data()
         
@@ -496,20 +614,31 @@ class VolumeBasedTradingBot:
                 if volume_rank:
                     volume_stocks.extend(volume_rank)
             
+            # 시가총액 필터 (상위 100개만 분석)
+            candidates = []
+            for stock in volume_stocks[:100]:
+                try:
+                    if not stock['code'] or stock['price'] * 1000000 < scan_config["min_market_cap"] * 100000000:
+                        continue
+                    candidates.append(stock)
+                except Exception as e:
+                    logger.error(f"종목 분석 오류 ({stock.get('code', 'Unknown')}): {str(e)}")
+            
+            # 후보 종목 일봉을 동시에 조회해 세 패턴을 한 번에 계산 (API 호출 제한은 global_rate_limiter가 적용)
+            scan_workers = max(1, int(scan_config.get("scan_workers", 4)))
+            with ThreadPoolExecutor(max_workers=scan_workers) as executor:
+                analyses = list(executor.map(lambda stock: self.analysis_engine.analyze(stock['code']), candidates))
+            
             # 거래량 급증 종목 필터링
             signal_stocks = []
             
-            for stock in volume_stocks[:100]:  # 상위 100개만 분석
+            for stock, analysis in zip(candidates, analyses):
                 try:
                     stock_code = stock['code']
                     stock_name = stock['name']
                     
-                    # 시가총액 필터
-                    if stock['price'] * 1000000 < scan_config["min_market_cap"] * 100000000:
-                        continue
-                    
                     # 거래량 급증 패턴 체크
-                    surge_detected, surge_info = self.analysis_engine.detect_volume_surge_pattern(stock_code)
+                    surge_detected, surge_info = analysis['surge']
                     
                     if surge_detected:
                         signal_stocks.append({
@@ -537,7 +666,9 @@ class VolumeBasedTradingBot:
             
             self.last_scan_time = current_time
             
-            logger.info(f"✅ 거래량 신호 스캔 완료: {len(self.target_stocks)}개 종목 선별")
+            cache_stats = self.analysis_engine.cache_stats
+            logger.info(f"✅ 거래량 신호 스캔 완료: {len(self.target_stocks)}개 종목 선별 "
+                        f"(후보 {len(candidates)}개, 누적 조회 {cache_stats['fetches']}회 / 캐시 {cache_stats['hits']}회)")
             
             # Discord 알림
             if (config.config["notifications"]["signal_alerts"] and 
@@ -583,8 +714,8 @@ class VolumeBasedTradingBot:
             if not current_price:
                 return False, "현재가 정보 없음"
             
-            # RSI 체크 (간단한 계산)
-            df = Common.GetOhlcv("KR", stock_code, 20)
+            # RSI 체크 (간단한 계산) - 거래량 분석 때 조회한 일봉 재사용
+            df = self.analysis_engine.get_volume_data(stock_code, "daily", 20)
             if df is not None and len(df) >= 14:
                 # RSI 계산
                 delta = df['close'].diff()
@@ -599,7 +730,7 @@ class VolumeBasedTradingBot:
                     return False, f"RSI 과매수 구간 ({current_rsi:.1f} > {rsi_limit})"
             
             # 5. 예산 체크
-            balance = KisKR.GetBalance()
+            balance = self.account_snapshots.get().balance or {}
             available_cash = float(balance.get('RemainMoney', 0))
             
             position_size = config.config["trading_budget"] / config.config["max_positions"]
@@ -699,7 +830,7 @@ class VolumeBasedTradingBot:
             
             # 7. RSI 과매수 구간 + 수익 실현
             if profit_rate > 20:  # 20% 이상 수익시에만 RSI 체크
-                df_rsi = Common.GetOhlcv("KR", stock_code, 20)
+                df_rsi = self.analysis_engine.get_volume_data(stock_code, "daily", 20)
                 if df_rsi is not None and len(df_rsi) >= 14:
                     delta = df_rsi['close'].diff()
                     gain = delta.where(delta > 0, 0).rolling(14).mean()
@@ -777,6 +908,8 @@ class VolumeBasedTradingBot:
             order_result = KisKR.MakeBuyLimitOrder(stock_code, buy_amount, buy_price)
             
             if isinstance(order_result, dict) and 'OrderNum' in order_result:
+                self.account_snapshots.on_fill(stock_code)
+                
                 # 매수 성공
                 position_data = {
                     'stock_code': stock_code,
@@ -857,6 +990,8 @@ class VolumeBasedTradingBot:
             order_result = KisKR.MakeSellLimitOrder(stock_code, sell_amount, sell_price)
             
             if isinstance(order_result, dict) and 'OrderNum' in order_result:
+                self.account_snapshots.on_fill(stock_code)
+                
                 # 매도 성공
                 entry_price = position_info['entry_price']
                 profit = (sell_price - entry_price) * sell_amount
@@ -939,13 +1074,22 @@ class VolumeBasedTradingBot:
     def update_positions_from_broker(self):
         """브로커 정보와 포지션 동기화"""
         try:
-            # 실제 보유 종목 조회
-            actual_holdings = KisKR.GetMyStockList()
+            # 실제 보유 종목 (계좌 스냅샷)
+            snapshot = self.account_snapshots.get()
+            if not snapshot.holdings_ok:
+                logger.warning("⚠️ 보유 종목 조회 실패 - 포지션 동기화 건너뜀")
+                return
+            actual_holdings = snapshot.holdings_list()
             
             # 내부 포지션과 브로커 포지션 비교
             for holding in actual_holdings:
                 stock_code = holding['StockCode']
                 actual_amount = holding['StockAmt']
+                
+                # 미체결 주문이 있으면 곧 보유량이 바뀌므로 이번 동기화에서 제외
+                if snapshot.has_open_order(stock_code):
+                    logger.info(f"⏳ {stock_code} 미체결 주문 있음 - 동기화 건너뜀")
+                    continue
                 actual_avg_price = holding['StockAvgPrice']
                 
                 if stock_code in self.positions:
@@ -967,7 +1111,7 @@ class VolumeBasedTradingBot:
                 
                 elif actual_amount > 0:
                     # 브로커에는 있지만 내부 포지션에 없는 경우
-                    stock_name = KisKR.GetStockName(stock_code)
+                    stock_name = holding.get('StockName') or KisKR.GetStockName(stock_code)
                     logger.warning(f"⚠️ {stock_name} 브로커 보유분 발견 - 내부 포지션 생성")
                     
                     self.positions[stock_code] = {
@@ -986,6 +1130,8 @@ class VolumeBasedTradingBot:
             internal_codes = set(self.positions.keys())
             
             for code in internal_codes - broker_codes:
+                if snapshot.has_open_order(code):
+                    continue
                 logger.warning(f"⚠️ {code} 브로커에서 제거됨 - 내부 포지션 삭제")
                 del self.positions[code]
             
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+계좌 스냅샷 서비스 (account_snapshot.py)
+- 보유 종목 / 잔고 / 미체결 주문을 한 번에 조회해 읽기 전용 스냅샷으로 보관
+- refresh_interval 안에서는 같은 스냅샷을 돌려주고, 체결 이벤트(on_fill) 후에는 다음 조회에서 바로 새로 가져옴
+  → 포지션 동기화 / 불일치 점검 / 총자산 계산이 각자 GetMyStockList, GetBalance를 반복 호출하지 않음
+- 조회 함수만 넘겨받으므로 KIS(국내/해외), 키움 어느 API 헬퍼에도 사용 가능
+- 조회 실패 시 해당 항목은 None (holdings_ok / balance_ok로 확인), 실패한 스냅샷은 다음 조회에서 다시 가져옴
+- 미체결 주문은 선택 항목 (open_orders_ok로 확인) - 조회 실패는 로그만 남기고 스냅샷 재조회 사유로 보지 않음
+- fetch_timeout을 주면 조회 함수마다 따로 시간 제한 (초과 시 해당 항목 조회 실패로 처리하고 바로 반환)
+
+사용 예:
+    snapshots = account_snapshot.AccountSnapshotService(KisKR.GetMyStockList, KisKR.GetBalance,
+                                                        lambda: KisKR.GetOrderList("", "ALL", "OPEN", 1),
+                                                        refresh_interval=30)
+    snapshot = snapshots.get()
+    holding = snapshot.holding("005930")       # 보유 정보 (읽기 전용 dict), 없으면 None
+    if snapshot.has_open_order("005930"):      # 미체결 주문이 있으면 잔고가 곧 바뀔 수 있음
+    ...
+    snapshots.on_fill("005930")                # 주문 체결 후 - 다음 get()은 새로 조회
+"""
+
+import time
+import logging
+import datetime
+import threading
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+def set_logger(external_logger):
+    """외부 로거를 설정하는 함수"""
+    global logger
+    logger = external_logger
+
+################################### 스냅샷 ##################################
+
+def _freeze(item) -> Mapping:
+    return MappingProxyType(dict(item))
+
+class AccountSnapshot:
+    """계좌 조회 결과 1회분 - 생성 후 변경 불가
+
+    holdings: {종목코드: 보유 정보} (조회 실패 시 None)
+    balance: 잔고 정보 (조회 실패 시 None)
+    open_orders: 미체결 주문 튜플 (조회하지 않았거나 실패 시 None)
+    """
+
+    def __init__(self, holdings: Optional[List[Dict]], balance: Optional[Dict], fetched_at: float,
+                 code_key: str = 'StockCode', open_orders: Optional[List[Dict]] = None,
+                 order_code_key: str = 'OrderStock'):
+        frozen_holdings = None
+        if holdings is not None:
+            frozen_holdings = MappingProxyType({str(item[code_key]): _freeze(item) for item in holdings if code_key in item})
+
+        object.__setattr__(self, 'holdings', frozen_holdings)
+        object.__setattr__(self, 'balance', _freeze(balance) if balance is not None else None)
+        object.__setattr__(self, 'open_orders', tuple(_freeze(order) for order in open_orders) if open_orders is not None else None)
+        object.__setattr__(self, 'order_code_key', order_code_key)
+        object.__setattr__(self, 'fetched_at', fetched_at)
+        object.__setattr__(self, 'fetched_time', datetime.datetime.now())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AccountSnapshot은 읽기 전용입니다")
+
+    @property
+    def holdings_ok(self) -> bool:
+        return self.holdings is not None
+
+    @property
+    def balance_ok(self) -> bool:
+        return self.balance is not None
+
+    @property
+    def open_orders_ok(self) -> bool:
+        return self.open_orders is not None
+
+    def holding(self, stock_code: str) -> Optional[Mapping]:
+        """종목 보유 정보, 보유하지 않았거나 조회 실패 시 None"""
+        if self.holdings is None:
+            return None
+        return self.holdings.get(str(stock_code))
+
+    def holdings_list(self) -> List[Dict]:
+        """보유 종목 리스트 사본 (GetMyStockList 반환 형식), 조회 실패 시 빈 리스트"""
+        if self.holdings is None:
+            return []
+        return [dict(item) for item in self.holdings.values()]
+
+    def open_orders_for(self, stock_code: str) -> List[Mapping]:
+        """종목의 미체결 주문, 없거나 조회 실패 시 빈 리스트"""
+        if self.open_orders is None:
+            return []
+        return [order for order in self.open_orders if str(order.get(self.order_code_key, '')) == str(stock_code)]
+
+    def has_open_order(self, stock_code: str) -> bool:
+        return len(self.open_orders_for(stock_code)) > 0
+
+################################### 스냅샷 서비스 ##################################
+
+class AccountSnapshotService:
+    """계좌 스냅샷 조회/재사용
+
+    Args:
+        holdings_fetcher: () -> 보유 종목 리스트 (None이면 조회 실패)
+        balance_fetcher: () -> 잔고 dict (None이면 조회 실패)
+        open_orders_fetcher: () -> 미체결 주문 리스트 (None이면 미체결 주문은 조회하지 않음)
+        refresh_interval: 스냅샷 재사용 시간 (초)
+        fetch_timeout: 조회 함수별 시간 제한 (초, None이면 제한 없음)
+        code_key: 보유 종목 정보의 종목코드 키
+        order_code_key: 미체결 주문 정보의 종목코드 키
+        clock: 경과 시간 측정 함수 (초)
+    """
+
+    def __init__(self, holdings_fetcher: Callable, balance_fetcher: Callable,
+                 open_orders_fetcher: Optional[Callable] = None, refresh_interval: float = 30.0,
+                 fetch_timeout: Optional[float] = None, code_key: str = 'StockCode',
+                 order_code_key: str = 'OrderStock', clock: Optional[Callable[[], float]] = None):
+        self.holdings_fetcher = holdings_fetcher
+        self.balance_fetcher = balance_fetcher
+        self.open_orders_fetcher = open_orders_fetcher
+        self.refresh_interval = refresh_interval
+        self.fetch_timeout = fetch_timeout
+        self.code_key = code_key
+        self.order_code_key = order_code_key
+        self.clock = clock or time.monotonic
+
+        self._snapshot = None
+        self._stale = True
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'refreshes': 0, 'failures': 0, 'timeouts': 0, 'fills': 0}
+
+    def get(self, max_age: Optional[float] = None) -> AccountSnapshot:
+        """스냅샷 반환 - max_age(기본 refresh_interval)보다 오래됐거나 체결 이후면 새로 조회"""
+        max_age = self.refresh_interval if max_age is None else max_age
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and not self._stale and self.clock() - snapshot.fetched_at < max_age:
+                self.stats['hits'] += 1
+                return snapshot
+            return self._refresh()
+
+    def refresh(self) -> AccountSnapshot:
+        """지금 새로 조회"""
+        with self._lock:
+            return self._refresh()
+
+    def on_fill(self, stock_code: Optional[str] = None):
+        """주문 체결(또는 주문 접수) 알림 - 다음 get()은 주기와 상관없이 새로 조회"""
+        with self._lock:
+            self._stale = True
+            self.stats['fills'] += 1
+        if stock_code:
+            logger.debug(f"📸 {stock_code} 체결 - 계좌 스냅샷 갱신 예정")
+
+    ################ 내부 처리 ################
+
+    def _call(self, fetcher: Callable):
+        if self.fetch_timeout is None:
+            return fetcher()
+
+        # 시간 초과 시 조회 스레드는 두고 바로 반환 (락을 잡은 채로 기다리지 않음)
+        result = [None]
+        error = [None]
+
+        def target():
+            try:
+                result[0] = fetcher()
+            except Exception as e:
+                error[0] = e
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        thread.join(self.fetch_timeout)
+        if thread.is_alive():
+            self.stats['timeouts'] += 1
+            raise TimeoutError(f"{self.fetch_timeout}초 초과")
+        if error[0] is not None:
+            raise error[0]
+        return result[0]
+
+    def _fetch(self, name: str, fetcher: Callable):
+        try:
+            result = self._call(fetcher)
+        except Exception as e:
+            logger.error(f"계좌 스냅샷 {name} 조회 실패: {str(e)}")
+            return None, False
+        if result is None:
+            logger.error(f"계좌 스냅샷 {name} 조회 실패: 응답 없음")
+        return result, result is not None
+
+    def _refresh(self) -> AccountSnapshot:
+        holdings, holdings_ok = self._fetch('보유 종목', self.holdings_fetcher)
+        if holdings_ok and not isinstance(holdings, list):
+            logger.error(f"계좌 스냅샷 보유 종목 조회 결과 형식 오류: {type(holdings).__name__}")
+            holdings, holdings_ok = None, False
+        balance, balance_ok = self._fetch('잔고', self.balance_fetcher)
+        if balance_ok and not isinstance(balance, dict):
+            logger.error(f"계좌 스냅샷 잔고 조회 결과 형식 오류: {type(balance).__name__}")
+            balance, balance_ok = None, False
+
+        # 미체결 주문은 참고용 - 실패해도 보유/잔고 스냅샷은 그대로 사용
+        # (KisKR.GetOrderList는 실패 시 오류 코드 문자열을 반환하므로 형식도 확인)
+        open_orders = None
+        if self.open_orders_fetcher is not None:
+            open_orders, open_orders_ok = self._fetch('미체결 주문', self.open_orders_fetcher)
+            if open_orders_ok and not isinstance(open_orders, list):
+                logger.warning(f"계좌 스냅샷 미체결 주문 조회 결과 형식 오류: {str(open_orders)[:50]}")
+                open_orders = None
+
+        snapshot = AccountSnapshot(holdings, balance, self.clock(), code_key=self.code_key,
+                                   open_orders=open_orders, order_code_key=self.order_code_key)
+        self._snapshot = snapshot
+        self.stats['refreshes'] += 1
+        # 하나라도 실패했으면 다음 조회에서 다시 가져옴
+        self._stale = not (holdings_ok and balance_ok)
+        if self._stale:
+            self.stats['failures'] += 1
+        return snapshot
@@ -0,0 +1,463 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+백테스트 공용 일봉 데이터 저장소 (backtest_data_store.py)
+- bb_backtest / VolumeBacktestingEngine / GoldBacktesting_KR가 같은 로컬 캐시를 사용
+- 종목별 수정주가 일봉을 Arrow(Feather) 파일로 저장, 메모리 매핑으로 전 종목 일괄 로드
+- 마지막 저장일 이후 구간만 API로 조회해 이어 붙임 (증분 갱신)
+- 겹치는 구간의 종가가 달라지면 (수정주가 반영) 전체 이력을 다시 받음
+- pyarrow가 없으면 pickle 파일로 동일하게 동작
+- 당일 1분봉은 MinuteBarStore로 날짜별 폴더에 적재 (KIS 분봉 API는 당일분만 제공)
+
+사용 예:
+    store = BacktestDataStore(fetcher=lambda code, count: Common.GetOhlcv("KR", code, count))
+    data = store.load_universe(["005930", "000660"], days=400)
+    store_offline = BacktestDataStore(offline=True)   # 네트워크 없이 캐시만 사용
+    MinuteBarStore().record_day(["005930", "000660"])  # 장 마감 후 당일 1분봉 적재
+"""
+
+import os
+import json
+import time
+import logging
+import datetime
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# 일봉 확정 시각 (장 마감 15:30 이후 여유)
+DAILY_BAR_FINAL_HOUR = 16
+
+# 증분 조회 시 기존 캐시와 겹치게 받을 거래일 수 (수정주가 변경 감지용)
+INCREMENTAL_OVERLAP_DAYS = 5
+
+# 겹치는 구간 종가 허용 오차 (상대값)
+ADJUSTMENT_TOLERANCE = 1e-6
+
+# 환경변수로 오프라인 모드 강제 (BACKTEST_DATA_OFFLINE=1)
+OFFLINE_ENV = "BACKTEST_DATA_OFFLINE"
+
+def expected_last_session(now: Optional[datetime.datetime] = None) -> datetime.date:
+    """현재 시각 기준 확정된 마지막 일봉 날짜 (장중이면 전 영업일, 주말 제외)"""
+    now = now or datetime.datetime.now()
+    session = now.date() if now.hour >= DAILY_BAR_FINAL_HOUR else now.date() - datetime.timedelta(days=1)
+    while session.weekday() >= 5:
+        session -= datetime.timedelta(days=1)
+    return session
+
+def normalize_daily_bars(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """API별로 다른 일봉 형식을 저장소 표준 형식으로 변환
+
+    - 컬럼: open/high/low/close/volume (대문자 컬럼도 허용)
+    - 인덱스: 'date' 이름의 DatetimeIndex (문자열 인덱스 변환, 시간대 제거), 정렬/중복 제거
+    """
+    if df is None or len(df) == 0:
+        return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name='date'))
+
+    df = df.rename(columns={col: col.lower() for col in df.columns if col.lower() in PRICE_COLUMNS})
+    missing = [col for col in PRICE_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"일봉 데이터 컬럼 부족: {missing}")
+
+    df = df[PRICE_COLUMNS].apply(pd.to_numeric, errors='coerce').astype(np.float64)
+
+    index = pd.to_datetime(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize().astype('datetime64[ns]')
+    df.index.name = 'date'
+
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    return df.dropna(subset=['close'])
+
+def normalize_minute_bars(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """분봉을 저장소 표준 형식으로 변환 (인덱스: 'time' 이름의 DatetimeIndex, 시각 유지)"""
+    if df is None or len(df) == 0:
+        return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name='time'))
+
+    df = df.rename(columns={col: col.lower() for col in df.columns if col.lower() in PRICE_COLUMNS})
+    missing = [col for col in PRICE_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"분봉 데이터 컬럼 부족: {missing}")
+
+    df = df[PRICE_COLUMNS].apply(pd.to_numeric, errors='coerce').astype(np.float64)
+
+    index = pd.to_datetime(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.astype('datetime64[ns]')
+    df.index.name = 'time'
+
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    return df.dropna(subset=['close'])
+
+def read_frame(path: str) -> pd.DataFrame:
+    """저장 파일 읽기 (Arrow 파일은 메모리 매핑으로 읽음)"""
+    if PYARROW_AVAILABLE and path.endswith(".arrow"):
+        table = feather.read_table(path, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+    return pd.read_pickle(path)
+
+def write_frame(df: pd.DataFrame, path: str):
+    """원자적 저장 (임시 파일 작성 후 교체)"""
+    tmp_path = path + ".tmp"
+    if PYARROW_AVAILABLE and path.endswith(".arrow"):
+        # 메모리 매핑 읽기를 위해 비압축 Arrow IPC로 저장
+        feather.write_feather(df, tmp_path, compression='uncompressed')
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+class BacktestDataStore:
+    """로컬 일봉 캐시 (종목별 Arrow 파일 + manifest.json)
+
+    manifest 항목:
+        first / last: 저장된 첫/마지막 일봉 날짜
+        requested_days: 지금까지 요청된 최대 봉 개수 (상장 기간이 짧은 종목의 반복 조회 방지)
+        checked_session: 마지막으로 최신 여부를 확인한 영업일 (휴장일 반복 조회 방지)
+    """
+
+    def __init__(self, root_dir: str = "backtest_data", fetcher: Optional[Callable] = None,
+                 offline: Optional[bool] = None, request_interval: float = 0.1):
+        """
+        Args:
+            root_dir: 저장 폴더
+            fetcher: fetcher(stock_code, count) → 최근 count개 일봉 DataFrame (없으면 캐시만 사용)
+            offline: True면 네트워크 조회 없이 캐시만 사용 (기본값: 환경변수 BACKTEST_DATA_OFFLINE)
+            request_interval: 실제 API 조회 사이 대기 시간 (초)
+        """
+        self.root_dir = root_dir
+        self.daily_dir = os.path.join(root_dir, "daily")
+        self.manifest_path = os.path.join(root_dir, "manifest.json")
+        self.fetcher = fetcher
+        self.offline = offline if offline is not None else os.environ.get(OFFLINE_ENV, "") == "1"
+        self.request_interval = request_interval
+        self.extension = ".arrow" if PYARROW_AVAILABLE else ".pkl"
+
+        os.makedirs(self.daily_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    ################################### 파일 입출력 ##################################
+
+    def _load_manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ 데이터 저장소 manifest 로드 실패 - 새로 작성: {e}")
+            return {}
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _path(self, stock_code: str) -> str:
+        return os.path.join(self.daily_dir, f"{stock_code}{self.extension}")
+
+    def read_cached(self, stock_code: str) -> Optional[pd.DataFrame]:
+        """캐시된 일봉 읽기 (Arrow 파일은 메모리 매핑으로 읽음)"""
+        path = self._path(stock_code)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            return read_frame(path)
+        except Exception as e:
+            logger.warning(f"⚠️ {stock_code} 캐시 파일 읽기 실패 - 재조회 대상: {e}")
+            return None
+
+    def _write(self, stock_code: str, df: pd.DataFrame):
+        write_frame(df, self._path(stock_code))
+
+    ################################### 조회 / 갱신 ##################################
+
+    @staticmethod
+    def days_since(start_date) -> int:
+        """start_date부터 오늘까지의 영업일 수 (조회 봉 개수 환산용)"""
+        start = pd.Timestamp(start_date).normalize()
+        today = pd.Timestamp(datetime.date.today())
+        return max(1, len(pd.bdate_range(start, today)))
+
+    def _fetch(self, stock_code: str, count: int) -> pd.DataFrame:
+        df = normalize_daily_bars(self.fetcher(stock_code, count))
+        # 장중에 받은 당일 미확정 봉은 저장하지 않음
+        session = pd.Timestamp(expected_last_session())
+        return df[df.index <= session]
+
+    def get_daily(self, stock_code: str, days: Optional[int] = None, start_date=None,
+                  end_date=None) -> pd.DataFrame:
+        """종목 일봉 조회 (캐시 우선, 필요한 구간만 증분 조회)
+
+        Args:
+            days: 필요한 최근 봉 개수 (GetOhlcv의 limit과 동일한 의미)
+            start_date / end_date: 반환 구간 (start_date는 필요한 과거 이력 범위로도 사용)
+        """
+        required_days = days or 0
+        if start_date is not None:
+            required_days = max(required_days, self.days_since(start_date))
+
+        df = self._sync(stock_code, required_days)
+
+        if df is None or df.empty:
+            return normalize_daily_bars(None)
+
+        if start_date is not None:
+            df = df[df.index >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            df = df[df.index <= pd.Timestamp(end_date)]
+        if days and start_date is None:
+            df = df.iloc[-days:]
+        return df
+
+    def _sync(self, stock_code: str, required_days: int) -> Optional[pd.DataFrame]:
+        """캐시 상태를 확인해 전체/증분 조회 후 저장"""
+        cached = self.read_cached(stock_code)
+        entry = self.manifest.get(stock_code, {})
+        session = expected_last_session()
+        session_str = session.strftime('%Y-%m-%d')
+
+        if self.offline or self.fetcher is None:
+            if cached is None:
+                logger.warning(f"⚠️ {stock_code} 캐시 없음 (오프라인 모드)")
+            return cached
+
+        needs_backfill = cached is None or required_days > entry.get('requested_days', 0)
+        is_fresh = cached is not None and (
+            entry.get('checked_session') == session_str or cached.index[-1].date() >= session
+        )
+
+        if not needs_backfill and is_fresh:
+            return cached
+
+        try:
+            if needs_backfill:
+                count = max(required_days, entry.get('requested_days', 0), len(cached) if cached is not None else 0)
+                logger.info(f"📥 {stock_code} 일봉 전체 조회 ({count}개)")
+                df = self._fetch(stock_code, count)
+                if cached is not None and not cached.empty:
+                    # 조회 범위 밖의 오래된 캐시는 유지
+                    df = pd.concat([cached[cached.index < df.index[0]], df]) if not df.empty else cached
+                entry['requested_days'] = max(required_days, entry.get('requested_days', 0))
+            else:
+                gap_days = len(pd.bdate_range(cached.index[-1], session))
+                count = gap_days + INCREMENTAL_OVERLAP_DAYS
+                logger.info(f"🔄 {stock_code} 일봉 증분 조회 ({count}개)")
+                recent = self._fetch(stock_code, count)
+                df = self._merge_incremental(stock_code, cached, recent, entry)
+
+            time.sleep(self.request_interval)
+
+        except Exception as e:
+            logger.warning(f"⚠️ {stock_code} 일봉 조회 실패 - 캐시 사용: {e}")
+            return cached
+
+        if df is None or df.empty:
+            return cached
+
+        # 메모리 매핑된 기존 파일 참조 해제 후 교체 (Windows는 매핑 중인 파일 교체 불가)
+        cached = None
+        try:
+            self._write(stock_code, df)
+        except OSError as e:
+            logger.warning(f"⚠️ {stock_code} 캐시 저장 실패 - 이번 실행만 조회 데이터 사용: {e}")
+            return df
+
+        entry.update({
+            'first': df.index[0].strftime('%Y-%m-%d'),
+            'last': df.index[-1].strftime('%Y-%m-%d'),
+            'rows': int(len(df)),
+            'checked_session': session_str,
+            'updated_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+        self.manifest[stock_code] = entry
+        self._save_manifest()
+        return df
+
+    def _merge_incremental(self, stock_code: str, cached: pd.DataFrame, recent: pd.DataFrame,
+                           entry: Dict) -> pd.DataFrame:
+        """증분 데이터 병합 - 겹치는 구간 종가가 다르면 수정주가 변경으로 보고 전체 재조회"""
+        if recent.empty:
+            return cached
+
+        overlap = recent.index.intersection(cached.index)
+        if len(overlap) > 0:
+            old_close = cached.loc[overlap, 'close'].values
+            new_close = recent.loc[overlap, 'close'].values
+            if np.any(np.abs(new_close / old_close - 1) > ADJUSTMENT_TOLERANCE):
+                count = max(entry.get('requested_days', 0), len(cached))
+                logger.info(f"🔁 {stock_code} 수정주가 변경 감지 - 전체 재조회 ({count}개)")
+                return self._fetch(stock_code, count)
+
+        merged = pd.concat([cached[cached.index < recent.index[0]], recent])
+        return merged[~merged.index.duplicated(keep='last')]
+
+    def load_universe(self, stock_codes: List[str], days: Optional[int] = None, start_date=None,
+                      end_date=None) -> Dict[str, pd.DataFrame]:
+        """여러 종목 일봉을 한 번에 로드 {종목코드: DataFrame} (데이터 없는 종목은 제외)"""
+        start_time = time.time()
+        result = {}
+        for stock_code in stock_codes:
+            df = self.get_daily(stock_code, days=days, start_date=start_date, end_date=end_date)
+            if not df.empty:
+                result[stock_code] = df
+
+        logger.info(f"📦 일봉 저장소 로드: {len(result)}/{len(stock_codes)}종목, {time.time() - start_time:.2f}초")
+        return result
+
+    def has_cache(self, stock_code: str) -> bool:
+        """캐시 파일 존재 여부"""
+        return os.path.exists(self._path(stock_code))
+
+################################### 분봉 저장소 ##################################
+
+class MinuteBarStore:
+    """당일 1분봉 저장소 (minute/<YYYYMMDD>/<종목코드>.arrow)
+
+    KIS 분봉 API는 당일 데이터만 제공하므로 장 마감 후 record_day로 매일 적재해
+    분봉 이벤트 백테스트(day_trading_backtest)에서 재생한다.
+    """
+
+    def __init__(self, root_dir: str = "backtest_data", fetcher: Optional[Callable] = None,
+                 request_interval: float = 0.1):
+        """
+        Args:
+            root_dir: 저장 폴더 (일봉 저장소와 같은 폴더 사용)
+            fetcher: fetcher(stock_code) → 당일 1분봉 DataFrame (기본값: KIS GetOhlcvMinute)
+            request_interval: 종목별 조회 사이 대기 시간 (초)
+        """
+        self.minute_dir = os.path.join(root_dir, "minute")
+        self.fetcher = fetcher
+        self.request_interval = request_interval
+        self.extension = ".arrow" if PYARROW_AVAILABLE else ".pkl"
+        os.makedirs(self.minute_dir, exist_ok=True)
+
+    @staticmethod
+    def _date_key(trade_date) -> str:
+        return pd.Timestamp(trade_date).strftime('%Y%m%d')
+
+    def _day_dir(self, trade_date) -> str:
+        return os.path.join(self.minute_dir, self._date_key(trade_date))
+
+    def available_dates(self) -> List[str]:
+        """분봉이 저장된 거래일 목록 (YYYYMMDD, 오름차순)"""
+        return sorted(name for name in os.listdir(self.minute_dir)
+                      if len(name) == 8 and name.isdigit() and os.listdir(os.path.join(self.minute_dir, name)))
+
+    def stock_codes(self, trade_date) -> List[str]:
+        """해당 거래일에 분봉이 저장된 종목 코드 목록"""
+        day_dir = self._day_dir(trade_date)
+        if not os.path.isdir(day_dir):
+            return []
+        return sorted(os.path.splitext(name)[0] for name in os.listdir(day_dir)
+                      if name.endswith((".arrow", ".pkl")))
+
+    def save(self, trade_date, stock_code: str, df: pd.DataFrame) -> int:
+        """해당 거래일 분봉만 저장 (저장된 봉 개수 반환)"""
+        df = normalize_minute_bars(df)
+        day = pd.Timestamp(trade_date).normalize()
+        df = df[df.index.normalize() == day]
+        if df.empty:
+            return 0
+
+        day_dir = self._day_dir(trade_date)
+        os.makedirs(day_dir, exist_ok=True)
+        write_frame(df, os.path.join(day_dir, f"{stock_code}{self.extension}"))
+        return len(df)
+
+    def load(self, trade_date, stock_code: str) -> Optional[pd.DataFrame]:
+        """종목 분봉 읽기 (없으면 None)"""
+        day_dir = self._day_dir(trade_date)
+        for extension in (self.extension, ".pkl"):
+            path = os.path.join(day_dir, f"{stock_code}{extension}")
+            if os.path.exists(path):
+                try:
+                    return read_frame(path)
+                except Exception as e:
+                    logger.warning(f"⚠️ {stock_code} 분봉 파일 읽기 실패: {e}")
+                    return None
+        return None
+
+    def load_day(self, trade_date, stock_codes: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """거래일 전 종목 분봉 일괄 로드 {종목코드: DataFrame}"""
+        start_time = time.time()
+        codes = stock_codes if stock_codes is not None else self.stock_codes(trade_date)
+        result = {}
+        for stock_code in codes:
+            df = self.load(trade_date, stock_code)
+            if df is not None and not df.empty:
+                result[stock_code] = df
+
+        logger.info(f"📦 분봉 저장소 로드 ({self._date_key(trade_date)}): {len(result)}/{len(codes)}종목, "
+                    f"{time.time() - start_time:.2f}초")
+        return result
+
+    def record_day(self, stock_codes: List[str], trade_date=None) -> int:
+        """당일 1분봉 조회 후 저장 - 장 마감(15:30) 이후 실행 (저장 종목 수 반환)"""
+        fetcher = self.fetcher or kis_minute_fetcher
+        trade_date = trade_date or datetime.date.today()
+        saved = 0
+        for stock_code in stock_codes:
+            try:
+                rows = self.save(trade_date, stock_code, fetcher(stock_code))
+                if rows > 0:
+                    saved += 1
+                else:
+                    logger.info(f"{stock_code}: 저장할 당일 분봉 없음")
+            except Exception as e:
+                logger.warning(f"⚠️ {stock_code} 분봉 적재 실패: {e}")
+            time.sleep(self.request_interval)
+
+        logger.info(f"📥 분봉 적재 완료 ({self._date_key(trade_date)}): {saved}/{len(stock_codes)}종목")
+        return saved
+
+################################### 공용 저장소 ##################################
+
+def kis_daily_fetcher(stock_code: str, count: int) -> Optional[pd.DataFrame]:
+    """KIS 수정주가 일봉 조회 (GetOhlcvNew 우선, 실패 시 Common.GetOhlcv)"""
+    import KIS_Common as Common
+    import KIS_API_Helper_KR as KisKR
+
+    df = None
+    try:
+        df = KisKR.GetOhlcvNew(stock_code, "D", count)
+    except Exception as e:
+        logger.warning(f"{stock_code}: GetOhlcvNew 조회 실패 ({str(e)}), 대체 방법 사용...")
+
+    if df is None or len(df) == 0:
+        df = Common.GetOhlcv("KR", stock_code, count)
+    return df
+
+def kis_minute_fetcher(stock_code: str) -> Optional[pd.DataFrame]:
+    """KIS 당일 1분봉 조회"""
+    import KIS_API_Helper_KR as KisKR
+    return KisKR.GetOhlcvMinute(stock_code, MinSt='1T')
+
+_default_store = None
+
+def get_default_store() -> BacktestDataStore:
+    """백테스트 모듈 공용 저장소 (KIS 모듈이 없으면 캐시만 사용)"""
+    global _default_store
+    if _default_store is None:
+        try:
+            import KIS_Common  # noqa: F401
+            import KIS_API_Helper_KR  # noqa: F401
+            fetcher = kis_daily_fetcher
+        except ImportError:
+            fetcher = None
+        _default_store = BacktestDataStore(fetcher=fetcher)
+    return _default_store
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+실전 봇 모듈 재생(replay) 공용 도구 (backtest_replay.py)
+- day_trading_backtest / smart_split_backtest가 실전 모듈의 전역(datetime, time, discord_alert 등)을
+  재생용 객체로 바꿔 끼울 때 사용
+- ReplayDatetime.now(), ReplayTime.time()은 ReplayClock의 재생 시각을 반환
+- replaced_attributes()는 모듈/클래스 속성을 교체하고 종료 시 원복
+- replaced_items()는 봇 설정 dict 항목을 교체하고 종료 시 원복 (portfolio_backtest의 초기 자산 기준 등)
+"""
+
+import time
+import datetime
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+################################### 재생 시각 ##################################
+
+class ReplayClock:
+    """재생 시각 (봇이 실행되는 서버 기준 naive 시각)
+
+    Args:
+        tz: 재생 시각의 시간대 이름 (예: 'Asia/Seoul'). 지정하면 datetime.now(tz)가 해당 시간대로 변환되고,
+            없으면 재생 시각을 요청한 시간대의 현지 시각으로 간주한다.
+    """
+
+    def __init__(self, tz: Optional[str] = None):
+        self.tz = ZoneInfo(tz) if tz else None
+        self.now = datetime.datetime(2000, 1, 1, 9, 0)
+        self.timestamp = self.now.timestamp()
+
+    def set(self, current: datetime.datetime):
+        if current.tzinfo is not None:
+            current = current.astimezone(self.tz).replace(tzinfo=None) if self.tz else current.replace(tzinfo=None)
+        self.now = current
+        self.timestamp = current.timestamp()
+
+    def advance(self, seconds: float):
+        self.set(self.now + datetime.timedelta(seconds=seconds))
+
+class ReplayDatetime(datetime.datetime):
+    """모듈 전역 datetime 대체 - now()가 재생 시각을 반환"""
+    clock: ReplayClock = None
+
+    @classmethod
+    def now(cls, tz=None):
+        current = cls.clock.now
+        result = cls(current.year, current.month, current.day,
+                     current.hour, current.minute, current.second, current.microsecond)
+        if tz is None:
+            return result
+        if cls.clock.tz is not None:
+            return result.replace(tzinfo=cls.clock.tz).astimezone(tz)
+        return tz.localize(result) if hasattr(tz, 'localize') else result.replace(tzinfo=tz)
+
+class ReplayTime:
+    """모듈 전역 time 대체 - time()은 재생 시각
+
+    Args:
+        advance_on_sleep: True면 sleep()이 대기 없이 재생 시각만 진행 (체결 대기 루프가 제한 시간에 도달하도록),
+                          False면 sleep()은 아무것도 하지 않음
+    """
+
+    def __init__(self, clock: ReplayClock, advance_on_sleep: bool = False):
+        self._clock = clock
+        self._advance_on_sleep = advance_on_sleep
+
+    def time(self) -> float:
+        return self._clock.timestamp
+
+    def sleep(self, seconds):
+        if self._advance_on_sleep and seconds:
+            self._clock.advance(seconds)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+class SilentAlert:
+    """discord_alert 대체 (재생 중 알림 전송 안 함)"""
+
+    def SendMessage(self, msg):
+        pass
+
+    def set_logger(self, logger):
+        pass
+
+################################### 속성 교체 ##################################
+
+@contextmanager
+def replaced_attributes(target: Any, replacements: Dict[str, Any]):
+    """target(모듈/클래스/객체)의 속성을 교체하고 종료 시 원복 (target에 직접 없던 속성은 삭제)"""
+    missing = object()
+    originals = {name: vars(target).get(name, missing) for name in replacements}
+    for name, value in replacements.items():
+        setattr(target, name, value)
+    try:
+        yield
+    finally:
+        for name, value in originals.items():
+            if value is missing:
+                delattr(target, name)
+            else:
+                setattr(target, name, value)
+
+@contextmanager
+def replaced_items(target: Dict, replacements: Dict[str, Any]):
+    """dict(봇 설정의 config 등) 항목을 교체하고 종료 시 원복 (원래 없던 키는 삭제)"""
+    missing = object()
+    originals = {key: target.get(key, missing) for key in replacements}
+    target.update(replacements)
+    try:
+        yield
+    finally:
+        for key, value in originals.items():
+            if value is missing:
+                target.pop(key, None)
+            else:
+                target[key] = value
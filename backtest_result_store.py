@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+백테스트 결과 열 지향 저장소 (backtest_result_store.py)
+- 거래 내역/일별 자산곡선을 dict 리스트 대신 타입이 정해진 열 버퍼(ColumnarBuffer)에 적재
+- 결과는 Parquet으로 저장 (pyarrow가 없으면 pickle 파일로 동일하게 동작)
+- BacktestResultStore는 실행(run)별 폴더에 trades/equity 파일을 저장하고,
+  여러 실행을 필요한 컬럼만 배치 단위로 읽어 부분 집계 → 합산 (전체를 메모리에 올리지 않음)
+
+사용 예:
+    trades = ColumnarBuffer({'date': 'str', 'stock_code': 'str', 'profit': 'float', 'hold_days': 'int'})
+    trades.append({'date': '2025-01-02', 'stock_code': '005930', 'profit': 12000.0, 'hold_days': 3})
+    store = BacktestResultStore("backtest_results/runs")
+    store.save_run("run_001", trades=trades, equity=equity, meta={'initial_capital': 10000000})
+    by_reason = store.aggregate("trades", by="sell_reason", sums=["profit"], positives=["profit"])
+"""
+
+import os
+import json
+import logging
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_KINDS = ('float', 'int')
+COLUMN_KINDS = ('float', 'int', 'str', 'date', 'object')
+
+# 배치 단위 읽기 행 수 (집계 시 메모리 상한)
+DEFAULT_BATCH_ROWS = 65536
+
+################################### 열 버퍼 ##################################
+
+class ColumnarBuffer:
+    """append(dict) 호환 열 지향 버퍼
+
+    숫자 컬럼('float', 'int')은 numpy 배열에 연속 저장하고(용량 2배씩 증가),
+    'str'/'date'/'object' 컬럼은 리스트에 저장한다. 'int'는 빈 값을 NaN으로 두는 nullable 정수.
+    리스트처럼 len(), 반복, 인덱싱(레코드 dict 반환)을 지원해 기존 코드와 호환되며,
+    레코드에서는 빈 값(NaN/None) 컬럼을 생략한다. 스키마에 없는 키는 'object' 컬럼으로 추가된다.
+
+    Args:
+        schema: {컬럼명: 'float' | 'int' | 'str' | 'date' | 'object'}
+        capacity: 초기 숫자 배열 용량
+    """
+
+    def __init__(self, schema: Dict[str, str], capacity: int = 256):
+        for name, kind in schema.items():
+            if kind not in COLUMN_KINDS:
+                raise ValueError(f"지원하지 않는 컬럼 타입: {name}={kind}")
+
+        self.schema = dict(schema)
+        self._size = 0
+        self._capacity = max(1, capacity)
+        self._columns = {name: self._new_column(kind) for name, kind in self.schema.items()}
+
+    def _new_column(self, kind: str):
+        if kind in NUMERIC_KINDS:
+            return np.full(self._capacity, np.nan)
+        return [None] * self._size
+
+    def _grow(self):
+        self._capacity *= 2
+        for name, kind in self.schema.items():
+            if kind in NUMERIC_KINDS:
+                column = np.full(self._capacity, np.nan)
+                column[:self._size] = self._columns[name][:self._size]
+                self._columns[name] = column
+
+    def _add_column(self, name: str, kind: str = 'object'):
+        self.schema[name] = kind
+        self._columns[name] = self._new_column(kind)
+
+    def append(self, record: Dict):
+        """레코드 1건 추가 (list.append와 같은 사용법)"""
+        for name in record:
+            if name not in self.schema:
+                self._add_column(name)
+
+        if self._size == self._capacity:
+            self._grow()
+
+        i = self._size
+        for name, kind in self.schema.items():
+            value = record.get(name)
+            if kind in NUMERIC_KINDS:
+                self._columns[name][i] = np.nan if value is None else value
+            else:
+                self._columns[name].append(value)
+        self._size += 1
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def clear(self):
+        self._size = 0
+        self._columns = {name: self._new_column(kind) for name, kind in self.schema.items()}
+
+    def _record(self, i: int) -> Dict:
+        record = {}
+        for name, kind in self.schema.items():
+            value = self._columns[name][i]
+            if kind in NUMERIC_KINDS:
+                if np.isnan(value):
+                    continue
+                record[name] = int(value) if kind == 'int' else float(value)
+            elif value is not None:
+                record[name] = value
+        return record
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self._size):
+            yield self._record(i)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("ColumnarBuffer index out of range")
+        return self._record(index)
+
+    def column(self, name: str):
+        """컬럼 값 (숫자 컬럼은 복사 없는 numpy 뷰, 그 외는 리스트)"""
+        if self.schema[name] in NUMERIC_KINDS:
+            return self._columns[name][:self._size]
+        return self._columns[name]
+
+    def to_frame(self) -> pd.DataFrame:
+        """스키마 순서의 DataFrame ('int'는 Int64, 'date'는 datetime64로 변환)"""
+        data = {}
+        for name, kind in self.schema.items():
+            values = self.column(name)
+            if kind == 'int':
+                data[name] = pd.array(values, dtype='Float64').astype('Int64')
+            elif kind == 'float':
+                data[name] = values.copy()
+            elif kind == 'date':
+                data[name] = pd.to_datetime(pd.Series(values, dtype=object))
+            else:
+                data[name] = pd.Series(values, dtype=object)
+        return pd.DataFrame(data, index=pd.RangeIndex(self._size))
+
+################################### 파일 입출력 ##################################
+
+def as_frame(data) -> pd.DataFrame:
+    """ColumnarBuffer / DataFrame / dict 리스트를 DataFrame으로"""
+    if isinstance(data, ColumnarBuffer):
+        return data.to_frame()
+    if isinstance(data, pd.DataFrame):
+        return data
+    return pd.DataFrame(list(data or []))
+
+def result_path(path: str) -> str:
+    """실제 저장 경로 (pyarrow가 없으면 .parquet 대신 .pkl)"""
+    if PYARROW_AVAILABLE or not path.endswith(".parquet"):
+        return path
+    return os.path.splitext(path)[0] + ".pkl"
+
+def write_results(data, path: str) -> str:
+    """결과 테이블 원자적 저장 (임시 파일 작성 후 교체) → 실제 저장 경로 반환"""
+    df = as_frame(data)
+    path = result_path(path)
+    tmp_path = path + ".tmp"
+
+    if path.endswith(".parquet"):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+def read_results(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """결과 테이블 읽기 (Parquet은 필요한 컬럼만 읽음)"""
+    path = result_path(path)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    df = pd.read_pickle(path)
+    return df[columns] if columns else df
+
+def iter_result_batches(path: str, columns: Optional[List[str]] = None,
+                        batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    """결과 테이블을 배치 단위로 읽기 (Parquet은 row group 스트리밍, pickle은 한 번에)"""
+    path = result_path(path)
+    if path.endswith(".parquet"):
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield read_results(path, columns)
+
+################################### 실행별 결과 저장소 ##################################
+
+class BacktestResultStore:
+    """실행(run)별 거래 내역/자산곡선 저장소
+
+    구조: <root_dir>/<run_id>/trades.parquet, equity.parquet, meta.json
+    """
+
+    def __init__(self, root_dir: str = os.path.join("backtest_results", "runs")):
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _run_dir(self, run_id: str) -> str:
+        return os.path.join(self.root_dir, str(run_id))
+
+    def _table_path(self, run_id: str, kind: str) -> str:
+        return result_path(os.path.join(self._run_dir(run_id), f"{kind}.parquet"))
+
+    def save_run(self, run_id: str, trades=None, equity=None, meta: Optional[Dict] = None) -> str:
+        """실행 1건 저장 (trades/equity는 ColumnarBuffer, DataFrame 또는 dict 리스트)"""
+        run_dir = self._run_dir(run_id)
+        os.makedirs(run_dir, exist_ok=True)
+
+        if trades is not None:
+            write_results(trades, os.path.join(run_dir, "trades.parquet"))
+        if equity is not None:
+            write_results(equity, os.path.join(run_dir, "equity.parquet"))
+
+        meta_path = os.path.join(run_dir, "meta.json")
+        with open(meta_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(meta or {}, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(meta_path + ".tmp", meta_path)
+        return run_dir
+
+    def run_ids(self) -> List[str]:
+        """저장된 실행 ID 목록 (meta.json이 있는 폴더 = 저장 완료)"""
+        if not os.path.isdir(self.root_dir):
+            return []
+        return sorted(name for name in os.listdir(self.root_dir)
+                      if os.path.exists(os.path.join(self.root_dir, name, "meta.json")))
+
+    def load_meta(self, run_id: str) -> Dict:
+        with open(os.path.join(self._run_dir(run_id), "meta.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load(self, run_id: str, kind: str = "trades", columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """실행 1건의 테이블 로드 (없으면 빈 DataFrame)"""
+        path = self._table_path(run_id, kind)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=columns or [])
+        return read_results(path, columns)
+
+    def iter_batches(self, kind: str = "trades", columns: Optional[List[str]] = None,
+                     run_ids: Optional[Sequence[str]] = None,
+                     batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """(run_id, 배치 DataFrame) 순회 - 필요한 컬럼만 배치 단위로 읽음"""
+        for run_id in (run_ids if run_ids is not None else self.run_ids()):
+            path = self._table_path(run_id, kind)
+            if not os.path.exists(path):
+                continue
+            for batch in iter_result_batches(path, columns, batch_rows):
+                yield run_id, batch
+
+    def aggregate(self, kind: str, by: Union[str, List[str]], sums: Sequence[str] = (),
+                  positives: Sequence[str] = (), where: Optional[Dict[str, Sequence]] = None,
+                  run_ids: Optional[Sequence[str]] = None, per_run: bool = False) -> pd.DataFrame:
+        """여러 실행에 걸친 그룹 집계 (배치별 부분 합계를 누적 → 마지막에 평균/비율 계산)
+
+        Args:
+            by: 그룹 컬럼 (예: 'sell_reason')
+            sums: 합계/평균을 낼 숫자 컬럼 (예: ['profit', 'hold_days'])
+            positives: 양수 비율을 낼 숫자 컬럼 (예: ['profit'] → 승률)
+            where: {컬럼: 허용값 목록} 필터 (예: {'type': ['SELL']})
+            per_run: True면 run_id별로 따로 집계
+
+        Returns:
+            그룹별 count, <컬럼>_sum, <컬럼>_mean, <컬럼>_positive_rate
+        """
+        keys = [by] if isinstance(by, str) else list(by)
+        where = where or {}
+        value_columns = list(dict.fromkeys(list(sums) + list(positives)))
+        read_columns = list(dict.fromkeys(keys + value_columns + list(where.keys())))
+        group_keys = (['run_id'] + keys) if per_run else keys
+
+        total = None
+        for run_id, batch in self.iter_batches(kind, read_columns, run_ids):
+            for column, allowed in where.items():
+                batch = batch[batch[column].isin(list(allowed))]
+            if batch.empty:
+                continue
+
+            parts = pd.DataFrame({key: batch[key].values for key in keys})
+            if per_run:
+                parts.insert(0, 'run_id', run_id)
+            parts['count'] = 1
+            for column in sums:
+                values = pd.to_numeric(batch[column], errors='coerce').astype(float)
+                parts[f"{column}_sum"] = values.fillna(0.0).values
+                parts[f"{column}_n"] = values.notna().astype(int).values
+            for column in positives:
+                values = pd.to_numeric(batch[column], errors='coerce').astype(float)
+                parts[f"{column}_pos"] = (values > 0).astype(int).values
+                parts[f"{column}_posn"] = values.notna().astype(int).values
+
+            partial = parts.groupby(group_keys, sort=False, dropna=False).sum()
+            total = partial if total is None else total.add(partial, fill_value=0)
+
+        if total is None:
+            return pd.DataFrame()
+
+        result = pd.DataFrame({'count': total['count'].astype(int)}, index=total.index)
+        for column in sums:
+            result[f"{column}_sum"] = total[f"{column}_sum"]
+            result[f"{column}_mean"] = total[f"{column}_sum"] / total[f"{column}_n"].replace(0, np.nan)
+        for column in positives:
+            result[f"{column}_positive_rate"] = total[f"{column}_pos"] / total[f"{column}_posn"].replace(0, np.nan) * 100
+        return result
+
+    def equity_summary(self, value_column: str = "total_value",
+                       run_ids: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """실행별 자산곡선 요약 (최종 자산, 총 수익률, 최대 낙폭) - 자산 컬럼 하나만 읽음"""
+        rows = []
+        for run_id in (run_ids if run_ids is not None else self.run_ids()):
+            values = self.load(run_id, "equity", [value_column])
+            if values.empty:
+                continue
+
+            values = values[value_column].to_numpy(dtype=float)
+            initial = self.load_meta(run_id).get('initial_capital') or values[0]
+            peak = np.maximum.accumulate(np.concatenate(([initial], values)))[1:]
+
+            rows.append({
+                'run_id': run_id,
+                'final_value': float(values[-1]),
+                'total_return': float((values[-1] / initial - 1) * 100),
+                'max_drawdown': float(((peak - values) / peak).max() * 100),
+                'days': len(values)
+            })
+
+        return pd.DataFrame(rows).set_index('run_id') if rows else pd.DataFrame()
@@ -30,6 +30,15 @@ except ImportError:
     print("❌ KIS API 모듈 임포트 실패")
     print("KIS_Common.py와 KIS_API_Helper_KR.py가 필요합니다.")
 
+# 백테스트 공용 일봉 저장소 (로컬 캐시 + 증분 조회)
+from backtest_data_store import BacktestDataStore
+
+# 거래 내역/일별 포트폴리오 열 버퍼 + Parquet 저장
+from backtest_result_store import ColumnarBuffer, write_results
+
+# 체결 모델 (기본: 종가 전량 체결, 호가 소진/시장충격 모델로 교체 가능)
+from fill_model import CloseFillModel
+
 # 데이터 소스 우선순위 설정
 if KIS_API_AVAILABLE:
     DATA_SOURCE = "kis_api"
@@ -221,14 +230,24 @@ def generate_sample_ohlcv_data(stock_code: str, start_date: str, end_date: str)
         logger.error(f"샘플 OHLCV 데이터 생성 실패: {e}")
         return pd.DataFrame()
 
+_kis_store = None
+
+def get_kis_store() -> BacktestDataStore:
+    """KIS 데이터 전용 저장소 (기존과 같은 Common.GetOhlcv 조회 순서 유지, 별도 폴더)"""
+    global _kis_store
+    if _kis_store is None:
+        fetcher = (lambda code, count: Common.GetOhlcv("KR", code, count)) if KIS_API_AVAILABLE else None
+        _kis_store = BacktestDataStore(root_dir=os.path.join("backtest_data", "kis_common"), fetcher=fetcher)
+    return _kis_store
+
 def get_kis_api_data(stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
     """KIS API로부터 한국 주식 데이터 조회 (bb_trading.py와 동일)"""
     try:
         logger.info(f"🔍 {stock_code} KIS API 데이터 조회 시작")
         
-        # bb_trading.py와 동일한 방식으로 데이터 조회
         # 기술적 지표 계산을 위해 충분한 기간 조회 (최대 500일)
-        df = Common.GetOhlcv("KR", stock_code, 500)
+        # 로컬 저장소에 있으면 마지막 저장일 이후만 조회
+        df = get_kis_store().get_daily(stock_code, days=500)
         
         if df is None or len(df) == 0:
             logger.warning(f"❌ {stock_code} KIS API 데이터 없음")
@@ -288,72 +307,92 @@ def get_kis_api_data(stock_code: str, start_date: str, end_date: str) -> pd.Data
         logger.error(f"❌ {stock_code} KIS API 조회 중 오류: {str(e)}")
         return pd.DataFrame()
 
+def fetch_yfinance_bars(stock_code: str, count: int) -> pd.DataFrame:
+    """yfinance 최근 count개 수정주가 일봉 조회 (저장소 fetcher 형식)"""
+    # 한국 주식 티커 변환 (여러 형식 시도)
+    possible_tickers = []
+    
+    # 방법 1: 기본 KS/KQ 방식
+    if stock_code.startswith("0"):  # 코스닥
+        possible_tickers.append(f"{stock_code}.KQ")
+    else:  # 코스피
+        possible_tickers.append(f"{stock_code}.KS")
+    
+    # 방법 2: 반대로도 시도
+    if stock_code.startswith("0"):
+        possible_tickers.append(f"{stock_code}.KS")
+    else:
+        possible_tickers.append(f"{stock_code}.KQ")
+    
+    # 주말/공휴일을 감안해 count × 1.7일 전부터 조회
+    fetch_start = datetime.date.today() - datetime.timedelta(days=int(count * 1.7) + 1)
+    
+    # 각 티커 형식을 순서대로 시도
+    for ticker in possible_tickers:
+        try:
+            logger.debug(f"yfinance 시도: {ticker}")
+            
+            stock = yf.Ticker(ticker)
+            df = stock.history(
+                start=fetch_start.strftime('%Y-%m-%d'),
+                auto_adjust=True,
+                back_adjust=True
+            )
+            
+            if df.empty:
+                continue
+            
+            # 컬럼명 소문자로 변환
+            df.columns = [col.lower() for col in df.columns]
+            
+            # 필요한 컬럼 확인
+            required_columns = ['open', 'high', 'low', 'close', 'volume']
+            if not all(col in df.columns for col in required_columns):
+                continue
+            
+            logger.info(f"✅ {stock_code} yfinance 성공: {ticker}")
+            return df[required_columns].iloc[-count:].copy()
+            
+        except Exception as e:
+            logger.debug(f"yfinance {ticker} 실패: {str(e)[:50]}")
+            continue
+    
+    return pd.DataFrame()
+
+_yfinance_store = None
+
+def get_yfinance_store() -> BacktestDataStore:
+    """yfinance 데이터 전용 저장소 (KIS 데이터와 섞이지 않도록 별도 폴더)"""
+    global _yfinance_store
+    if _yfinance_store is None:
+        fetcher = fetch_yfinance_bars if DATA_SOURCE == "yfinance" else None
+        _yfinance_store = BacktestDataStore(root_dir=os.path.join("backtest_data", "yfinance"), fetcher=fetcher)
+    return _yfinance_store
+
 def get_yfinance_data(stock_code: str, start_date: str, end_date: str) -> pd.DataFrame:
     """yfinance로부터 한국 주식 데이터 조회 (KIS API 실패시 대체용)"""
     try:
         logger.info(f"🔍 {stock_code} yfinance 데이터 조회 (대체 수단)")
         
-        # 한국 주식 티커 변환 (여러 형식 시도)
-        possible_tickers = []
+        # 기술적 지표 계산을 위해 시작일보다 120일 일찍 조회
+        extended_start = pd.to_datetime(start_date) - pd.Timedelta(days=120)
         
-        # 방법 1: 기본 KS/KQ 방식
-        if stock_code.startswith("0"):  # 코스닥
-            possible_tickers.append(f"{stock_code}.KQ")
-        else:  # 코스피
-            possible_tickers.append(f"{stock_code}.KS")
+        df = get_yfinance_store().get_daily(stock_code, start_date=extended_start, end_date=end_date)
         
-        # 방법 2: 반대로도 시도
-        if stock_code.startswith("0"):
-            possible_tickers.append(f"{stock_code}.KS")
-        else:
-            possible_tickers.append(f"{stock_code}.KQ")
+        if df.empty or len(df) < 30:
+            logger.warning(f"❌ {stock_code} yfinance 모든 시도 실패")
+            return pd.DataFrame()
         
-        # 기술적 지표 계산을 위해 시작일보다 90일 일찍 조회
-        extended_start = pd.to_datetime(start_date) - pd.Timedelta(days=120)
+        # 백테스트 기간 데이터 확인
+        backtest_mask = (df.index >= start_date) & (df.index <= end_date)
+        backtest_data = df[backtest_mask]
         
-        # 각 티커 형식을 순서대로 시도
-        for ticker in possible_tickers:
-            try:
-                logger.debug(f"yfinance 시도: {ticker}")
-                
-                stock = yf.Ticker(ticker)
-                df = stock.history(
-                    start=extended_start.strftime('%Y-%m-%d'), 
-                    end=end_date,
-                    auto_adjust=True,
-                    back_adjust=True
-                )
-                
-                if df.empty or len(df) < 30:
-                    continue
-                
-                # 컬럼명 소문자로 변환
-                df.columns = [col.lower() for col in df.columns]
-                
-                # 필요한 컬럼 확인
-                required_columns = ['open', 'high', 'low', 'close', 'volume']
-                if not all(col in df.columns for col in required_columns):
-                    continue
-                
-                df = df[required_columns].copy()
-                
-                # 백테스트 기간 데이터 확인
-                backtest_mask = (df.index >= start_date) & (df.index <= end_date)
-                backtest_data = df[backtest_mask]
-                
-                if len(backtest_data) == 0:
-                    continue
-                
-                logger.info(f"✅ {stock_code} yfinance 성공: {ticker}")
-                logger.info(f"   전체: {len(df)}일, 백테스트: {len(backtest_data)}일")
-                return df
-                
-            except Exception as e:
-                logger.debug(f"yfinance {ticker} 실패: {str(e)[:50]}")
-                continue
+        if len(backtest_data) == 0:
+            logger.warning(f"❌ {stock_code} yfinance 백테스트 기간 데이터 없음")
+            return pd.DataFrame()
         
-        logger.warning(f"❌ {stock_code} yfinance 모든 시도 실패")
-        return pd.DataFrame()
+        logger.info(f"   전체: {len(df)}일, 백테스트: {len(backtest_data)}일")
+        return df
         
     except Exception as e:
         logger.error(f"yfinance 조회 중 오류 ({stock_code}): {e}")
@@ -443,17 +482,184 @@ def get_stock_data_backtest(stock_code: str, all_data: pd.DataFrame, current_dat
         logger.error(f"종목 데이터 조회 중 오류 ({stock_code}): {e}")
         return None
 
+################################### 지표 타임라인 (사전 계산) ##################################
+
+class IndicatorTimeline:
+    """종목별 기술적 지표 사전 계산 타임라인
+
+    get_stock_data_backtest는 매일 전체 과거 데이터로 지표를 다시 계산하므로 O(n²)이다.
+    사용하는 지표(RSI, MACD, BB, MA, ATR, 지지/저항)는 모두 과거 데이터만 쓰는
+    롤링/지수이동평균 계산이라, 전체 구간에서 한 번 계산한 i번째 값이
+    i번째 날까지 잘라서 계산한 값과 같다. 따라서 한 번만 계산해두고
+    날짜 → 정수 인덱스로 조회한다.
+    """
+
+    MIN_DATA_DAYS = 30
+    SR_PERIOD = 20
+
+    def __init__(self, stock_code: str, all_data: pd.DataFrame):
+        self.stock_code = stock_code
+
+        if not all_data.empty and not all_data.index.is_monotonic_increasing:
+            all_data = all_data.sort_index()
+
+        self.all_data = all_data
+        self.dates = np.array(all_data.index.date, dtype='datetime64[D]') if not all_data.empty else np.array([], dtype='datetime64[D]')
+        self.close = all_data['close'].values if not all_data.empty else np.array([])
+        self.columns = {}
+
+        if not all_data.empty and BB_FUNCTIONS_AVAILABLE:
+            self._precompute()
+
+    def _precompute(self):
+        """전체 구간 지표를 한 번에 계산 (get_stock_data_backtest와 동일 공식)"""
+        from bb_trading import TechnicalIndicators
+
+        data = self.all_data
+
+        rsi = TechnicalIndicators.calculate_rsi(data, trading_config.rsi_period)
+        macd_data = TechnicalIndicators.calculate_macd(
+            data, trading_config.macd_fast, trading_config.macd_slow, trading_config.macd_signal
+        )
+        bb_data = TechnicalIndicators.calculate_bollinger_bands(
+            data, trading_config.bb_period, trading_config.bb_std
+        )
+        atr = TechnicalIndicators.calculate_atr(data)
+
+        # NaN 대체값은 get_stock_data_backtest와 동일하게 유지
+        self.columns = {
+            'rsi': rsi.fillna(50).values,
+            'macd': macd_data['MACD'].fillna(0).values,
+            'macd_signal': macd_data['Signal'].fillna(0).values,
+            'macd_histogram': macd_data['Histogram'].fillna(0).values,
+            'bb_upper': bb_data['UpperBand'].fillna(0).values,
+            'bb_middle': bb_data['MiddleBand'].fillna(0).values,
+            'bb_lower': bb_data['LowerBand'].fillna(0).values,
+            'ma5': data['close'].rolling(window=5).mean().fillna(0).values,
+            'ma20': data['close'].rolling(window=20).mean().fillna(0).values,
+            'ma60': data['close'].rolling(window=60).mean().fillna(0).values,
+            'atr': atr.fillna(0).values
+        }
+
+        # 지지/저항선: 최근 20일 저가 10% / 고가 90% 분위수 (detect_support_resistance와 동일)
+        support = np.full(len(data), np.nan)
+        resistance = np.full(len(data), np.nan)
+        if len(data) >= self.SR_PERIOD:
+            from numpy.lib.stride_tricks import sliding_window_view
+            lows = data['low'].values.astype(float)
+            highs = data['high'].values.astype(float)
+            support[self.SR_PERIOD - 1:] = np.percentile(sliding_window_view(lows, self.SR_PERIOD), 10, axis=1)
+            resistance[self.SR_PERIOD - 1:] = np.percentile(sliding_window_view(highs, self.SR_PERIOD), 90, axis=1)
+        self.columns['support'] = support
+        self.columns['resistance'] = resistance
+
+    def index_of(self, current_date: datetime.date) -> int:
+        """current_date 이하 마지막 봉의 정수 인덱스 (없으면 -1)"""
+        return int(np.searchsorted(self.dates, np.datetime64(current_date, 'D'), side='right')) - 1
+
+    def get_stock_data(self, current_date: datetime.date) -> Optional[Dict]:
+        """get_stock_data_backtest와 동일한 형식의 stock_data를 정수 인덱스로 반환"""
+        try:
+            idx = self.index_of(current_date)
+            if idx + 1 < self.MIN_DATA_DAYS:
+                return None
+
+            stock_data = {
+                'stock_code': self.stock_code,
+                'current_price': self.close[idx],
+                'ohlcv_data': self.all_data.iloc[:idx + 1]
+            }
+
+            if self.columns:
+                for key, values in self.columns.items():
+                    stock_data[key] = values[idx]
+
+            return stock_data
+
+        except Exception as e:
+            logger.error(f"지표 타임라인 조회 중 오류 ({self.stock_code}): {e}")
+            return None
+
+def check_indicator_timeline_parity(stock_code: str, all_data: pd.DataFrame, tolerance: float = 1e-9) -> Dict:
+    """사전 계산 타임라인과 기존 일별 재계산(get_stock_data_backtest) 결과 정합성 검증"""
+    timeline = IndicatorTimeline(stock_code, all_data)
+    mismatches = []
+    checked_days = 0
+
+    all_dates = sorted(set(timeline.all_data.index.date)) if not timeline.all_data.empty else []
+    
+    for current_date in all_dates:
+        expected = get_stock_data_backtest(stock_code, all_data, current_date)
+        actual = timeline.get_stock_data(current_date)
+
+        if expected is None or actual is None:
+            if (expected is None) != (actual is None):
+                mismatches.append({'date': current_date, 'key': 'availability'})
+            continue
+
+        checked_days += 1
+
+        for key, expected_value in expected.items():
+            if key in ('stock_code', 'ohlcv_data'):
+                continue
+            actual_value = actual.get(key)
+
+            if expected_value is None or actual_value is None or pd.isna(actual_value):
+                same = expected_value is None and (actual_value is None or pd.isna(actual_value))
+            else:
+                same = abs(float(expected_value) - float(actual_value)) <= tolerance * max(1.0, abs(float(expected_value)))
+
+            if not same:
+                mismatches.append({'date': current_date, 'key': key,
+                                   'expected': expected_value, 'actual': actual_value})
+
+        if len(expected['ohlcv_data']) != len(actual['ohlcv_data']):
+            mismatches.append({'date': current_date, 'key': 'ohlcv_data'})
+
+    result = {
+        'stock_code': stock_code,
+        'checked_days': checked_days,
+        'mismatch_count': len(mismatches),
+        'mismatches': mismatches[:20],
+        'is_identical': len(mismatches) == 0
+    }
+
+    if result['is_identical']:
+        logger.info(f"✅ {stock_code} 지표 타임라인 정합성 확인: {checked_days}일 일치")
+    else:
+        logger.warning(f"⚠️ {stock_code} 지표 타임라인 불일치: {len(mismatches)}건")
+
+    return result
+
 ################################### 정확한 백테스트 엔진 ##################################
 
+# 거래 내역 열 버퍼 스키마 (BUY / SELL / FINAL_SELL 공용, 해당 없는 컬럼은 빈 값)
+TRADE_SCHEMA = {
+    'date': 'date', 'action': 'str', 'stock_code': 'str', 'stock_name': 'str',
+    'price': 'float', 'amount': 'int', 'total_cost': 'float', 'score': 'float', 'signals': 'str',
+    'net_profit': 'float', 'profit_rate': 'float', 'reason': 'str', 'holding_days': 'int', 'sell_type': 'str'
+}
+
+# 일별 포트폴리오 열 버퍼 스키마
+PORTFOLIO_SCHEMA = {
+    'date': 'date', 'cash': 'float', 'stock_value': 'float', 'total_value': 'float',
+    'available_budget': 'float', 'positions_count': 'int', 'daily_return': 'float'
+}
+
 class AccurateBacktest:
     """bb_trading.py 실제 함수 사용한 정확한 백테스트"""
     
-    def __init__(self, config_path: str = "target_stock_config.json"):
+    def __init__(self, config_path: str = "target_stock_config.json", fill_model=None):
+        """
+        Args:
+            fill_model: 체결 모델 (fill_model.py, 기본값 CloseFillModel - 종가 전량 체결)
+        """
         self.config_path = config_path
+        self.fill_model = fill_model or CloseFillModel()
         self.trading_config = None
         self.results = {}
-        self.trade_history = []
-        self.daily_portfolio = []
+        self.trade_history = ColumnarBuffer(TRADE_SCHEMA)
+        self.daily_portfolio = ColumnarBuffer(PORTFOLIO_SCHEMA)
         
         self.load_trading_config()
     
@@ -483,8 +689,8 @@ class AccurateBacktest:
         
         logger.info(f"📊 {stock_code} 데이터 조회 시작...")
         
-        # 1. KIS API 시도 (최우선 - bb_trading.py와 동일)
-        if KIS_API_AVAILABLE:
+        # 1. KIS API 시도 (최우선 - bb_trading.py와 동일, 로컬 저장소에 있으면 오프라인도 가능)
+        if KIS_API_AVAILABLE or get_kis_store().has_cache(stock_code):
             df = get_kis_api_data(stock_code, start_date, end_date)
             if not df.empty and len(df) > 60:
                 logger.info(f"✅ {stock_code} KIS API 실제 데이터 사용")
@@ -630,7 +836,8 @@ class AccurateBacktest:
                     'volume': volumes[i-1]
                 })
             
-            df = pd.DataFrame(data, index=business_days[1:len(data)+1])
+            # prices[i]는 business_days[i-1] 종가 (prices[0]은 기준가)
+            df = pd.DataFrame(data, index=business_days[:len(data)])
             
             # 데이터 품질 검증
             if len(df) < 60:
@@ -719,32 +926,103 @@ class AccurateBacktest:
             logger.error(f"예산 계산 중 오류: {e}")
             return cash * 0.7
     
-    def run_backtest(self, start_date: str, end_date: str, initial_cash: float = 10000000):
-        """정확한 백테스트 실행"""
+    def apply_config_overrides(self, overrides: Dict):
+        """설정값 덮어쓰기 (파라미터 스윕용)
+        
+        - "rsi_oversold": 전역 설정값
+        - "target_stocks.rsi_oversold": 모든 타겟 종목의 개별 설정값
+        """
+        for key, value in overrides.items():
+            if key.startswith("target_stocks."):
+                stock_key = key.split(".", 1)[1]
+                for stock_config in self.trading_config.target_stocks.values():
+                    stock_config[stock_key] = value
+            else:
+                self.trading_config.config[key] = value
+    
+    def load_stock_data(self, start_date: str, end_date: str) -> Dict[str, pd.DataFrame]:
+        """활성화된 타겟 종목 데이터 조회"""
+        stock_data_dict = {}
+        for stock_code in self.trading_config.target_stocks.keys():
+            if self.trading_config.target_stocks[stock_code].get('enabled', True):
+                df = self.get_stock_data_for_backtest(stock_code, start_date, end_date)
+                if not df.empty and len(df) > 60:  # bb_trading.py는 60일 데이터 필요
+                    stock_data_dict[stock_code] = df
+        return stock_data_dict
+    
+    def run_backtest(self, start_date: str, end_date: str, initial_cash: float = 10000000,
+                     stock_data_dict: Optional[Dict[str, pd.DataFrame]] = None, verbose: bool = True):
+        """정확한 백테스트 실행 (stock_data_dict를 주면 데이터 조회 생략)"""
         logger.info(f"🚀 정확한 백테스트 시작: {start_date} ~ {end_date}")
         logger.info(f"💰 초기 자금: {initial_cash:,.0f}원")
         logger.info(f"🔧 bb_trading.py 함수 사용: {'✅' if BB_FUNCTIONS_AVAILABLE else '❌'}")
         
         # 초기 상태
-        cash = initial_cash
-        positions = {}
-        initial_total_asset = initial_cash
-        total_trades = 0
-        winning_trades = 0
-        total_profit = 0
+        self.reset_state(initial_cash)
         
         # 타겟 종목 데이터 조회
-        stock_data_dict = {}
-        for stock_code in self.trading_config.target_stocks.keys():
-            if self.trading_config.target_stocks[stock_code].get('enabled', True):
-                df = self.get_stock_data_for_backtest(stock_code, start_date, end_date)
-                if not df.empty and len(df) > 60:  # bb_trading.py는 60일 데이터 필요
-                    stock_data_dict[stock_code] = df
+        if stock_data_dict is None:
+            stock_data_dict = self.load_stock_data(start_date, end_date)
         
         if not stock_data_dict:
             logger.error("❌ 사용 가능한 종목 데이터가 없습니다.")
             return
         
+        trading_dates, indicator_timelines = self.prepare_timelines(stock_data_dict, start_date, end_date)
+        
+        # 일별 백테스트 실행
+        for i, current_date in enumerate(trading_dates):
+            total_value = self.simulate_day(current_date, indicator_timelines)
+            if total_value is None:
+                continue
+            
+            # 진행 상황 출력
+            if i % 10 == 0 or i == len(trading_dates) - 1:
+                progress = (i + 1) / len(trading_dates) * 100
+                logger.info(f"📊 진행률: {progress:.1f}% ({current_date}) "
+                          f"총자산: {total_value:,.0f}원 "
+                          f"수익률: {(total_value/initial_cash-1)*100:+.1f}% "
+                          f"보유: {len(self.positions)}개")
+        
+        # 최종 정산 (남은 포지션 매도)
+        final_date = trading_dates[-1] if trading_dates else datetime.date.today()
+        self.settle_positions(final_date)
+        
+        # 최종 결과 계산
+        final_value = self.cash
+        total_return = (final_value / self.initial_cash - 1) * 100
+        
+        self.results = {
+            'initial_cash': initial_cash,
+            'final_value': final_value,
+            'total_return': total_return,
+            'total_trades': self.total_trades,
+            'winning_trades': self.winning_trades,
+            'winning_rate': self.winning_trades / max(self.total_trades, 1) * 100,
+            'total_profit': self.total_profit,
+            'trading_days': len(trading_dates),
+            'annual_return': total_return * (365 / len(trading_dates)) if len(trading_dates) > 0 else 0,
+            'bb_functions_used': BB_FUNCTIONS_AVAILABLE
+        }
+        
+        logger.info("🎯 정확한 백테스트 완료!")
+        if verbose:
+            self.print_results()
+            self.print_detailed_analysis()
+    
+    def reset_state(self, initial_cash: float, initial_total_asset: Optional[float] = None):
+        """시뮬레이션 상태 초기화 (현금/포지션/거래 통계)"""
+        self.initial_cash = initial_cash
+        self.initial_total_asset = initial_total_asset or initial_cash
+        self.cash = initial_cash
+        self.positions = {}
+        self.daily_stock_data = {}
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.total_profit = 0
+    
+    def prepare_timelines(self, stock_data_dict: Dict[str, pd.DataFrame], start_date: str, end_date: str):
+        """백테스트 거래일 목록과 종목별 지표 타임라인 (거래일, {종목코드: IndicatorTimeline})"""
         # 공통 날짜 범위 설정 (백테스트 기간만)
         all_dates = set()
         for df in stock_data_dict.values():
@@ -755,293 +1033,336 @@ class AccurateBacktest:
         trading_dates = sorted(list(all_dates))
         logger.info(f"📅 백테스트 기간: {len(trading_dates)}일")
         
-        # 일별 백테스트 실행
-        for i, current_date in enumerate(trading_dates):
-            try:
-                # 현재 날짜의 종목 데이터 준비
-                daily_stock_data = {}
-                
-                for stock_code, all_data in stock_data_dict.items():
-                    stock_data = get_stock_data_backtest(stock_code, all_data, current_date)
-                    if stock_data:
-                        daily_stock_data[stock_code] = stock_data
-                
-                if not daily_stock_data:
+        # 종목별 지표 타임라인 사전 계산 (일별 재계산 대신 정수 인덱스 조회)
+        indicator_timelines = {
+            stock_code: IndicatorTimeline(stock_code, all_data)
+            for stock_code, all_data in stock_data_dict.items()
+        }
+        return trading_dates, indicator_timelines
+    
+    def execute_fill(self, side: str, stock_code: str, quantity: int, price: float, current_date: datetime.date):
+        """체결 모델로 주문 체결 (봉 정보는 당일 일봉) → fill_model.Fill"""
+        stock_data = self.daily_stock_data.get(stock_code)
+        bar = stock_data['ohlcv_data'].iloc[-1] if stock_data is not None else None
+        return self.fill_model.execute(side, quantity, price, bar=bar, stock_code=stock_code, timestamp=current_date)
+    
+    def simulate_day(self, current_date: datetime.date, indicator_timelines: Dict[str, 'IndicatorTimeline'],
+                     available_budget: Optional[float] = None) -> Optional[float]:
+        """거래일 하루 진행 (현재가/트레일링 스탑 갱신 → 매도 → 매수 → 일별 포트폴리오 기록)
+        
+        Args:
+            available_budget: 매수 가능 예산 (없으면 simulate_available_budget_accurate로 계산,
+                              포트폴리오 백테스트는 계좌 전체 잔고 기준 예산을 전달)
+        Returns:
+            당일 총자산 (데이터 없는 날이나 오류 시 None)
+        """
+        positions = self.positions
+        try:
+            # 현재 날짜의 종목 데이터 준비
+            daily_stock_data = {}
+            
+            for stock_code, timeline in indicator_timelines.items():
+                stock_data = timeline.get_stock_data(current_date)
+                if stock_data:
+                    daily_stock_data[stock_code] = stock_data
+            
+            self.daily_stock_data = daily_stock_data
+            if not daily_stock_data:
+                return None
+            
+            # 포지션 현재가 업데이트
+            for stock_code, position in positions.items():
+                if stock_code in daily_stock_data:
+                    current_price = daily_stock_data[stock_code]['current_price']
+                    position['current_price'] = current_price
+                    
+                    # bb_trading.py의 update_trailing_stop 함수 사용
+                    if BB_FUNCTIONS_AVAILABLE:
+                        target_config = self.trading_config.target_stocks[stock_code]
+                        position = update_trailing_stop(position, current_price, target_config)
+                        positions[stock_code] = position
+                    else:
+                        # 간단한 트레일링 스탑
+                        if 'high_price' not in position or current_price > position['high_price']:
+                            position['high_price'] = current_price
+            
+            # 포트폴리오 가치 계산
+            stock_value = sum(pos['amount'] * pos.get('current_price', pos['entry_price']) 
+                            for pos in positions.values())
+            total_value = self.cash + stock_value
+            if available_budget is None:
+                available_budget = self.simulate_available_budget_accurate(total_value, self.initial_total_asset, self.cash)
+            
+            # 기존 포지션 매도 체크
+            positions_to_close = []
+            
+            for stock_code, position in positions.items():
+                if stock_code not in daily_stock_data:
                     continue
                 
-                # 포지션 현재가 업데이트
-                for stock_code, position in positions.items():
-                    if stock_code in daily_stock_data:
+                try:
+                    target_config = self.trading_config.target_stocks[stock_code]
+                    
+                    if BB_FUNCTIONS_AVAILABLE:
+                        # bb_trading.py의 실제 analyze_sell_signal 함수 사용
+                        sell_analysis = analyze_sell_signal(daily_stock_data[stock_code], position, target_config)
+                    else:
+                        # 간단한 매도 신호 (폴백)
                         current_price = daily_stock_data[stock_code]['current_price']
-                        position['current_price'] = current_price
+                        entry_price = position['entry_price']
+                        profit_rate = (current_price - entry_price) / entry_price
+                        
+                        stop_loss = target_config.get('stop_loss', -0.03)
+                        take_profit = target_config.get('profit_target', 0.06)
+                        
+                        if profit_rate <= stop_loss:
+                            sell_analysis = {
+                                'is_sell_signal': True,
+                                'sell_type': 'stop_loss',
+                                'reason': f"손절 {profit_rate*100:.1f}%",
+                                'profit_rate': profit_rate
+                            }
+                        elif profit_rate >= take_profit:
+                            sell_analysis = {
+                                'is_sell_signal': True,
+                                'sell_type': 'take_profit',
+                                'reason': f"익절 {profit_rate*100:.1f}%", 
+                                'profit_rate': profit_rate
+                            }
+                        else:
+                            sell_analysis = {'is_sell_signal': False}
+                    
+                    if sell_analysis['is_sell_signal']:
+                        # 매도 실행 (체결 모델에 따라 부분체결 시 잔량은 보유 유지)
+                        fill = self.execute_fill('SELL', stock_code, position['amount'],
+                                                 daily_stock_data[stock_code]['current_price'], current_date)
+                        if fill.quantity <= 0:
+                            continue
+                        sell_price = fill.price
+                        sell_amount = fill.quantity
                         
-                        # bb_trading.py의 update_trailing_stop 함수 사용
+                        # bb_trading.py의 calculate_trading_fee 함수 사용
                         if BB_FUNCTIONS_AVAILABLE:
-                            target_config = self.trading_config.target_stocks[stock_code]
-                            position = update_trailing_stop(position, current_price, target_config)
-                            positions[stock_code] = position
+                            sell_fee = calculate_trading_fee(sell_price, sell_amount, False)
                         else:
-                            # 간단한 트레일링 스탑
-                            if 'high_price' not in position or current_price > position['high_price']:
-                                position['high_price'] = current_price
-                
-                # 포트폴리오 가치 계산
-                stock_value = sum(pos['amount'] * pos.get('current_price', pos['entry_price']) 
-                                for pos in positions.values())
-                total_value = cash + stock_value
-                available_budget = self.simulate_available_budget_accurate(total_value, initial_total_asset, cash)
+                            sell_fee = sell_price * sell_amount * 0.003
+                        
+                        # 손익 계산 (부분체결이면 매수 수수료도 체결 수량만큼 배분)
+                        entry_price = position['entry_price']
+                        buy_fee = position.get('buy_fee', 0)
+                        if fill.is_partial:
+                            buy_fee = buy_fee * sell_amount / position['amount']
+                        gross_profit = (sell_price - entry_price) * sell_amount
+                        net_profit = gross_profit - buy_fee - sell_fee
+                        # 수익률도 체결가/수수료 기준 (매수 수수료 포함 원가 대비 순손익 - 신호 판단용 종가 수익률이 아님)
+                        entry_cost = entry_price * sell_amount + buy_fee
+                        profit_rate = net_profit / entry_cost if entry_cost > 0 else 0
+                        
+                        # 현금 회수
+                        self.cash += sell_price * sell_amount - sell_fee
+                        
+                        # 거래 기록
+                        self.trade_history.append({
+                            'date': current_date,
+                            'action': 'SELL',
+                            'stock_code': stock_code,
+                            'stock_name': target_config.get('name', stock_code),
+                            'price': sell_price,
+                            'amount': sell_amount,
+                            'net_profit': net_profit,
+                            'profit_rate': profit_rate,
+                            'reason': sell_analysis.get('reason', 'Unknown'),
+                            'holding_days': (current_date - position['entry_date']).days,
+                            'sell_type': sell_analysis.get('sell_type', 'unknown')
+                        })
+                        
+                        # 통계 업데이트
+                        self.total_trades += 1
+                        self.total_profit += net_profit
+                        if net_profit > 0:
+                            self.winning_trades += 1
+                        
+                        if fill.is_partial:
+                            position['amount'] -= sell_amount
+                            position['buy_fee'] = position.get('buy_fee', 0) - buy_fee
+                        else:
+                            positions_to_close.append(stock_code)
+                        
+                        logger.info(f"💰 매도: {target_config.get('name', stock_code)} "
+                                  f"{net_profit:+,.0f}원 ({profit_rate*100:+.1f}%) "
+                                  f"[{sell_analysis.get('sell_type', 'unknown')}]"
+                                  + (f" (부분체결 {sell_amount}/{fill.requested}주)" if fill.is_partial else ""))
                 
-                # 기존 포지션 매도 체크
-                positions_to_close = []
+                except Exception as e:
+                    logger.error(f"매도 분석 오류 ({stock_code}): {e}")
+                    continue
+            
+            # 매도된 포지션 제거
+            for stock_code in positions_to_close:
+                del positions[stock_code]
+            
+            # 새로운 매수 기회 탐색
+            if len(positions) < self.trading_config.max_positions and available_budget > 100000:
+                buy_opportunities = []
                 
-                for stock_code, position in positions.items():
+                for stock_code, target_config in self.trading_config.target_stocks.items():
+                    if not target_config.get('enabled', True):
+                        continue
+                    if stock_code in positions:
+                        continue
                     if stock_code not in daily_stock_data:
                         continue
                     
                     try:
-                        target_config = self.trading_config.target_stocks[stock_code]
-                        
                         if BB_FUNCTIONS_AVAILABLE:
-                            # bb_trading.py의 실제 analyze_sell_signal 함수 사용
-                            sell_analysis = analyze_sell_signal(daily_stock_data[stock_code], position, target_config)
+                            # bb_trading.py의 실제 analyze_buy_signal 함수 사용
+                            buy_analysis = analyze_buy_signal(daily_stock_data[stock_code], target_config)
                         else:
-                            # 간단한 매도 신호 (폴백)
+                            # 간단한 매수 신호 (폴백)
                             current_price = daily_stock_data[stock_code]['current_price']
-                            entry_price = position['entry_price']
-                            profit_rate = (current_price - entry_price) / entry_price
+                            rsi = daily_stock_data[stock_code].get('rsi', 50)
                             
-                            stop_loss = target_config.get('stop_loss', -0.03)
-                            take_profit = target_config.get('profit_target', 0.06)
+                            score = 0
+                            if rsi <= 30:
+                                score += 30
+                            if len(daily_stock_data[stock_code]['ohlcv_data']) >= 20:
+                                ma20 = daily_stock_data[stock_code]['ohlcv_data']['close'].rolling(20).mean().iloc[-1]
+                                if current_price <= ma20 * 1.02:
+                                    score += 25
                             
-                            if profit_rate <= stop_loss:
-                                sell_analysis = {
-                                    'is_sell_signal': True,
-                                    'sell_type': 'stop_loss',
-                                    'reason': f"손절 {profit_rate*100:.1f}%",
-                                    'profit_rate': profit_rate
-                                }
-                            elif profit_rate >= take_profit:
-                                sell_analysis = {
-                                    'is_sell_signal': True,
-                                    'sell_type': 'take_profit',
-                                    'reason': f"익절 {profit_rate*100:.1f}%", 
-                                    'profit_rate': profit_rate
-                                }
-                            else:
-                                sell_analysis = {'is_sell_signal': False}
+                            min_score = target_config.get('min_score', 70)
+                            buy_analysis = {
+                                'is_buy_signal': score >= min_score,
+                                'score': score,
+                                'min_score': min_score,
+                                'signals': [f"간단 분석 점수: {score}"]
+                            }
                         
-                        if sell_analysis['is_sell_signal']:
-                            # 매도 실행
-                            sell_price = daily_stock_data[stock_code]['current_price']
-                            sell_amount = position['amount']
-                            
-                            # bb_trading.py의 calculate_trading_fee 함수 사용
-                            if BB_FUNCTIONS_AVAILABLE:
-                                sell_fee = calculate_trading_fee(sell_price, sell_amount, False)
-                            else:
-                                sell_fee = sell_price * sell_amount * 0.003
-                            
-                            # 손익 계산
-                            entry_price = position['entry_price']
-                            buy_fee = position.get('buy_fee', 0)
-                            gross_profit = (sell_price - entry_price) * sell_amount
-                            net_profit = gross_profit - buy_fee - sell_fee
-                            
-                            # 현금 회수
-                            cash += sell_price * sell_amount - sell_fee
-                            
-                            # 거래 기록
-                            self.trade_history.append({
-                                'date': current_date,
-                                'action': 'SELL',
+                        if buy_analysis['is_buy_signal']:
+                            buy_opportunities.append({
                                 'stock_code': stock_code,
                                 'stock_name': target_config.get('name', stock_code),
-                                'price': sell_price,
-                                'amount': sell_amount,
-                                'net_profit': net_profit,
-                                'profit_rate': sell_analysis.get('profit_rate', (sell_price - entry_price) / entry_price),
-                                'reason': sell_analysis.get('reason', 'Unknown'),
-                                'holding_days': (current_date - position['entry_date']).days,
-                                'sell_type': sell_analysis.get('sell_type', 'unknown')
+                                'price': daily_stock_data[stock_code]['current_price'],
+                                'score': buy_analysis['score'],
+                                'target_config': target_config,
+                                'analysis': buy_analysis
                             })
-                            
-                            # 통계 업데이트
-                            total_trades += 1
-                            total_profit += net_profit
-                            if net_profit > 0:
-                                winning_trades += 1
-                            
-                            positions_to_close.append(stock_code)
-                            
-                            logger.info(f"💰 매도: {target_config.get('name', stock_code)} "
-                                      f"{net_profit:+,.0f}원 ({sell_analysis.get('profit_rate', 0)*100:+.1f}%) "
-                                      f"[{sell_analysis.get('sell_type', 'unknown')}]")
                     
                     except Exception as e:
-                        logger.error(f"매도 분석 오류 ({stock_code}): {e}")
+                        logger.error(f"매수 분석 오류 ({stock_code}): {e}")
                         continue
                 
-                # 매도된 포지션 제거
-                for stock_code in positions_to_close:
-                    del positions[stock_code]
+                # 점수순 정렬 후 매수 실행
+                buy_opportunities.sort(key=lambda x: x['score'], reverse=True)
+                max_new_positions = self.trading_config.max_positions - len(positions)
                 
-                # 새로운 매수 기회 탐색
-                if len(positions) < self.trading_config.max_positions and available_budget > 100000:
-                    buy_opportunities = []
+                for opportunity in buy_opportunities[:max_new_positions]:
+                    if available_budget <= 100000:
+                        break
                     
-                    for stock_code, target_config in self.trading_config.target_stocks.items():
-                        if not target_config.get('enabled', True):
-                            continue
-                        if stock_code in positions:
+                    stock_code = opportunity['stock_code']
+                    stock_price = opportunity['price']
+                    target_config = opportunity['target_config']
+                    
+                    try:
+                        if BB_FUNCTIONS_AVAILABLE:
+                            # bb_trading.py의 실제 calculate_position_size 함수 사용
+                            quantity = calculate_position_size(target_config, available_budget, stock_price)
+                        else:
+                            # 간단한 포지션 크기 계산
+                            allocation_ratio = target_config.get('allocation_ratio', 0.2)
+                            allocated_budget = available_budget * allocation_ratio
+                            quantity = int(allocated_budget / (stock_price * 1.003))  # 수수료 고려
+                        
+                        if quantity <= 0:
                             continue
-                        if stock_code not in daily_stock_data:
+                        
+                        # 체결 모델 적용 (체결가/체결 수량)
+                        fill = self.execute_fill('BUY', stock_code, quantity, stock_price, current_date)
+                        if fill.quantity <= 0:
                             continue
+                        quantity = fill.quantity
+                        stock_price = fill.price
                         
-                        try:
-                            if BB_FUNCTIONS_AVAILABLE:
-                                # bb_trading.py의 실제 analyze_buy_signal 함수 사용
-                                buy_analysis = analyze_buy_signal(daily_stock_data[stock_code], target_config)
-                            else:
-                                # 간단한 매수 신호 (폴백)
-                                current_price = daily_stock_data[stock_code]['current_price']
-                                rsi = daily_stock_data[stock_code].get('rsi', 50)
-                                
-                                score = 0
-                                if rsi <= 30:
-                                    score += 30
-                                if len(daily_stock_data[stock_code]['ohlcv_data']) >= 20:
-                                    ma20 = daily_stock_data[stock_code]['ohlcv_data']['close'].rolling(20).mean().iloc[-1]
-                                    if current_price <= ma20 * 1.02:
-                                        score += 25
-                                
-                                min_score = target_config.get('min_score', 70)
-                                buy_analysis = {
-                                    'is_buy_signal': score >= min_score,
-                                    'score': score,
-                                    'min_score': min_score,
-                                    'signals': [f"간단 분석 점수: {score}"]
-                                }
-                            
-                            if buy_analysis['is_buy_signal']:
-                                buy_opportunities.append({
-                                    'stock_code': stock_code,
-                                    'stock_name': target_config.get('name', stock_code),
-                                    'price': daily_stock_data[stock_code]['current_price'],
-                                    'score': buy_analysis['score'],
-                                    'target_config': target_config,
-                                    'analysis': buy_analysis
-                                })
+                        # 수수료 계산
+                        if BB_FUNCTIONS_AVAILABLE:
+                            buy_fee = calculate_trading_fee(stock_price, quantity, True)
+                        else:
+                            buy_fee = stock_price * quantity * 0.003
+                        
+                        total_cost = stock_price * quantity
+                        total_needed = total_cost + buy_fee
                         
-                        except Exception as e:
-                            logger.error(f"매수 분석 오류 ({stock_code}): {e}")
+                        if total_needed > self.cash:
                             continue
-                    
-                    # 점수순 정렬 후 매수 실행
-                    buy_opportunities.sort(key=lambda x: x['score'], reverse=True)
-                    max_new_positions = self.trading_config.max_positions - len(positions)
-                    
-                    for opportunity in buy_opportunities[:max_new_positions]:
-                        if available_budget <= 100000:
-                            break
                         
-                        stock_code = opportunity['stock_code']
-                        stock_price = opportunity['price']
-                        target_config = opportunity['target_config']
+                        # 매수 실행
+                        self.cash -= total_needed
+                        available_budget -= total_needed
                         
-                        try:
-                            if BB_FUNCTIONS_AVAILABLE:
-                                # bb_trading.py의 실제 calculate_position_size 함수 사용
-                                quantity = calculate_position_size(target_config, available_budget, stock_price)
-                            else:
-                                # 간단한 포지션 크기 계산
-                                allocation_ratio = target_config.get('allocation_ratio', 0.2)
-                                allocated_budget = available_budget * allocation_ratio
-                                quantity = int(allocated_budget / (stock_price * 1.003))  # 수수료 고려
-                            
-                            if quantity <= 0:
-                                continue
-                            
-                            # 수수료 계산
-                            if BB_FUNCTIONS_AVAILABLE:
-                                buy_fee = calculate_trading_fee(stock_price, quantity, True)
-                            else:
-                                buy_fee = stock_price * quantity * 0.003
-                            
-                            total_cost = stock_price * quantity
-                            total_needed = total_cost + buy_fee
-                            
-                            if total_needed > cash:
-                                continue
-                            
-                            # 매수 실행
-                            cash -= total_needed
-                            available_budget -= total_needed
-                            
-                            # 포지션 생성
-                            positions[stock_code] = {
-                                'stock_code': stock_code,
-                                'entry_price': stock_price,
-                                'amount': quantity,
-                                'buy_fee': buy_fee,
-                                'entry_date': current_date,
-                                'current_price': stock_price,
-                                'high_price': stock_price,
-                                'trailing_stop': stock_price * (1 - target_config.get('trailing_stop', self.trading_config.trailing_stop_ratio))
-                            }
-                            
-                            # 거래 기록
-                            self.trade_history.append({
-                                'date': current_date,
-                                'action': 'BUY',
-                                'stock_code': stock_code,
-                                'stock_name': target_config.get('name', stock_code),
-                                'price': stock_price,
-                                'amount': quantity,
-                                'total_cost': total_needed,
-                                'score': opportunity['score'],
-                                'signals': ', '.join(opportunity['analysis'].get('signals', []))
-                            })
-                            
-                            logger.info(f"✅ 매수: {target_config.get('name', stock_code)} "
-                                      f"{stock_price:,.0f}원 × {quantity}주 = {total_needed:,.0f}원 "
-                                      f"(점수: {opportunity['score']})")
+                        # 포지션 생성
+                        positions[stock_code] = {
+                            'stock_code': stock_code,
+                            'entry_price': stock_price,
+                            'amount': quantity,
+                            'buy_fee': buy_fee,
+                            'entry_date': current_date,
+                            'current_price': stock_price,
+                            'high_price': stock_price,
+                            'trailing_stop': stock_price * (1 - target_config.get('trailing_stop', self.trading_config.trailing_stop_ratio))
+                        }
                         
-                        except Exception as e:
-                            logger.error(f"매수 실행 오류 ({stock_code}): {e}")
-                            continue
-                
-                # 일별 포트폴리오 기록
-                stock_value = sum(pos['amount'] * pos.get('current_price', pos['entry_price']) 
-                                for pos in positions.values())
-                total_value = cash + stock_value
-                
-                self.daily_portfolio.append({
-                    'date': current_date,
-                    'cash': cash,
-                    'stock_value': stock_value,
-                    'total_value': total_value,
-                    'available_budget': available_budget,
-                    'positions_count': len(positions),
-                    'daily_return': (total_value / initial_cash - 1) * 100
-                })
-                
-                # 진행 상황 출력
-                if i % 10 == 0 or i == len(trading_dates) - 1:
-                    progress = (i + 1) / len(trading_dates) * 100
-                    logger.info(f"📊 진행률: {progress:.1f}% ({current_date}) "
-                              f"총자산: {total_value:,.0f}원 "
-                              f"수익률: {(total_value/initial_cash-1)*100:+.1f}% "
-                              f"보유: {len(positions)}개")
+                        # 거래 기록
+                        self.trade_history.append({
+                            'date': current_date,
+                            'action': 'BUY',
+                            'stock_code': stock_code,
+                            'stock_name': target_config.get('name', stock_code),
+                            'price': stock_price,
+                            'amount': quantity,
+                            'total_cost': total_needed,
+                            'score': opportunity['score'],
+                            'signals': ', '.join(opportunity['analysis'].get('signals', []))
+                        })
+                        
+                        logger.info(f"✅ 매수: {target_config.get('name', stock_code)} "
+                                  f"{stock_price:,.0f}원 × {quantity}주 = {total_needed:,.0f}원 "
+                                  f"(점수: {opportunity['score']})")
+                    
+                    except Exception as e:
+                        logger.error(f"매수 실행 오류 ({stock_code}): {e}")
+                        continue
             
-            except Exception as e:
-                logger.error(f"❌ {current_date} 백테스트 중 오류: {e}")
-                continue
+            # 일별 포트폴리오 기록
+            stock_value = sum(pos['amount'] * pos.get('current_price', pos['entry_price']) 
+                            for pos in positions.values())
+            total_value = self.cash + stock_value
+            
+            self.daily_portfolio.append({
+                'date': current_date,
+                'cash': self.cash,
+                'stock_value': stock_value,
+                'total_value': total_value,
+                'available_budget': available_budget,
+                'positions_count': len(positions),
+                'daily_return': (total_value / self.initial_cash - 1) * 100
+            })
+            
+            return total_value
         
-        # 최종 정산 (남은 포지션 매도)
-        final_date = trading_dates[-1] if trading_dates else datetime.date.today()
-        for stock_code, position in positions.items():
-            if stock_code in daily_stock_data:
-                final_price = daily_stock_data[stock_code]['current_price']
+        except Exception as e:
+            logger.error(f"❌ {current_date} 백테스트 중 오류: {e}")
+            return None
+    
+    def settle_positions(self, final_date: datetime.date):
+        """남은 포지션 최종 정산 (마지막 거래일 현재가로 매도, 정산한 포지션은 제거)
+        
+        평가 목적의 정산이라 체결 모델을 거치지 않는다 (부분체결로 잔량이 남지 않도록).
+        """
+        settled = []
+        for stock_code, position in self.positions.items():
+            if stock_code in self.daily_stock_data:
+                final_price = self.daily_stock_data[stock_code]['current_price']
                 sell_amount = position['amount']
                 
                 if BB_FUNCTIONS_AVAILABLE:
@@ -1054,11 +1375,11 @@ class AccurateBacktest:
                 gross_profit = (final_price - entry_price) * sell_amount
                 net_profit = gross_profit - buy_fee - sell_fee
                 
-                cash += final_price * sell_amount - sell_fee
-                total_profit += net_profit
-                total_trades += 1
+                self.cash += final_price * sell_amount - sell_fee
+                self.total_profit += net_profit
+                self.total_trades += 1
                 if net_profit > 0:
-                    winning_trades += 1
+                    self.winning_trades += 1
                 
                 # 최종 정산 거래 기록
                 self.trade_history.append({
@@ -1074,27 +1395,10 @@ class AccurateBacktest:
                     'holding_days': (final_date - position['entry_date']).days,
                     'sell_type': 'final_settlement'
                 })
+                settled.append(stock_code)
         
-        # 최종 결과 계산
-        final_value = cash
-        total_return = (final_value / initial_cash - 1) * 100
-        
-        self.results = {
-            'initial_cash': initial_cash,
-            'final_value': final_value,
-            'total_return': total_return,
-            'total_trades': total_trades,
-            'winning_trades': winning_trades,
-            'winning_rate': winning_trades / max(total_trades, 1) * 100,
-            'total_profit': total_profit,
-            'trading_days': len(trading_dates),
-            'annual_return': total_return * (365 / len(trading_dates)) if len(trading_dates) > 0 else 0,
-            'bb_functions_used': BB_FUNCTIONS_AVAILABLE
-        }
-        
-        logger.info("🎯 정확한 백테스트 완료!")
-        self.print_results()
-        self.print_detailed_analysis()
+        for stock_code in settled:
+            del self.positions[stock_code]
     
     def print_results(self):
         """결과 출력"""
@@ -1117,77 +1421,63 @@ class AccurateBacktest:
         print("="*70)
     
     def print_detailed_analysis(self):
-        """상세 분석 출력"""
+        """상세 분석 출력 (거래/포트폴리오 열 버퍼를 DataFrame groupby로 집계)"""
         if not self.trade_history:
             return
         
-        buy_trades = [t for t in self.trade_history if t['action'] == 'BUY']
-        sell_trades = [t for t in self.trade_history if t['action'] in ['SELL', 'FINAL_SELL']]
+        trades = self.trade_history.to_frame()
+        buy_count = int((trades['action'] == 'BUY').sum())
+        sell_trades = trades[trades['action'].isin(['SELL', 'FINAL_SELL'])].copy()
         
         print("\n📋 거래 분석:")
         print("-" * 70)
-        print(f"매수 거래: {len(buy_trades)}회")
+        print(f"매수 거래: {buy_count}회")
         print(f"매도 거래: {len(sell_trades)}회")
         
-        if sell_trades:
-            profits = [t['net_profit'] for t in sell_trades]
-            profit_rates = [t['profit_rate'] * 100 for t in sell_trades]
-            holding_days = [t.get('holding_days', 0) for t in sell_trades]
+        if not sell_trades.empty:
+            sell_trades['holding_days'] = sell_trades['holding_days'].astype(float).fillna(0)
+            sell_trades['stock_name'] = sell_trades['stock_name'].fillna(sell_trades['stock_code'])
+            sell_trades['sell_type'] = sell_trades['sell_type'].fillna('unknown')
+            
+            profits = sell_trades['net_profit'].to_numpy()
+            profit_rates = sell_trades['profit_rate'].to_numpy() * 100
             
             print(f"\n💰 손익 통계:")
             print(f"평균 수익:   {np.mean(profits):>12,.0f}원 ({np.mean(profit_rates):>6.2f}%)")
             print(f"최대 수익:   {max(profits):>12,.0f}원 ({max(profit_rates):>6.2f}%)")
             print(f"최대 손실:   {min(profits):>12,.0f}원 ({min(profit_rates):>6.2f}%)")
-            print(f"평균 보유:   {np.mean(holding_days):>12.1f}일")
+            print(f"평균 보유:   {sell_trades['holding_days'].mean():>12.1f}일")
             print(f"수익 표준편차: {np.std(profits):>8,.0f}원")
             
             # 매도 유형별 분석
-            sell_types = {}
-            for trade in sell_trades:
-                sell_type = trade.get('sell_type', 'unknown')
-                if sell_type not in sell_types:
-                    sell_types[sell_type] = {'count': 0, 'profit': 0}
-                sell_types[sell_type]['count'] += 1
-                sell_types[sell_type]['profit'] += trade['net_profit']
+            sell_types = sell_trades.groupby('sell_type', sort=False)['net_profit'].agg(['count', 'sum'])
             
             print(f"\n📊 매도 유형별 분석:")
-            for sell_type, data in sell_types.items():
-                avg_profit = data['profit'] / data['count']
-                print(f"{sell_type:>15}: {data['count']:>3}회, "
-                      f"총 {data['profit']:>10,.0f}원 (평균: {avg_profit:>8,.0f}원)")
-        
-        # 종목별 성과
-        if sell_trades:
+            for sell_type, data in sell_types.iterrows():
+                avg_profit = data['sum'] / data['count']
+                print(f"{sell_type:>15}: {int(data['count']):>3}회, "
+                      f"총 {data['sum']:>10,.0f}원 (평균: {avg_profit:>8,.0f}원)")
+            
+            # 종목별 성과 (수익순 정렬)
             print(f"\n🎯 종목별 성과:")
             print("-" * 70)
-            stock_performance = {}
-            for trade in sell_trades:
-                stock_name = trade.get('stock_name', trade['stock_code'])
-                if stock_name not in stock_performance:
-                    stock_performance[stock_name] = {
-                        'profit': 0, 'trades': 0, 'holding_days': []
-                    }
-                stock_performance[stock_name]['profit'] += trade['net_profit']
-                stock_performance[stock_name]['trades'] += 1
-                stock_performance[stock_name]['holding_days'].append(trade.get('holding_days', 0))
-            
-            # 수익순으로 정렬
-            sorted_stocks = sorted(stock_performance.items(), 
-                                 key=lambda x: x[1]['profit'], reverse=True)
+            stock_performance = sell_trades.groupby('stock_name', sort=False).agg(
+                profit=('net_profit', 'sum'),
+                trades=('net_profit', 'size'),
+                avg_holding=('holding_days', 'mean'))
+            stock_performance = stock_performance.sort_values('profit', ascending=False, kind='stable')
             
-            for stock_name, perf in sorted_stocks:
+            for stock_name, perf in stock_performance.iterrows():
                 avg_profit = perf['profit'] / perf['trades']
-                avg_holding = np.mean(perf['holding_days'])
                 print(f"{stock_name:>15}: {perf['profit']:>10,.0f}원 "
-                      f"({perf['trades']:>2}회, 평균: {avg_profit:>8,.0f}원, "
-                      f"보유: {avg_holding:>4.1f}일)")
+                      f"({int(perf['trades']):>2}회, 평균: {avg_profit:>8,.0f}원, "
+                      f"보유: {perf['avg_holding']:>4.1f}일)")
         
         # 월별 성과
         if self.daily_portfolio:
             print(f"\n📅 월별 성과:")
             print("-" * 70)
-            df_portfolio = pd.DataFrame(self.daily_portfolio)
-            df_portfolio['date'] = pd.to_datetime(df_portfolio['date'])
+            df_portfolio = self.daily_portfolio.to_frame()
             df_portfolio['month'] = df_portfolio['date'].dt.to_period('M')
             
             monthly_returns = df_portfolio.groupby('month').agg({
@@ -1206,19 +1496,19 @@ class AccurateBacktest:
                       f"(최저: {min_return:>6.2f}%, 최고: {max_return:>6.2f}%)")
     
     def save_detailed_results(self, prefix: str = "accurate_backtest"):
-        """상세 결과 저장"""
+        """상세 결과 저장 (거래 내역/일별 포트폴리오는 Parquet, pyarrow가 없으면 pickle)"""
         try:
-            # 거래 내역 CSV
+            trades_path = portfolio_path = None
+            
+            # 거래 내역
             if self.trade_history:
-                df_trades = pd.DataFrame(self.trade_history)
-                df_trades.to_csv(f"{prefix}_trades.csv", index=False, encoding='utf-8-sig')
-                logger.info(f"📊 거래 내역 저장: {prefix}_trades.csv")
+                trades_path = write_results(self.trade_history, f"{prefix}_trades.parquet")
+                logger.info(f"📊 거래 내역 저장: {trades_path}")
             
-            # 일별 포트폴리오 CSV
+            # 일별 포트폴리오
             if self.daily_portfolio:
-                df_portfolio = pd.DataFrame(self.daily_portfolio)
-                df_portfolio.to_csv(f"{prefix}_portfolio.csv", index=False, encoding='utf-8-sig')
-                logger.info(f"📊 포트폴리오 내역 저장: {prefix}_portfolio.csv")
+                portfolio_path = write_results(self.daily_portfolio, f"{prefix}_portfolio.parquet")
+                logger.info(f"📊 포트폴리오 내역 저장: {portfolio_path}")
             
             # 결과 요약 JSON
             with open(f"{prefix}_summary.json", 'w', encoding='utf-8') as f:
@@ -1226,8 +1516,10 @@ class AccurateBacktest:
             logger.info(f"📊 결과 요약 저장: {prefix}_summary.json")
             
             print(f"\n✅ 상세 결과 저장 완료:")
-            print(f"  - {prefix}_trades.csv (거래 내역)")
-            print(f"  - {prefix}_portfolio.csv (일별 포트폴리오)")
+            if trades_path:
+                print(f"  - {trades_path} (거래 내역)")
+            if portfolio_path:
+                print(f"  - {portfolio_path} (일별 포트폴리오)")
             print(f"  - {prefix}_summary.json (결과 요약)")
             
         except Exception as e:
@@ -1343,6 +1635,38 @@ def run_accurate_custom_backtest():
         logger.error(f"❌ 정확한 백테스트 실행 중 오류: {e}")
         print(f"❌ 오류 발생: {e}")
 
+def run_indicator_timeline_parity_check():
+    """지표 타임라인 정합성 검증 (사전 계산 vs 일별 재계산, 6개월)"""
+    try:
+        backtest = AccurateBacktest("target_stock_config.json")
+        
+        end_date = datetime.datetime.now().strftime('%Y-%m-%d')
+        start_date = (datetime.datetime.now() - datetime.timedelta(days=180)).strftime('%Y-%m-%d')
+        
+        print(f"🔍 지표 타임라인 정합성 검증")
+        print(f"📅 기간: {start_date} ~ {end_date}")
+        
+        all_identical = True
+        for stock_code, target_config in backtest.trading_config.target_stocks.items():
+            if not target_config.get('enabled', True):
+                continue
+            
+            df = backtest.get_stock_data_for_backtest(stock_code, start_date, end_date)
+            if df.empty:
+                continue
+            
+            result = check_indicator_timeline_parity(stock_code, df)
+            all_identical = all_identical and result['is_identical']
+            
+            status = "✅ 일치" if result['is_identical'] else f"❌ 불일치 {result['mismatch_count']}건"
+            print(f"{target_config.get('name', stock_code):>15}: {result['checked_days']:>4}일 {status}")
+        
+        print(f"\n{'✅ 모든 종목 정합성 확인' if all_identical else '❌ 정합성 불일치 종목 존재'}")
+        
+    except Exception as e:
+        logger.error(f"❌ 정합성 검증 중 오류: {e}")
+        print(f"❌ 오류 발생: {e}")
+
 ################################### 메인 실행부 ##################################
 
 if __name__ == "__main__":
@@ -1365,11 +1689,12 @@ if __name__ == "__main__":
     print("1. 정확한 백테스트 (3개월)")
     print("2. 정확한 백테스트 (6개월)")
     print("3. 사용자 정의 정확한 백테스트")
+    print("4. 지표 타임라인 정합성 검증")
     print("0. 종료")
     
     while True:
         try:
-            choice = input("\n선택하세요 (0-3): ")
+            choice = input("\n선택하세요 (0-4): ")
             
             if choice == "1":
                 run_accurate_backtest_3months()
@@ -1380,6 +1705,9 @@ if __name__ == "__main__":
             elif choice == "3":
                 run_accurate_custom_backtest()
                 break
+            elif choice == "4":
+                run_indicator_timeline_parity_check()
+                break
             elif choice == "0":
                 print("프로그램을 종료합니다.")
                 break
@@ -0,0 +1,408 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+bb_backtest.py 파라미터 스윕 실행기
+- 그리드 / 랜덤 탐색 파라미터 조합을 AccurateBacktest로 병렬 실행 (프로세스 풀)
+- 가격 데이터는 한 번만 조회해 공유 메모리에 적재, 워커는 복사 없이 참조
+- 결과는 실행마다 CSV 한 줄씩 즉시 기록 (중단 후 재실행 시 완료된 조합은 건너뜀)
+- pyarrow가 있으면 최종 결과를 Parquet으로도 저장
+- runs_dir를 주면 실행별 거래 내역/자산곡선을 Parquet으로 남기고, 여러 실행을 스트리밍 집계
+
+사용 예:
+    sweep = ParameterSweep("target_stock_config.json", "2025-01-01", "2025-06-30")
+    sweep.run(grid={"rsi_oversold": [25, 30, 35], "bb_std": [1.8, 2.0, 2.2]})
+    sweep.run(random_spec={"stop_loss_ratio": {"low": -0.07, "high": -0.02},
+                           "trailing_stop_ratio": {"low": 0.01, "high": 0.04}}, n_samples=50)
+    sweep_runs = ParameterSweep(..., runs_dir="backtest_results/bb_sweep_runs")
+    sweep_runs.aggregate_trades(by="sell_type")   # 전 실행 매도 유형별 손익/승률
+"""
+
+import os
+import csv
+import json
+import random
+import hashlib
+import logging
+import itertools
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+import bb_backtest
+from backtest_result_store import BacktestResultStore
+
+logger = logging.getLogger('AccurateBacktest')
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+RESULT_METRICS = [
+    'final_value', 'total_return', 'annual_return', 'total_trades',
+    'winning_trades', 'winning_rate', 'total_profit', 'max_drawdown', 'trading_days'
+]
+
+################################### 파라미터 조합 생성 ##################################
+
+def expand_grid(grid: Dict[str, List]) -> List[Dict]:
+    """그리드 탐색 조합 생성 {"bb_std": [1.8, 2.0]} → [{"bb_std": 1.8}, {"bb_std": 2.0}]"""
+    keys = list(grid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*[grid[key] for key in keys])]
+
+def sample_random(random_spec: Dict[str, Dict], n_samples: int, seed: int = 42) -> List[Dict]:
+    """랜덤 탐색 조합 생성
+
+    random_spec 값 형식:
+        {"low": -0.07, "high": -0.02}             → 균등분포 실수
+        {"low": 20, "high": 40, "type": "int"}    → 균등분포 정수 (양끝 포함)
+        {"choices": [1.8, 2.0, 2.2]}              → 목록 중 선택
+    """
+    rng = random.Random(seed)
+    samples = []
+
+    for _ in range(n_samples):
+        params = {}
+        for key, spec in random_spec.items():
+            if 'choices' in spec:
+                params[key] = rng.choice(spec['choices'])
+            elif spec.get('type') == 'int':
+                params[key] = rng.randint(int(spec['low']), int(spec['high']))
+            else:
+                params[key] = round(rng.uniform(spec['low'], spec['high']), spec.get('digits', 4))
+        samples.append(params)
+
+    return samples
+
+def make_run_id(params: Dict, settings: Optional[Dict] = None) -> str:
+    """파라미터 조합 + 실행 조건(기간/초기자금/설정 파일) 고유 ID (재실행 시 완료 여부 판별용)
+
+    실행 조건이 다르면 ID도 달라지므로, 같은 결과 파일에 다른 기간으로 다시 돌려도
+    이전 기간 결과를 완료로 보고 건너뛰지 않음
+    """
+    payload = json.dumps({'params': params, 'settings': settings or {}}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+################################### 공유 메모리 가격 데이터 ##################################
+
+class SharedPriceData:
+    """종목별 OHLCV를 하나의 float64 배열로 묶어 공유 메모리에 적재
+
+    워커에는 공유 메모리 이름과 종목별 행 범위/날짜(int64)만 전달되고,
+    DataFrame은 공유 버퍼 위의 뷰로 다시 만든다.
+    """
+
+    def __init__(self, stock_data_dict: Dict[str, pd.DataFrame]):
+        total_rows = sum(len(df) for df in stock_data_dict.values())
+        nbytes = max(total_rows * len(PRICE_COLUMNS) * 8, 8)
+
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        buffer = np.ndarray((total_rows, len(PRICE_COLUMNS)), dtype=np.float64, buffer=self.shm.buf)
+
+        self.layout = {}
+        offset = 0
+        for stock_code, df in stock_data_dict.items():
+            rows = len(df)
+            dates = pd.DatetimeIndex(df.index)
+            if dates.tz is not None:
+                dates = dates.tz_localize(None)
+
+            buffer[offset:offset + rows] = df[PRICE_COLUMNS].values.astype(np.float64)
+            self.layout[stock_code] = {
+                'offset': offset,
+                'rows': rows,
+                'dates': dates.values.astype('datetime64[ns]')
+            }
+            offset += rows
+
+        self.total_rows = total_rows
+
+    def descriptor(self) -> Dict:
+        """워커 초기화용 정보 (작은 메타데이터만 포함)"""
+        return {'name': self.shm.name, 'total_rows': self.total_rows, 'layout': self.layout}
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+def attach_shared_price_data(descriptor: Dict):
+    """공유 메모리에 연결해 종목별 DataFrame 뷰 생성 (복사 없음)"""
+    shm = shared_memory.SharedMemory(name=descriptor['name'])
+    buffer = np.ndarray((descriptor['total_rows'], len(PRICE_COLUMNS)), dtype=np.float64, buffer=shm.buf)
+    buffer.flags.writeable = False
+
+    stock_data_dict = {}
+    for stock_code, info in descriptor['layout'].items():
+        view = buffer[info['offset']:info['offset'] + info['rows']]
+        stock_data_dict[stock_code] = pd.DataFrame(
+            view, index=pd.DatetimeIndex(info['dates']), columns=PRICE_COLUMNS, copy=False
+        )
+
+    return shm, stock_data_dict
+
+################################### 워커 ##################################
+
+_worker_state = {}
+
+def _init_worker(descriptor: Dict, config_path: str, log_level: int, runs_dir: Optional[str] = None):
+    """워커 프로세스 초기화: 공유 가격 데이터 연결 + 로그 최소화"""
+    logging.getLogger().setLevel(log_level)
+    logger.setLevel(log_level)
+
+    shm, stock_data_dict = attach_shared_price_data(descriptor)
+    _worker_state['shm'] = shm
+    _worker_state['stock_data_dict'] = stock_data_dict
+    _worker_state['config_path'] = config_path
+    _worker_state['run_store'] = BacktestResultStore(runs_dir) if runs_dir else None
+
+def _run_single(task: Dict) -> Dict:
+    """파라미터 조합 1개 실행 후 요약 지표만 반환 (거래 내역은 runs_dir가 있으면 Parquet 기록, 없으면 폐기)"""
+    row = {'run_id': task['run_id'], 'params': json.dumps(task['params'], sort_keys=True, ensure_ascii=False)}
+    row.update({f"param_{key}": value for key, value in task['params'].items()})
+
+    try:
+        backtest = bb_backtest.AccurateBacktest(_worker_state['config_path'])
+        backtest.apply_config_overrides(task['params'])
+        backtest.run_backtest(
+            task['start_date'], task['end_date'], task['initial_cash'],
+            stock_data_dict=_worker_state['stock_data_dict'], verbose=False
+        )
+
+        results = backtest.results or {}
+        for metric in RESULT_METRICS:
+            row[metric] = results.get(metric)
+
+        if backtest.daily_portfolio:
+            values = backtest.daily_portfolio.column('total_value')
+            peak = np.maximum.accumulate(values)
+            row['max_drawdown'] = float(((values - peak) / peak).min() * 100)
+
+        run_store = _worker_state.get('run_store')
+        if run_store is not None:
+            run_store.save_run(task['run_id'], trades=backtest.trade_history, equity=backtest.daily_portfolio,
+                               meta={'params': task['params'], 'initial_capital': task['initial_cash']})
+
+        row['error'] = ''
+
+    except Exception as e:
+        for metric in RESULT_METRICS:
+            row.setdefault(metric, None)
+        row['error'] = str(e)
+
+    return row
+
+################################### 스윕 실행기 ##################################
+
+class ParameterSweep:
+    """AccurateBacktest 파라미터 스윕 실행기"""
+
+    def __init__(self, config_path: str = "target_stock_config.json",
+                 start_date: str = None, end_date: str = None,
+                 initial_cash: float = 10000000,
+                 results_path: str = "bb_sweep_results.csv",
+                 max_workers: Optional[int] = None,
+                 tasks_per_worker: int = 20,
+                 runs_dir: Optional[str] = None):
+        """
+        Args:
+            tasks_per_worker: 워커 프로세스 1개가 처리할 최대 실행 수 (이후 재시작하여 메모리 상한 유지)
+            runs_dir: 실행별 거래 내역/자산곡선 Parquet 저장 폴더 (None이면 저장 안 함)
+        """
+        self.config_path = config_path
+        self.start_date = start_date
+        self.end_date = end_date
+        self.initial_cash = initial_cash
+        self.results_path = results_path
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.tasks_per_worker = tasks_per_worker
+        self.runs_dir = runs_dir
+
+    def load_completed_run_ids(self) -> set:
+        """이미 기록된 실행 ID (재개용)"""
+        if not os.path.exists(self.results_path):
+            return set()
+
+        try:
+            completed = pd.read_csv(self.results_path, usecols=['run_id', 'error'], dtype=str, keep_default_na=False)
+            return set(completed.loc[completed['error'] == '', 'run_id'])
+        except Exception as e:
+            logger.warning(f"⚠️ 기존 스윕 결과 읽기 실패, 처음부터 실행: {e}")
+            return set()
+
+    def run_settings(self) -> Dict:
+        """결과에 영향을 주는 실행 조건 (run_id 계산에 포함)"""
+        return {
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'initial_cash': float(self.initial_cash),
+            'config_path': os.path.abspath(self.config_path)
+        }
+
+    def build_tasks(self, grid: Optional[Dict] = None, random_spec: Optional[Dict] = None,
+                    n_samples: int = 20, seed: int = 42) -> List[Dict]:
+        """실행할 파라미터 조합 목록 (완료된 조합 제외)"""
+        if grid:
+            combinations = expand_grid(grid)
+        elif random_spec:
+            combinations = sample_random(random_spec, n_samples, seed)
+        else:
+            raise ValueError("grid 또는 random_spec 중 하나는 필요합니다.")
+
+        completed = self.load_completed_run_ids()
+        settings = self.run_settings()
+        tasks = []
+        seen = set()
+
+        for params in combinations:
+            run_id = make_run_id(params, settings)
+            if run_id in completed or run_id in seen:
+                continue
+            seen.add(run_id)
+            tasks.append({
+                'run_id': run_id,
+                'params': params,
+                'start_date': self.start_date,
+                'end_date': self.end_date,
+                'initial_cash': self.initial_cash
+            })
+
+        logger.info(f"📋 스윕 조합: 전체 {len(combinations)}개, 완료 {len(combinations) - len(tasks)}개, 실행 예정 {len(tasks)}개")
+        return tasks
+
+    def _append_row(self, row: Dict, fieldnames: List[str]):
+        """결과 한 줄 즉시 기록"""
+        file_exists = os.path.exists(self.results_path) and os.path.getsize(self.results_path) > 0
+
+        with open(self.results_path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            if not file_exists:
+                writer.writeheader()
+            writer.writerow(row)
+            f.flush()
+
+    def _fieldnames(self, tasks: List[Dict]) -> List[str]:
+        """결과 테이블 컬럼 (기존 파일이 있으면 그 헤더 유지)"""
+        if os.path.exists(self.results_path) and os.path.getsize(self.results_path) > 0:
+            with open(self.results_path, 'r', encoding='utf-8') as f:
+                header = next(csv.reader(f), None)
+            if header:
+                return header
+
+        param_keys = sorted({key for task in tasks for key in task['params'].keys()})
+        return ['run_id', 'params'] + [f"param_{key}" for key in param_keys] + RESULT_METRICS + ['error']
+
+    def run(self, grid: Optional[Dict] = None, random_spec: Optional[Dict] = None,
+            n_samples: int = 20, seed: int = 42) -> pd.DataFrame:
+        """스윕 실행 → 전체 결과 테이블 반환"""
+        tasks = self.build_tasks(grid, random_spec, n_samples, seed)
+
+        if tasks:
+            # 가격 데이터는 한 번만 조회
+            loader = bb_backtest.AccurateBacktest(self.config_path)
+            stock_data_dict = loader.load_stock_data(self.start_date, self.end_date)
+
+            if not stock_data_dict:
+                logger.error("❌ 사용 가능한 종목 데이터가 없습니다.")
+                return self.load_results()
+
+            shared = SharedPriceData(stock_data_dict)
+            del stock_data_dict
+            fieldnames = self._fieldnames(tasks)
+
+            logger.info(f"🚀 파라미터 스윕 시작: {len(tasks)}개 조합, 워커 {self.max_workers}개")
+
+            try:
+                with multiprocessing.Pool(
+                    processes=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(shared.descriptor(), self.config_path, logging.WARNING, self.runs_dir),
+                    maxtasksperchild=self.tasks_per_worker
+                ) as pool:
+                    for done, row in enumerate(pool.imap_unordered(_run_single, tasks), 1):
+                        self._append_row(row, fieldnames)
+
+                        if row['error']:
+                            logger.warning(f"⚠️ [{done}/{len(tasks)}] {row['params']} 실패: {row['error']}")
+                        else:
+                            logger.info(f"📊 [{done}/{len(tasks)}] {row['params']} "
+                                        f"수익률 {row.get('total_return') or 0:+.2f}% MDD {row.get('max_drawdown') or 0:.2f}%")
+            finally:
+                shared.close()
+
+        results = self.load_results()
+        self.export_parquet(results)
+        return results
+
+    def load_results(self) -> pd.DataFrame:
+        """결과 테이블 로드"""
+        if not os.path.exists(self.results_path):
+            return pd.DataFrame()
+        return pd.read_csv(self.results_path, keep_default_na=False, na_values=[''])
+
+    def export_parquet(self, results: pd.DataFrame):
+        """pyarrow가 있으면 Parquet으로도 저장"""
+        if results.empty:
+            return
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return
+
+        parquet_path = os.path.splitext(self.results_path)[0] + ".parquet"
+        results.to_parquet(parquet_path, index=False)
+        logger.info(f"📊 스윕 결과 Parquet 저장: {parquet_path}")
+
+    def aggregate_trades(self, by: str = 'sell_type', per_run: bool = False) -> pd.DataFrame:
+        """runs_dir에 저장된 전 실행의 매도 거래를 그룹별 집계 (필요한 컬럼만 배치 단위로 읽음)
+
+        Returns:
+            그룹별 count, net_profit 합계/평균, 승률(net_profit_positive_rate), 평균 보유일
+        """
+        if not self.runs_dir:
+            raise ValueError("runs_dir가 설정되지 않았습니다.")
+
+        store = BacktestResultStore(self.runs_dir)
+        return store.aggregate("trades", by=by, sums=['net_profit', 'profit_rate', 'holding_days'],
+                               positives=['net_profit'], where={'action': ['SELL', 'FINAL_SELL']},
+                               per_run=per_run)
+
+    def equity_summary(self) -> pd.DataFrame:
+        """runs_dir에 저장된 실행별 자산곡선 요약 (최종 자산, 수익률, 최대 낙폭)"""
+        if not self.runs_dir:
+            raise ValueError("runs_dir가 설정되지 않았습니다.")
+        return BacktestResultStore(self.runs_dir).equity_summary('total_value')
+
+    @staticmethod
+    def print_top(results: pd.DataFrame, sort_by: str = 'total_return', top_n: int = 10):
+        """상위 조합 출력"""
+        if results.empty:
+            print("스윕 결과가 없습니다.")
+            return
+
+        valid = results[results['error'].isna()] if 'error' in results.columns else results
+        top = valid.sort_values(sort_by, ascending=False).head(top_n)
+
+        print("\n" + "=" * 70)
+        print(f"🏆 파라미터 스윕 상위 {len(top)}개 ({sort_by} 기준)")
+        print("=" * 70)
+        for _, row in top.iterrows():
+            print(f"{row['params']}: 수익률 {row['total_return']:+.2f}%, "
+                  f"MDD {row['max_drawdown']:.2f}%, 승률 {row['winning_rate']:.1f}%, 거래 {int(row['total_trades'])}회")
+
+################################### 메인 실행부 ##################################
+
+if __name__ == "__main__":
+    import datetime
+
+    end_date = datetime.datetime.now().strftime('%Y-%m-%d')
+    start_date = (datetime.datetime.now() - datetime.timedelta(days=180)).strftime('%Y-%m-%d')
+
+    sweep = ParameterSweep("target_stock_config.json", start_date, end_date)
+    results = sweep.run(grid={
+        "target_stocks.rsi_oversold": [45, 50, 55],
+        "bb_std": [1.8, 2.0, 2.2],
+        "stop_loss_ratio": [-0.03, -0.05],
+        "trailing_stop_ratio": [0.02, 0.025, 0.03]
+    })
+    ParameterSweep.print_top(results)
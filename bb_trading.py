@@ -173,7 +173,9 @@ class TradingConfig:
             "last_sector_update": "",
             "bot_name": "TargetStockBot",
             "use_discord_alert": True,
-            "check_interval_minutes": 30
+            "check_interval_minutes": 30,
+            "enable_loop_profiler": False,      # 메인 루프 구간 프로파일 (LoopProfile_{봇이름}.jsonl)
+            "loop_profiler_summary_every": 20   # 구간별 백분위 요약 로그 주기 (루프 수)
         }
         
         try:
@@ -501,6 +503,18 @@ Common.set_logger(logger)
 import technical_analysis
 technical_analysis.set_logger(logger)
 
+import daily_bar_memo
+daily_bar_memo.set_logger(logger)
+
+import state_journal
+state_journal.set_logger(logger)
+
+import global_rate_limiter
+global_rate_limiter.set_logger(logger)
+
+import loop_profiler
+loop_profiler.set_logger(logger)
+
 # import news_analysis
 # news_analysis.set_logger(logger)
 
@@ -1465,42 +1479,47 @@ def detect_stock_environment(stock_code):
 
 ################################### 기술적 분석 함수 ##################################
 
+_daily_bars = None
+
+def get_daily_bar_memo():
+    """Config 지표 기간으로 만든 일봉 메모 (60일, 기간 설정이 바뀌면 새로 생성)"""
+    global _daily_bars
+    settings = daily_bar_memo.IndicatorSettings(
+        rsi_period=trading_config.rsi_period,
+        macd_fast=trading_config.macd_fast,
+        macd_slow=trading_config.macd_slow,
+        macd_signal=trading_config.macd_signal,
+        bb_period=trading_config.bb_period,
+        bb_std=trading_config.bb_std,
+        ma_windows=(5, 20, 60)
+    )
+    if _daily_bars is None or _daily_bars.settings.key() != settings.key():
+        _daily_bars = daily_bar_memo.DailyBarMemo(
+            count=60,
+            history_fetcher=lambda stock_code, count: Common.GetOhlcv("KR", stock_code, count),
+            quote_fetcher=lambda stock_code: KisKR.GetCurrentQuote(stock_code),
+            settings=settings
+        )
+    return _daily_bars
+
 def get_stock_data(stock_code):
-    """종목 데이터 조회 및 기술적 분석 (Config 적용)"""
+    """종목 데이터 조회 및 기술적 분석 (Config 적용)
+
+    완료 일봉과 지표는 일봉 메모에서 가져오고 오늘 봉만 현재 시세로 갱신 (평가당 시세 조회 1회)
+    """
     try:
-        # 일봉 데이터 조회
-        df = Common.GetOhlcv("KR", stock_code, 60)
+        # 일봉 데이터 조회 (RSI/MACD/볼린저밴드/MA/ATR 컬럼 포함)
+        df, quote = get_daily_bar_memo().get(stock_code)
         
         if df is None or len(df) < 30:
             logger.error(f"{stock_code}: 데이터 부족")
             return None
         
-        # 현재가 조회
-        current_price = KisKR.GetCurrentPrice(stock_code)
-        if not current_price or current_price <= 0:
+        # 현재가 - 오늘 봉 갱신에 쓴 시세
+        if quote is None:
             logger.error(f"{stock_code}: 현재가 조회 실패")
             return None
-        
-        # Config에서 기술적 지표 설정값 사용
-        df['RSI'] = TechnicalIndicators.calculate_rsi(df, trading_config.rsi_period)
-        
-        macd_data = TechnicalIndicators.calculate_macd(
-            df, trading_config.macd_fast, trading_config.macd_slow, trading_config.macd_signal
-        )
-        df[['MACD', 'Signal', 'Histogram']] = macd_data
-        
-        bb_data = TechnicalIndicators.calculate_bollinger_bands(
-            df, trading_config.bb_period, trading_config.bb_std
-        )
-        df[['MiddleBand', 'UpperBand', 'LowerBand']] = bb_data
-        
-        # 이동평균선 계산
-        df['MA5'] = df['close'].rolling(window=5).mean()
-        df['MA20'] = df['close'].rolling(window=20).mean()
-        df['MA60'] = df['close'].rolling(window=60).mean()
-        
-        # ATR 계산
-        df['ATR'] = TechnicalIndicators.calculate_atr(df)
+        current_price = quote['close']
         
         # 지지/저항선 분석
         sr_data = TechnicalIndicators.detect_support_resistance(df)
@@ -4785,56 +4804,73 @@ def analyze_sell_signal_with_surge_adaptive(stock_data, position, target_config)
    
 ################################### 상태 관리 ##################################
 
+_trading_state_store = None
+
+def _default_trading_state():
+    return {
+        'positions': {},
+        'daily_stats': {
+            'date': '',
+            'total_profit': 0,
+            'total_trades': 0,
+            'winning_trades': 0,
+            'start_balance': 0
+        }
+    }
+
+def _state_json_serializer(obj):
+    """numpy 타입을 JSON 호환 타입으로 변환"""
+    if isinstance(obj, (np.integer, np.int64, np.int32)):
+        return int(obj)
+    elif isinstance(obj, (np.floating, np.float64, np.float32)):
+        return float(obj)
+    elif isinstance(obj, (np.bool_, np.bool)):
+        return bool(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif hasattr(obj, 'item'):  # numpy scalar
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+def get_trading_state_store():
+    """봇별 트레이딩 상태 저장소 (메모리 상태 + 변경분 저널, 스냅샷은 TargetStockBot_{봇이름}.json - 매수/매도 시 즉시 저장)"""
+    global _trading_state_store
+
+    filename = f"TargetStockBot_{get_bot_name()}.json"
+    if _trading_state_store is None or _trading_state_store.path != filename:
+        if _trading_state_store is not None:
+            _trading_state_store.close()
+        _trading_state_store = state_journal.JournaledStateStore(
+            filename,
+            default_factory=_default_trading_state,
+            serializer=_state_json_serializer,
+            snapshot_kwargs={'indent': 2, 'ensure_ascii': False},
+            snapshot_when=state_journal.changes_positions
+        )
+    return _trading_state_store
+
 def load_trading_state():
-    """트레이딩 상태 로드 - pending_orders 필드 추가"""
+    """트레이딩 상태 로드 - pending_orders 필드 추가 (메모리 상태 사본, 첫 호출 시 스냅샷 + 저널로 복구)"""
     try:
-        bot_name = get_bot_name()
-        with open(f"TargetStockBot_{bot_name}.json", 'r') as f:
-            state = json.load(f)
+        state = get_trading_state_store().load()
         
         # 🆕 pending_orders 필드 추가 (라이브러리 사용)
         state = enhance_trading_state(state)
         return state
         
-    except:
-        return enhance_trading_state({
-            'positions': {},
-            'daily_stats': {
-                'date': '',
-                'total_profit': 0,
-                'total_trades': 0,
-                'winning_trades': 0,
-                'start_balance': 0
-            }
-        })
+    except Exception as e:
+        logger.error(f"트레이딩 상태 로드 실패: {str(e)}")
+        return enhance_trading_state(_default_trading_state())
 
-def save_trading_state(state):
-    """트레이딩 상태 저장 - numpy 타입 처리 및 에러 로깅"""
-        
-    def json_serializer(obj):
-        """numpy 타입을 JSON 호환 타입으로 변환"""
-        if isinstance(obj, (np.integer, np.int64, np.int32)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float64, np.float32)):
-            return float(obj)
-        elif isinstance(obj, (np.bool_, np.bool)):
-            return bool(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif hasattr(obj, 'item'):  # numpy scalar
-            return obj.item()
-        raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
-    
-    bot_name = get_bot_name()
-    filename = f"TargetStockBot_{bot_name}.json"
-    
+def save_trading_state(state, durable=False, snapshot=False):
+    """트레이딩 상태 저장 - 바뀐 부분만 저널에 기록 (durable=True이면 즉시 fsync, snapshot=True이면 상태 파일까지 저장)"""
     try:
-        logger.info("💾 트레이딩 상태 저장 시작")
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(state, f, indent=2, ensure_ascii=False, default=json_serializer)
+        changed = get_trading_state_store().save(state, durable=durable, snapshot=snapshot)
+        if not changed:
+            logger.debug("💾 트레이딩 상태 변경 없음")
+            return
         
-        logger.info(f"✅ 트레이딩 상태 저장 완료: {filename}")
+        logger.info(f"✅ 트레이딩 상태 저장 완료: 변경 {changed}건 저널 기록")
         
         # 저장 내용 요약 로그
         logger.info(f"📊 저장된 데이터:")
@@ -7863,6 +7899,8 @@ def create_config_file(config_path: str = "target_stock_config.json") -> None:
             "bot_name": "TargetStockBot",
             "use_discord_alert": True,
             "check_interval_minutes": 30,
+            "enable_loop_profiler": False,
+            "loop_profiler_summary_every": 20,
             
             # 후보종목 풀 설정
             "use_candidate_pool": True,
@@ -8202,12 +8240,12 @@ def save_and_verify_trading_state(trading_state, operation_name="상태저장"):
         before_pending = list(trading_state.get('pending_orders', {}).keys())
         logger.debug(f"   저장 전 pending_orders: {before_pending}")
         
-        # 2. 저장 실행
-        save_trading_state(trading_state)
+        # 2. 저장 실행 (저널 fsync + 상태 파일 스냅샷 저장)
+        save_trading_state(trading_state, durable=True, snapshot=True)
         
-        # 3. 즉시 다시 로드하여 검증
-        reloaded_state = load_trading_state()
-        after_pending = list(reloaded_state.get('pending_orders', {}).keys())
+        # 3. 상태 파일을 다시 읽어 검증
+        saved_state = get_trading_state_store().read_snapshot()
+        after_pending = list(saved_state.get('pending_orders', {}).keys())
         
         logger.debug(f"   저장 후 pending_orders: {after_pending}")
         
@@ -8229,7 +8267,8 @@ def save_and_verify_trading_state(trading_state, operation_name="상태저장"):
         else:
             logger.debug(f"✅ {operation_name}: 저장/로드 일치 확인")
         
-        return reloaded_state
+        # 메모리 기준본 사본 반환 (pending_orders 필드 보정 포함)
+        return load_trading_state()
         
     except Exception as e:
         logger.error(f"❌ {operation_name} 중 오류: {str(e)}")
@@ -8291,6 +8330,7 @@ def test_market_data_connection():
 
 def main():
     """메인 함수 (Config 적용)"""
+    global KisKR, Common
     
     # 1. 설정 초기화 (가장 먼저!)
     config_path = "target_stock_config.json"
@@ -8303,8 +8343,22 @@ def main():
     # Config 클래스 초기화
     config = initialize_config(config_path)
 
+    # API 호출 제한 - day_trading과 같은 공용 limiter (메인 루프 구간별 API 호출 수 집계에도 사용)
+    # 미체결 주문 관리자도 감싼 모듈을 쓰도록 관리자 초기화 전에 적용
+    api_limiter = global_rate_limiter.get_rate_limiter(is_virtual=Common.GetNowDist() == "VIRTUAL")
+    KisKR = global_rate_limiter.RateLimitedModule(KisKR, api_limiter, global_rate_limiter.KIS_KR_ENDPOINTS)
+    Common = global_rate_limiter.RateLimitedModule(Common, api_limiter, global_rate_limiter.KIS_COMMON_ENDPOINTS)
+
     # 🆕 미체결 주문 관리자 초기화
     initialize_pending_manager()
+
+    # 메인 루프 구간 프로파일러 (설정 enable_loop_profiler)
+    profiler = loop_profiler.LoopProfiler(
+        f"LoopProfile_{get_bot_name()}.jsonl",
+        enabled=config.config.get('enable_loop_profiler', False),
+        api_call_counter=lambda: api_limiter.calls_total,
+        summary_every=config.config.get('loop_profiler_summary_every', 20)
+    )
     
     # 섹터 정보 업데이트 (날짜가 바뀌었거나 처음 실행시)
     today = datetime.datetime.now().strftime('%Y%m%d')
@@ -8343,6 +8397,8 @@ def main():
     next_day_priority_checked = False
 
     while True:
+        # 구간 프로파일 - 이전 루프 기록 후 새 루프 시작
+        profiler.start_loop('trading_time')
         try:
             now = datetime.datetime.now()
             today = now.strftime('%Y-%m-%d')
@@ -8351,9 +8407,11 @@ def main():
             is_trading_time, is_market_open = check_trading_time()
             
             # 트레이딩 상태 로드
+            profiler.phase('load_state')
             trading_state = load_trading_state()
             
             # 날짜가 바뀌면 일일 통계 초기화
+            profiler.phase('daily_init')
             if trading_state['daily_stats']['date'] != today:
                 balance = KisKR.GetBalance()
                 start_balance = float(balance.get('TotalMoney', 0)) if balance else 0
@@ -8386,6 +8444,7 @@ def main():
             # 🆕 ===== 여기부터 새로운 코드 삽입 시작 =====
             
             # 장마감 대기 종목 관리 (15:25~15:35 사이 한 번)
+            profiler.phase('candidate_management')
             if (now.hour == 15 and 25 <= now.minute <= 35 and not end_of_day_managed):
                 logger.info("🕐 장마감 대기 종목 관리 실행")
                 trading_state = end_of_day_candidate_management(trading_state)
@@ -8401,6 +8460,7 @@ def main():
             # 🆕 ===== 새로운 코드 삽입 끝 =====
 
             # 장 시작 알림 (Config 사용)
+            profiler.phase('report')
             if is_market_open and not market_open_notified:
                 msg = f"🔔 장 시작!\n"
                 msg += get_budget_info_message()
@@ -8436,10 +8496,12 @@ def main():
                     daily_report_sent = True
                
                 logger.info("장 시간 외입니다.")
+                profiler.phase('sleep')
                 time.sleep(300)  # 5분 대기
                 continue
 
             # 🆕 미체결 주문 지연 체결 확인 및 자동 관리 (5분마다)
+            profiler.phase('pending_orders')
             if (now - last_pending_check).total_seconds() >= 180:
                 logger.info("🔍 지연 체결 확인 및 미체결 주문 자동 관리 실행")
                 
@@ -8456,11 +8518,13 @@ def main():
             trading_state = check_delayed_executions(trading_state)
 
             # 포지션 관리 (매도 신호 체크)
+            profiler.phase('positions')
             logger.info("=== 타겟 종목 포지션 관리 ===")
             trading_state = process_positions(trading_state)
             save_trading_state(trading_state)
 
             # 🎯 분봉 타이밍 사용시에만 매수 대기 후보 관리
+            profiler.phase('buy_candidates')
             if hasattr(trading_config, 'use_intraday_timing') and trading_config.use_intraday_timing:
                 trading_state = process_buy_candidates(trading_state)
                 save_trading_state(trading_state)
@@ -8468,14 +8532,17 @@ def main():
             # 새로운 매수 기회 스캔 (15시 이전까지만)
             if now.hour < 15:
                 logger.info("=== 타겟 종목 매수 기회 스캔 ===")
+                profiler.phase('scan')
                 buy_opportunities = scan_target_stocks(trading_state)
 
                 if buy_opportunities:
                     # 매수 실행
+                    profiler.phase('buy')
                     trading_state = execute_buy_opportunities(buy_opportunities, trading_state)
                     save_trading_state(trading_state)
             
             # 1시간마다 타겟 종목 현황 보고
+            profiler.phase('report')
             if (now - last_status_report).seconds >= 3600:
                 send_target_stock_status()
                 
@@ -8499,13 +8566,19 @@ def main():
                 check_interval = getattr(trading_config, 'intraday_check_interval', 10)
             else:
                 check_interval = 30  # 기존 주기
+            
+            # 상태 저널 미반영분 fsync
+            get_trading_state_store().flush()
+            api_limiter.log_stats()
                 
+            profiler.phase('sleep')
             time.sleep(check_interval)
 
         except Exception as e:
             error_msg = f"⚠️ 메인 루프 에러: {str(e)}"
             logger.error(error_msg)
             discord_alert.SendMessage(error_msg)
+            profiler.phase('error_sleep')
             time.sleep(60)  # 에러 발생 시 1분 대기
 
 if __name__ == "__main__":
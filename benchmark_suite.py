@@ -0,0 +1,537 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+지표/스캐너/백테스트 성능 벤치마크 (benchmark_suite.py)
+- bb_backtest의 합성 OHLCV 생성기(generate_sample_ohlcv_data, generate_realistic_sample_data)로 데이터 생성
+- 대상: TechnicalIndicators 함수, KIS_Common.Get* 지표 헬퍼, GetOhlcvNew 응답 파싱,
+  VolumeBacktestingEngine 신호 스캔/run_backtest, AccurateBacktest.run_backtest, GoldTradingBacktest.run_backtest
+- 데이터 크기(일봉 개수)별로 측정하고 결과를 JSON으로 저장 → 커밋 간 회귀 비교
+
+사용 예:
+    PYTHONHASHSEED=0 python benchmark_suite.py --sizes 250 1000 2500
+    PYTHONHASHSEED=0 python benchmark_suite.py --compare backtest_results/benchmarks/benchmark_abc1234_20250101_090000.json
+
+생성기는 hash(종목코드)로 시드를 정하므로 PYTHONHASHSEED를 고정해야 실행 간 같은 데이터가 만들어진다.
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import contextlib
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Optional
+
+from backtest_replay import ReplayClock, ReplayTime, replaced_attributes
+
+################################### 설정 ##################################
+
+BENCHMARK_DIR = os.path.join("backtest_results", "benchmarks")
+DEFAULT_SIZES = [250, 1000, 2500]
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.2      # 기준 대비 20% 이상 느려지면 회귀로 판정
+SYNTHETIC_END_DATE = "2024-12-31"
+VOLUME_STOCK_COUNT = 10
+OHLCV_PAGE_SIZE = 100        # KIS 일봉 API 한 페이지 행 수
+
+BENCHMARK_GROUPS = [
+    "technical_indicators",
+    "common_indicators",
+    "ohlcv_parsing",
+    "volume_signal_scan",
+    "volume_backtest",
+    "accurate_backtest",
+    "gold_backtest",
+]
+
+################################### 합성 데이터 ##################################
+
+def synthetic_date_range(bars: int, end_date: str = SYNTHETIC_END_DATE):
+    """일봉 bars개에 해당하는 (시작일, 종료일) 문자열"""
+    start = pd.bdate_range(end=end_date, periods=bars)[0]
+    return start.strftime('%Y-%m-%d'), end_date
+
+def make_sample_ohlcv(stock_code: str, bars: int) -> pd.DataFrame:
+    """bb_backtest.generate_sample_ohlcv_data로 일봉 bars개 생성 (open/high/low/close/volume, DatetimeIndex)"""
+    import bb_backtest
+    start_date, end_date = synthetic_date_range(bars)
+    with quiet_output():
+        return bb_backtest.generate_sample_ohlcv_data(stock_code, start_date, end_date)
+
+class SyntheticDailyStore:
+    """BacktestDataStore 대체 - get_daily()가 합성 일봉을 반환 (VolumeBacktestingEngine 데이터 로드용)"""
+
+    def __init__(self, bars: int):
+        self.bars = bars
+
+    def get_daily(self, stock_code, days=None, start_date=None):
+        return make_sample_ohlcv(stock_code, self.bars)
+
+    def has_cache(self, stock_code):
+        return True
+
+################################### GetOhlcvNew 응답 재현 ##################################
+
+class FakeResponse:
+    """requests.Response 대체 (status_code, json(), text)"""
+
+    def __init__(self, payload: Dict):
+        self.status_code = 200
+        self._payload = payload
+        self.text = ""
+
+    def json(self):
+        return self._payload
+
+class FakeDailyChartServer:
+    """KIS 일별 시세(inquire-daily-itemchartprice) 페이지 응답 재현
+
+    FID_INPUT_DATE_2(종료일) 이전 일봉을 최신순으로 최대 OHLCV_PAGE_SIZE개씩 돌려준다.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        rows = []
+        for date, row in df.iloc[::-1].iterrows():
+            rows.append({
+                'stck_bsop_date': date.strftime('%Y%m%d'),
+                'stck_oprc': str(int(row['open'])),
+                'stck_hgpr': str(int(row['high'])),
+                'stck_lwpr': str(int(row['low'])),
+                'stck_clpr': str(int(row['close'])),
+                'acml_vol': str(int(row['volume'])),
+                'acml_tr_pbmn': str(int(row['volume'] * row['close'])),
+            })
+        self.rows = rows
+        self.dates = [row['stck_bsop_date'] for row in rows]
+        self.last_date = self.dates[0] if self.dates else "20000101"
+        self.calls = 0
+
+    def get(self, url, headers=None, params=None):
+        self.calls += 1
+        end = params["FID_INPUT_DATE_2"]
+        # 최신순 정렬이므로 종료일 이하 첫 위치부터 한 페이지
+        first = next((i for i, d in enumerate(self.dates) if d <= end), len(self.dates))
+        return FakeResponse({'rt_cd': '0', 'output2': self.rows[first:first + OHLCV_PAGE_SIZE]})
+
+class FakeCommon:
+    """GetOhlcvNew가 쓰는 KIS_Common 함수 대체 (토큰/URL 고정, 날짜 계산은 원본 사용)"""
+
+    def __init__(self, common_module, now_date: str):
+        self._common = common_module
+        self._now_date = now_date
+
+    def GetNowDist(self):
+        return "REAL"
+
+    def GetUrlBase(self, dist):
+        return "https://benchmark.local"
+
+    def GetToken(self, dist):
+        return "token"
+
+    def GetAppKey(self, dist):
+        return "app_key"
+
+    def GetAppSecret(self, dist):
+        return "app_secret"
+
+    def GetNowDateStr(self, area="KR", type="NONE"):
+        return self._now_date
+
+    def __getattr__(self, name):
+        return getattr(self._common, name)
+
+################################### 측정 ##################################
+
+def measure(func: Callable, repeat: int = DEFAULT_REPEAT, setup: Optional[Callable] = None, warmup: int = 1) -> Dict:
+    """func 실행 시간 측정 (ms) - setup()의 반환값을 인자로 넘기며 setup 시간은 제외"""
+    timings = []
+    last_result = None
+    for i in range(warmup + repeat):
+        args = setup() if setup else None
+        started = time.perf_counter()
+        last_result = func(args) if setup else func()
+        elapsed = (time.perf_counter() - started) * 1000
+        if i >= warmup:
+            timings.append(elapsed)
+
+    return {
+        'median_ms': round(statistics.median(timings), 4),
+        'min_ms': round(min(timings), 4),
+        'max_ms': round(max(timings), 4),
+        'mean_ms': round(statistics.fmean(timings), 4),
+        'repeat': repeat,
+        'last_result': last_result
+    }
+
+@contextlib.contextmanager
+def quiet_output():
+    """측정 중 로그/print 출력 억제 (출력 비용이 측정값에 섞이지 않도록)"""
+    previous_level = logging.root.manager.disable
+    logging.disable(logging.CRITICAL)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(previous_level)
+
+def get_git_commit() -> str:
+    """현재 커밋 해시 (git 저장소가 아니면 'unknown')"""
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=repo_dir,
+                                capture_output=True, text=True, timeout=10)
+        if commit.returncode != 0:
+            return "unknown"
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo_dir,
+                               capture_output=True, text=True, timeout=30)
+        return commit.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+    except Exception:
+        return "unknown"
+
+################################### 벤치마크 스위트 ##################################
+
+class BenchmarkSuite:
+    """합성 데이터 기반 성능 벤치마크 실행기
+
+    Args:
+        sizes: 측정할 데이터 크기 목록 (일봉 개수)
+        repeat: 크기별 반복 측정 횟수 (중앙값 사용)
+        groups: 실행할 그룹 (None이면 BENCHMARK_GROUPS 전체)
+    """
+
+    def __init__(self, sizes: List[int] = None, repeat: int = DEFAULT_REPEAT, groups: List[str] = None):
+        self.sizes = sorted(sizes or DEFAULT_SIZES)
+        self.repeat = repeat
+        self.groups = groups or list(BENCHMARK_GROUPS)
+        self.results = []
+        self.skipped = {}
+
+    def record(self, group: str, name: str, size: int, stats: Dict, **extra):
+        """측정 결과 1건 기록 (last_result는 JSON에 넣지 않음)"""
+        entry = {'group': group, 'name': name, 'size': size}
+        entry.update({k: v for k, v in stats.items() if k != 'last_result'})
+        entry.update(extra)
+        self.results.append(entry)
+        print(f"  ⏱️ {group}.{name} [{size}] {entry['median_ms']:,.2f}ms (min {entry['min_ms']:,.2f})")
+
+    def run(self) -> Dict:
+        """선택된 그룹 전체 실행 후 결과 dict 반환"""
+        print(f"🚀 벤치마크 시작 - 크기: {self.sizes}, 반복: {self.repeat}회")
+        started = time.perf_counter()
+
+        for group in self.groups:
+            print(f"\n📊 {group}")
+            try:
+                getattr(self, f"bench_{group}")()
+            except ImportError as e:
+                self.skipped[group] = f"모듈 없음: {e}"
+                print(f"  ⚠️ 건너뜀 ({self.skipped[group]})")
+            except Exception as e:
+                self.skipped[group] = f"실행 오류: {e}"
+                print(f"  ❌ 실패 ({self.skipped[group]})")
+
+        elapsed = time.perf_counter() - started
+        print(f"\n✅ 벤치마크 완료 - {len(self.results)}건, {elapsed:.1f}초")
+        return self.to_dict()
+
+    def to_dict(self) -> Dict:
+        return {
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'git_commit': get_git_commit(),
+            'environment': {
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'pythonhashseed': os.environ.get('PYTHONHASHSEED', 'random'),
+            },
+            'sizes': self.sizes,
+            'repeat': self.repeat,
+            'results': self.results,
+            'skipped': self.skipped,
+        }
+
+    def save(self, path: Optional[str] = None, data: Optional[Dict] = None) -> str:
+        """결과 JSON 저장 (기본: backtest_results/benchmarks/benchmark_<커밋>_<시각>.json)"""
+        data = data or self.to_dict()
+        if path is None:
+            os.makedirs(BENCHMARK_DIR, exist_ok=True)
+            stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+            path = os.path.join(BENCHMARK_DIR, f"benchmark_{data['git_commit']}_{stamp}.json")
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+        print(f"💾 벤치마크 결과 저장: {path}")
+        return path
+
+    ################################### 지표 ##################################
+
+    def bench_technical_indicators(self):
+        """technical_analysis.TechnicalIndicators 함수별 측정"""
+        from technical_analysis import TechnicalIndicators as TI
+
+        cases = {
+            'calculate_atr': lambda df: TI.calculate_atr(df),
+            'calculate_rsi': lambda df: TI.calculate_rsi(df),
+            'calculate_macd': lambda df: TI.calculate_macd(df),
+            'calculate_bollinger_bands': lambda df: TI.calculate_bollinger_bands(df),
+            'calculate_stochastic': lambda df: TI.calculate_stochastic(df),
+            'calculate_momentum': lambda df: TI.calculate_momentum(df),
+            'is_golden_cross': lambda df: TI.is_golden_cross(df),
+            'is_death_cross': lambda df: TI.is_death_cross(df),
+            'detect_support_resistance': lambda df: TI.detect_support_resistance(df),
+        }
+
+        for size in self.sizes:
+            df = make_sample_ohlcv("005930", size)
+            for name, func in cases.items():
+                with quiet_output():
+                    stats = measure(lambda: func(df), self.repeat)
+                self.record("technical_indicators", name, size, stats)
+
+    def bench_common_indicators(self):
+        """KIS_Common.Get* 지표 헬퍼 측정 (GetMACD는 입력에 컬럼을 추가하므로 매번 복사본 사용)"""
+        import KIS_Common as Common
+
+        cases = {
+            'GetMA': (lambda df: Common.GetMA(df, 20, -1), False),
+            'GetRSI': (lambda df: Common.GetRSI(df, 14, -1), False),
+            'GetBB': (lambda df: Common.GetBB(df, 20, -1), False),
+            'GetMACD': (lambda df: Common.GetMACD(df, -1), True),
+            'GetStoch': (lambda df: Common.GetStoch(df, 14, -1), False),
+        }
+
+        for size in self.sizes:
+            df = make_sample_ohlcv("005930", size)
+            for name, (func, mutates) in cases.items():
+                with quiet_output():
+                    if mutates:
+                        stats = measure(func, self.repeat, setup=df.copy)
+                    else:
+                        stats = measure(lambda: func(df), self.repeat)
+                self.record("common_indicators", name, size, stats)
+
+    ################################### API 응답 파싱 ##################################
+
+    def bench_ohlcv_parsing(self):
+        """KisKR.GetOhlcvNew 페이지 응답 파싱 측정 (requests/time/Common을 가짜 서버로 교체, 네트워크 없음)"""
+        import KIS_Common as Common
+        import KIS_API_Helper_KR as KisKR
+
+        for size in self.sizes:
+            df = make_sample_ohlcv("005930", size)
+            server = FakeDailyChartServer(df)
+            replacements = {
+                'requests': server,
+                'time': ReplayTime(ReplayClock()),
+                'Common': FakeCommon(Common, server.last_date),
+                'logger': logging.getLogger('benchmark_suite.ohlcv'),
+            }
+
+            with replaced_attributes(KisKR, replacements), quiet_output():
+                stats = measure(lambda: KisKR.GetOhlcvNew("005930", "D", size), self.repeat)
+
+            parsed = stats['last_result']
+            self.record("ohlcv_parsing", "GetOhlcvNew", size, stats,
+                        rows=0 if parsed is None else len(parsed),
+                        pages=server.calls // (self.repeat + 1))
+
+    ################################### 거래량 백테스트 ##################################
+
+    def _load_volume_data(self, size: int):
+        """VolumeBacktestingEngine.load_stock_data로 합성 데이터 로드 (지표 계산은 엔진 코드 그대로)"""
+        import VolumeBacktestingEngine as vbe
+
+        stock_list = [f"{100000 + i * 1111:06d}" for i in range(VOLUME_STOCK_COUNT)]
+        with replaced_attributes(vbe, {'get_default_store': lambda: SyntheticDailyStore(size)}), quiet_output():
+            stock_data_dict = vbe.VolumeBacktestingEngine().load_stock_data(stock_list)
+        return vbe, stock_list, stock_data_dict
+
+    def bench_volume_signal_scan(self):
+        """VolumeBacktestingEngine.build_price_panel (전 종목 패턴 신호 스캔) 측정"""
+        for size in self.sizes:
+            vbe, stock_list, stock_data_dict = self._load_volume_data(size)
+            engine = vbe.VolumeBacktestingEngine()
+
+            with quiet_output():
+                stats = measure(lambda: engine.build_price_panel(stock_data_dict), self.repeat)
+
+            self.record("volume_signal_scan", "build_price_panel", size, stats, stocks=len(stock_data_dict))
+
+    def bench_volume_backtest(self):
+        """VolumeBacktestingEngine.run_backtest 측정 (데이터 로드 제외)"""
+        for size in self.sizes:
+            vbe, stock_list, stock_data_dict = self._load_volume_data(size)
+            start_date, end_date = synthetic_date_range(size)
+            start_dt = datetime.datetime.strptime(start_date, '%Y-%m-%d')
+            end_dt = datetime.datetime.strptime(end_date, '%Y-%m-%d')
+
+            def run(engine):
+                engine.run_backtest(stock_list, start_dt, end_dt, stock_data_dict=stock_data_dict)
+                return engine
+
+            with quiet_output():
+                stats = measure(run, self.repeat, setup=vbe.VolumeBacktestingEngine)
+
+            engine = stats['last_result']
+            self.record("volume_backtest", "run_backtest", size, stats,
+                        stocks=len(stock_data_dict), trades=len(engine.trade_history))
+
+    ################################### bb_trading 백테스트 ##################################
+
+    def bench_accurate_backtest(self):
+        """bb_backtest.AccurateBacktest.run_backtest 측정 (generate_realistic_sample_data 데이터)"""
+        import bb_backtest
+
+        for size in self.sizes:
+            start_date, end_date = synthetic_date_range(size)
+
+            with quiet_output():
+                backtest = bb_backtest.AccurateBacktest()
+                stock_data_dict = {}
+                for stock_code, config in backtest.trading_config.target_stocks.items():
+                    df = backtest.generate_realistic_sample_data(stock_code, config.get('name', stock_code),
+                                                                 start_date, end_date)
+                    if not df.empty:
+                        stock_data_dict[stock_code] = df
+
+            if not stock_data_dict:
+                raise ValueError("generate_realistic_sample_data 합성 데이터 생성 실패")
+
+            def run(backtest):
+                backtest.run_backtest(start_date, end_date, stock_data_dict=stock_data_dict, verbose=False)
+                return backtest
+
+            with quiet_output():
+                stats = measure(run, self.repeat, setup=bb_backtest.AccurateBacktest)
+
+            backtest = stats['last_result']
+            self.record("accurate_backtest", "run_backtest", size, stats,
+                        stocks=len(stock_data_dict), trades=len(backtest.trade_history))
+
+    ################################### 골드 백테스트 ##################################
+
+    def bench_gold_backtest(self):
+        """GoldBacktesting_KR.GoldTradingBacktest.run_backtest 측정 (API 초기화 없이 합성 데이터 주입)"""
+        import GoldBacktesting_KR as gold
+
+        for size in self.sizes:
+            with quiet_output():
+                template = gold.GoldTradingBacktest(init_api=False)
+                price_data = {}
+                for stock_code in template.portfolio_config.keys():
+                    df = make_sample_ohlcv(stock_code, size)
+                    df = df.rename(columns={'open': 'Open', 'high': 'High', 'low': 'Low',
+                                            'close': 'Close', 'volume': 'Volume'})
+                    price_data[stock_code] = template.calculate_technical_indicators(df)
+
+                def setup():
+                    backtest = gold.GoldTradingBacktest(init_api=False)
+                    backtest.price_data = dict(price_data)
+                    return backtest
+
+                def run(backtest):
+                    backtest.run_backtest(verbose=False)
+                    return backtest
+
+                stats = measure(run, self.repeat, setup=setup)
+
+            backtest = stats['last_result']
+            self.record("gold_backtest", "run_backtest", size, stats,
+                        stocks=len(price_data), trades=len(backtest.trades))
+
+################################### 회귀 비교 ##################################
+
+def load_benchmark(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def compare_benchmarks(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """두 벤치마크 결과를 (group, name, size) 기준으로 비교
+
+    status: regression(기준 대비 threshold 이상 느림) / improved(threshold 이상 빠름) / ok / new / missing
+    """
+    def keyed(data):
+        return {(r['group'], r['name'], r['size']): r for r in data.get('results', [])}
+
+    base_map, current_map = keyed(baseline), keyed(current)
+    rows = []
+
+    for key in sorted(set(base_map) | set(current_map)):
+        base, cur = base_map.get(key), current_map.get(key)
+        row = {'group': key[0], 'name': key[1], 'size': key[2],
+               'baseline_ms': base['median_ms'] if base else None,
+               'current_ms': cur['median_ms'] if cur else None,
+               'ratio': None}
+
+        if base is None:
+            row['status'] = 'new'
+        elif cur is None:
+            row['status'] = 'missing'
+        else:
+            ratio = cur['median_ms'] / base['median_ms'] if base['median_ms'] > 0 else float('inf')
+            row['ratio'] = round(ratio, 3)
+            if ratio > 1 + threshold:
+                row['status'] = 'regression'
+            elif ratio < 1 - threshold:
+                row['status'] = 'improved'
+            else:
+                row['status'] = 'ok'
+        rows.append(row)
+
+    return rows
+
+def print_comparison(rows: List[Dict], baseline: Dict, current: Dict):
+    """비교 결과 출력"""
+    status_icons = {'regression': '🔴', 'improved': '🟢', 'ok': '⚪', 'new': '🆕', 'missing': '❔'}
+
+    print(f"\n{'=' * 80}")
+    print(f"📈 벤치마크 비교: {baseline.get('git_commit')} → {current.get('git_commit')}")
+    print(f"{'=' * 80}")
+
+    for row in rows:
+        base_str = f"{row['baseline_ms']:,.2f}" if row['baseline_ms'] is not None else "-"
+        cur_str = f"{row['current_ms']:,.2f}" if row['current_ms'] is not None else "-"
+        ratio_str = f"x{row['ratio']:.2f}" if row['ratio'] is not None else ""
+        print(f"{status_icons[row['status']]} {row['group']}.{row['name']} [{row['size']}] "
+              f"{base_str}ms → {cur_str}ms {ratio_str}")
+
+    regressions = [row for row in rows if row['status'] == 'regression']
+    print(f"\n회귀 {len(regressions)}건 / 전체 {len(rows)}건")
+
+################################### 실행 ##################################
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 데이터 기반 지표/스캐너/백테스트 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="데이터 크기 (일봉 개수)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="반복 측정 횟수")
+    parser.add_argument("--groups", nargs="+", choices=BENCHMARK_GROUPS, help="실행할 벤치마크 그룹")
+    parser.add_argument("--output", help="결과 JSON 경로")
+    parser.add_argument("--compare", help="비교 기준 벤치마크 JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="회귀 판정 비율 (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    suite = BenchmarkSuite(sizes=args.sizes, repeat=args.repeat, groups=args.groups)
+    current = suite.run()
+    suite.save(args.output, current)
+
+    if args.compare:
+        baseline = load_benchmark(args.compare)
+        rows = compare_benchmarks(baseline, current, args.threshold)
+        print_comparison(rows, baseline, current)
+        if any(row['status'] == 'regression' for row in rows):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+당일 인식 일봉 메모 (daily_bar_memo.py)
+- 완료된 일봉(오늘 이전)은 종목별로 하루 한 번만 조회하고, 오늘 봉은 현재가 시세(시가/고가/저가/현재가/누적거래량)로만 갱신
+- 완료 구간의 지표(RSI, 볼린저밴드, MACD, ATR, 이동평균)는 한 번 계산해 두고 오늘 봉 값만 이어서 계산
+- day_trading.get_stock_data / bb_trading.get_stock_data가 평가마다 일봉+현재가를 다시 조회하던 것을 시세 1회 조회로 대체
+- 지표 컬럼 이름은 bb_trading 기준: RSI, MACD, Signal, Histogram, MiddleBand, UpperBand, LowerBand, ATR, MA{기간}
+"""
+
+import datetime
+import logging
+import threading
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+def set_logger(external_logger):
+    """외부 로거를 설정하는 함수"""
+    global logger
+    logger = external_logger
+
+################################### 지표 계산 ##################################
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    # 평균 손실 0은 0.00001로 대체 (TechnicalIndicators.calculate_rsi와 동일)
+    return 100 - (100 / (1 + avg_gain / np.where(avg_loss != 0, avg_loss, 0.00001)))
+
+def _ema_step(previous: float, value: float, span: int) -> float:
+    # ewm(span, adjust=False)의 한 단계: y_t = (1 - a) * y_(t-1) + a * x_t
+    alpha = 2.0 / (span + 1)
+    return (1 - alpha) * previous + alpha * value
+
+def _window_mean(values: np.ndarray, window: int) -> float:
+    return float(values[-window:].mean()) if len(values) >= window else np.nan
+
+class IndicatorSettings:
+    """메모가 계산하는 지표 기간 설정"""
+
+    def __init__(self, rsi_period: int = 14, macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9,
+                 bb_period: int = 20, bb_std: float = 2.0, atr_period: int = 14,
+                 ma_windows: Sequence[int] = (5, 20, 60)):
+        self.rsi_period = rsi_period
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal = macd_signal
+        self.bb_period = bb_period
+        self.bb_std = bb_std
+        self.atr_period = atr_period
+        self.ma_windows = tuple(ma_windows)
+
+    def key(self) -> Tuple:
+        return (self.rsi_period, self.macd_fast, self.macd_slow, self.macd_signal,
+                self.bb_period, self.bb_std, self.atr_period, self.ma_windows)
+
+def add_indicators(df: pd.DataFrame, settings: IndicatorSettings) -> Dict[str, np.ndarray]:
+    """df 전체에 지표 컬럼을 추가하고 오늘 봉을 이어서 계산할 중간값(gain/loss/TR, EMA 끝값) 반환"""
+    close = df['close'].astype(float)
+    high = df['high'].astype(float)
+    low = df['low'].astype(float)
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    avg_gain = gain.rolling(window=settings.rsi_period).mean()
+    avg_loss = loss.rolling(window=settings.rsi_period).mean()
+    df['RSI'] = 100 - (100 / (1 + avg_gain / avg_loss.where(avg_loss != 0, 0.00001)))
+
+    ema_fast = close.ewm(span=settings.macd_fast, adjust=False).mean()
+    ema_slow = close.ewm(span=settings.macd_slow, adjust=False).mean()
+    macd = ema_fast - ema_slow
+    signal = macd.ewm(span=settings.macd_signal, adjust=False).mean()
+    df['MACD'] = macd
+    df['Signal'] = signal
+    df['Histogram'] = macd - signal
+
+    middle = close.rolling(window=settings.bb_period).mean()
+    std = close.rolling(window=settings.bb_period).std()
+    df['MiddleBand'] = middle
+    df['UpperBand'] = middle + std * settings.bb_std
+    df['LowerBand'] = middle - std * settings.bb_std
+
+    true_range = pd.concat([(high - low).abs(), (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1).max(axis=1)
+    df['ATR'] = true_range.rolling(window=settings.atr_period).mean()
+
+    for window in settings.ma_windows:
+        df[f"MA{window}"] = close.rolling(window=window).mean()
+
+    return {
+        'close': close.to_numpy(),
+        'gain': gain.to_numpy(),
+        'loss': loss.to_numpy(),
+        'true_range': true_range.to_numpy(),
+        'ema_fast': float(ema_fast.iloc[-1]),
+        'ema_slow': float(ema_slow.iloc[-1]),
+        'signal': float(signal.iloc[-1])
+    }
+
+def next_indicator_row(state: Dict[str, np.ndarray], bar: Dict[str, float], settings: IndicatorSettings) -> Dict[str, float]:
+    """완료 구간 중간값(state)에 오늘 봉(bar) 하나를 이어 붙인 지표 값 (전체 재계산과 같은 값)"""
+    close = float(bar['close'])
+    high = float(bar['high'])
+    low = float(bar['low'])
+    closes = np.append(state['close'], close)
+    prev_close = state['close'][-1]
+
+    delta = close - prev_close
+    true_range = max(abs(high - low), abs(high - prev_close), abs(low - prev_close))
+    ema_fast = _ema_step(state['ema_fast'], close, settings.macd_fast)
+    ema_slow = _ema_step(state['ema_slow'], close, settings.macd_slow)
+    macd = ema_fast - ema_slow
+    signal = _ema_step(state['signal'], macd, settings.macd_signal)
+
+    gains = np.append(state['gain'], delta if delta > 0 else 0)
+    losses = np.append(state['loss'], -delta if delta < 0 else 0)
+    avg_gain = _window_mean(gains, settings.rsi_period)
+    avg_loss = _window_mean(losses, settings.rsi_period)
+    rsi = float(_rsi_from_averages(avg_gain, avg_loss)) if not np.isnan(avg_gain) else np.nan
+
+    if len(closes) >= settings.bb_period:
+        window = closes[-settings.bb_period:]
+        middle = float(window.mean())
+        std = float(window.std(ddof=1))
+    else:
+        middle = std = np.nan
+
+    row = {
+        'RSI': rsi,
+        'MACD': macd,
+        'Signal': signal,
+        'Histogram': macd - signal,
+        'MiddleBand': middle,
+        'UpperBand': middle + std * settings.bb_std,
+        'LowerBand': middle - std * settings.bb_std,
+        'ATR': _window_mean(np.append(state['true_range'], true_range), settings.atr_period)
+    }
+    for window in settings.ma_windows:
+        row[f"MA{window}"] = _window_mean(closes, window)
+    return row
+
+################################### 일봉 메모 ##################################
+
+class DailyBarMemo:
+    """종목별 완료 일봉 + 오늘 봉 메모
+
+    Args:
+        count: 반환할 일봉 개수 (오늘 봉 포함 여부와 상관없이 같은 개수, 기존 GetOhlcv 조회 개수와 동일하게 지정)
+        history_fetcher: (stock_code, count) -> 일봉 DataFrame (count + 1개 조회, 오늘 진행 중인 봉이 있으면 제외하고 사용)
+        quote_fetcher: stock_code -> {'open', 'high', 'low', 'close', 'volume'[, 'value', 'date']} (KisKR.GetCurrentQuote 형식)
+            'date'(시세의 거래일)가 없으면 시세가 마지막 완료 일봉과 같을 때 이전 거래일 시세로 판단
+        clock: 현재 시각 함수 (날짜가 바뀌면 완료 일봉을 다시 조회, 백테스트 재생 시각 연동용)
+        settings: 지표 기간 설정
+    """
+
+    def __init__(self, count: int, history_fetcher: Callable, quote_fetcher: Callable,
+                 clock: Optional[Callable] = None, settings: Optional[IndicatorSettings] = None):
+        self.count = count
+        self.history_fetcher = history_fetcher
+        self.quote_fetcher = quote_fetcher
+        self.clock = clock or datetime.datetime.now
+        self.settings = settings or IndicatorSettings()
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._code_locks = {}
+        self.history_loads = 0
+        self.quote_requests = 0
+
+    def get(self, stock_code: str, quote: Optional[Dict] = None) -> Tuple[Optional[pd.DataFrame], Optional[Dict]]:
+        """(지표 컬럼 포함 일봉, 시세) 반환
+
+        - 시세 거래량이 0이거나 시세 거래일이 마지막 완료 일봉 이후가 아니면(장 시작 전, 휴장일) 오늘 봉 없이 완료 일봉만 반환
+        - 오늘 봉이 있으면 완료 일봉 count - 1개 + 오늘 봉, 없으면 완료 일봉 count개 (MA60 등 count개가 필요한 지표 유지)
+        - 완료 일봉 조회 실패 시 (None, None), 시세 조회 실패 시 (완료 일봉, None)
+        - quote를 넘기면 시세를 다시 조회하지 않음
+        """
+        entry = self._entry(stock_code)
+        if entry is None:
+            return None, None
+
+        if quote is None:
+            self.quote_requests += 1
+            quote = self.quote_fetcher(stock_code)
+        if not isinstance(quote, dict) or not quote.get('close'):
+            logger.error(f"{stock_code}: 현재 시세 조회 실패 ({quote})")
+            return entry['frame'].copy(), None
+
+        if not quote.get('volume') or not self._is_new_session(entry, quote):
+            return entry['frame'].copy(), quote
+        return self._with_today(entry, quote), quote
+
+    def clear(self, stock_code: Optional[str] = None):
+        """완료 일봉 메모 삭제 (None이면 전체)"""
+        with self._lock:
+            if stock_code is None:
+                self._entries.clear()
+                self._code_locks.clear()
+            else:
+                self._entries.pop(stock_code, None)
+                self._code_locks.pop(stock_code, None)
+
+    def _code_lock(self, stock_code: str) -> threading.Lock:
+        with self._lock:
+            code_lock = self._code_locks.get(stock_code)
+            if code_lock is None:
+                code_lock = self._code_locks[stock_code] = threading.Lock()
+            return code_lock
+
+    def _evict_before(self, today: pd.Timestamp):
+        # 날짜가 바뀐 메모와 종목 락은 같이 삭제 (스캔 종목이 계속 바뀌어도 당일 조회 종목만 유지)
+        for code in [code for code, entry in self._entries.items() if entry['date'] < today]:
+            code_lock = self._code_locks.get(code)
+            if code_lock is not None and code_lock.locked():
+                continue  # 지금 다시 조회 중인 종목은 조회가 끝나면 새 메모로 교체됨
+            del self._entries[code]
+            self._code_locks.pop(code, None)
+
+    def _is_new_session(self, entry: Dict, quote: Dict) -> bool:
+        """시세가 마지막 완료 일봉 이후 거래일의 시세인지 (휴장일/장 시작 전에는 직전 거래일 시세가 그대로 옴)"""
+        if quote.get('date') is not None:
+            return pd.Timestamp(quote['date']).normalize() > entry['last_bar_date']
+
+        # 거래일 정보가 없으면 마지막 완료 일봉과 시세 값이 모두 같을 때 이전 거래일 시세로 판단
+        last_bar = entry['frame'].iloc[-1]
+        for column in ('open', 'high', 'low', 'close', 'volume'):
+            if column not in last_bar.index or quote.get(column) is None:
+                return True
+            if float(quote[column]) != float(last_bar[column]):
+                return True
+        return False
+
+    def _entry(self, stock_code: str) -> Optional[Dict]:
+        today = pd.Timestamp(self.clock()).normalize()
+        entry = self._entries.get(stock_code)
+        if entry is not None and entry['date'] == today:
+            return entry
+
+        # 같은 종목 동시 조회는 한 번만 (다른 종목은 병렬)
+        code_lock = self._code_lock(stock_code)
+        with code_lock:
+            entry = self._entries.get(stock_code)
+            if entry is not None and entry['date'] == today:
+                return entry
+
+            self.history_loads += 1
+            # 오늘 봉 포함 여부를 모르므로 하나 더 조회 (오늘 봉이 빠져도 완료 일봉 count개 유지)
+            df = self.history_fetcher(stock_code, self.count + 1)
+            if df is None or len(df) == 0:
+                logger.error(f"{stock_code}: 일봉 데이터 조회 실패")
+                self._drop_lock(stock_code)
+                return None
+
+            dates = pd.to_datetime(df.index, errors='coerce')
+            is_completed = np.asarray(dates < today)
+            completed = df[is_completed].tail(self.count).copy()
+            if completed.empty:
+                logger.error(f"{stock_code}: 완료된 일봉 없음")
+                self._drop_lock(stock_code)
+                return None
+
+            state = add_indicators(completed, self.settings)
+            entry = {
+                'date': today,
+                'frame': completed,
+                'state': state,
+                'last_bar_date': pd.Timestamp(dates[is_completed][-1]).normalize(),
+                'index_label': today if isinstance(completed.index, pd.DatetimeIndex) else today.strftime('%Y-%m-%d')
+            }
+            with self._lock:
+                self._evict_before(today)
+                self._entries[stock_code] = entry
+            return entry
+
+    def _drop_lock(self, stock_code: str):
+        # 조회 실패로 메모가 없는 종목의 락은 남기지 않음
+        with self._lock:
+            if stock_code not in self._entries:
+                self._code_locks.pop(stock_code, None)
+
+    def _with_today(self, entry: Dict, quote: Dict) -> pd.DataFrame:
+        prefix = entry['frame']
+        bar = {column: quote.get(column, np.nan) for column in ('open', 'high', 'low', 'close', 'volume', 'value')}
+        row = {column: np.nan for column in prefix.columns}
+        row.update({column: value for column, value in bar.items() if column in prefix.columns})
+        if 'change' in prefix.columns:
+            row['change'] = float(bar['close']) / float(prefix['close'].iloc[-1]) - 1
+        row.update(next_indicator_row(entry['state'], bar, self.settings))
+
+        today = pd.DataFrame([row], index=pd.Index([entry['index_label']], name=prefix.index.name), columns=prefix.columns)
+        # 시세에서 채운 정수 컬럼(거래량 등)은 기존 dtype 유지
+        for column, dtype in prefix.dtypes.items():
+            if pd.api.types.is_integer_dtype(dtype) and pd.notna(row[column]):
+                today[column] = today[column].astype(dtype)
+        return pd.concat([prefix.iloc[1:] if len(prefix) >= self.count else prefix, today])
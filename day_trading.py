@@ -4,6 +4,12 @@ import numpy as np
 import discord_alert
 import concurrent.futures
 import threading
+import queue
+import itertools
+import sys
+import heapq
+import hashlib
+from collections import OrderedDict, defaultdict
 
 import openai
 import urllib.request
@@ -21,6 +27,13 @@ from pykrx import stock
 
 import KIS_Common as Common
 import KIS_API_Helper_KR as KisKR
+import daily_bar_memo
+import global_rate_limiter
+import state_journal
+import order_fill_tracker
+import loop_profiler
+import news_store
+import momentum_batch
 
 
 ################################### 상수 정의 ##################################
@@ -63,6 +76,27 @@ MAX_STOCK_PRICE = 150000    # 최대 주가 제한
 MIN_DAILY_VOLUME = 10000  # 최소 일일 거래량
 MIN_PRICE_THRESHOLD = 2500 # 저가 종목 가격 제한
 
+# 단계별 스캔 파이프라인 설정 (스냅샷 → 일봉 → 분봉 → 매수조건/호가)
+SCAN_QUEUE_SIZE = 20      # 단계 사이 우선순위 큐 최대 크기
+SCAN_STAGE_WORKERS = {'daily': 3, 'minute': 3, 'order_book': 2}  # 단계별 작업 스레드 수
+SCAN_SLOT_OVERPROVISION = 5   # 남은 매수 가능 종목 수 × 이 배수만큼 선정되면 스캔 조기 종료 (매수 단계 필터에서 걸러질 종목 여유분)
+MOMENTUM_MACD_MAX_SCORE = 25  # 모멘텀 MACD 최대 점수 (분봉 확인으로 달라질 수 있는 최대 폭)
+SCAN_DAILY_SCORE_BATCH = 8    # 일봉 단계 모멘텀 점수 일괄 계산 단위 (종목 수)
+MOMENTUM_BATCH_PARITY_CHECK = False  # 일봉 단계 일괄 점수를 check_momentum_conditions 결과와 대조 (불일치 시 경고 로그)
+
+# 주문 체결 추적 설정
+FILL_POLL_INTERVAL = 2            # 미체결 주문 전체 주문내역/잔고 조회 간격 (초)
+FILL_WAIT_SERVICE_INTERVAL = 5    # 체결 대기 중 다른 보유 종목 트레일링 스탑 점검 간격 (초)
+
+# 메인 루프 구간 프로파일러 (LoopProfile_{BOT_NAME}.jsonl에 루프별 구간 시간/API 호출 수 기록)
+ENABLE_LOOP_PROFILER = False
+LOOP_PROFILER_SUMMARY_EVERY = 20  # 구간별 백분위 요약 로그 주기 (루프 수)
+
+# 뉴스 조회/분석 설정 (기사와 분석 결과는 NewsStore_{BOT_NAME}.json에 저장)
+NEWS_REFRESH_SECONDS = 3600       # 종목별 뉴스 재조회 간격 (초, 재시작해도 유지)
+NEWS_FETCH_WORKERS = 4            # 종목별 뉴스 동시 조회 스레드 수
+NAVER_NEWS_CALLS_PER_SECOND = 8   # 네이버 검색 API 초당 호출 수 (한도 10건)
+
 # 전일 고모멘텀 종목 최대 저장 기간
 HIGH_MOMENTUM_STORE_DAYS = 5  # 고모멘텀 종목 저장 기간 (일)
 HIGH_MOMENTUM_SCORE_THRESHOLD = 70  # 고모멘텀 점수 기준
@@ -129,10 +163,6 @@ HIGH_VOL_SELL_RATIO = 0.5         # 고변동성 매도 비율 (50%)
 # 분할매도 쿨다운 시간 (동일 종목 연속 분할매도 방지)
 FRACTIONAL_SELL_COOLDOWN = 20*60  # 20분 (초 단위)
 
-
-# 파일 상단(글로벌 변수 정의 부분)에 락 객체 추가 // 병렬처리 시 안정성 개선
-api_lock = threading.Lock()
-
 ################################### 로깅 처리 ##################################
 
 import logging
@@ -180,37 +210,202 @@ logger.addHandler(console_handler)
 # KIS_API_Helper_KR과 KIS_Common 모듈에 로거 전달
 KisKR.set_logger(logger)
 Common.set_logger(logger)
+daily_bar_memo.set_logger(logger)
+global_rate_limiter.set_logger(logger)
+state_journal.set_logger(logger)
+order_fill_tracker.set_logger(logger)
+loop_profiler.set_logger(logger)
+news_store.set_logger(logger)
+momentum_batch.set_logger(logger)
 
 
 ################################### 캐시 처리 ##################################
 
+# 네임스페이스별 기본 상한 (항목 수 / 추정 바이트)
+CACHE_MAX_ENTRIES = 1000
+CACHE_MAX_BYTES = None
+
+# 캐시 통계 로그 주기 (초)
+CACHE_STATS_LOG_INTERVAL = 600
+
+# @cached 실패(None 반환) 결과 캐시 시간 (초) - 같은 스캔 안에서 실패 종목을 반복 조회하지 않을 만큼만 짧게
+# (일시적 API 오류 하나로 다음 스캔까지 '데이터 없음'이 이어지지 않도록, 예외는 캐시하지 않음)
+NEGATIVE_CACHE_TTL = 5
+
+# 동일 키 선행 호출 대기 상한 (초) - 초과 시 직접 호출
+SINGLE_FLIGHT_TIMEOUT = 30
+
+# 캐시 키에 그대로 넣을 인자 문자열 최대 길이 (초과 시 해시)
+CACHE_KEY_MAX_PART = 128
+
+# 실패 결과 표시용 값 (CacheManager.get은 None으로 반환)
+_NEGATIVE = object()
+
+def cache_key_part(value):
+    """캐시 키 조각 - 스칼라는 str() 그대로, DataFrame/배열은 내용 해시, 긴 값은 다이제스트로 축약"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        text = str(value)
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        digest = int(pd.util.hash_pandas_object(value, index=True).sum()) if len(value) else 0
+        return f"{type(value).__name__}{value.shape}#{digest:x}"
+    elif isinstance(value, np.ndarray):
+        return f"ndarray{value.shape}#{hashlib.md5(np.ascontiguousarray(value).tobytes()).hexdigest()[:16]}"
+    elif isinstance(value, dict):
+        text = '{' + ','.join(f"{cache_key_part(k)}:{cache_key_part(v)}"
+                              for k, v in sorted(value.items(), key=lambda item: str(item[0]))) + '}'
+    elif isinstance(value, (list, tuple)):
+        text = '[' + ','.join(cache_key_part(item) for item in value) + ']'
+    else:
+        text = str(value)
+
+    if len(text) > CACHE_KEY_MAX_PART:
+        return f"#{hashlib.md5(text.encode('utf-8')).hexdigest()}"
+    return text
+
+def estimate_cache_size(value, _depth=0):
+    """캐시 값의 대략적인 메모리 크기 (바이트) - DataFrame/배열은 버퍼 크기, dict/list는 3단계까지 합산"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=False))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    size = sys.getsizeof(value)
+    if _depth >= 3:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_cache_size(k, _depth + 1) + estimate_cache_size(v, _depth + 1)
+                    for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(estimate_cache_size(item, _depth + 1) for item in value)
+    return size
+
 # TimedCache 클래스 정의
 class TimedCache:
-    def __init__(self, expiry_seconds=CACHE_EXPIRY):
-        self.cache = {}
+    """스레드 안전 LRU + TTL 캐시 (CacheManager 네임스페이스 1개)
+
+    - OrderedDict로 최근 사용 순서 유지, 항목 수/추정 바이트 상한을 넘으면 가장 오래 안 쓴 항목부터 제거
+    - 만료 시각은 최소 힙으로 관리해 만료된 항목만 꺼내 제거 (매 조회마다 전체 키를 훑지 않음)
+    - process_stock_chunk 스레드풀에서 동시에 접근하므로 모든 조작은 RLock 안에서 수행
+    - 만료 기준은 모듈 전역 time.time() (백테스트 재생 시각으로 교체 가능)
+    """
+
+    def __init__(self, expiry_seconds=CACHE_EXPIRY, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.cache = OrderedDict()  # {키: (값, 만료시각, 추정 바이트)}
         self.expiry = expiry_seconds
-        self._last_cleanup = time.time()
-        
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._heap = []  # (만료시각, 순번, 키) - 덮어쓴 항목의 예전 만료시각은 꺼낼 때 무시
+        self._sequence = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+
     def get(self, key):
-        self.cleanup()
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if time.time() - timestamp < self.expiry:
-                return data
-            del self.cache[key]
-        return None
-        
-    def set(self, key, value):
-        self.cache[key] = (value, time.time())
-        
+        with self._lock:
+            self._expire(time.time())
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        """값 저장 (ttl 생략 시 네임스페이스 기본 만료 시간, 단일 값이 max_bytes보다 크면 저장하지 않음)"""
+        size = estimate_cache_size(value)
+        with self._lock:
+            now = time.time()
+            self._remove(key)
+            if self.max_bytes and size > self.max_bytes:
+                self.rejected += 1
+                return
+
+            expires_at = now + (self.expiry if ttl is None else ttl)
+            self.cache[key] = (value, expires_at, size)
+            self.bytes += size
+            self._sequence += 1
+            heapq.heappush(self._heap, (expires_at, self._sequence, key))
+
+            self._expire(now)
+            self._evict()
+            if len(self._heap) > 2 * len(self.cache) + 64:
+                self._compact()
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+            self._heap.clear()
+            self.bytes = 0
+
     def cleanup(self):
-        current_time = time.time()
-        if current_time - self._last_cleanup >= 60:
-            expired_keys = [k for k, v in self.cache.items() 
-                          if current_time - v[1] >= self.expiry]
-            for k in expired_keys:
-                del self.cache[k]
-            self._last_cleanup = current_time
+        """만료 항목 제거 (get/set에서 자동 수행, 외부 호출 호환용)"""
+        with self._lock:
+            self._expire(time.time())
+
+    def __len__(self):
+        return len(self.cache)
+
+    def _remove(self, key):
+        entry = self.cache.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+        return entry
+
+    def _expire(self, now):
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self.cache.get(key)
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+                self.expirations += 1
+
+    def _evict(self):
+        while self.cache and ((self.max_entries and len(self.cache) > self.max_entries)
+                              or (self.max_bytes and self.bytes > self.max_bytes)):
+            _, (_, _, size) = self.cache.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def _compact(self):
+        """덮어쓰기/LRU 제거로 쌓인 무효 힙 항목 정리 (남은 항목은 기존 순번 유지 - 같은 만료시각은 저장 순서대로)"""
+        live = []
+        seen = set()
+        for item in self._heap:
+            expires_at, _, key = item
+            entry = self.cache.get(key)
+            if entry is not None and entry[1] == expires_at and key not in seen:
+                seen.add(key)
+                live.append(item)
+        heapq.heapify(live)
+        self._heap = live
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.cache),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'rejected': self.rejected,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'expiry': self.expiry
+            }
 
 # 캐시 관리자 클래스 정의 (싱글톤으로 구현)
 class CacheManager:
@@ -226,22 +421,28 @@ class CacheManager:
         if self._initialized:
             return
             
+        MB = 1024 * 1024
         self.caches = {
-            'volume_rank': TimedCache(expiry_seconds=60),    # 1분
-            'stock_data': TimedCache(expiry_seconds=60),     # 1분
-            'minute_data': TimedCache(expiry_seconds=60),    # 1분
-            'sector_info': TimedCache(expiry_seconds=3600),  # 1시간
-            'volume_data': TimedCache(expiry_seconds=300),   # 5분
-            'stock_list': TimedCache(expiry_seconds=300),    # 5분
-            'news_articles': TimedCache(expiry_seconds=3600),  # 1시간
-            'news_analysis': TimedCache(expiry_seconds=3600), # 1시간
+            'volume_rank': TimedCache(expiry_seconds=60, max_entries=50),    # 1분
+            'stock_data': TimedCache(expiry_seconds=60, max_entries=400, max_bytes=128 * MB),     # 1분 (일봉+분봉 DataFrame)
+            'minute_data': TimedCache(expiry_seconds=60, max_entries=400, max_bytes=64 * MB),    # 1분
+            'sector_info': TimedCache(expiry_seconds=3600, max_entries=2000),  # 1시간
+            'volume_data': TimedCache(expiry_seconds=300, max_entries=500, max_bytes=32 * MB),   # 5분
+            'stock_list': TimedCache(expiry_seconds=300, max_entries=20),    # 5분
+            'news_articles': TimedCache(expiry_seconds=3600, max_entries=500, max_bytes=16 * MB),  # 1시간
+            'news_analysis': TimedCache(expiry_seconds=3600, max_entries=500), # 1시간
             'order_book_history': TimedCache(expiry_seconds=60),  # 1분 동안 캐시            
-            'momentum_data': TimedCache(expiry_seconds=180),  # 3분 (180초) 만료
-            'discord_news_messages': TimedCache(expiry_seconds=3600),  # 1시간 (캐시 기간 조정 가능)
-            'discord_price_alerts': TimedCache(expiry_seconds=3600),    # 1시간 고점 알림용 새로운 캐시
-            'discord_loss_messages': TimedCache(expiry_seconds=3600),  # 1시간 (캐시 기간 조정 가능)
-            'discord_scan_messages': TimedCache(expiry_seconds=3600)  # 1시간 동안 중복 알림 방지
+            'momentum_data': TimedCache(expiry_seconds=180, max_entries=3000),  # 3분 (180초) 만료
+            'discord_news_messages': TimedCache(expiry_seconds=3600, max_entries=5000),  # 1시간 (캐시 기간 조정 가능)
+            'discord_price_alerts': TimedCache(expiry_seconds=3600, max_entries=5000),    # 1시간 고점 알림용 새로운 캐시
+            'discord_loss_messages': TimedCache(expiry_seconds=3600, max_entries=5000),  # 1시간 (캐시 기간 조정 가능)
+            'discord_scan_messages': TimedCache(expiry_seconds=3600, max_entries=5000)  # 1시간 동안 중복 알림 방지
         }
+        self._last_stats_log = time.time()
+        self._flights = {}  # {(캐시 종류, 키): Future} - 진행 중인 @cached 호출
+        self._flight_lock = threading.Lock()
+        self._flight_waits = defaultdict(int)
+        self._negative_hits = defaultdict(int)
         self._initialized = True
 
     @classmethod
@@ -251,40 +452,146 @@ class CacheManager:
         return cls._instance
 
     def get(self, cache_type, key):
+        found, value = self.lookup(cache_type, key)
+        return value
+
+    def lookup(self, cache_type, key):
+        """(적중 여부, 값) - 캐시된 실패 결과는 적중으로 보고 값은 None"""
+        if cache_type not in self.caches:
+            return False, None
+        value = self.caches[cache_type].get(key)
+        if value is _NEGATIVE:
+            self._negative_hits[cache_type] += 1
+            return True, None
+        return value is not None, value
+
+    def set(self, cache_type, key, value, ttl=None):
         if cache_type in self.caches:
-            return self.caches[cache_type].get(key)
-        return None
+            self.caches[cache_type].set(key, value, ttl)
 
-    def set(self, cache_type, key, value):
+    def set_negative(self, cache_type, key, ttl=NEGATIVE_CACHE_TTL):
+        """실패 결과 기록 (ttl 동안 lookup이 (True, None) 반환)"""
         if cache_type in self.caches:
-            self.caches[cache_type].set(key, value)
+            self.caches[cache_type].set(key, _NEGATIVE, ttl)
+
+    def delete(self, cache_type, key):
+        if cache_type in self.caches:
+            self.caches[cache_type].delete(key)
+
+    def begin_flight(self, cache_type, key):
+        """같은 키의 진행 중 호출 합류 → (Future, 선행 호출 여부)
+
+        선행 호출이 없으면 새 Future를 등록하고 True, 있으면 그 Future와 False를 반환한다.
+        같은 스레드의 재귀 호출은 자기 Future를 기다리면 교착되므로 (None, False)를 반환한다.
+        """
+        with self._flight_lock:
+            flight = self._flights.get((cache_type, key))
+            if flight is not None:
+                if flight.leader == threading.get_ident():
+                    return None, False
+                self._flight_waits[cache_type] += 1
+                return flight, False
+            flight = concurrent.futures.Future()
+            flight.leader = threading.get_ident()
+            self._flights[(cache_type, key)] = flight
+            return flight, True
+
+    def end_flight(self, cache_type, key):
+        with self._flight_lock:
+            self._flights.pop((cache_type, key), None)
+
+    def clear(self, cache_type=None):
+        """캐시 비우기 (cache_type 생략 시 전체)"""
+        for name, cache in self.caches.items():
+            if cache_type is None or name == cache_type:
+                cache.clear()
+
+    def stats(self):
+        """네임스페이스별 캐시 통계 {이름: {entries, bytes, hits, misses, hit_rate, evictions, expirations, ...}}"""
+        stats = {}
+        for name, cache in self.caches.items():
+            stats[name] = cache.stats()
+            stats[name]['negative_hits'] = self._negative_hits[name]
+            stats[name]['single_flight_waits'] = self._flight_waits[name]
+        return stats
+
+    def log_stats(self, force=False):
+        """캐시 통계 로그 (CACHE_STATS_LOG_INTERVAL마다, 조회가 있었던 네임스페이스만)"""
+        now = time.time()
+        if not force and now - self._last_stats_log < CACHE_STATS_LOG_INTERVAL:
+            return
+        self._last_stats_log = now
+
+        lines = []
+        for name, stat in self.stats().items():
+            if stat['hits'] + stat['misses'] == 0 and stat['entries'] == 0:
+                continue
+            lines.append(f"  {name}: {stat['entries']}개 / {stat['bytes'] / 1024 / 1024:.1f}MB, "
+                         f"적중 {stat['hit_rate']}% ({stat['hits']}/{stat['hits'] + stat['misses']}), "
+                         f"LRU 제거 {stat['evictions']}, 만료 {stat['expirations']}, "
+                         f"실패캐시 적중 {stat['negative_hits']}, 동시호출 합류 {stat['single_flight_waits']}")
+        if lines:
+            logger.info("📦 캐시 현황\n" + "\n".join(lines))
 
     def create_key(self, *args):
-        return '_'.join(str(arg) for arg in args)
+        return '_'.join(cache_key_part(arg) for arg in args)
 
-def cached(cache_type, expiry=None):
+def cached(cache_type, expiry=None, negative_ttl=NEGATIVE_CACHE_TTL):
+    """함수 결과 캐시 데코레이터
+
+    - expiry: 결과 캐시 시간 (생략 시 네임스페이스 기본값)
+    - 동일 키 동시 호출은 한 번만 실행하고 나머지 스레드는 그 결과를 기다림 (single-flight)
+    - None 반환은 negative_ttl 동안 실패로 캐시해 바로 None 반환 (0이면 실패 캐시 안 함)
+    - 예외는 캐시하지 않음 (그 순간 기다리던 스레드만 같은 예외를 받고, 다음 호출은 다시 실행)
+    - CacheManager에 없는 캐시 종류는 캐시 없이 그대로 호출
+    """
     def decorator(func):
         def wrapper(*args, **kwargs):
             # 캐시 매니저 인스턴스 얻기
             cache_manager = CacheManager.get_instance()
+            if cache_type not in cache_manager.caches:
+                return func(*args, **kwargs)
             
-            # 캐시 키 생성
+            # 캐시 키 생성 (DataFrame 등은 내용 해시로)
             cache_key = cache_manager.create_key(
                 func.__name__,
                 *args,
-                *[f"{k}={v}" for k, v in sorted(kwargs.items())]
+                *[f"{k}={cache_key_part(v)}" for k, v in sorted(kwargs.items())]
             )
             
             # 캐시된 결과 확인
-            cached_result = cache_manager.get(cache_type, cache_key)
-            if cached_result is not None:
-                logger.info(f"캐시 히트: {func.__name__}")
+            found, cached_result = cache_manager.lookup(cache_type, cache_key)
+            if found:
+                if cached_result is not None:
+                    logger.info(f"캐시 히트: {func.__name__}")
                 return cached_result
             
-            # 함수 실행 및 결과 캐싱
-            result = func(*args, **kwargs)
-            cache_manager.set(cache_type, cache_key, result)
-            return result
+            # 같은 키로 진행 중인 호출이 있으면 그 결과를 기다림
+            flight, is_leader = cache_manager.begin_flight(cache_type, cache_key)
+            if not is_leader:
+                if flight is not None:
+                    try:
+                        return flight.result(timeout=SINGLE_FLIGHT_TIMEOUT)
+                    except concurrent.futures.TimeoutError:
+                        logger.warning(f"{func.__name__} 선행 호출 대기 시간 초과 - 직접 조회")
+                return func(*args, **kwargs)
+            
+            try:
+                # 대기 등록 직전에 선행 호출이 끝났을 수 있으므로 한 번 더 확인
+                found, cached_result = cache_manager.lookup(cache_type, cache_key)
+                if not found:
+                    cached_result = func(*args, **kwargs)
+                    if cached_result is not None:
+                        cache_manager.set(cache_type, cache_key, cached_result, expiry)
+                    elif negative_ttl:
+                        cache_manager.set_negative(cache_type, cache_key, negative_ttl)
+                flight.set_result(cached_result)
+                return cached_result
+            except Exception as e:
+                flight.set_exception(e)
+                raise
+            finally:
+                cache_manager.end_flight(cache_type, cache_key)
         return wrapper
     return decorator        
 
@@ -297,6 +604,20 @@ cache_manager = CacheManager.get_instance()
 # Common.SetChangeMode("VIRTUAL")  # 실제 계좌 거래시 주석 처리
 Common.SetChangeMode()
 
+# API 호출 제한 - 단일 락 대신 엔드포인트별 동시 실행 수 + 전역 초당 호출 수
+# (서로 다른 종목의 분봉/일봉 조회는 한도 안에서 동시에 실행, 대기 시간은 api_limiter.log_stats()로 확인)
+api_limiter = global_rate_limiter.get_rate_limiter(is_virtual=Common.GetNowDist() == "VIRTUAL")
+KisKR = global_rate_limiter.RateLimitedModule(KisKR, api_limiter, global_rate_limiter.KIS_KR_ENDPOINTS)
+Common = global_rate_limiter.RateLimitedModule(Common, api_limiter, global_rate_limiter.KIS_COMMON_ENDPOINTS)
+
+# 메인 루프 구간 프로파일러 - API 호출 수는 api_limiter 누적 호출 수로 계산
+main_loop_profiler = loop_profiler.LoopProfiler(
+    f"LoopProfile_{BOT_NAME}.jsonl",
+    enabled=ENABLE_LOOP_PROFILER,
+    api_call_counter=lambda: api_limiter.calls_total,
+    summary_every=LOOP_PROFILER_SUMMARY_EVERY
+)
+
 
 
 ################################### 전략 적용 시간대 구분   ##################################
@@ -3422,32 +3743,97 @@ def count_total_positions_for_fractional(trading_state):
         return len(trading_state.get('positions', {})), 0, len(trading_state.get('positions', {})), 0
 
 
-def wait_for_order_execution(stock_code, order_amount, max_wait_time=45, order_type="BUY", order_price=None):
-    """주문 체결을 안전하게 기다리는 함수 - 체결가 오차 허용 버전 (개선)"""
-    start_time = time.time()
-    order_side = "BUY" if order_type == "BUY" else "SELL"
+# 주문 체결 추적 - 체결 대기 중인 주문 전체를 주기마다 당일 주문내역 1회 + 잔고 1회 조회로 함께 확인
+fill_tracker = order_fill_tracker.OrderFillTracker(
+    order_list_fetcher=lambda: KisKR.GetOrderList(side="ALL", status="ALL", limit=0),
+    balance_fetcher=lambda: KisKR.GetMyStockList(),
+    poll_interval=FILL_POLL_INTERVAL,
+    clock=lambda: datetime.now(),
+    sleeper=lambda seconds: time.sleep(seconds)
+)
+
+# 체결 대기 중 다른 보유 종목 점검에 쓸 main 루프 상태 (trading_state 등, main이 매 루프 갱신)
+position_service_context = {}
+_fill_wait_service_lock = threading.Lock()
+_last_fill_wait_service = 0
+
+
+def resolve_fill_price(order, holding):
+    """잔고 변화로 체결을 확인했을 때의 체결가
+    매수: 평균단가 → 최우선매도호가 → 지정가 → 현재가 / 매도: 최우선매수호가 → 현재가 → 지정가
+    """
+    stock_code = order['stock_code']
+    order_price = order['order_price']
+
+    if order['side'] == "BUY" and holding:
+        avg_price = float(holding.get('AvrPrice', 0))
+        if avg_price > 0:
+            return avg_price
+
+    best_price = 0
+    order_book = KisKR.GetOrderBook(stock_code)
+    if order_book and 'levels' in order_book and len(order_book['levels']) > 0:
+        best_price = order_book['levels'][0]['ask_price' if order['side'] == "BUY" else 'bid_price']
+    if best_price > 0:
+        return best_price
+
+    if order['side'] == "BUY":
+        if order_price is not None and order_price > 0:
+            return order_price
+        return KisKR.GetCurrentPrice(stock_code)
+
+    current_market_price = KisKR.GetCurrentPrice(stock_code)
+    if current_market_price and current_market_price > 0:
+        return current_market_price
+    return order_price or 0
+
+
+def service_positions_during_fill(exclude_code):
+    """체결 대기 중 다른 보유 종목의 트레일링 스탑/손절 점검 (FILL_WAIT_SERVICE_INTERVAL마다)
+    - main 루프와 같은 trading_state 객체를 사용해 대기가 끝난 뒤 상태가 어긋나지 않도록 함
+    - 점검 중 매도 체결을 기다리는 동안에는 다시 들어오지 않음
+    """
+    global _last_fill_wait_service
+
+    context = position_service_context
+    if not context or not _fill_wait_service_lock.acquire(blocking=False):
+        return
+    try:
+        if time.time() - _last_fill_wait_service < FILL_WAIT_SERVICE_INTERVAL:
+            return
+        _last_fill_wait_service = time.time()
+
+        trading_state = context['trading_state']
+        balance = fill_tracker.latest_balance()
+        for stock_code in list(trading_state['positions'].keys()):
+            if stock_code == exclude_code or fill_tracker.is_tracking(stock_code):
+                continue
+            stock = balance.get(stock_code)
+            if stock is None:
+                continue
+            service_position(stock, trading_state, context['daily_profit'], context['current_date'],
+                             context['is_morning_session'], context['all_news_analysis'])
+    finally:
+        _fill_wait_service_lock.release()
+
+
+def wait_for_order_execution(stock_code, order_amount, max_wait_time=45, order_type="BUY", order_price=None, order_no=None):
+    """주문 체결 대기 - fill_tracker로 체결 확인 (개선)
+    - 주문번호(order_no)가 있으면 주문내역에서 해당 주문의 체결 수량/평균가를 우선 사용
+    - 대기 중에는 다른 보유 종목의 트레일링 스탑/손절 점검을 계속 수행
+    """
     stock_name = KisKR.GetStockName(stock_code)
     
     logger.info(f"{stock_name}({stock_code}) {order_type} 주문 체결 대기... 주문량: {order_amount}주")
-    executed_amount = 0
-    executed_price = 0
     
     # 시작 시점의 보유 수량 확인
-    initial_position = None
-    try:
-        my_stocks = KisKR.GetMyStockList()
-        for stock in my_stocks:
-            if stock['StockCode'] == stock_code:
-                initial_position = stock
-                break
-    except Exception as e:
-        logger.error(f"초기 보유 수량 확인 중 오류: {str(e)}")
+    initial_position = fill_tracker.holding(stock_code, refresh=True)
     
     initial_amount = int(initial_position.get('StockAmt', 0)) if initial_position else 0
     logger.info(f"{stock_name}({stock_code}) 초기 보유 수량: {initial_amount}주")
     
-    # 주문 직후 바로 보유량이 예상과 일치하는지 확인 (즉시 체결된 경우를 위해)
-    if order_type == "BUY" and initial_amount > 0:
+    # 주문 직후 바로 보유량이 예상과 일치하는지 확인 (즉시 체결된 경우를 위해, 주문번호를 모를 때만)
+    if order_type == "BUY" and order_no is None and initial_amount > 0:
         # 이미 체결된 것으로 보이는 경우
         if initial_amount == order_amount:
             logger.info(f"{stock_name}({stock_code}) 즉시 체결 감지! 주문량({order_amount}주)과 보유량({initial_amount}주) 일치")
@@ -3472,293 +3858,28 @@ def wait_for_order_execution(stock_code, order_amount, max_wait_time=45, order_t
             
             return actual_price, initial_amount
     
-    # 상태 확인 최대 시도 횟수
-    max_check_attempts = 8
-    current_check = 0
-    
-    while time.time() - start_time < max_wait_time and current_check < max_check_attempts:
-        try:
-            current_check += 1
-            
-            # 1. API를 통한 체결 확인 시도
-            order_details = KisKR.GetOrderList(
-                stockcode=stock_code,
-                side=order_side,
-                status="CLOSE",  # 체결된 주문만 조회
-                limit=10  # 더 많은 주문 기록 확인
-            )
-            
-            if order_details:
-                # 최근 60초 이내 체결된 주문 필터링 및 확인
-                current_time = time.time()
-                recent_orders = []
-                
-                for order in order_details:
-                    order_date_str = order.get('OrderDate', '')
-                    order_time_str = order.get('OrderTime', '')
-                    
-                    if order_date_str and order_time_str:
-                        try:
-                            order_datetime_str = f"{order_date_str} {order_time_str}"
-                            order_timestamp = time.mktime(
-                                datetime.strptime(
-                                    order_datetime_str, 
-                                    "%Y%m%d %H%M%S"
-                                ).timetuple()
-                            )
-                            
-                            if current_time - order_timestamp <= 120:  # 2분으로 확장
-                                recent_orders.append(order)
-                        except Exception as e:
-                            logger.warning(f"주문 시간 변환 중 오류: {e}")
-                
-                # 체결 주문 확인 - 수량이 일치하거나 유사한 주문 찾기
-                for order in recent_orders:
-                    if (order.get('OrderStock') == stock_code and 
-                        order.get('OrderStatus') == 'Close' and
-                        order.get('OrderSide') == ('Buy' if order_type == "BUY" else 'Sell')):
-                        
-                        # 체결 정보 확인 - 수량 유사성 확인
-                        order_amt = int(order.get('OrderAmt', 0))
-                        # 주문 수량의 50% 이상 또는 절대 수량이 거의 일치하면 인정
-                        if order_amt >= order_amount * 0.5 or abs(order_amt - order_amount) <= 2:
-                            executed_price = float(order.get('OrderAvgPrice', 0))
-                            executed_amount = order_amt
-                            
-                            if executed_price > 0 and executed_amount > 0:
-                                logger.info(f"{stock_name}({stock_code}) {order_type} 주문 체결 확인: {executed_amount}주 @ {executed_price:,.0f}원")
-                                return executed_price, executed_amount
-            
-            # 2. 계좌 데이터로 확인 - 이 부분을 더 강화
-            current_stocks = KisKR.GetMyStockList()
-            for stock in current_stocks:
-                if stock['StockCode'] == stock_code:
-                    current_amount = int(stock.get('StockAmt', 0))
-                    
-                    # 보유 수량 변화 감지 - 여기가 핵심 수정 부분
-                    if order_type == "BUY":
-                        # 매수 주문의 경우
-                        if current_amount >= initial_amount:
-                            # 상태1: 증가한 경우 (정상 체결)
-                            if current_amount > initial_amount:
-                                changed_amount = current_amount - initial_amount
-                                logger.info(f"보유량 증가 감지: {initial_amount}주 → {current_amount}주 (변화량: {changed_amount}주)")
-                            # 상태2: 변화 없지만 초기값이 이미 주문량과 동일 (즉시 체결된 경우)
-                            elif initial_amount == order_amount:
-                                changed_amount = order_amount
-                                logger.info(f"체결 감지: 초기부터 보유량({initial_amount}주)이 주문량({order_amount}주)과 일치")
-                            # 상태3: 변화 없고 초기값도 다름 (미체결)
-                            else:
-                                logger.info(f"미체결 상태 감지: 보유량({current_amount}주) 변화 없음, 주문량({order_amount}주)과 불일치")
-                                changed_amount = 0
-                            
-                            # 체결된 경우만 처리
-                            if changed_amount > 0:
-                                # 변경: 주문량과 실제 변화량 비교 로직 추가
-                                if changed_amount != order_amount:
-                                    logger.warning(f"주문 수량({order_amount}주)과 실제 변화량({changed_amount}주)이 다릅니다!")
-                                    
-                                    # 실제 주문된 수량(order_amount)과 변화량 비교
-                                    # 만약 변화량이 주문량보다 적으면 부분 체결로 간주
-                                    if changed_amount < order_amount:
-                                        logger.info(f"부분 체결로 판단됨: {changed_amount}주 (주문: {order_amount}주)")
-                                    # 만약 변화량이 주문량보다 많으면, 예상치 못한 상황이므로 로그 기록
-                                    elif changed_amount > order_amount:
-                                        logger.warning(f"예상보다 많은 수량 체결됨: {changed_amount}주 (주문: {order_amount}주)")
-                                
-                                # 체결가 결정 - 다양한 소스에서 가장 신뢰할 수 있는 것 선택
-                                # 1. 평균단가 (가능한 경우)
-                                avg_price = float(stock.get('AvrPrice', 0))
-                                
-                                # 2. 현재가 (API에서)
-                                current_market_price = KisKR.GetCurrentPrice(stock_code)
-                                
-                                # 3. 호가 정보 (더 정확한 체결가를 위해)
-                                order_book = KisKR.GetOrderBook(stock_code)
-                                best_price = 0
-                                if order_book and 'levels' in order_book and len(order_book['levels']) > 0:
-                                    best_price = order_book['levels'][0]['ask_price']  # 최우선매도호가
-                                
-                                # 체결가 결정 로직
-                                if avg_price > 0:
-                                    price_to_use = avg_price
-                                    logger.info(f"체결가 결정: 계좌 평균단가 기준 ({avg_price:,.0f}원)")
-                                elif best_price > 0:
-                                    price_to_use = best_price
-                                    logger.info(f"체결가 결정: 호가 기준 ({best_price:,.0f}원)")
-                                elif order_price is not None and order_price > 0:
-                                    price_to_use = order_price
-                                    logger.info(f"체결가 결정: 지정가 기준 ({order_price:,.0f}원)")
-                                else:
-                                    price_to_use = current_market_price
-                                    logger.info(f"체결가 결정: 현재가 기준 ({current_market_price:,.0f}원)")
-                                
-                                # 중요: 실제 변화된 수량 반환 (주문량 아님)
-                                logger.info(f"{stock_name}({stock_code}) {order_type} 주문 체결 확인 (계좌 데이터 기반): {changed_amount}주 @ {price_to_use:,.0f}원")
-                                
-                                # 체결 정보를 로그에 더 자세히 기록
-                                if changed_amount == order_amount:
-                                    logger.info(f"{stock_name}({stock_code}) - 완전 체결: 주문량({order_amount}주) = 체결량({changed_amount}주)")
-                                else:
-                                    logger.info(f"{stock_name}({stock_code}) - 부분 체결: 주문량({order_amount}주) vs 체결량({changed_amount}주)")
-                                
-                                return price_to_use, changed_amount
-                    else:  # SELL (매도 로직은 동일하게 유지)
-                        if current_amount < initial_amount:
-                            changed_amount = initial_amount - current_amount
-                            
-                            # 변경: 주문량과 실제 변화량 비교 로직 추가
-                            if changed_amount != order_amount:
-                                logger.warning(f"주문 수량({order_amount}주)과 실제 변화량({changed_amount}주)이 다릅니다!")
-                                
-                                # 실제 주문된 수량(order_amount)과 변화량 비교
-                                if changed_amount < order_amount:
-                                    logger.info(f"부분 체결로 판단됨: {changed_amount}주 (주문: {order_amount}주)")
-                                elif changed_amount > order_amount:
-                                    logger.warning(f"예상보다 많은 수량 체결됨: {changed_amount}주 (주문: {order_amount}주)")
-                            
-                            # 체결가 결정 로직 (매도 버전)
-                            # 현재가 및 호가 정보 가져오기
-                            current_market_price = KisKR.GetCurrentPrice(stock_code)
-                            order_book = KisKR.GetOrderBook(stock_code)
-                            best_price = 0
-                            if order_book and 'levels' in order_book and len(order_book['levels']) > 0:
-                                best_price = order_book['levels'][0]['bid_price']  # 최우선매수호가
-                            
-                            # 체결가 결정
-                            if best_price > 0:
-                                price_to_use = best_price
-                                logger.info(f"체결가 결정: 호가 기준 ({best_price:,.0f}원)")
-                            elif current_market_price > 0:
-                                price_to_use = current_market_price
-                                logger.info(f"체결가 결정: 현재가 기준 ({current_market_price:,.0f}원)")
-                            elif order_price is not None and order_price > 0:
-                                price_to_use = order_price
-                                logger.info(f"체결가 결정: 지정가 기준 ({order_price:,.0f}원)")
-                            else:
-                                # 기본값 (최후의 수단)
-                                price_to_use = order_price if order_price else current_market_price
-                                logger.info(f"체결가 결정: 기본값 사용 ({price_to_use:,.0f}원)")
-
-                            logger.info(f"{stock_name}({stock_code}) {order_type} 주문 체결 확인 (계좌 데이터 기반): {changed_amount}주 @ {price_to_use:,.0f}원")
-                            return price_to_use, changed_amount
-                    
-                    # 변화가 없는 경우 로그 기록
-                    if current_amount == initial_amount:
-                        logger.info(f"{stock_name}({stock_code}) 보유수량 변화 없음: {current_amount}주 (초기: {initial_amount}주)")
-                        
-                        # 추가: 변화가 없지만 이미 주문량과 일치하면 체결된 것으로 간주할지 검토 (매수에만 적용)
-                        if order_type == "BUY" and current_amount == order_amount:
-                            logger.info(f"특이케이스: 보유량({current_amount}주)이 주문량({order_amount}주)과 일치하지만 변화 없음 - 체결 여부 추가 확인 필요")
-                            
-                            # 호가 정보를 통해 체결 가능 여부 판단
-                            order_book = KisKR.GetOrderBook(stock_code)
-                            if order_book and 'levels' in order_book and len(order_book['levels']) > 0:
-                                best_ask_price = order_book['levels'][0]['ask_price']  # 최우선매도호가
-                                
-                                # 최우선매도호가가 주문가와 같거나 낮으면 체결 가능성 높음
-                                if best_ask_price <= order_price:
-                                    logger.info(f"체결 가능성 높음: 최우선매도호가({best_ask_price:,.0f}원) <= 주문가({order_price:,.0f}원)")
-                                    
-                                    # 주문 시간 확인 - 충분한 시간이 지났으면 체결된 것으로 간주
-                                    elapsed_time = time.time() - start_time
-                                    if elapsed_time > 10:  # 10초 이상 지난 경우
-                                        logger.info(f"체결로 간주: 보유량({current_amount}주)이 주문량({order_amount}주)과 일치하고 충분한 시간({elapsed_time:.1f}초) 경과")
-                                        return best_ask_price, current_amount
-            
-            # 주기적인 대기 메시지 출력
-            elapsed = time.time() - start_time
-            if int(elapsed) % 5 == 0 and elapsed > 0:
-                logger.info(f"{stock_name}({stock_code}) {order_type} 주문 체결 대기 중... ({int(elapsed)}초/{max_wait_time}초)")
-            
-            # API 호출 빈도 조절
-            sleep_time = 2 if elapsed < 10 else 3
-            time.sleep(sleep_time)
-            
-        except Exception as e:
-            logger.error(f"{order_type} 주문 상태 확인 중 에러: {str(e)}")
-            time.sleep(2)
+    future = fill_tracker.track(
+        stock_code,
+        order_type,
+        order_amount,
+        initial_amount=initial_amount,
+        order_price=order_price,
+        order_no=order_no,
+        timeout=max_wait_time,
+        price_resolver=resolve_fill_price
+    )
+    result = fill_tracker.wait(future, on_idle=lambda: service_positions_during_fill(stock_code))
     
-    # 최종 확인 - 대기 시간 종료 후 마지막 시도
-    logger.warning(f"{stock_name}({stock_code}) {order_type} 주문 체결 확인 제한 도달 ({max_wait_time}초/{max_check_attempts}회)")
+    if result['amount'] <= 0 or result['price'] <= 0:
+        logger.warning(f"{stock_name}({stock_code}) {order_type} 주문 체결 확인 제한 도달 ({max_wait_time}초) - 미체결")
+        return 0, 0
     
-    try:
-        # 최종 계좌 상태 확인
-        final_stocks = KisKR.GetMyStockList()
-        for stock in final_stocks:
-            if stock['StockCode'] == stock_code:
-                final_amount = int(stock.get('StockAmt', 0))
-                
-                # 핵심 수정: 변화가 없지만 보유량이 주문량과 동일한 경우 체결로 간주 (매수만 적용)
-                if order_type == "BUY":
-                    if final_amount > initial_amount:
-                        # 보유량 증가 - 정상 체결
-                        changed_amount = final_amount - initial_amount
-                        logger.info(f"최종 확인: 보유량 증가 ({initial_amount}주 → {final_amount}주)")
-                    elif final_amount == order_amount and initial_amount == order_amount:
-                        # 변화 없지만 주문량과 일치 - 초기에 체결되었을 가능성
-                        changed_amount = order_amount
-                        logger.info(f"최종 확인: 보유량({final_amount}주)이 주문량({order_amount}주)과 일치 - 체결로 간주")
-                    else:
-                        # 미체결
-                        logger.info(f"최종 확인: 미체결 (보유량: {final_amount}주, 주문량: {order_amount}주)")
-                        return 0, 0
-                else:  # SELL
-                    if final_amount < initial_amount:
-                        changed_amount = initial_amount - final_amount
-                    else:
-                        logger.info(f"최종 확인: 매도 미체결 (보유량: {final_amount}주, 주문량: {order_amount}주)")
-                        return 0, 0
-                
-                # 주문량과 실제 변화량 차이 로깅
-                if changed_amount != order_amount:
-                    logger.warning(f"최종 확인: 주문량({order_amount}주)과 실제 변화량({changed_amount}주) 불일치!")
-                
-                # 가격 정보 확보 (다양한 소스에서)
-                best_price = 0
-                avg_price = 0
-                current_price = 0
-                
-                # 1. 평균매입가 확인 (가장 정확)
-                if 'AvrPrice' in stock:
-                    avg_price = float(stock.get('AvrPrice', 0))
-                
-                # 2. 호가 정보 가져오기
-                order_book = None
-                try:
-                    order_book = KisKR.GetOrderBook(stock_code)
-                    if order_book and 'levels' in order_book and len(order_book['levels']) > 0:
-                        if order_type == "BUY":
-                            best_price = order_book['levels'][0]['ask_price']  # 최우선매도호가
-                        else:  # SELL
-                            best_price = order_book['levels'][0]['bid_price']  # 최우선매수호가
-                except:
-                    pass
-                
-                # 3. 현재가 가져오기
-                current_price = KisKR.GetCurrentPrice(stock_code)
-                
-                # 최종 가격 결정 로직
-                if avg_price > 0:
-                    price_to_use = avg_price
-                    logger.info(f"최종 확인: 평균가 기반 체결가 사용 - {changed_amount}주 @ {price_to_use:,.0f}원")
-                elif best_price > 0:
-                    price_to_use = best_price
-                    logger.info(f"최종 확인: 호가 기반 체결가 사용 - {changed_amount}주 @ {price_to_use:,.0f}원")
-                elif order_price is not None and order_price > 0:
-                    price_to_use = order_price
-                    logger.info(f"최종 확인: 지정가 기반 체결가 사용 - {changed_amount}주 @ {price_to_use:,.0f}원")
-                else:
-                    price_to_use = current_price
-                    logger.info(f"최종 확인: 현재가 기반 체결가 사용 - {changed_amount}주 @ {price_to_use:,.0f}원")
-                
-                return price_to_use, changed_amount
-    
-    except Exception as e:
-        logger.error(f"체결 상태 최종 확인 중 오류: {str(e)}")
+    # 체결 정보를 로그에 더 자세히 기록
+    logger.info(f"{stock_name}({stock_code}) {order_type} 주문 체결 확인 ({result['source']}, {result['elapsed']:.1f}초): {result['amount']}주 @ {result['price']:,.0f}원")
+    if result['amount'] != order_amount:
+        logger.info(f"{stock_name}({stock_code}) - 부분 체결: 주문량({order_amount}주) vs 체결량({result['amount']}주)")
     
-    # 여기에 도달하면 체결 확인에 실패한 것
-    return 0, 0
+    return result['price'], result['amount']
 
 ############### 고위험 매수 방지를 위한 함수 추가 ###################
 
@@ -4326,17 +4447,14 @@ def handle_buy_order_with_safety(stock_code, stock_name, buy_amount, stock_price
                     return None, "가격 급락으로 주문 취소", 0
         # 가격 재검증 코드 끝 -------------------------
 
-        # 체결 대기 (시간 증가)
-        logger.info(f"{stock_name}({stock_code}) - 체결 확인을 위해 10초 대기...")
-        time.sleep(10)
-
-        # 체결 대기 함수 호출 - 지정가 정보 전달
+        # 체결 대기 함수 호출 - 지정가/주문번호 정보 전달 (기존 고정 10초 대기 포함 최대 55초)
         executed_price, executed_amount = wait_for_order_execution(
             stock_code, 
             current_order_amount,
-            max_wait_time=45,
+            max_wait_time=55,
             order_type="BUY",
-            order_price=int_limit_price  # 지정가 정보 전달
+            order_price=int_limit_price,  # 지정가 정보 전달
+            order_no=order_result.get('OrderNum2') if isinstance(order_result, dict) else None
         )
         
         # 체결 정보 검증
@@ -4485,10 +4603,12 @@ def handle_buy_order_with_safety(stock_code, stock_name, buy_amount, stock_price
         logger.info(msg)
         discord_alert.SendMessage(msg)
         
-        # 상태 파일의 유무 확인 (추가 안전 조치)
+        # 상태 파일의 유무 확인 (추가 안전 조치) - 매수 기록을 스냅샷 파일에 바로 반영
         try:
+            trading_state_store.compact()
+
             # 파일 존재 여부 확인
-            file_exists = os.path.exists(f"KrStock_{BOT_NAME}.json")
+            file_exists = os.path.exists(trading_state_store.path)
             if not file_exists:
                 logger.critical(f"심각한 오류: 상태 파일이 존재하지 않습니다!")
                 emergency_msg = f"⚠️ 상태 파일 없음 - 수동 개입 필요!"
@@ -4496,8 +4616,7 @@ def handle_buy_order_with_safety(stock_code, stock_name, buy_amount, stock_price
             else:
                 # 파일 내용 확인
                 try:
-                    with open(f"KrStock_{BOT_NAME}.json", 'r') as f:
-                        saved_state = json.load(f)
+                    saved_state = trading_state_store.read_snapshot()
                     
                     if stock_code not in saved_state.get('positions', {}):
                         logger.critical(f"심각한 오류: 상태 파일에 방금 매수한 종목이 없습니다!")
@@ -4769,17 +4888,14 @@ def handle_buy_order(stock_code, stock_name, buy_amount, stock_price, stock_data
                     return None, "가격 급락으로 주문 취소", 0
         # 가격 재검증 코드 끝 -------------------------
 
-        # 체결 대기 (시간 증가)
-        logger.info(f"체결 확인을 위해 10초 대기...")
-        time.sleep(10)
-
-        # 체결 대기 함수 호출 - 지정가 정보 전달
+        # 체결 대기 함수 호출 - 지정가/주문번호 정보 전달 (기존 고정 10초 대기 포함 최대 55초)
         executed_price, executed_amount = wait_for_order_execution(
             stock_code, 
             current_order_amount,
-            max_wait_time=45,
+            max_wait_time=55,
             order_type="BUY",
-            order_price=int_limit_price  # 지정가 정보 전달
+            order_price=int_limit_price,  # 지정가 정보 전달
+            order_no=order_result.get('OrderNum2') if isinstance(order_result, dict) else None
         )        
         
         # 주문 체결 여부 검증 강화 (체결 상태 명시적 로깅)
@@ -4928,10 +5044,12 @@ def handle_buy_order(stock_code, stock_name, buy_amount, stock_price, stock_data
         logger.info(msg)
         discord_alert.SendMessage(msg)
         
-        # 상태 파일의 유무 확인 (추가 안전 조치)
+        # 상태 파일의 유무 확인 (추가 안전 조치) - 매수 기록을 스냅샷 파일에 바로 반영
         try:
+            trading_state_store.compact()
+
             # 파일 존재 여부 확인
-            file_exists = os.path.exists(f"KrStock_{BOT_NAME}.json")
+            file_exists = os.path.exists(trading_state_store.path)
             if not file_exists:
                 logger.critical(f"심각한 오류: 상태 파일이 존재하지 않습니다!")
                 emergency_msg = f"⚠️ 상태 파일 없음 - 수동 개입 필요!"
@@ -4939,8 +5057,7 @@ def handle_buy_order(stock_code, stock_name, buy_amount, stock_price, stock_data
             else:
                 # 파일 내용 확인
                 try:
-                    with open(f"KrStock_{BOT_NAME}.json", 'r') as f:
-                        saved_state = json.load(f)
+                    saved_state = trading_state_store.read_snapshot()
                     
                     if stock_code not in saved_state.get('positions', {}):
                         logger.critical(f"심각한 오류: 상태 파일에 방금 매수한 종목이 없습니다!")
@@ -5124,10 +5241,12 @@ def handle_buy_order(stock_code, stock_name, buy_amount, stock_price, stock_data
         logger.info(msg)
         discord_alert.SendMessage(msg)
         
-        # 상태 파일의 유무 확인 (추가 안전 조치)
+        # 상태 파일의 유무 확인 (추가 안전 조치) - 매수 기록을 스냅샷 파일에 바로 반영
         try:
+            trading_state_store.compact()
+
             # 파일 존재 여부 확인
-            file_exists = os.path.exists(f"KrStock_{BOT_NAME}.json")
+            file_exists = os.path.exists(trading_state_store.path)
             if not file_exists:
                 logger.critical(f"심각한 오류: 상태 파일이 존재하지 않습니다!")
                 emergency_msg = f"⚠️ 상태 파일 없음 - 수동 개입 필요!"
@@ -5135,8 +5254,7 @@ def handle_buy_order(stock_code, stock_name, buy_amount, stock_price, stock_data
             else:
                 # 파일 내용 확인
                 try:
-                    with open(f"KrStock_{BOT_NAME}.json", 'r') as f:
-                        saved_state = json.load(f)
+                    saved_state = trading_state_store.read_snapshot()
                     
                     if stock_code not in saved_state.get('positions', {}):
                         logger.critical(f"심각한 오류: 상태 파일에 방금 매수한 종목이 없습니다!")
@@ -5198,62 +5316,16 @@ def handle_buy_order(stock_code, stock_name, buy_amount, stock_price, stock_data
 
 
 
-def wait_for_sell_order_execution(stock_code, order_amount, max_wait_time=30):
-    """매도 주문 체결을 안전하게 기다리는 함수"""
-    start_time = time.time()
-    
-    while time.time() - start_time < max_wait_time:
-        try:
-            order_details = KisKR.GetOrderList(
-                stockcode=stock_code,
-                side="SELL",
-                status="CLOSE",
-                limit=5  # 더 많은 주문 기록 확인
-            )
-            
-            if order_details:
-                # 주문 정보 더 자세히 로깅
-                logger.info(f"주문 상세 정보: {order_details}")
-                
-                # 최근 체결된 주문 찾기
-                for order in order_details:
-                    # 정확한 주문 매칭 확인 (시간 기반 필터링 추가)
-                    order_time_str = order.get('OrderTime', '')
-                    if order_time_str:
-                        try:
-                            order_time = datetime.strptime(order_time_str, "%H%M%S")
-                            current_time = datetime.now()
-                            time_diff = (current_time - order_time).total_seconds()
-                            
-                            # 최근 5분 이내 주문만 고려
-                            if time_diff > 300:  # 5분 = 300초
-                                continue
-                        except:
-                            # 시간 형식 변환 오류 시 계속 진행
-                            pass
-                    
-                    if (order.get('OrderStock') == stock_code and 
-                        order.get('OrderAmt') == order_amount and
-                        order.get('OrderStatus') == 'Close' and
-                        order.get('OrderSide') == 'Sell'):
-                        
-                        executed_price = float(order.get('OrderAvgPrice', 0))
-                                        
-                        if executed_price > 0:
-                            logger.info(f"실제 체결가: {executed_price:,.0f}원")
-                            return executed_price
-                                    
-            # 주문 상태 주기적으로 확인
-            if (time.time() - start_time) % 5 < 1:  # 약 5초마다 로그 출력
-                logger.info(f"{stock_code} 매도 주문 체결 대기 중... ({int(time.time() - start_time)}초 경과)")
-                
-            time.sleep(1)  # 1초 간격으로 체크
-            
-        except Exception as e:
-            logger.error(f"매도 주문 상태 확인 중 에러: {str(e)}")
-    
-    logger.warning(f"{stock_code} 매도 주문 체결 확인 타임아웃 ({max_wait_time}초)")
-    return 0  # 최대 대기 시간 초과
+def wait_for_sell_order_execution(stock_code, order_amount, max_wait_time=30, order_no=None):
+    """매도 주문 체결을 안전하게 기다리는 함수 - 체결가 반환 (미체결/타임아웃 시 0)"""
+    executed_price, _ = wait_for_order_execution(
+        stock_code,
+        order_amount,
+        max_wait_time=max_wait_time,
+        order_type="SELL",
+        order_no=order_no
+    )
+    return executed_price
 
 
 def process_sell_order(stock_code, amount):
@@ -5300,7 +5372,8 @@ def process_sell_order(stock_code, amount):
             stock_code, 
             amount, 
             max_wait_time=15, 
-            order_type="SELL"
+            order_type="SELL",
+            order_no=order_result.get('OrderNum2') if isinstance(order_result, dict) else None
         )
         
         if executed_price == 0 or executed_amount == 0:
@@ -5979,6 +6052,27 @@ def calculate_volume_trend(df):
     return df['volume'] > vol_ma
 
 
+# 일봉 메모 - 완료 일봉은 종목별 하루 1회 조회, 오늘 봉과 지표는 현재 시세로만 갱신
+# (백테스트가 Common/KisKR/datetime을 교체할 수 있도록 호출 시점에 모듈 전역을 참조)
+daily_bars = daily_bar_memo.DailyBarMemo(
+    count=20,
+    history_fetcher=lambda stock_code, count: Common.GetOhlcv("KR", stock_code, count),
+    quote_fetcher=lambda stock_code: KisKR.GetCurrentQuote(stock_code),
+    clock=lambda: datetime.now(),
+    settings=daily_bar_memo.IndicatorSettings(ma_windows=(5, 10, 20))
+)
+
+@cached('stock_data')
+def get_daily_ohlcv(stock_code):
+    """일봉 데이터(20일, 지표 컬럼 포함) 조회 - 스캔 일봉 단계와 get_stock_data가 같은 조회 결과를 공유
+
+    완료 일봉은 일봉 메모에서 가져오고 오늘 봉만 현재 시세로 갱신 (시세 조회 실패 시 None)
+    """
+    df, quote = daily_bars.get(stock_code)
+    if quote is None:
+        return None
+    return df
+
 @cached('stock_data')
 def get_stock_data(stock_code):
     """종목의 현재가, 보조지표 등 데이터 조회"""
@@ -5990,7 +6084,7 @@ def get_stock_data(stock_code):
         
         # 일봉 데이터
         logger.info(f"{stock_code}: 일봉 데이터 로드 시작")
-        df = Common.GetOhlcv("KR", stock_code, 20)  # 20일로 충분
+        df = get_daily_ohlcv(stock_code)  # 20일로 충분
         logger.info(f"{stock_code}: 일봉 데이터 로드 완료. 데이터 크기: {len(df) if df is not None else 'None'}")
         
         # DataFrame 유효성 검사 추가 - 일봉 데이터가 없으면 먼저 체크해서 리턴
@@ -6006,10 +6100,8 @@ def get_stock_data(stock_code):
                 # 장초반이 아닐 때만 실제 분봉 데이터 로드 시도
                 logger.info(f"{stock_code}: 분봉 데이터 로드 직전. KisKR.GetOhlcvMinute 호출 시작")
 
-                # 락 사용: 분봉 데이터 API 호출 시 락 획득
-                with api_lock:
-                    # 실제 KisKR.GetOhlcvMinute 함수 반환값 확인
-                    minute_df = KisKR.GetOhlcvMinute(stock_code, MinSt='5T')
+                # 분봉 조회 동시 실행 수는 api_limiter가 제한 (다른 종목 조회와는 병렬)
+                minute_df = KisKR.GetOhlcvMinute(stock_code, MinSt='5T')
                 logger.info(f"{stock_code}: KisKR.GetOhlcvMinute 호출 결과. 타입: {type(minute_df)}, 값: {minute_df is None and 'None' or 'Not None'}")
                 
                 if minute_df is not None:
@@ -6049,8 +6141,8 @@ def get_stock_data(stock_code):
             minute_df.index = pd.date_range(start=now, periods=rows_to_use, freq='5T')
             logger.info(f"{stock_code}: 에러 발생으로 일봉 데이터로 대체한 분봉 데이터 생성 (길이: {len(minute_df)}개)")
 
-        # 현재가 조회
-        current_price = KisKR.GetCurrentPrice(stock_code)
+        # 현재가 - 일봉 메모가 오늘 봉을 갱신할 때 받은 시세
+        current_price = df['close'].iloc[-1]
         logger.info(f"{stock_code}: 현재가 = {current_price}")
         
         # 현재가 유효성 검사
@@ -6059,57 +6151,30 @@ def get_stock_data(stock_code):
             return None
 
         try:
-            # RSI 계산
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss.replace(0, 0.00001)
-            rsi = 100 - (100 / (1 + rs))
-
-            # NaN 체크 추가
-            rsi_value = rsi.iloc[-1]
+            # RSI/볼린저밴드/MACD/ATR/이동평균은 일봉 메모가 완료 구간에 오늘 봉만 이어서 계산한 값
+            rsi_value = df['RSI'].iloc[-1]
             if pd.isna(rsi_value):
                 rsi_value = 50  # NaN일 경우 중립값(50) 사용
             
-            # 볼린저밴드 계산
-            ma20 = df['close'].rolling(window=20).mean()
-            std = df['close'].rolling(window=20).std()
-            upper = ma20 + 2 * std
-            lower = ma20 - 2 * std
-            
-            # MACD 계산
-            exp1 = df['close'].ewm(span=12, adjust=False).mean()
-            exp2 = df['close'].ewm(span=26, adjust=False).mean()
-            macd = exp1 - exp2
-            signal = macd.ewm(span=9, adjust=False).mean()
-            
-            # ATR 계산
-            high_low = df['high'] - df['low']
-            high_close = np.abs(df['high'] - df['close'].shift())
-            low_close = np.abs(df['low'] - df['close'].shift())
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = np.max(ranges, axis=1)
-            atr = true_range.rolling(window=14).mean()
-            
             result = {
                 'current_price': current_price,
                 'ohlcv': df,
                 'minute_ohlcv': minute_df,  # 분봉 데이터 추가
                 'code': stock_code,
                 'rsi': rsi_value,  # NaN 값이 처리된 rsi 값 사용
-                'upper_band': upper.iloc[-1],
-                'lower_band': lower.iloc[-1],
-                'ma5': df['close'].rolling(window=5).mean().iloc[-1],
-                'ma10': df['close'].rolling(window=10).mean().iloc[-1],
-                'ma20': ma20.iloc[-1],
+                'upper_band': df['UpperBand'].iloc[-1],
+                'lower_band': df['LowerBand'].iloc[-1],
+                'ma5': df['MA5'].iloc[-1],
+                'ma10': df['MA10'].iloc[-1],
+                'ma20': df['MA20'].iloc[-1],
                 'volume': df['volume'].iloc[-1],
                 'prev_volume': df['volume'].iloc[-2],
                 'volume_ma5': df['volume'].rolling(window=5).mean().iloc[-1],
-                'macd': macd.iloc[-1],
-                'macd_signal': signal.iloc[-1],
-                'prev_macd': macd.iloc[-2],
-                'prev_macd_signal': signal.iloc[-2],
-                'atr': atr.iloc[-1],
+                'macd': df['MACD'].iloc[-1],
+                'macd_signal': df['Signal'].iloc[-1],
+                'prev_macd': df['MACD'].iloc[-2],
+                'prev_macd_signal': df['Signal'].iloc[-2],
+                'atr': df['ATR'].iloc[-1],
                 'close': df['close'].iloc[-1],
                 'prev_close': df['close'].iloc[-2],
                 'low': df['low'].iloc[-1]
@@ -6133,9 +6198,17 @@ def get_stock_data(stock_code):
     
 
 
+def get_required_momentum_score(is_early_morning, is_morning_session):
+    """시간대별 모멘텀 통과 기준 점수 (RSI 과매수 근접 시 가산점 제외)"""
+    # return 35 if is_early_morning else 45 if is_morning_session else 55
+    return 30 if is_early_morning else 38 if is_morning_session else 55  # 기존 35/45/55에서 완화
+
 # 4. 모멘텀 점수 계산의 NaN 처리 및 일관성 개선
-def check_momentum_conditions(stock_data, return_score=False):
-    """모멘텀 조건 체크 - NaN 처리 개선"""
+def check_momentum_conditions(stock_data, return_score=False, cache_score=True):
+    """모멘텀 조건 체크 - NaN 처리 개선
+
+    cache_score=False면 통과해도 momentum_data에 점수를 남기지 않음 (스캔 일봉 단계의 예비 점수용)
+    """
     if stock_data is None:
         return (False, 0) if return_score else False
         
@@ -6379,8 +6452,7 @@ def check_momentum_conditions(stock_data, return_score=False):
             logger.error(f"RSI 분석 중 에러: {str(e)}")
 
         # 시간대별 점수 기준 조정
-        # required_score = 35 if is_early_morning else 45 if is_morning_session else 55
-        required_score = 30 if is_early_morning else 38 if is_morning_session else 55  # 기존 35/45/55에서 완화
+        required_score = get_required_momentum_score(is_early_morning, is_morning_session)
 
         # 거래량 조건 추가 - 이 부분을 추가
         if volume_score < 10:  # 거래량 점수가 10점 미만인 경우
@@ -6413,7 +6485,7 @@ def check_momentum_conditions(stock_data, return_score=False):
         logger.info(f"\n최종 판정: {'통과' if passed else '미달'}")
 
         # 모멘텀 점수 캐싱 - 호가분석에서 활용하기 위해
-        if passed:
+        if passed and cache_score:
             cache_key = f"{stock_code}_momentum_score"
             cache_manager = CacheManager.get_instance()
             cache_manager.set('momentum_data', cache_key, {
@@ -6430,6 +6502,43 @@ def check_momentum_conditions(stock_data, return_score=False):
         return (False, 0) if return_score else False
 
 
+def score_momentum_batch(stock_data_list):
+    """여러 종목의 모멘텀 점수 일괄 계산 (check_momentum_conditions와 같은 규칙, 종목코드 인덱스의 점수표 반환)"""
+    is_early_morning = is_in_early_morning_session()
+    is_morning_session = is_in_morning_session()
+    rsi_bounds = ((MIN_EARLY_MORNING_BUY_RSI, MAX_EARLY_MORNING_BUY_RSI) if is_early_morning
+                  else (MIN_BUY_RSI, MAX_BUY_RSI))
+
+    features = momentum_batch.extract_feature_frame(
+        {stock_data['code']: (stock_data['ohlcv'], stock_data.get('minute_ohlcv')) for stock_data in stock_data_list},
+        is_early_morning)
+    return momentum_batch.score_momentum_batch(
+        features, is_early_morning, is_morning_session,
+        get_required_momentum_score(is_early_morning, is_morning_session), rsi_bounds)
+
+
+def check_momentum_batch_parity(stock_data_list, scored=None):
+    """일괄 점수(score_momentum_batch)와 check_momentum_conditions 결과(통과 여부, 점수) 대조, 불일치 목록 반환"""
+    if scored is None:
+        scored = score_momentum_batch(stock_data_list)
+
+    mismatches = []
+    for stock_data in stock_data_list:
+        stock_code = stock_data['code']
+        passed, score = check_momentum_conditions(stock_data, return_score=True, cache_score=False)
+        batch_passed = bool(scored.at[stock_code, 'passed'])
+        batch_score = int(scored.at[stock_code, 'momentum_score'])
+        if bool(passed) != batch_passed or int(score) != batch_score:
+            mismatches.append({'code': stock_code, 'scalar': (bool(passed), int(score)),
+                               'batch': (batch_passed, batch_score)})
+
+    if mismatches:
+        logger.warning(f"⚠️ 모멘텀 일괄 점수 불일치 {len(mismatches)}/{len(stock_data_list)}종목: {mismatches}")
+    else:
+        logger.info(f"✅ 모멘텀 일괄 점수 대조 일치: {len(stock_data_list)}종목")
+    return mismatches
+
+
 def load_detected_stocks():
     """이전 포착 종목 로드"""
     try:
@@ -6687,8 +6796,41 @@ def scan_hong_strategy_stocks(stock_list=None, is_morning_session=False, is_earl
        return []  # 에러 발생시 빈 리스트 반환
 
 
+def build_momentum_stock_info(stock, stock_data, momentum_score, previous_codes):
+    """모든 조건을 통과한 종목의 스캔 결과 생성 (신규 포착 종목은 알림 로그)"""
+    stock_code = stock['code']
+    logger.info(f">>> {stock['name']} - 모든 조건 통과!")
+    avg_volume = get_average_volume(stock_code, VOLUME_WINDOW)
+    
+    stock_info = {
+        'code': stock_code,
+        'name': stock['name'],
+        'price': stock_data['current_price'],
+        'volume_ratio': stock_data['volume'] / stock_data['prev_volume'],
+        'avg_volume': avg_volume,
+        'rsi': stock_data['rsi'],
+        'atr': stock_data['atr'],
+        'strategy': 'momentum',
+        'momentum_score': momentum_score  # 모멘텀 점수 추가
+    }
+
+    # 신규 포착 알림
+    if stock_code not in previous_codes:
+        try:
+            msg = f"🎯 새로운 모멘텀 포착! - {stock['name']}({stock_code})\n"
+            msg += f"- 현재가: {stock_data['current_price']:,}원\n"
+            msg += f"- 거래량: {stock_data['volume']:,}주 "
+            msg += f"(평균 대비 {stock_data['volume']/avg_volume*100:.1f}%)\n"
+            msg += f"- RSI: {stock_data['rsi']:.1f}\n"
+            msg += f"- 모멘텀 점수: {momentum_score}"
+            logger.info(msg)
+        except Exception as e:
+            logger.error(f"신규 포착 알림 생성 중 에러: {stock_code}, {str(e)}")
+
+    return stock_info
+
 def process_stock_chunk(stocks_chunk, momentum_stocks, sold_stocks, previous_codes):
-    """단일 청크 처리 함수 - 디버깅 강화"""
+    """단일 청크 처리 함수 - 디버깅 강화 (순차 처리, 백테스트 재생용 / 실전 스캔은 ScanPipeline)"""
     # 현재 시간 체크
     now = datetime.now()
     chunk_results = []
@@ -6754,31 +6896,7 @@ def process_stock_chunk(stocks_chunk, momentum_stocks, sold_stocks, previous_cod
                 logger.info("  -> 고점 체크(check_buy_conditions 함수 실행결과) 통과")
 
                 # 최종 선정
-                logger.info(f">>> {stock['name']} - 모든 조건 통과!")
-                avg_volume = get_average_volume(stock_code, VOLUME_WINDOW)
-                
-                stock_info = {
-                    'code': stock_code,
-                    'name': stock['name'],
-                    'price': stock_data['current_price'],
-                    'volume_ratio': stock_data['volume'] / stock_data['prev_volume'],
-                    'avg_volume': avg_volume,
-                    'rsi': stock_data['rsi'],
-                    'atr': stock_data['atr'],
-                    'strategy': 'momentum',
-                    'momentum_score': momentum_score  # 모멘텀 점수 추가
-                }
-                chunk_results.append(stock_info)
-
-                # 신규 포착 알림
-                if stock_code not in previous_codes:
-                    msg = f"🎯 새로운 모멘텀 포착! - {stock['name']}({stock_code})\n"
-                    msg += f"- 현재가: {stock_data['current_price']:,}원\n"
-                    msg += f"- 거래량: {stock_data['volume']:,}주 "
-                    msg += f"(평균 대비 {stock_data['volume']/avg_volume*100:.1f}%)\n"
-                    msg += f"- RSI: {stock_data['rsi']:.1f}\n"
-                    msg += f"- 모멘텀 점수: {momentum_score}"
-                    logger.info(msg)
+                chunk_results.append(build_momentum_stock_info(stock, stock_data, momentum_score, previous_codes))
 
         except Exception as e:
             logger.error(f"종목 {stock_code if 'stock_code' in locals() else 'Unknown'} 처리 중 에러: {str(e)}")
@@ -6787,6 +6905,274 @@ def process_stock_chunk(stocks_chunk, momentum_stocks, sold_stocks, previous_cod
     return chunk_results
 
 
+class ScanPipeline:
+    """단계별 우선순위 스캔 파이프라인
+
+    스냅샷 → 일봉 → 분봉 → 매수조건/호가 순으로 비싼 조회를 뒤로 미루고,
+    단계 사이는 부분 점수가 높은 종목부터 꺼내는 크기 제한 우선순위 큐로 연결
+    - 스냅샷: 당일 매도/이미 선정/중복 종목 제외, 등락률·거래량 비율 순 정렬 (API 호출 없음)
+    - 일봉: 일봉만으로 모멘텀 점수 계산, 분봉 MACD 최대 점수를 더해도 기준 미달이면 제외
+            (분봉/현재가 조회 생략, 최종 판정과 어긋나는 제외는 없음)
+            점수는 SCAN_DAILY_SCORE_BATCH개씩 모아 score_momentum_batch로 일괄 계산 (남은 종목은 단계 종료 시)
+    - 분봉: get_stock_data(분봉/현재가 포함)로 모멘텀 점수 확정
+    - 매수조건/호가: check_buy_conditions(고점 근접도, 단기 상승률, 호가 분석) 통과 시 최종 선정
+    - 저가 기준(MIN_PRICE_THRESHOLD) 이상 선정 종목이 buy_slots개가 되면 남은 작업은 취소 (None이면 끝까지 진행)
+    - 결과는 모멘텀 점수 높은 순 (먼저 끝난 순서가 아님)
+    - 단계별 처리 건수/소요 시간은 stats에 기록하고 log_stats()로 출력
+    """
+
+    STAGES = ('snapshot', 'daily', 'minute', 'order_book')
+    STAGE_NAMES = {'snapshot': '스냅샷', 'daily': '일봉', 'minute': '분봉', 'order_book': '매수조건/호가'}
+    MANDATORY_FIELDS = ['code', 'current_price', 'volume', 'volume_ma5', 'rsi', 'macd', 'macd_signal']
+
+    def __init__(self, momentum_stocks, sold_stocks, previous_codes, buy_slots=None,
+                 workers=None, queue_size=SCAN_QUEUE_SIZE):
+        self.momentum_stocks = momentum_stocks
+        self.sold_stocks = sold_stocks
+        self.previous_codes = previous_codes
+        self.buy_slots = buy_slots
+        self.workers = {stage: max(1, count) for stage, count in dict(SCAN_STAGE_WORKERS, **(workers or {})).items()}
+        self.queue_size = queue_size
+        self.results = []
+        self.cancelled = threading.Event()
+        self.elapsed = 0.0
+        self.stats = {stage: {'in': 0, 'out': 0, 'skipped': 0, 'busy': 0.0, 'started': None, 'finished': None}
+                      for stage in self.STAGES}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._remaining = {}
+        self._daily_batch = []
+        self._eligible = 0
+
+    @staticmethod
+    def snapshot_score(stock):
+        """종목 리스트 스냅샷(등락률, 거래량 비율) 우선순위 점수 - 제외 기준이 아니라 처리 순서에만 사용"""
+        try:
+            return float(stock.get('price_change') or 0) + float(stock.get('volume_ratio') or 0) * 10
+        except (TypeError, ValueError):
+            return 0.0
+
+    def run(self, stock_list):
+        """stock_list를 단계별로 처리하고 최종 선정 종목 리스트 반환"""
+        started = time.time()
+        stages = self.STAGES[1:]
+        handlers = {'daily': self._daily_stage, 'minute': self._minute_stage, 'order_book': self._order_book_stage}
+        self._flush_handlers = {'daily': self._flush_daily_batch}
+        queues = {stage: queue.PriorityQueue(maxsize=self.queue_size) for stage in stages}
+        self._remaining = {stage: self.workers[stage] for stage in stages}
+
+        threads = []
+        for index, stage in enumerate(stages):
+            next_stage = stages[index + 1] if index + 1 < len(stages) else None
+            for _ in range(self.workers[stage]):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(stage, handlers[stage], queues[stage], next_stage, queues.get(next_stage)),
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            if self.buy_slots is not None and self.buy_slots <= 0:
+                self.cancelled.set()
+            for score, stock in self._snapshot_stage(stock_list):
+                if self.cancelled.is_set():
+                    break
+                self._put(queues['daily'], score, stock)
+        finally:
+            self._close(queues['daily'], 'daily')
+            for thread in threads:
+                thread.join()
+
+        self.elapsed = time.time() - started
+        self.results.sort(key=lambda stock_info: stock_info['momentum_score'], reverse=True)
+        return self.results
+
+    def log_stats(self):
+        """단계별 처리 건수와 소요 시간 출력"""
+        lines = [f"\n=== 스캔 단계별 처리 현황 (총 {self.elapsed:.2f}초, 선정 {len(self.results)}종목) ==="]
+        if self.cancelled.is_set():
+            lines.append(f"- 매수 가능 종목 수({self.buy_slots}개) 충족으로 남은 작업 취소")
+        for stage in self.STAGES:
+            stats = self.stats[stage]
+            elapsed = stats['finished'] - stats['started'] if stats['started'] is not None else 0.0
+            line = f"- {self.STAGE_NAMES[stage]}: {stats['in']}건 → 통과 {stats['out']}건"
+            if stats['skipped']:
+                line += f", 취소 {stats['skipped']}건"
+            line += f" | 경과 {elapsed:.2f}초 (작업 합계 {stats['busy']:.2f}초)"
+            lines.append(line)
+        logger.info("\n".join(lines))
+
+    def _snapshot_stage(self, stock_list):
+        """스냅샷 단계 - 당일 매도/이미 선정/중복 종목 제외 후 스냅샷 점수 순 정렬"""
+        started = time.time()
+        excluded = {stock['code'] for stock in self.momentum_stocks} | set(self.sold_stocks)
+        candidates = []
+        for stock in stock_list:
+            stock_code = stock.get('code')
+            if not stock_code or stock_code in excluded:
+                continue
+            excluded.add(stock_code)
+            candidates.append((self.snapshot_score(stock), stock))
+        candidates.sort(key=lambda x: x[0], reverse=True)
+        self._record('snapshot', started, len(stock_list), len(candidates))
+        return candidates
+
+    def _daily_stage(self, stock):
+        """일봉 단계 - 일봉을 조회해 모아 두고 SCAN_DAILY_SCORE_BATCH개가 차면 일괄 점수 계산 (통과 종목 리스트 반환)"""
+        stock_code = stock['code']
+        df = get_daily_ohlcv(stock_code)
+        if df is None or len(df) < 5:
+            logger.info(f"{stock['name']}({stock_code}) - 일봉 데이터 부족으로 제외")
+            return None
+
+        daily_data = {'code': stock_code, 'current_price': df['close'].iloc[-1], 'ohlcv': df, 'minute_ohlcv': None}
+        with self._lock:
+            self._daily_batch.append((stock, daily_data))
+            if len(self._daily_batch) < SCAN_DAILY_SCORE_BATCH:
+                return []
+            batch, self._daily_batch = self._daily_batch, []
+        return self._score_daily_batch(batch)
+
+    def _flush_daily_batch(self):
+        """일봉 단계 종료 시 남은 종목 점수 계산"""
+        with self._lock:
+            batch, self._daily_batch = self._daily_batch, []
+        return self._score_daily_batch(batch) if batch else []
+
+    def _score_daily_batch(self, batch):
+        """일봉 모멘텀 점수 일괄 계산 후 분봉 조회 대상 선별"""
+        stock_data_list = [daily_data for _, daily_data in batch]
+        scored = score_momentum_batch(stock_data_list)
+        if MOMENTUM_BATCH_PARITY_CHECK:
+            check_momentum_batch_parity(stock_data_list, scored)
+
+        is_early_morning = is_in_early_morning_session()
+        required_score = get_required_momentum_score(False, is_in_morning_session())
+        results = []
+        for stock, daily_data in batch:
+            stock_code = stock['code']
+            daily_score = int(scored.at[stock_code, 'momentum_score'])
+            if is_early_morning:
+                # 장초반에는 get_stock_data도 분봉 대신 일봉을 쓰므로 일봉 점수가 곧 최종 점수
+                if not scored.at[stock_code, 'passed']:
+                    logger.info(f"{stock['name']}({stock_code}) - 일봉 모멘텀 점수 미달로 제외 ({daily_score}점)")
+                    continue
+            elif daily_score + MOMENTUM_MACD_MAX_SCORE < required_score:
+                # 분봉 확인으로 바뀌는 건 MACD 점수뿐이므로 최대 점수를 더해도 기준 미달이면 제외
+                logger.info(f"{stock['name']}({stock_code}) - 일봉 모멘텀 점수 미달로 제외 "
+                            f"({daily_score}점 + MACD 최대 {MOMENTUM_MACD_MAX_SCORE}점 < {required_score}점)")
+                continue
+            results.append((daily_score, stock))
+        return results
+
+    def _minute_stage(self, stock):
+        """분봉 단계 - 분봉/현재가를 포함한 전체 데이터로 모멘텀 점수 확정"""
+        stock_code = stock['code']
+        stock_data = get_stock_data(stock_code)
+        if stock_data is None:
+            logger.info(f"{stock['name']}({stock_code}) - 주가 데이터 로드 실패")
+            return None
+
+        stock_data['code'] = stock_code
+        missing_fields = [field for field in self.MANDATORY_FIELDS if field not in stock_data]
+        if missing_fields:
+            logger.info(f"{stock['name']}({stock_code}) - 필수 필드 누락: {missing_fields}")
+            return None
+
+        passed_momentum, momentum_score = check_momentum_conditions(stock_data, return_score=True)
+        if not passed_momentum:
+            return None
+        return momentum_score, (stock, stock_data, momentum_score)
+
+    def _order_book_stage(self, item):
+        """매수조건/호가 단계 - check_buy_conditions 통과 종목 최종 선정"""
+        stock, stock_data, momentum_score = item
+        if not check_buy_conditions(stock_data):
+            # 모멘텀 점수가 높은 경우 저장
+            if momentum_score >= HIGH_MOMENTUM_SCORE_THRESHOLD:
+                save_high_momentum_missed_stocks(stock_data, momentum_score, "고점 근접도 불충족")
+            return None
+
+        stock_info = build_momentum_stock_info(stock, stock_data, momentum_score, self.previous_codes)
+        with self._lock:
+            self.results.append(stock_info)
+            # 매수 단계에서 바로 제외되는 저가 종목은 매수 가능 종목 수에 넣지 않음
+            if stock_info['price'] >= MIN_PRICE_THRESHOLD:
+                self._eligible += 1
+            slots_filled = self.buy_slots is not None and self._eligible >= self.buy_slots
+        if slots_filled and not self.cancelled.is_set():
+            self.cancelled.set()
+            logger.info(f"매수 가능 종목 수({self.buy_slots}개) 충족 - 남은 스캔 작업 취소")
+        return momentum_score, stock_info
+
+    def _worker(self, stage, handler, in_queue, next_stage, out_queue):
+        """단계 작업 스레드 - 점수 높은 종목부터 처리해 다음 단계 큐로 전달"""
+        while True:
+            _, _, item = in_queue.get()
+            if item is None:
+                break
+            if self.cancelled.is_set():
+                with self._lock:
+                    self.stats[stage]['skipped'] += 1
+                continue
+
+            started = time.time()
+            try:
+                result = handler(item)
+            except Exception as e:
+                logger.error(f"스캔 {self.STAGE_NAMES[stage]} 단계 처리 중 에러: {str(e)}")
+                result = None
+            # 일괄 처리 단계는 (점수, 항목) 리스트를 반환 (아직 모으는 중이면 빈 리스트)
+            results = result if isinstance(result, list) else ([] if result is None else [result])
+            self._record(stage, started, 1, len(results))
+            self._forward(out_queue, results)
+
+        # 단계의 마지막 스레드가 남은 일괄 처리분을 넘기고 다음 단계에 종료 신호 전달
+        with self._lock:
+            self._remaining[stage] -= 1
+            is_last = self._remaining[stage] == 0
+        if is_last and stage in self._flush_handlers and not self.cancelled.is_set():
+            started = time.time()
+            try:
+                results = self._flush_handlers[stage]()
+            except Exception as e:
+                logger.error(f"스캔 {self.STAGE_NAMES[stage]} 단계 마무리 중 에러: {str(e)}")
+                results = []
+            self._record(stage, started, 0, len(results))
+            self._forward(out_queue, results)
+        if is_last and out_queue is not None:
+            self._close(out_queue, next_stage)
+
+    def _forward(self, out_queue, results):
+        if out_queue is None:
+            return
+        for score, item in results:
+            if self.cancelled.is_set():
+                break
+            self._put(out_queue, score, item)
+
+    def _put(self, target_queue, score, item):
+        # 큐가 가득 차면 다음 단계가 꺼낼 때까지 대기 (점수 역순, 같은 점수는 먼저 들어온 순)
+        target_queue.put((-score, next(self._sequence), item))
+
+    def _close(self, target_queue, stage):
+        # 종료 신호는 어떤 점수보다 뒤에 꺼내지도록 무한대 우선순위로 작업 스레드 수만큼 넣음
+        for _ in range(self.workers[stage]):
+            target_queue.put((float('inf'), next(self._sequence), None))
+
+    def _record(self, stage, started, processed, passed):
+        finished = time.time()
+        with self._lock:
+            stats = self.stats[stage]
+            stats['in'] += processed
+            stats['out'] += passed
+            stats['busy'] += finished - started
+            stats['started'] = started if stats['started'] is None else min(stats['started'], started)
+            stats['finished'] = finished if stats['finished'] is None else max(stats['finished'], finished)
+
+
 ############# 장 초반 종목 스캔 (9:00~9:20)#############
 
 @cached('volume_rank')
@@ -7306,8 +7692,11 @@ def detect_higher_lows_pattern(stock_code, min_candles=8):
         return False, {"error": str(e)}
 
 
-def scan_momentum_stocks():
-    """급등 가능성이 높은 종목 스캔 - 완전한 버전"""
+def scan_momentum_stocks(buy_slots=None):
+    """급등 가능성이 높은 종목 스캔 - 완전한 버전
+
+    buy_slots: 남은 매수 가능 종목 수 (그 SCAN_SLOT_OVERPROVISION배가 선정되면 스캔 조기 종료, None이면 전체 스캔)
+    """
     momentum_stocks = []
     
     try:
@@ -7584,31 +7973,12 @@ def scan_momentum_stocks():
  
         logger.info(f"\n총 {len(stock_list)}개 종목 분석 시작...")
 
-        # 청크 기반 병렬 처리
-        CHUNK_SIZE = 20
-        chunks = [stock_list[i:i + CHUNK_SIZE] 
-                 for i in range(0, len(stock_list), CHUNK_SIZE)]
-        
-        processed_count = 0
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            futures = [executor.submit(
-                process_stock_chunk, 
-                chunk, 
-                momentum_stocks, 
-                sold_stocks,
-                previous_codes
-            ) for chunk in chunks]
-            
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    results = future.result()
-                    if results:
-                        momentum_stocks.extend(results)
-                    processed_count += CHUNK_SIZE
-                    logger.info(f"진행률: {min(processed_count, len(stock_list))}/{len(stock_list)}")
-                except Exception as e:
-                    logger.error(f"청크 처리 중 에러: {str(e)}")
-                    continue
+        # 단계별 우선순위 파이프라인 (스냅샷 → 일봉 → 분봉 → 매수조건/호가)
+        # 매수 단계의 뉴스/미체결/쿨다운 필터에서 걸러질 수 있으므로 남은 자리보다 넉넉히 선정
+        scan_slots = None if buy_slots is None else max(buy_slots, 0) * SCAN_SLOT_OVERPROVISION
+        pipeline = ScanPipeline(momentum_stocks, sold_stocks, previous_codes, buy_slots=scan_slots)
+        momentum_stocks.extend(pipeline.run(stock_list))
+        pipeline.log_stats()
 
         # 결과 정렬 및 저장
         momentum_stocks.sort(
@@ -7622,8 +7992,11 @@ def scan_momentum_stocks():
 
         # 이미 처리된 종목 중복 방지
         processed_codes = [stock['code'] for stock in momentum_stocks]
+
+        # 매수 가능 종목 수가 이미 채워졌으면 추가 스캔 생략
+        higher_lows_scan_list = [] if pipeline.cancelled.is_set() else stock_list
         
-        for stock in stock_list:
+        for stock in higher_lows_scan_list:
             if stock['code'] in sold_stocks or stock['code'] in processed_codes:
                 continue  # 당일 매도 종목 또는 이미 포함된 종목은 제외
             
@@ -7725,18 +8098,24 @@ def scan_momentum_stocks():
     return momentum_stocks
 
 
+# 트레이딩 상태는 메모리에 두고 변경분만 저널에 기록 (스냅샷은 기존 KrStock_{BOT_NAME}.json에 주기적으로, 매수/매도 시 즉시 저장)
+trading_state_store = state_journal.JournaledStateStore(
+    f"KrStock_{BOT_NAME}.json",
+    default_factory=lambda: {'positions': {}},
+    snapshot_when=state_journal.changes_positions
+)
+
 def load_trading_state():
-    """트레이딩 상태 로드"""
+    """트레이딩 상태 로드 (메모리 상태 사본, 첫 호출 시 스냅샷 + 저널로 복구)"""
     try:
-        with open(f"KrStock_{BOT_NAME}.json", 'r') as f:
-            return json.load(f)
-    except:
+        return trading_state_store.load()
+    except Exception as e:
+        logger.error(f"트레이딩 상태 로드 실패: {str(e)}")
         return {'positions': {}}
 
 def save_trading_state(state):
-    """트레이딩 상태 저장"""
-    with open(f"KrStock_{BOT_NAME}.json", 'w') as f:
-        json.dump(state, f)
+    """트레이딩 상태 저장 (바뀐 부분만 저널에 기록, 포지션 변경 시 스냅샷까지 저장)"""
+    trading_state_store.save(state)
 
 def load_daily_profit_state():
     """일일 손익 상태 로드"""
@@ -8868,15 +9247,43 @@ def check_market_condition():
         logger.error(f"Error checking market condition: {str(e)}")
         return True  # 에러 발생시 기본적으로 트레이딩 허용
 
+# 뉴스 기사 / AI 분석 결과 저장소 - 재시작해도 NEWS_REFRESH_SECONDS 안에 조회한 종목은 다시 조회하지 않고,
+# 기사 구성(내용 해시)이 같은 종목은 AI 분석을 다시 요청하지 않음
+news_article_store = news_store.NewsStore(f"NewsStore_{BOT_NAME}.json")
+naver_news_bucket = global_rate_limiter.TokenBucket(NAVER_NEWS_CALLS_PER_SECOND)
+
+
+def fetch_naver_news(keyword):
+   """네이버 뉴스 검색 1회 (최신순 50건)"""
+   naver_news_bucket.acquire()
+
+   encText = urllib.parse.quote(keyword)
+   url = f"https://openapi.naver.com/v1/search/news?query={encText}&display=50&sort=date"
+   
+   request = urllib.request.Request(url)
+   request.add_header("X-Naver-Client-Id", os.getenv("NAVER_CLIENT_ID"))
+   request.add_header("X-Naver-Client-Secret", os.getenv("NAVER_CLIENT_SECRET"))
+   
+   response = urllib.request.urlopen(request, timeout=10)
+   if response.getcode() != 200:
+       return []
+   return json.loads(response.read().decode('utf-8')).get('items', [])
+
+
 @cached('news_articles')    
 def get_news_articles(stock_code, company_name):
-   """네이버 뉴스 API를 통한 관련 뉴스 수집"""
+   """네이버 뉴스 API를 통한 관련 뉴스 수집 (NEWS_REFRESH_SECONDS 안에 조회한 종목은 저장소 기사 사용)"""
    try:
        # 회사명/종목코드 검증 로직 추가
        if not company_name or not stock_code:
            logger.info(f"경고: 잘못된 회사명 또는 종목코드 - 회사명: {company_name}, 종목코드: {stock_code}")
            return []
 
+       stored_articles = news_article_store.fresh_articles(stock_code, NEWS_REFRESH_SECONDS)
+       if stored_articles is not None:
+           logger.info(f"뉴스 저장소 사용: {company_name} ({stock_code}) - {len(stored_articles)}개")
+           return stored_articles
+
        logger.info(f"뉴스 검색 시도: {company_name} ({stock_code})")
 
        load_dotenv()
@@ -8892,67 +9299,59 @@ def get_news_articles(stock_code, company_name):
        all_articles = []
        processed_titles = set()
        
-       for keyword in keywords:
-           encText = urllib.parse.quote(keyword)
-           url = f"https://openapi.naver.com/v1/search/news?query={encText}&display=50&sort=date"
-           
-           request = urllib.request.Request(url)
-           request.add_header("X-Naver-Client-Id", os.getenv("NAVER_CLIENT_ID"))
-           request.add_header("X-Naver-Client-Secret", os.getenv("NAVER_CLIENT_SECRET"))
-           
-           response = urllib.request.urlopen(request)
-           
-           if response.getcode() == 200:
-               response_body = response.read()
-               news_data = json.loads(response_body.decode('utf-8'))
+       # 키워드별 검색 동시 실행 (초당 호출 수는 naver_news_bucket으로 제한)
+       with concurrent.futures.ThreadPoolExecutor(max_workers=len(keywords)) as executor:
+           keyword_items = list(executor.map(fetch_naver_news, keywords))
+       
+       for items in keyword_items:
+           for item in items:
+               # HTML 태그 및 특수문자 제거
+               title = re.sub('<[^>]+>', '', item['title'])
+               title = re.sub('&[a-zA-Z]+;', '', title)  # HTML 엔터티 제거
+            #    title = re.sub('[^가-힣0-9a-zA-Z\s\[\]\(\)\.,-]', '', title)  # 허용된 문자만 남김
+               title = re.sub(r'[^가-힣0-9a-zA-Z\s\[\]\(\)\.,-]', '', title)                   
                
-               for item in news_data['items']:
-                   # HTML 태그 및 특수문자 제거
-                   title = re.sub('<[^>]+>', '', item['title'])
-                   title = re.sub('&[a-zA-Z]+;', '', title)  # HTML 엔터티 제거
-                #    title = re.sub('[^가-힣0-9a-zA-Z\s\[\]\(\)\.,-]', '', title)  # 허용된 문자만 남김
-                   title = re.sub(r'[^가-힣0-9a-zA-Z\s\[\]\(\)\.,-]', '', title)                   
-                   
-                   description = re.sub('<[^>]+>', '', item['description'])
-                   description = re.sub('&[a-zA-Z]+;', '', description)  # HTML 엔터티 제거
-                #    description = re.sub('[^가-힣0-9a-zA-Z\s\[\]\(\)\.,-]', '', description)  # 허용된 문자만 남김
-                   description = re.sub(r'[^가-힣0-9a-zA-Z\s\[\]\(\)\.,-]', '', description)                   
-                   
-                   # 제목 또는 내용에 회사명이 포함된 경우만 처리
-                   if company_name not in title and company_name not in description:
-                       continue
-                       
-                   if title in processed_titles:
-                       continue
+               description = re.sub('<[^>]+>', '', item['description'])
+               description = re.sub('&[a-zA-Z]+;', '', description)  # HTML 엔터티 제거
+            #    description = re.sub('[^가-힣0-9a-zA-Z\s\[\]\(\)\.,-]', '', description)  # 허용된 문자만 남김
+               description = re.sub(r'[^가-힣0-9a-zA-Z\s\[\]\(\)\.,-]', '', description)                   
+               
+               # 제목 또는 내용에 회사명이 포함된 경우만 처리
+               if company_name not in title and company_name not in description:
+                   continue
                    
-                   pub_date = datetime.strptime(item['pubDate'], '%a, %d %b %Y %H:%M:%S +0900')
+               if title in processed_titles:
+                   continue
+               
+               pub_date = datetime.strptime(item['pubDate'], '%a, %d %b %Y %H:%M:%S +0900')
+               
+               if pub_date >= twelve_hours_ago:
+                   impact_keywords = [
+                       '실적', '매출', '영업이익', '계약', '투자', '강세', '체결', '수주', 
+                       '특허', 'MOU', '기술', '제품', '신제품', '개발', '협약', '증가',
+                       '상승', '하락', '급등', '급락', '신고가', '신저가', '호실적', '흑자',
+                       '적자', '매수', '매도', '목표가', '예상', '전망', '리포트'
+                   ]
                    
-                   if pub_date >= twelve_hours_ago:
-                       impact_keywords = [
-                           '실적', '매출', '영업이익', '계약', '투자', '강세', '체결', '수주', 
-                           '특허', 'MOU', '기술', '제품', '신제품', '개발', '협약', '증가',
-                           '상승', '하락', '급등', '급락', '신고가', '신저가', '호실적', '흑자',
-                           '적자', '매수', '매도', '목표가', '예상', '전망', '리포트'
-                       ]
-                       
-                       if any(keyword in title or keyword in description for keyword in impact_keywords):
-                           all_articles.append({
-                               'title': title.strip(),  # 앞뒤 공백 제거
-                               'description': description[:30].strip()  # 앞뒤 공백 제거
-                           })
-                           processed_titles.add(title)
-           
-           time.sleep(0.1)
+                   if any(keyword in title or keyword in description for keyword in impact_keywords):
+                       all_articles.append({
+                           'title': title.strip(),  # 앞뒤 공백 제거
+                           'description': description[:30].strip(),  # 앞뒤 공백 제거
+                           'link': item.get('link', ''),
+                           'originallink': item.get('originallink', '')
+                       })
+                       processed_titles.add(title)
        
        all_articles.sort(key=lambda x: x['title'])
-       selected_articles = all_articles[:3]
+       new_count = news_article_store.record_fetch(stock_code, all_articles[:3])
+       selected_articles = [{'title': article['title'], 'description': article['description']} for article in all_articles[:3]]
        
        logger.info(f"\n=== {company_name} 주요 뉴스 ===")
        for i, article in enumerate(selected_articles, 1):
            logger.info(f"\n[{i}] {article['title']}")
            logger.info(f"내용: {article['description']}...")
        
-       logger.info(f"\n총 {len(selected_articles)}개의 관련 뉴스를 찾았습니다.")
+       logger.info(f"\n총 {len(selected_articles)}개의 관련 뉴스를 찾았습니다. (새 기사 {new_count}개)")
        
        return selected_articles
            
@@ -8964,7 +9363,10 @@ def get_news_articles(stock_code, company_name):
 
 @cached('news_analysis')
 def analyze_all_stocks_news(my_stocks):
-    """모든 보유 종목의 뉴스를 한번에 분석"""
+    """모든 보유 종목의 뉴스를 한번에 분석
+    - 종목별 뉴스는 동시에 조회
+    - 기사 구성(내용 해시)이 같은 종목은 저장된 분석 결과를 쓰고, 바뀐 종목만 모아 AI 분석 1회 요청
+    """
     try:
         if not my_stocks:
             return {}
@@ -8972,12 +9374,16 @@ def analyze_all_stocks_news(my_stocks):
         news_data = {
             "stocks": {}
         }
+        pending_analysis = {}  # AI 분석을 요청할 종목 {종목명: 내용 해시}
         
-        for stock in my_stocks:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(NEWS_FETCH_WORKERS, len(my_stocks))) as executor:
+            fetched_articles = list(executor.map(
+                lambda stock: get_news_articles(stock['StockCode'], stock['StockName']), my_stocks))
+        
+        for stock, news_articles in zip(my_stocks, fetched_articles):
             stock_code = stock['StockCode']
             stock_name = stock['StockName']
             
-            news_articles = get_news_articles(stock_code, stock_name)
             if not news_articles:
                 logger.info(f"경고: {stock_name} ({stock_code})에 대한 뉴스를 찾을 수 없습니다.")
                 continue
@@ -8992,8 +9398,22 @@ def analyze_all_stocks_news(my_stocks):
                     for article in news_articles[:3]  # 최근 3개 뉴스
                 ]
             }
+            
+            digest = news_store.content_hash(stock_name, news_data["stocks"][stock_name]["articles"])
+            stored_analysis = news_article_store.get_analysis(digest)
+            if stored_analysis is not None:
+                news_data["stocks"][stock_name]["analysis"] = stored_analysis
+            else:
+                pending_analysis[stock_name] = digest
+
+        reused_count = len(news_data["stocks"]) - len(pending_analysis)
+        if reused_count:
+            logger.info(f"📰 저장된 뉴스 분석 사용: {reused_count}종목 (AI 분석 요청 {len(pending_analysis)}종목)")
 
-        if news_data["stocks"]:
+        if pending_analysis:
+            request_data = {
+                "stocks": {stock_name: news_data["stocks"][stock_name] for stock_name in pending_analysis}
+            }
             client = openai.OpenAI()
 
             response = client.chat.completions.create(
@@ -9011,7 +9431,7 @@ def analyze_all_stocks_news(my_stocks):
                 },
                 {
                     "role": "user",
-                    "content": json.dumps(news_data, ensure_ascii=False)
+                    "content": json.dumps(request_data, ensure_ascii=False)
                 }],
                 response_format={
                     "type": "json_schema",
@@ -9043,16 +9463,19 @@ def analyze_all_stocks_news(my_stocks):
 
             analysis_results = json.loads(response.choices[0].message.content)
 
-            # 분석 결과를 news_data 구조에 통합
+            # 분석 결과를 news_data 구조에 통합하고 내용 해시로 저장
+            new_analyses = {}
             if "analyses" in analysis_results:
                 for analysis in analysis_results["analyses"]:
                     stock_name = analysis["stock_name"]
-                    if stock_name in news_data["stocks"]:
+                    if stock_name in pending_analysis:
                         news_data["stocks"][stock_name]["analysis"] = {
                             "decision": analysis["decision"],
                             "percentage": analysis["percentage"],
                             "reason": analysis["reason"]
                         }
+                        new_analyses[pending_analysis[stock_name]] = news_data["stocks"][stock_name]["analysis"]
+            news_article_store.put_analyses(new_analyses)
 
             # 결과 로깅 및 알림
             msg = "📊 보유/매수대상 종목 뉴스 분석 결과\n"
@@ -9169,6 +9592,162 @@ def get_actual_position_count(trading_state):
     
     return total_count
 
+def service_position(stock, trading_state, daily_profit, current_date, is_morning_session, all_news_analysis):
+    """보유 종목 하나의 트레일링 스탑/손절/재평가 점검 및 매도 처리
+    (main 루프와 체결 대기 중 점검(service_positions_during_fill)에서 공용)
+    """
+    stock_code = stock['StockCode']
+    stock_name = stock.get('StockName', stock_code)
+    if stock_code in trading_state['positions']:
+        position = trading_state['positions'][stock_code]
+        current_price = KisKR.GetCurrentPrice(stock_code)
+        current_data = get_stock_data(stock_code)
+
+        # 기존 트레일링 스탑 체크
+        should_sell, updated_position, sell_type = update_trailing_stop(position, current_price, current_data)
+
+        # 오전 장중이면 다음날 재평가 로직도 체크
+        if is_morning_session and not should_sell:  # 트레일링 스탑에 걸리지 않은 경우만
+
+        # entry_time을 datetime 객체로 변환
+            entry_time = datetime.strptime(position['entry_time'], '%Y-%m-%d %H:%M:%S')
+            current_time = datetime.now()
+
+        # 매수일자와 현재 일자가 다른 경우에만 재평가
+            if entry_time.date() < current_time.date():
+                 if check_next_day_exit_conditions(stock_code, position, all_news_analysis):
+                     should_sell = True
+                     sell_type = "REEVALUATION"
+
+        trading_state['positions'][stock_code] = updated_position
+        save_trading_state(trading_state)
+
+        if should_sell:
+            # 분할매도 조건 확인
+            if sell_type.startswith("FRACTIONAL_"):
+                # 분할매도 로직 호출
+                sell_reason = sell_type.replace("FRACTIONAL_", "")
+
+                # determine_fractional_sell 함수에서 얻은 매도 비율 다시 계산
+                # (함수 호출 결과에서 바로 추출할 수 없어 매도 유형에 따라 설정)
+                sell_ratio = 0.0
+
+                if sell_reason == "HIGH_VOLATILITY_PROFIT":
+                    sell_ratio = HIGH_VOL_SELL_RATIO
+                elif sell_reason == "FIRST_STAGE_PROFIT":
+                    sell_ratio = FIRST_SELL_RATIO
+                elif sell_reason == "SECOND_STAGE_PROFIT":
+                    sell_ratio = SECOND_SELL_RATIO
+                elif sell_reason == "THIRD_STAGE_PROFIT":
+                    sell_ratio = THIRD_SELL_RATIO
+
+                # 분할매도 실행
+                success, trade_info, remaining_amount = execute_fractional_sell(
+                    stock_code, 
+                    position, 
+                    sell_ratio, 
+                    sell_reason, 
+                    daily_profit
+                )
+
+                if success:
+                    # 거래 이력 저장
+                    trade_history = load_today_trade_history()
+                    if trade_history['date'] != current_date:
+                        trade_history = {'date': current_date, 'trades': []}
+
+                    # trade_info가 None이 아닌 경우에만 거래 이력에 추가
+                    if trade_info is not None:  # None 체크로 명확히 함
+                        trade_history['trades'].append(trade_info)
+                        save_today_trade_history(trade_history)
+                        logger.info(f"거래 이력 저장 완료: {stock_code}")
+                    else:
+                        logger.warning(f"{stock_code} 거래 정보가 없어 이력에 저장하지 않음")
+
+                    # 분할매도 정보 업데이트
+                    if remaining_amount > 0:
+                        # 분할매도 단계 업데이트
+                        if 'fractional_sell_stage' not in position:
+                            position['fractional_sell_stage'] = 0
+
+                        position['fractional_sell_stage'] += 1
+                        position['last_fractional_sell_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                        position['amount'] = remaining_amount
+
+                        # 트레이딩 상태 저장
+                        trading_state['positions'][stock_code] = position
+                        save_trading_state(trading_state)
+
+                        logger.info(f"{stock_name}({stock_code}) 분할매도 완료 - 포지션 업데이트: 남은 수량 {remaining_amount}주, 단계 {position['fractional_sell_stage']}")
+                    else:
+                        # 전체 매도 완료된 경우
+                        del trading_state['positions'][stock_code]
+                        save_trading_state(trading_state)
+
+                        # 당일 매도 종목 리스트에 추가 및 저장
+                        daily_trading = load_daily_trading_history()
+                        if stock_code not in daily_trading['sold_stocks']:
+                            daily_trading['sold_stocks'].append(stock_code)
+                            save_daily_trading_history(daily_trading)
+
+                        logger.info(f"{stock_name}({stock_code}) 전체 매도 완료 - 포지션 삭제")
+                else:
+                    # 매도 실패 시 로그 및 알림 추가
+                    msg = f"⚠️ {stock_name}({stock_code}) 분할매도 실패 - 다음 주기에 재시도합니다."
+                    logger.warning(msg)
+                    discord_alert.SendMessage(msg)
+            else:
+                # 기존 매도 로직 사용 (변경 없음)
+                success, trade_info, remaining_amount = handle_sell_order(
+                    stock_code, 
+                    position, 
+                    sell_type, 
+                    daily_profit
+                 )
+
+                if success:
+                    # 거래 이력 저장
+                    trade_history = load_today_trade_history()
+                    if trade_history['date'] != current_date:
+                        trade_history = {'date': current_date, 'trades': []}
+
+                    # trade_info가 None이 아닌 경우에만 거래 이력에 추가
+                    if trade_info is not None:  # None 체크로 명확히 함
+                        trade_history['trades'].append(trade_info)
+                        save_today_trade_history(trade_history)
+                        logger.info(f"거래 이력 저장 완료: {stock_code}")
+                    else:
+                        logger.warning(f"{stock_code} 거래 정보가 없어 이력에 저장하지 않음")
+
+                    # 일부 매도인 경우 (remaining_amount > 0)
+                    if remaining_amount > 0:
+                        # 포지션 수량 업데이트
+                        trading_state['positions'][stock_code]['amount'] = remaining_amount
+                        save_trading_state(trading_state)
+                        logger.info(f"{stock_name}({stock_code}) 일부 매도 완료 - 남은 수량: {remaining_amount}주")
+                    else:
+                        # 전체 매도인 경우 - 포지션 삭제
+                        del trading_state['positions'][stock_code]
+                        save_trading_state(trading_state)
+                        # 당일 매도 종목 리스트에 추가 및 저장
+                        daily_trading = load_daily_trading_history()
+                        if stock_code not in daily_trading['sold_stocks']:
+                            daily_trading['sold_stocks'].append(stock_code)
+                            save_daily_trading_history(daily_trading)
+
+                    # 여기에 미체결 주문 상태 제거 로직 추가
+                    if 'pending_orders' in trading_state and stock_code in trading_state['pending_orders']:
+                        del trading_state['pending_orders'][stock_code]
+                        logger.info(f"{stock_code} 미체결 주문 상태 제거")
+                        save_trading_state(trading_state)
+
+                else:
+                    # 매도 실패 시 로그 및 알림 추가
+                    msg = f"⚠️ {stock_name}({stock_code}) 매도 실패 - 다음 주기에 재시도합니다."
+                    logger.warning(msg)
+                    discord_alert.SendMessage(msg)
+
+
 def main():
    msg = "모멘텀 데이트레이딩 봇 시작!"
    logger.info(msg)
@@ -9206,15 +9785,19 @@ def main():
 ################초기화 코드 선언#########################
 
    while True:
+       # 구간 프로파일 - 이전 루프 기록 후 새 루프 시작
+       main_loop_profiler.start_loop('holiday_check')
        try:
            today = datetime.now().strftime('%Y-%m-%d')
            # 휴장일 체크
            if KisKR.IsTodayOpenCheck() == 'N':
               logger.info("휴장일 입니다.")
+              main_loop_profiler.phase('sleep')
               time.sleep(300)  # 5분 대기
               continue
                       
            # 거래 상태 로드
+           main_loop_profiler.phase('load_state')
            trading_state = load_trading_state()
 
            now = datetime.now()
@@ -9225,11 +9808,13 @@ def main():
 
 
            # 미체결 주문 자동 취소 함수 호출 (루프마다 체크)
+           main_loop_profiler.phase('auto_cancel')
            auto_cancel_pending_orders(max_pending_minutes=15)  # 15분 이후 취소
 
 ################################################## 초기화 코드 ####################################################
 
            # 일일 매매 이력 로드
+           main_loop_profiler.phase('daily_init')
            daily_trading = load_daily_trading_history()
 
            # 당일 매도 종목 리스트 업데이트
@@ -9314,6 +9899,7 @@ def main():
 ################################################## 초기화 코드 ####################################################
 
             # 실시간 계좌 정보 업데이트
+           main_loop_profiler.phase('balance')
            try:
                current_balance = KisKR.GetBalance()
                current_total_money = float(current_balance.get('TotalMoney', 0))
@@ -9336,6 +9922,7 @@ def main():
                market_open_notified = True
 
            # 장 개장일이면서 장 마감 시간이면 일일 보고서 전송
+           main_loop_profiler.phase('report')
            if KisKR.IsTodayOpenCheck() and now.hour == 15 and now.minute >= 30 and now.minute < 50 and not send_daily_report_finished:  # 15:30~15:35 사이
                send_daily_report()  # 기존 계좌 보고서
                send_daily_trading_report()  # 당일 매매 수익 보고서
@@ -9344,12 +9931,14 @@ def main():
            if not is_trading_time:
                msg = "장 시간 외 입니다. 다음 장 시작까지 대기"
                logger.info(msg)
+               main_loop_profiler.phase('sleep')
                time.sleep(300)  # 5분 대기
                continue
 
            trading_budget = current_total_money * TRADE_BUDGET_RATIO
 
            # 손실 한도 체크를 위해 daily_profit 로드
+           main_loop_profiler.phase('profit_limits')
            daily_profit = load_daily_profit_state()
 
            # 당일 실현손익 기준으로 손실 한도 체크
@@ -9373,6 +9962,7 @@ def main():
                     discord_today_profit = True
 
            # 봇이 보유한 종목들의 종목코드 리스트
+           main_loop_profiler.phase('positions')
            bot_positions = list(trading_state['positions'].keys())
 
            logger.info(f"bot_positions 내용: {bot_positions}")           
@@ -9391,163 +9981,26 @@ def main():
             # 오전 장중(9:00-10:00)에만 일일 뉴스 분석
            if is_morning_session and not news_analysis_done and bot_stocks:
                logger.info("오늘의 뉴스 분석 시작...")
+               main_loop_profiler.phase('news')
                all_news_analysis = analyze_all_stocks_news(bot_stocks)
                news_analysis_done = True
                msg = "오늘의 보유 종목 뉴스 분석 완료"
                logger.info(msg)
             #    discord_alert.SendMessage(msg)
 
+           # 체결 대기 중 다른 보유 종목 점검에 쓸 현재 루프 상태
+           position_service_context.update(
+               trading_state=trading_state,
+               daily_profit=daily_profit,
+               current_date=current_date,
+               is_morning_session=is_morning_session,
+               all_news_analysis=all_news_analysis
+           )
+
            # 봇이 매매한 종목만 체크
+           main_loop_profiler.phase('positions')
            for stock in bot_stocks:
-               stock_code = stock['StockCode']
-               if stock_code in trading_state['positions']:
-                   position = trading_state['positions'][stock_code]
-                   current_price = KisKR.GetCurrentPrice(stock_code)
-                   current_data = get_stock_data(stock_code)
-                                
-                   # 기존 트레일링 스탑 체크
-                   should_sell, updated_position, sell_type = update_trailing_stop(position, current_price, current_data)
-                                
-                   # 오전 장중이면 다음날 재평가 로직도 체크
-                   if is_morning_session and not should_sell:  # 트레일링 스탑에 걸리지 않은 경우만
-
-                   # entry_time을 datetime 객체로 변환
-                       entry_time = datetime.strptime(position['entry_time'], '%Y-%m-%d %H:%M:%S')
-                       current_time = datetime.now()
-
-                   # 매수일자와 현재 일자가 다른 경우에만 재평가
-                       if entry_time.date() < current_time.date():
-                            if check_next_day_exit_conditions(stock_code, position, all_news_analysis):
-                                should_sell = True
-                                sell_type = "REEVALUATION"
-                                
-                   trading_state['positions'][stock_code] = updated_position
-                   save_trading_state(trading_state)
-
-                   if should_sell:
-                       # 분할매도 조건 확인
-                       if sell_type.startswith("FRACTIONAL_"):
-                           # 분할매도 로직 호출
-                           sell_reason = sell_type.replace("FRACTIONAL_", "")
-                           
-                           # determine_fractional_sell 함수에서 얻은 매도 비율 다시 계산
-                           # (함수 호출 결과에서 바로 추출할 수 없어 매도 유형에 따라 설정)
-                           sell_ratio = 0.0
-                           
-                           if sell_reason == "HIGH_VOLATILITY_PROFIT":
-                               sell_ratio = HIGH_VOL_SELL_RATIO
-                           elif sell_reason == "FIRST_STAGE_PROFIT":
-                               sell_ratio = FIRST_SELL_RATIO
-                           elif sell_reason == "SECOND_STAGE_PROFIT":
-                               sell_ratio = SECOND_SELL_RATIO
-                           elif sell_reason == "THIRD_STAGE_PROFIT":
-                               sell_ratio = THIRD_SELL_RATIO
-                               
-                           # 분할매도 실행
-                           success, trade_info, remaining_amount = execute_fractional_sell(
-                               stock_code, 
-                               position, 
-                               sell_ratio, 
-                               sell_reason, 
-                               daily_profit
-                           )
-                           
-                           if success:
-                               # 거래 이력 저장
-                               trade_history = load_today_trade_history()
-                               if trade_history['date'] != current_date:
-                                   trade_history = {'date': current_date, 'trades': []}
-
-                               # trade_info가 None이 아닌 경우에만 거래 이력에 추가
-                               if trade_info is not None:  # None 체크로 명확히 함
-                                   trade_history['trades'].append(trade_info)
-                                   save_today_trade_history(trade_history)
-                                   logger.info(f"거래 이력 저장 완료: {stock_code}")
-                               else:
-                                   logger.warning(f"{stock_code} 거래 정보가 없어 이력에 저장하지 않음")
-                                
-                               # 분할매도 정보 업데이트
-                               if remaining_amount > 0:
-                                   # 분할매도 단계 업데이트
-                                   if 'fractional_sell_stage' not in position:
-                                       position['fractional_sell_stage'] = 0
-                                   
-                                   position['fractional_sell_stage'] += 1
-                                   position['last_fractional_sell_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                                   position['amount'] = remaining_amount
-                                   
-                                   # 트레이딩 상태 저장
-                                   trading_state['positions'][stock_code] = position
-                                   save_trading_state(trading_state)
-                                   
-                                   logger.info(f"{stock_name}({stock_code}) 분할매도 완료 - 포지션 업데이트: 남은 수량 {remaining_amount}주, 단계 {position['fractional_sell_stage']}")
-                               else:
-                                   # 전체 매도 완료된 경우
-                                   del trading_state['positions'][stock_code]
-                                   save_trading_state(trading_state)
-                                   
-                                   # 당일 매도 종목 리스트에 추가 및 저장
-                                   daily_trading = load_daily_trading_history()
-                                   if stock_code not in daily_trading['sold_stocks']:
-                                       daily_trading['sold_stocks'].append(stock_code)
-                                       save_daily_trading_history(daily_trading)
-                                       
-                                   logger.info(f"{stock_name}({stock_code}) 전체 매도 완료 - 포지션 삭제")
-                           else:
-                               # 매도 실패 시 로그 및 알림 추가
-                               msg = f"⚠️ {stock_name}({stock_code}) 분할매도 실패 - 다음 주기에 재시도합니다."
-                               logger.warning(msg)
-                               discord_alert.SendMessage(msg)
-                       else:
-                           # 기존 매도 로직 사용 (변경 없음)
-                           success, trade_info, remaining_amount = handle_sell_order(
-                               stock_code, 
-                               position, 
-                               sell_type, 
-                               daily_profit
-                            )
-                           
-                           if success:
-                               # 거래 이력 저장
-                               trade_history = load_today_trade_history()
-                               if trade_history['date'] != current_date:
-                                   trade_history = {'date': current_date, 'trades': []}
-
-                               # trade_info가 None이 아닌 경우에만 거래 이력에 추가
-                               if trade_info is not None:  # None 체크로 명확히 함
-                                   trade_history['trades'].append(trade_info)
-                                   save_today_trade_history(trade_history)
-                                   logger.info(f"거래 이력 저장 완료: {stock_code}")
-                               else:
-                                   logger.warning(f"{stock_code} 거래 정보가 없어 이력에 저장하지 않음")
-                                
-                               # 일부 매도인 경우 (remaining_amount > 0)
-                               if remaining_amount > 0:
-                                   # 포지션 수량 업데이트
-                                   trading_state['positions'][stock_code]['amount'] = remaining_amount
-                                   save_trading_state(trading_state)
-                                   logger.info(f"{stock_name}({stock_code}) 일부 매도 완료 - 남은 수량: {remaining_amount}주")
-                               else:
-                                   # 전체 매도인 경우 - 포지션 삭제
-                                   del trading_state['positions'][stock_code]
-                                   save_trading_state(trading_state)
-                                   # 당일 매도 종목 리스트에 추가 및 저장
-                                   daily_trading = load_daily_trading_history()
-                                   if stock_code not in daily_trading['sold_stocks']:
-                                       daily_trading['sold_stocks'].append(stock_code)
-                                       save_daily_trading_history(daily_trading)
-
-                               # 여기에 미체결 주문 상태 제거 로직 추가
-                               if 'pending_orders' in trading_state and stock_code in trading_state['pending_orders']:
-                                   del trading_state['pending_orders'][stock_code]
-                                   logger.info(f"{stock_code} 미체결 주문 상태 제거")
-                                   save_trading_state(trading_state)
-
-                           else:
-                               # 매도 실패 시 로그 및 알림 추가
-                               msg = f"⚠️ {stock_name}({stock_code}) 매도 실패 - 다음 주기에 재시도합니다."
-                               logger.warning(msg)
-                               discord_alert.SendMessage(msg)
+               service_position(stock, trading_state, daily_profit, current_date, is_morning_session, all_news_analysis)
 
            # 시장 상황 체크
         #    if not check_market_condition():
@@ -9559,6 +10012,7 @@ def main():
                            
            # 새로운 매매기회 스캔 (수정버전 / 15시 이전 까지만 작동)
 
+           main_loop_profiler.phase('buy_check')
            logger.info("==== 매수 조건 확인 ====")
            logger.info(f"현재 시간: {now.hour}:{now.minute}")
            # 기존 로그 추가 (단순 포지션 수 체크)
@@ -9581,7 +10035,9 @@ def main():
                    time.sleep(60)  # 1분 대기
                    continue
 
-               momentum_stocks = scan_momentum_stocks()
+               main_loop_profiler.phase('scan')
+               momentum_stocks = scan_momentum_stocks(buy_slots=MAX_BUY_AMOUNT - get_actual_position_count(trading_state))
+               main_loop_profiler.phase('buy')
                
                if momentum_stocks:
                    current_position_count = get_actual_position_count(trading_state)
@@ -9875,12 +10331,22 @@ def main():
                            logger.error(error_msg)
                            discord_alert.SendMessage(f"⚠️ {stock['name']}({stock['code']}) {error_msg}")
 
+           # 캐시 / API 호출 대기 현황 주기적 로그
+           main_loop_profiler.phase('housekeeping')
+           cache_manager.log_stats()
+           api_limiter.log_stats()
+
+           # 상태 저널 미반영분 fsync
+           trading_state_store.flush()
+
+           main_loop_profiler.phase('sleep')
            time.sleep(30)  # 30초 간격으로 체크
            
        except Exception as e:
            msg = f"⚠️ 에러 발생!\n{str(e)}"
            logger.error(msg)
            discord_alert.SendMessage(msg)
+           main_loop_profiler.phase('error_sleep')
            time.sleep(30)
 
 if __name__ == "__main__":
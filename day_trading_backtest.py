@@ -0,0 +1,837 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+day_trading 모멘텀 전략 분봉 이벤트 백테스트 (day_trading_backtest.py)
+- MinuteBarStore에 적재된 1분봉을 1분 단위로 재생하며 day_trading.py의 실제 함수를 그대로 호출
+  · 진입: process_stock_chunk (get_stock_data → check_momentum_conditions → check_buy_conditions)
+          → calculate_position_size → check_short_term_momentum
+  · 청산: update_trailing_stop (determine_fractional_sell / calculate_adaptive_stop_loss 포함)
+          → execute_fractional_sell / handle_sell_order
+- 재생 중에는 day_trading 모듈 전역의 KisKR / Common / datetime / time / discord_alert를 재생용 객체로 교체
+  · datetime.now(), time.time()은 재생 시각 기준 → 시간대 판단과 캐시 만료도 재생 시각으로 동작
+  · 주문/잔고 API는 모의 계좌(SimulatedBroker)로 연결, 그 외 KIS API 호출은 예외 발생 (실주문 불가)
+- 전 종목 1차 필터는 (분 × 종목) NumPy 배열로 한 번에 계산하고, 상위 후보만 전략 함수로 검사
+  · 청산 체크는 매분, 신규 진입 스캔은 scan_interval(기본 5분) 간격
+- 체결: 신호 발생 다음 분봉 시가 (마지막 봉은 종가), 수수료/세금은 calculate_trading_fee
+
+단순화:
+- 분할매수는 1차 매수만 재현, 뉴스 분석 / 다음날 재평가 / 홍인기·외국인기관·저점상승 스캔 제외
+- 종목 리스트(get_stock_list) 대신 저장된 분봉 종목 전체를 시간대별 상승률·거래량·가격 기준으로 필터
+- 호가는 분봉 위치로 합성 (종가가 고가에 가까울수록 매수잔량 우세)
+- 장 마감 시 미청산 포지션은 마지막 종가로 청산 (BACKTEST_DAY_END)
+
+사용 예:
+    python day_trading_backtest.py --record              # 장 마감 후 당일 분봉 적재
+    python day_trading_backtest.py 20250602 20250603     # 저장된 거래일 재생 (생략 시 전체)
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import datetime
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from backtest_data_store import PRICE_COLUMNS, MinuteBarStore, get_default_store
+from backtest_replay import ReplayClock, ReplayDatetime, ReplayTime, SilentAlert, replaced_attributes
+from fill_model import synthetic_order_book
+
+import day_trading as dt
+
+logger = logging.getLogger('DayTradingBacktest')
+
+# 분할매도 유형별 매도 비율 (main 루프와 동일)
+FRACTIONAL_SELL_RATIOS = {
+    'HIGH_VOLATILITY_PROFIT': dt.HIGH_VOL_SELL_RATIO,
+    'FIRST_STAGE_PROFIT': dt.FIRST_SELL_RATIO,
+    'SECOND_STAGE_PROFIT': dt.SECOND_SELL_RATIO,
+    'THIRD_STAGE_PROFIT': dt.THIRD_SELL_RATIO
+}
+
+# 장 운영 시각 (연속매매 09:00~15:20, 15:30 종가 단일가)
+SESSION_OPEN = "09:00"
+SESSION_CLOSE = "15:30"
+CONTINUOUS_CLOSE_HOUR, CONTINUOUS_CLOSE_MINUTE = 15, 20
+
+DAY_END_SELL_TYPE = 'BACKTEST_DAY_END'
+
+# KIS 일봉/분봉 조회 결과 컬럼 (change는 조회 시 계산)
+DAILY_COLUMNS = PRICE_COLUMNS + ['value']
+
+################################### 모의 계좌 ##################################
+
+class SimulatedBroker:
+    """모의 계좌 - 현금/보유 수량 관리, 체결가는 ReplayMarket이 결정"""
+
+    def __init__(self, initial_cash: float):
+        self.cash = float(initial_cash)
+        self.holdings = {}  # {종목코드: {'amount': 수량, 'avg_price': 평균단가}}
+        self.fills = []
+
+    def buy(self, market: 'ReplayMarket', stock_code: str, amount: int):
+        """매수 체결 (현금 부족 시 가능한 수량으로 축소) → (체결가, 체결수량, 수수료)"""
+        price = market.fill_price(stock_code)
+        if price <= 0:
+            return 0, 0, 0
+        unit_cost = price + dt.calculate_trading_fee(price, 1, is_buy=True)
+        amount = min(int(amount), int(self.cash // unit_cost))
+        if amount < 1:
+            return 0, 0, 0
+
+        fee = dt.calculate_trading_fee(price, amount, is_buy=True)
+        self.cash -= price * amount + fee
+
+        holding = self.holdings.setdefault(stock_code, {'amount': 0, 'avg_price': 0.0})
+        total_cost = holding['avg_price'] * holding['amount'] + price * amount
+        holding['amount'] += amount
+        holding['avg_price'] = total_cost / holding['amount']
+
+        self.fills.append({'time': market.clock.now, 'code': stock_code, 'side': 'BUY',
+                           'price': price, 'amount': amount, 'fee': fee})
+        return price, amount, fee
+
+    def sell(self, market: 'ReplayMarket', stock_code: str, amount: int):
+        """매도 체결 (보유 수량 한도) → (체결가, 체결수량, 수수료)"""
+        holding = self.holdings.get(stock_code)
+        if not holding:
+            return 0, 0, 0
+        price = market.fill_price(stock_code)
+        amount = min(int(amount), holding['amount'])
+        if price <= 0 or amount < 1:
+            return 0, 0, 0
+
+        fee = dt.calculate_trading_fee(price, amount, is_buy=False)
+        self.cash += price * amount - fee
+
+        holding['amount'] -= amount
+        if holding['amount'] == 0:
+            del self.holdings[stock_code]
+
+        self.fills.append({'time': market.clock.now, 'code': stock_code, 'side': 'SELL',
+                           'price': price, 'amount': amount, 'fee': fee})
+        return price, amount, fee
+
+    def stock_value(self, market: 'ReplayMarket') -> float:
+        return sum(market.last_price(code) * holding['amount'] for code, holding in self.holdings.items())
+
+    def balance(self, market: 'ReplayMarket') -> Dict:
+        """KisKR.GetBalance 형식"""
+        stock_money = self.stock_value(market)
+        cost = sum(holding['avg_price'] * holding['amount'] for holding in self.holdings.values())
+        return {
+            'TotalMoney': self.cash + stock_money,
+            'StockMoney': stock_money,
+            'StockRevenue': stock_money - cost,
+            'RemainMoney': self.cash
+        }
+
+    def stock_list(self, market: 'ReplayMarket') -> List[Dict]:
+        """KisKR.GetMyStockList 형식 (API와 같이 문자열 값)"""
+        result = []
+        for code, holding in self.holdings.items():
+            now_price = market.last_price(code)
+            ori_money = holding['avg_price'] * holding['amount']
+            now_money = now_price * holding['amount']
+            result.append({
+                'StockCode': code,
+                'StockName': market.GetStockName(code),
+                'StockAmt': str(holding['amount']),
+                'StockAvgPrice': str(holding['avg_price']),
+                'StockOriMoney': str(ori_money),
+                'StockNowMoney': str(now_money),
+                'StockNowPrice': str(now_price),
+                'StockRevenueRate': str((now_money / ori_money - 1) * 100 if ori_money > 0 else 0),
+                'StockRevenueMoney': str(now_money - ori_money)
+            })
+        return result
+
+################################### 시세 재생 ##################################
+
+class ReplayMarket:
+    """KisKR 대체 - 재생 시각까지의 분봉/일봉과 모의 계좌만 제공
+
+    분봉은 실제 체결이 있었던 봉만 보이도록 종목별 '재생 시각까지의 봉 개수' 배열로 관리하고,
+    일봉은 전일까지의 저장 일봉 + 재생 시각까지 누적한 당일 봉으로 구성한다.
+    """
+
+    def __init__(self, clock: ReplayClock, broker: SimulatedBroker, names: Optional[Dict[str, str]] = None):
+        self.clock = clock
+        self.broker = broker
+        self.names = names or {}
+        self.t = 0
+        self.grid = pd.DatetimeIndex([])
+        self.codes: List[str] = []
+        self.minute = {}        # {종목코드: 당일 1분봉 (API 형식)}
+        self.arrays = {}        # {종목코드: 분봉 배열 (시가/고가/저가/종가/거래량 + 누적값)}
+        self.bar_counts = {}    # {종목코드: 재생 시각별 공개된 분봉 개수 (len(grid))}
+        self.daily = {}         # {종목코드: 전일까지 일봉 배열 + 날짜 문자열 인덱스}
+        self._resampled = {}
+        self._daily_cache = {}
+
+    def load_day(self, grid: pd.DatetimeIndex, minute_frames: Dict[str, pd.DataFrame],
+                 daily_frames: Dict[str, pd.DataFrame]):
+        """거래일 데이터 적재 (분봉/일봉 모두 있는 종목만 재생)"""
+        self.grid = grid
+        self.t = 0
+        self.codes = [code for code in minute_frames if code in daily_frames]
+        self.minute, self.arrays, self.bar_counts, self.daily = {}, {}, {}, {}
+        self._resampled = {}
+        self._daily_cache = {}
+
+        grid_values = grid.values
+        for code in self.codes:
+            frame = minute_frames[code][PRICE_COLUMNS].copy()
+            frame['value'] = (frame['close'] * frame['volume']).cumsum()
+            frame.insert(6, 'change', frame['close'].pct_change())
+            self.minute[code] = frame
+
+            arrays = {col: frame[col].to_numpy() for col in PRICE_COLUMNS}
+            arrays.update({
+                'cum_high': np.maximum.accumulate(arrays['high']),
+                'cum_low': np.minimum.accumulate(arrays['low']),
+                'cum_volume': np.cumsum(arrays['volume']),
+                'cum_value': frame['value'].to_numpy()
+            })
+            self.arrays[code] = arrays
+            self.bar_counts[code] = np.searchsorted(frame.index.values, grid_values, side='right')
+
+            daily = daily_frames[code]
+            self.daily[code] = {col: daily[col].to_numpy() for col in PRICE_COLUMNS}
+            self.daily[code]['value'] = self.daily[code]['close'] * self.daily[code]['volume']
+            self.daily[code]['index'] = list(daily.index.strftime('%Y-%m-%d'))
+
+    def set_time(self, t: int):
+        self.t = t
+        self.clock.set(self.grid[t].to_pydatetime())
+
+    def bar_count(self, stock_code: str) -> int:
+        counts = self.bar_counts.get(stock_code)
+        return int(counts[self.t]) if counts is not None else 0
+
+    def prev_close(self, stock_code: str) -> float:
+        daily = self.daily.get(stock_code)
+        return float(daily['close'][-1]) if daily is not None and len(daily['close']) > 0 else 0.0
+
+    def last_price(self, stock_code: str) -> float:
+        """재생 시각 기준 최종 체결가 (당일 체결 전이면 전일 종가)"""
+        n = self.bar_count(stock_code)
+        if n == 0:
+            return self.prev_close(stock_code)
+        return float(self.arrays[stock_code]['close'][n - 1])
+
+    def fill_price(self, stock_code: str) -> float:
+        """주문 체결가 - 다음 분봉 시가 (이후 체결이 없으면 최종 체결가)"""
+        n = self.bar_count(stock_code)
+        arrays = self.arrays.get(stock_code)
+        if arrays is not None and n < len(arrays['open']):
+            return float(arrays['open'][n])
+        return self.last_price(stock_code)
+
+    def daily_ohlcv(self, stock_code: str, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """전일까지 일봉 + 재생 시각까지 누적된 당일 봉 (재생 시각별 1회 생성)"""
+        daily = self.daily.get(stock_code)
+        if daily is None:
+            return None
+
+        cached = self._daily_cache.get(stock_code)
+        if cached is not None and cached[0] == self.t:
+            df = cached[1]
+        else:
+            columns = {col: daily[col] for col in DAILY_COLUMNS}
+            index = daily['index']
+            n = self.bar_count(stock_code)
+            if n > 0:
+                arrays = self.arrays[stock_code]
+                today = {
+                    'open': arrays['open'][0],
+                    'high': arrays['cum_high'][n - 1],
+                    'low': arrays['cum_low'][n - 1],
+                    'close': arrays['close'][n - 1],
+                    'volume': arrays['cum_volume'][n - 1],
+                    'value': arrays['cum_value'][n - 1]
+                }
+                columns = {col: np.append(values, today[col]) for col, values in columns.items()}
+                index = index + [self.clock.now.strftime('%Y-%m-%d')]
+            df = pd.DataFrame(columns, index=index)
+            df.insert(6, 'change', df['close'].pct_change())
+            self._daily_cache[stock_code] = (self.t, df)
+
+        return df.tail(limit) if limit else df
+
+    def resampled_minute(self, stock_code: str, MinSt: str, n: int) -> pd.DataFrame:
+        """n개 분봉까지의 MinSt 봉 - 완성된 구간은 미리 집계한 값, 진행 중인 마지막 구간만 새로 집계"""
+        key = (stock_code, MinSt)
+        resampled = self._resampled.get(key)
+        if resampled is None:
+            frame = self.minute[stock_code]
+            bins = frame.resample(MinSt.replace('T', 'min')).agg({
+                'open': 'first',
+                'high': 'max',
+                'low': 'min',
+                'close': 'last',
+                'volume': 'sum',
+                'value': 'sum'
+            })
+            bar_bin = np.searchsorted(bins.index.values, frame.index.values, side='right') - 1
+            resampled = {col: bins[col].to_numpy() for col in DAILY_COLUMNS}
+            resampled.update({
+                'index': bins.index,
+                'bar_bin': bar_bin,
+                'bin_start': np.searchsorted(bar_bin, np.arange(len(bins)), side='left')
+            })
+            self._resampled[key] = resampled
+
+        arrays = self.arrays[stock_code]
+        last_bin = resampled['bar_bin'][n - 1]
+        start = resampled['bin_start'][last_bin]
+        partial = {
+            'open': arrays['open'][start],
+            'high': arrays['high'][start:n].max(),
+            'low': arrays['low'][start:n].min(),
+            'close': arrays['close'][n - 1],
+            'volume': arrays['volume'][start:n].sum(),
+            'value': arrays['cum_value'][start:n].sum()
+        }
+        df = pd.DataFrame({col: np.append(resampled[col][:last_bin], partial[col]) for col in DAILY_COLUMNS},
+                          index=resampled['index'][:last_bin + 1])
+        df.insert(6, 'change', df['close'].pct_change())
+        return df
+
+    ############# KisKR 인터페이스 #############
+
+    def GetCurrentPrice(self, stock_code):
+        price = self.last_price(stock_code)
+        return int(price) if price > 0 else None
+
+    def GetCurrentQuote(self, stock_code):
+        """재생 시각까지 누적된 당일 시가/고가/저가/현재가/거래량과 거래일 (장 시작 전이면 거래량 0)"""
+        price = self.last_price(stock_code)
+        if price <= 0:
+            return None
+        n = self.bar_count(stock_code)
+        if n == 0:
+            return {'code': stock_code, 'open': int(price), 'high': int(price), 'low': int(price),
+                    'close': int(price), 'volume': 0, 'value': 0.0}
+        arrays = self.arrays[stock_code]
+        return {
+            'code': stock_code,
+            'date': self.grid[self.t].normalize(),
+            'open': arrays['open'][0],
+            'high': arrays['cum_high'][n - 1],
+            'low': arrays['cum_low'][n - 1],
+            'close': arrays['close'][n - 1],
+            'volume': arrays['cum_volume'][n - 1],
+            'value': arrays['cum_value'][n - 1]
+        }
+
+    def GetStockName(self, stock_code):
+        return self.names.get(stock_code, stock_code)
+
+    def GetStockPrevClose(self, stock_code):
+        return self.prev_close(stock_code)
+
+    def GetOhlcvMinute(self, stock_code, MinSt='1T'):
+        n = self.bar_count(stock_code)
+        if n == 0:
+            return None
+        if MinSt == '1T':
+            return self.minute[stock_code].iloc[:n].copy()
+        return self.resampled_minute(stock_code, MinSt, n)
+
+    def GetOhlcv(self, stock_code, p_code="D", adj_ok="1"):
+        return self.daily_ohlcv(stock_code)
+
+    def GetOhlcvNew(self, stock_code, p_code, get_count, adj_ok="1"):
+        return self.daily_ohlcv(stock_code, get_count)
+
+    def GetStockOpenPrice(self, stock_code, get_count=1):
+        df = self.daily_ohlcv(stock_code, get_count)
+        if df is not None and not df.empty:
+            return df
+        return None
+
+    def GetOrderBook(self, stock_code, depth=5, debug=False):
+        """분봉 기반 합성 호가 - 종가가 분봉 고가에 가까울수록 매수잔량 우세"""
+        n = self.bar_count(stock_code)
+        if n == 0:
+            return None
+        frame = self.minute[stock_code]
+        recent = frame.iloc[max(0, n - 5):n]
+        high, low = float(recent['high'].iloc[-1]), float(recent['low'].iloc[-1])
+        price = float(recent['close'].iloc[-1])
+        level_volume = float(recent['volume'].mean())
+        return synthetic_order_book(price, high, low, level_volume).to_kis(depth)
+
+    def GetBalance(self):
+        return self.broker.balance(self)
+
+    def GetMyStockList(self):
+        return self.broker.stock_list(self)
+
+    def __getattr__(self, name):
+        raise RuntimeError(f"백테스트 재생 중 지원하지 않는 KIS API 호출: KisKR.{name}")
+
+class ReplayCommon:
+    """Common 대체 - 일봉 조회만 재생 데이터로 연결"""
+
+    def __init__(self, market: ReplayMarket, common):
+        self._market = market
+        self._common = common
+
+    def GetOhlcv(self, area, stock_code, limit=500, adj_ok="1"):
+        return self._market.daily_ohlcv(stock_code, limit)
+
+    def __getattr__(self, name):
+        return getattr(self._common, name)
+
+################################### 백테스트 엔진 ##################################
+
+class DayTradingBacktest:
+    """day_trading 모멘텀 전략 분봉 이벤트 백테스트"""
+
+    def __init__(self, initial_capital: float = 10000000, minute_store: Optional[MinuteBarStore] = None,
+                 daily_store=None, stock_codes: Optional[List[str]] = None,
+                 names: Optional[Dict[str, str]] = None, max_candidates: int = 5, scan_interval: int = 5,
+                 daily_lookback: int = 60, enforce_daily_limits: bool = True,
+                 strategy_log_level: int = logging.ERROR):
+        """
+        Args:
+            initial_capital: 모의 계좌 총 평가금 (봇 운용 금액은 TRADE_BUDGET_RATIO 적용)
+            minute_store / daily_store: 분봉/일봉 저장소 (기본값: backtest_data 폴더)
+            stock_codes: 재생 종목 (기본값: 거래일별 저장된 전 종목)
+            names: {종목코드: 종목명} (없으면 코드 표시)
+            max_candidates: 1차 필터 통과 종목 중 전략 함수로 검사할 상위 종목 수 (분당)
+            scan_interval: 신규 진입 스캔 간격 (분, 전략이 보는 5분봉 주기)
+            daily_lookback: 재생 일봉 개수 (get_stock_data는 20개 사용)
+            enforce_daily_limits: 당일 실현손익이 MAX_DAILY_LOSS / MAX_DAILY_PROFIT 도달 시 신규 매수 중단
+            strategy_log_level: 재생 중 day_trading 로거 레벨 (로그 파일 기록 최소화)
+        """
+        self.initial_capital = initial_capital
+        self.minute_store = minute_store or MinuteBarStore()
+        self.daily_store = daily_store or get_default_store()
+        self.stock_codes = stock_codes
+        self.max_candidates = max_candidates
+        self.scan_interval = max(1, int(scan_interval))
+        self.daily_lookback = daily_lookback
+        self.enforce_daily_limits = enforce_daily_limits
+        self.strategy_log_level = strategy_log_level
+
+        self.clock = ReplayClock()
+        self.broker = SimulatedBroker(initial_capital)
+        self.market = ReplayMarket(self.clock, self.broker, names)
+
+        self.trading_state = {'positions': {}}
+        self.daily_profit = {}
+        self.daily_trading = {'sold_stocks': []}
+        self.accumulated = {
+            'accumulated_profit': 0,
+            'total_trades': 0,
+            'winning_trades': 0,
+            'max_profit_trade': 0,
+            'max_loss_trade': 0
+        }
+
+        self.trades = []
+        self.equity = []
+        self.daily_results = []
+
+    ################################### 전략 모듈 교체 ##################################
+
+    def _process_sell_order(self, stock_code, amount):
+        """process_sell_order 대체 - 모의 계좌 시장가 매도"""
+        executed_price, executed_amount, _ = self.broker.sell(self.market, stock_code, amount)
+        if executed_amount <= 0:
+            return 0, 0, "모의 계좌 매도 체결 실패"
+        return executed_price, executed_amount, None
+
+    @contextmanager
+    def strategy_replay(self):
+        """day_trading 모듈 전역을 재생용 객체로 교체 (종료 시 원복)"""
+        ReplayDatetime.clock = self.clock
+        replacements = {
+            'KisKR': self.market,
+            'Common': ReplayCommon(self.market, dt.Common),
+            'datetime': ReplayDatetime,
+            'time': ReplayTime(self.clock),
+            'discord_alert': SilentAlert(),
+            'process_sell_order': self._process_sell_order,
+            'save_high_momentum_missed_stocks': lambda *args, **kwargs: None,
+            'load_daily_profit_state': lambda: self.daily_profit,
+            'save_daily_profit_state': lambda state: None,
+            'load_trading_state': lambda: self.trading_state,
+            'save_trading_state': lambda state: None,
+            'load_daily_trading_history': lambda: self.daily_trading,
+            'save_daily_trading_history': lambda history: None
+        }
+        original_level = dt.logger.level
+
+        dt.logger.setLevel(self.strategy_log_level)
+        try:
+            with replaced_attributes(dt, replacements):
+                yield
+        finally:
+            dt.logger.setLevel(original_level)
+            # 재생 시각 기준으로 저장된 캐시가 실전 실행에 섞이지 않도록 비움
+            self._clear_strategy_caches()
+
+    @staticmethod
+    def _clear_strategy_caches():
+        dt.CacheManager.get_instance().clear()
+        dt.daily_bars.clear()
+
+    ################################### 거래일 준비 ##################################
+
+    def _load_day(self, trade_date: str) -> bool:
+        day = pd.Timestamp(trade_date).normalize()
+        frames = self.minute_store.load_day(day, self.stock_codes)
+        if not frames:
+            logger.warning(f"⚠️ {trade_date}: 저장된 분봉 없음")
+            return False
+
+        prev_day = day - pd.Timedelta(days=1)
+        daily_frames = {}
+        for code in frames:
+            daily = self.daily_store.get_daily(code, days=self.daily_lookback, end_date=prev_day)
+            if len(daily) >= 5:
+                daily_frames[code] = daily
+
+        open_time = pd.Timestamp(f"{day.date()} {SESSION_OPEN}")
+        close_time = pd.Timestamp(f"{day.date()} {SESSION_CLOSE}")
+        grid = pd.date_range(open_time, close_time, freq='min')
+        frames = {code: df[(df.index >= open_time) & (df.index <= close_time)] for code, df in frames.items()}
+        frames = {code: df for code, df in frames.items() if not df.empty}
+
+        self.market.load_day(grid, frames, daily_frames)
+        if not self.market.codes:
+            logger.warning(f"⚠️ {trade_date}: 일봉 이력이 있는 재생 종목 없음")
+            return False
+
+        self._build_scan_arrays()
+        return True
+
+    def _build_scan_arrays(self):
+        """1차 필터용 (분 × 종목) 배열 - 최종 체결가, 누적 거래량, 시가"""
+        market = self.market
+        n_minutes, n_codes = len(market.grid), len(market.codes)
+        self.scan_close = np.full((n_minutes, n_codes), np.nan)
+        self.scan_volume = np.zeros((n_minutes, n_codes))
+        self.scan_open = np.full(n_codes, np.nan)
+
+        for j, code in enumerate(market.codes):
+            counts = market.bar_counts[code]
+            arrays = market.arrays[code]
+            traded = counts > 0
+            last = np.maximum(counts - 1, 0)
+            self.scan_close[:, j] = np.where(traded, arrays['close'][last], np.nan)
+            self.scan_volume[:, j] = np.where(traded, arrays['cum_volume'][last], 0)
+            self.scan_open[j] = arrays['open'][0]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.scan_rise = (self.scan_close / self.scan_open - 1) * 100
+
+    ################################### 종목 스캔 ##################################
+
+    @staticmethod
+    def _scan_thresholds():
+        """scan_momentum_stocks의 시간대별 상승률/거래량 기준"""
+        if dt.is_in_morning_session():
+            if dt.is_in_early_morning_session():
+                return dt.MIN_RISE_RATE * 0.5, dt.MIN_DAILY_VOLUME * 0.5
+            return dt.MIN_RISE_RATE * 0.85, dt.MIN_DAILY_VOLUME * 0.8
+        return dt.MIN_RISE_RATE, dt.MIN_DAILY_VOLUME
+
+    def prefilter(self, t: int, excluded) -> List[Dict]:
+        """전 종목 1차 필터 (NumPy) → 상승률 상위 max_candidates 종목"""
+        rise_threshold, volume_threshold = self._scan_thresholds()
+        close = self.scan_close[t]
+        rise = self.scan_rise[t]
+
+        with np.errstate(invalid='ignore'):
+            mask = ((rise >= rise_threshold) &
+                    (self.scan_volume[t] >= volume_threshold) &
+                    (close >= dt.MIN_PRICE_THRESHOLD) &
+                    (close <= dt.MAX_STOCK_PRICE))
+        if excluded:
+            mask &= ~np.isin(np.array(self.market.codes), list(excluded))
+
+        selected = np.flatnonzero(mask)
+        if len(selected) == 0:
+            return []
+        if len(selected) > self.max_candidates:
+            top = np.argpartition(-rise[selected], self.max_candidates - 1)[:self.max_candidates]
+            selected = selected[top]
+        selected = selected[np.argsort(-rise[selected], kind='stable')]
+
+        return [{'code': self.market.codes[j], 'name': self.market.GetStockName(self.market.codes[j])}
+                for j in selected]
+
+    ################################### 매매 처리 ##################################
+
+    def _record_trade(self, trade_info: Optional[Dict]):
+        if trade_info is not None:
+            self.trades.append(dict(trade_info))
+
+    def _mark_sold(self, stock_code: str):
+        del self.trading_state['positions'][stock_code]
+        if stock_code not in self.daily_trading['sold_stocks']:
+            self.daily_trading['sold_stocks'].append(stock_code)
+
+    def _sell(self, stock_code: str, position: Dict, sell_type: str):
+        """main 루프의 매도 분기 재현 (분할매도 / 일반 매도)"""
+        if sell_type.startswith("FRACTIONAL_"):
+            sell_reason = sell_type.replace("FRACTIONAL_", "")
+            sell_ratio = FRACTIONAL_SELL_RATIOS.get(sell_reason, 0.0)
+            success, trade_info, remaining_amount = dt.execute_fractional_sell(
+                stock_code, position, sell_ratio, sell_reason, self.daily_profit
+            )
+            if not success:
+                return
+            self._record_trade(trade_info)
+            if remaining_amount > 0:
+                position['fractional_sell_stage'] = position.get('fractional_sell_stage', 0) + 1
+                position['last_fractional_sell_time'] = self.clock.now.strftime('%Y-%m-%d %H:%M:%S')
+                position['amount'] = remaining_amount
+            else:
+                self._mark_sold(stock_code)
+        else:
+            success, trade_info, remaining_amount = dt.handle_sell_order(
+                stock_code, position, sell_type, self.daily_profit
+            )
+            if not success:
+                return
+            self._record_trade(trade_info)
+            if remaining_amount > 0:
+                position['amount'] = remaining_amount
+            else:
+                self._mark_sold(stock_code)
+
+    def _check_exits(self):
+        for stock_code in list(self.trading_state['positions']):
+            if self.market.bar_count(stock_code) == 0:
+                continue
+            position = self.trading_state['positions'][stock_code]
+            current_price = self.market.GetCurrentPrice(stock_code)
+            current_data = dt.get_stock_data(stock_code)
+            if current_data is None:
+                continue
+
+            should_sell, updated_position, sell_type = dt.update_trailing_stop(position, current_price, current_data)
+            self.trading_state['positions'][stock_code] = updated_position
+            if should_sell:
+                self._sell(stock_code, updated_position, sell_type)
+
+    def _can_enter(self) -> bool:
+        now = self.clock.now
+        if now.hour >= 15 or dt.is_too_early_for_trading():
+            return False
+        if len(self.trading_state['positions']) >= dt.MAX_BUY_AMOUNT:
+            return False
+        if self.enforce_daily_limits:
+            rate = self.daily_profit['today_profit_rate']
+            if rate <= dt.MAX_DAILY_LOSS or rate >= dt.MAX_DAILY_PROFIT:
+                return False
+        return True
+
+    def _check_entries(self, t: int):
+        sold_stocks = self.daily_trading['sold_stocks']
+        excluded = set(sold_stocks) | set(self.trading_state['positions'])
+        candidates = self.prefilter(t, excluded)
+        if not candidates:
+            return
+
+        momentum_stocks = dt.process_stock_chunk(candidates, [], sold_stocks, [])
+        momentum_stocks.sort(key=lambda x: (x['volume_ratio'], x['rsi']), reverse=True)
+
+        trading_budget = self.broker.balance(self.market)['TotalMoney'] * dt.TRADE_BUDGET_RATIO
+        for stock in momentum_stocks:
+            positions = self.trading_state['positions']
+            if len(positions) >= dt.MAX_BUY_AMOUNT:
+                break
+            if stock['price'] < dt.MIN_PRICE_THRESHOLD:
+                continue
+
+            available_budget = trading_budget / (dt.MAX_BUY_AMOUNT - len(positions))
+            buy_amount = dt.calculate_position_size(
+                available_budget, stock['code'], stock['price'], stock['atr'], positions
+            )
+            if buy_amount < 1:
+                continue
+
+            stock_data = dt.get_stock_data(stock['code'])
+            if stock_data is None or not dt.check_short_term_momentum(stock_data):
+                continue
+            if dt.is_in_afternoon_session() and stock_data['rsi'] > dt.MAX_BUY_RSI:
+                continue
+
+            executed_price, executed_amount, buy_fee = self.broker.buy(self.market, stock['code'], buy_amount)
+            if executed_amount <= 0:
+                continue
+
+            now_str = self.clock.now.strftime('%Y-%m-%d %H:%M:%S')
+            positions[stock['code']] = {
+                'entry_price': executed_price,
+                'amount': executed_amount,
+                'entry_time': now_str,
+                'trading_fee': buy_fee,
+                'code': stock['code'],
+                'strategy': 'momentum_buy',
+                'buy_stage': 1,
+                'last_buy_time': now_str,
+                'total_planned_amount': buy_amount
+            }
+
+    def _close_day(self):
+        """장 마감 미청산 포지션 종가 청산"""
+        for stock_code in list(self.trading_state['positions']):
+            position = self.trading_state['positions'][stock_code]
+            success, trade_info, _ = dt.handle_sell_order(stock_code, position, DAY_END_SELL_TYPE, self.daily_profit)
+            if success:
+                self._record_trade(trade_info)
+            self.trading_state['positions'].pop(stock_code, None)
+
+    ################################### 실행 ##################################
+
+    def run_day(self, trade_date: str) -> Optional[Dict]:
+        """거래일 1일 재생"""
+        if not self._load_day(trade_date):
+            return None
+
+        start_time = time.time()
+        start_equity = self.broker.balance(self.market)['TotalMoney']
+        self.trading_state = {'positions': {}}
+        self.daily_trading = {'last_date': trade_date, 'sold_stocks': []}
+        self.daily_profit = {
+            'last_date': trade_date,
+            'start_money': start_equity * dt.TRADE_BUDGET_RATIO,
+            'today_profit': 0,
+            'today_profit_rate': 0,
+            **self.accumulated
+        }
+        trades_before = len(self.trades)
+        self._clear_strategy_caches()
+
+        with self.strategy_replay():
+            last_t = len(self.market.grid) - 1
+            last_scan = -self.scan_interval
+            for t in range(last_t + 1):
+                self.market.set_time(t)
+                now = self.clock.now
+
+                if (now.hour, now.minute) < (CONTINUOUS_CLOSE_HOUR, CONTINUOUS_CLOSE_MINUTE):
+                    self._check_exits()
+                    if t - last_scan >= self.scan_interval and self._can_enter():
+                        self._check_entries(t)
+                        last_scan = t
+
+                if t == last_t:
+                    self._close_day()
+
+                self.equity.append({'time': now, 'equity': self.broker.balance(self.market)['TotalMoney']})
+
+        self.accumulated = {key: self.daily_profit[key] for key in self.accumulated}
+        end_equity = self.broker.balance(self.market)['TotalMoney']
+        result = {
+            'date': trade_date,
+            'symbols': len(self.market.codes),
+            'trades': len(self.trades) - trades_before,
+            'start_equity': start_equity,
+            'end_equity': end_equity,
+            'daily_return': (end_equity / start_equity - 1) * 100 if start_equity > 0 else 0,
+            'realized_profit': self.daily_profit['today_profit'],
+            'elapsed_sec': time.time() - start_time
+        }
+        self.daily_results.append(result)
+        logger.info(f"📅 {trade_date}: {result['symbols']}종목, 거래 {result['trades']}건, "
+                    f"수익률 {result['daily_return']:+.3f}%, {result['elapsed_sec']:.1f}초")
+        return result
+
+    def run(self, trade_dates: Optional[List[str]] = None) -> Dict:
+        """여러 거래일 연속 재생 (계좌 잔고는 이어짐)"""
+        trade_dates = trade_dates or self.minute_store.available_dates()
+        for trade_date in trade_dates:
+            self.run_day(trade_date)
+        return self.summarize()
+
+    def summarize(self) -> Dict:
+        """거래/자산 요약 지표"""
+        trades = pd.DataFrame(self.trades)
+        equity = pd.DataFrame(self.equity)
+
+        final_equity = equity['equity'].iloc[-1] if not equity.empty else self.initial_capital
+        if not equity.empty:
+            values = equity['equity'].to_numpy()
+            drawdown = values / np.maximum.accumulate(values) - 1
+            max_drawdown = float(drawdown.min() * 100)
+        else:
+            max_drawdown = 0.0
+
+        summary = {
+            'trade_days': len(self.daily_results),
+            'initial_capital': self.initial_capital,
+            'final_equity': float(final_equity),
+            'total_return': float((final_equity / self.initial_capital - 1) * 100),
+            'max_drawdown': max_drawdown,
+            'total_trades': int(len(trades)),
+            'win_rate': float((trades['profit_amount'] > 0).mean() * 100) if not trades.empty else 0.0,
+            'avg_profit_rate': float(trades['profit_rate'].mean()) if not trades.empty else 0.0,
+            'total_profit': float(trades['profit_amount'].sum()) if not trades.empty else 0.0,
+            'total_fee': float(trades['trading_fee'].sum()) if not trades.empty else 0.0,
+            'sell_types': trades['sell_type'].value_counts().to_dict() if not trades.empty else {},
+            'elapsed_sec': float(sum(day['elapsed_sec'] for day in self.daily_results))
+        }
+        return summary
+
+    def print_summary(self, summary: Dict):
+        print("\n" + "=" * 60)
+        print("📊 day_trading 분봉 백테스트 결과")
+        print("=" * 60)
+        print(f"재생 거래일: {summary['trade_days']}일 (소요 {summary['elapsed_sec']:.1f}초)")
+        print(f"초기 자산: {summary['initial_capital']:,.0f}원 → 최종 자산: {summary['final_equity']:,.0f}원")
+        print(f"총 수익률: {summary['total_return']:+.3f}%, 최대 낙폭: {summary['max_drawdown']:.3f}%")
+        print(f"거래 수: {summary['total_trades']}건, 승률: {summary['win_rate']:.1f}%, "
+              f"평균 수익률: {summary['avg_profit_rate']:+.2f}%")
+        print(f"실현 손익: {summary['total_profit']:,.0f}원 (수수료/세금 {summary['total_fee']:,.0f}원)")
+        for sell_type, count in summary['sell_types'].items():
+            print(f"  - {sell_type}: {count}건")
+        for day in self.daily_results:
+            print(f"  {day['date']}: {day['symbols']}종목, 거래 {day['trades']}건, "
+                  f"{day['daily_return']:+.3f}%, {day['elapsed_sec']:.1f}초")
+
+    def save_results(self, summary: Dict) -> Dict[str, str]:
+        """거래 내역 CSV / 분별 자산 CSV / 요약 JSON 저장"""
+        os.makedirs('backtest_results', exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+        files = {
+            'trades': f'backtest_results/day_trading_trades_{timestamp}.csv',
+            'equity': f'backtest_results/day_trading_equity_{timestamp}.csv',
+            'summary': f'backtest_results/day_trading_summary_{timestamp}.json'
+        }
+        pd.DataFrame(self.trades).to_csv(files['trades'], index=False, encoding='utf-8-sig')
+        pd.DataFrame(self.equity).to_csv(files['equity'], index=False, encoding='utf-8-sig')
+        with open(files['summary'], 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'daily': self.daily_results}, f, ensure_ascii=False, indent=2, default=str)
+        print(f"✅ 결과 저장 완료: {files['trades']}, {files['equity']}, {files['summary']}")
+        return files
+
+def record_today_minute_bars(stock_codes: Optional[List[str]] = None) -> int:
+    """장 마감 후 당일 1분봉 적재 (기본값: day_trading 종목 리스트)"""
+    if stock_codes is None:
+        stock_codes = [stock['code'] for stock in (dt.get_stock_list() or [])]
+    return MinuteBarStore().record_day(stock_codes)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if '--record' in sys.argv:
+        record_today_minute_bars()
+    else:
+        dates = [arg for arg in sys.argv[1:] if arg.isdigit() and len(arg) == 8]
+        backtest = DayTradingBacktest()
+        result = backtest.run(dates or None)
+        backtest.print_summary(result)
+        backtest.save_results(result)
@@ -0,0 +1,568 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+백테스트 체결 모델 (fill_model.py)
+- 기존 백테스트는 종가(± 수수료)로 전량 체결 → 유동성/호가 간격 무시
+- OrderBookFillModel: 호가 스냅샷을 1호가부터 소진하며 체결 (평균 체결가, 호가 부족 시 부분체결)
+  · 스냅샷은 DepthSnapshotStore에 기록된 실제 호가(KisKR.GetOrderBook / Kiwoom GetHoga ka10004) 우선,
+    없으면 일봉/분봉으로 합성 (day_trading_backtest의 합성 호가와 같은 방식)
+  · 지정가 주문은 LimitOrder로 대기열 위치(같은 가격의 앞선 잔량)를 추적하며 이후 봉에서 체결
+    (smart_split_backtest.SimulatedBroker가 fill_model로 받으면 봇의 지정가 주문을 이 방식으로 체결)
+- ImpactFillModel: 긴 일봉 백테스트용 벡터화 근사 (반 스프레드 + 제곱근 시장충격 + 거래량 참여율 상한)
+- CloseFillModel: 기존과 동일한 종가 전량 체결 (기본값)
+- AccurateBacktest / VolumeBacktestingEngine / GoldTradingBacktest는 fill_model 인자로 교체
+
+사용 예:
+    DepthSnapshotStore().record(["005930", "000660"])           # 장중 주기적으로 실제 호가 기록
+    model = OrderBookFillModel(snapshot_store=DepthSnapshotStore())
+    fill = model.execute('BUY', 500, 71000, bar={'high': 72000, 'low': 70500, 'volume': 1.2e7},
+                         stock_code="005930", timestamp="2025-06-02")
+    fill.quantity, fill.price, fill.slippage_rate
+    backtest = AccurateBacktest(fill_model=ImpactFillModel(max_participation=0.05))
+"""
+
+import os
+import json
+import time
+import logging
+import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BUY, SELL = 'BUY', 'SELL'
+
+# 연속매매 시간 (09:00~15:20, 분) - 일봉 거래량을 분당 거래량으로 환산
+SESSION_MINUTES = 380
+
+# 호가 단계 수 (KIS / 키움 최대 10단계)
+DEFAULT_DEPTH = 10
+
+# 한국 주식 호가 단위 구간 (가격 < 경계값 → 호가 단위)
+TICK_BOUNDARIES = np.array([1000, 5000, 10000, 50000, 100000, 500000], dtype=np.float64)
+TICK_UNITS = np.array([1, 5, 10, 50, 100, 500, 1000], dtype=np.float64)
+
+def tick_size(price: float) -> int:
+    """한국 주식 호가 단위"""
+    if price < 1000:
+        return 1
+    elif price < 5000:
+        return 5
+    elif price < 10000:
+        return 10
+    elif price < 50000:
+        return 50
+    elif price < 100000:
+        return 100
+    elif price < 500000:
+        return 500
+    return 1000
+
+def tick_sizes(prices) -> np.ndarray:
+    """tick_size의 벡터 버전"""
+    return TICK_UNITS[np.searchsorted(TICK_BOUNDARIES, np.asarray(prices, dtype=np.float64), side='right')]
+
+def side_sign(side: str) -> int:
+    """매수 +1 / 매도 -1"""
+    if side == BUY:
+        return 1
+    if side == SELL:
+        return -1
+    raise ValueError(f"알 수 없는 주문 방향: {side}")
+
+################################### 호가 스냅샷 ##################################
+
+class OrderBookSnapshot:
+    """호가 스냅샷 (매도호가는 가격 오름차순, 매수호가는 가격 내림차순 - 1호가가 앞)"""
+
+    def __init__(self, ask_prices, ask_volumes, bid_prices, bid_volumes, timestamp=None):
+        self.ask_prices = np.asarray(ask_prices, dtype=np.float64)
+        self.ask_volumes = np.asarray(ask_volumes, dtype=np.float64)
+        self.bid_prices = np.asarray(bid_prices, dtype=np.float64)
+        self.bid_volumes = np.asarray(bid_volumes, dtype=np.float64)
+        self.timestamp = pd.Timestamp(timestamp) if timestamp is not None else None
+
+    @classmethod
+    def from_kis(cls, orderbook: Dict, timestamp=None) -> 'OrderBookSnapshot':
+        """KisKR.GetOrderBook 결과 → 스냅샷 (가격 0인 단계 제외)"""
+        levels = orderbook.get('levels', [])
+        asks = [(level['ask_price'], level['ask_volume']) for level in levels if level['ask_price'] > 0]
+        bids = [(level['bid_price'], level['bid_volume']) for level in levels if level['bid_price'] > 0]
+        return cls.from_levels(asks, bids, timestamp)
+
+    @classmethod
+    def from_kiwoom(cls, hoga: Dict, timestamp=None) -> 'OrderBookSnapshot':
+        """키움 GetHoga(ka10004) 결과 → 스냅샷 (SellHoga는 10→1 역순으로 들어있음)"""
+        asks = [(item['Price'], item['Qty']) for item in sorted(hoga.get('SellHoga', []), key=lambda x: x['Level'])
+                if item['Price'] > 0]
+        bids = [(item['Price'], item['Qty']) for item in sorted(hoga.get('BuyHoga', []), key=lambda x: x['Level'])
+                if item['Price'] > 0]
+        return cls.from_levels(asks, bids, timestamp)
+
+    @classmethod
+    def from_levels(cls, asks: List[Tuple[float, float]], bids: List[Tuple[float, float]],
+                    timestamp=None) -> 'OrderBookSnapshot':
+        asks = sorted(asks, key=lambda level: level[0])
+        bids = sorted(bids, key=lambda level: -level[0])
+        return cls([p for p, _ in asks], [q for _, q in asks],
+                   [p for p, _ in bids], [q for _, q in bids], timestamp)
+
+    @classmethod
+    def from_dict(cls, record: Dict) -> 'OrderBookSnapshot':
+        """DepthSnapshotStore 저장 형식 {'timestamp', 'asks': [[가격, 잔량], ...], 'bids': [...]} → 스냅샷"""
+        return cls.from_levels([tuple(level) for level in record.get('asks', [])],
+                               [tuple(level) for level in record.get('bids', [])],
+                               record.get('timestamp'))
+
+    def to_dict(self) -> Dict:
+        return {
+            'timestamp': self.timestamp.strftime('%Y-%m-%d %H:%M:%S') if self.timestamp is not None else None,
+            'asks': [[float(p), float(q)] for p, q in zip(self.ask_prices, self.ask_volumes)],
+            'bids': [[float(p), float(q)] for p, q in zip(self.bid_prices, self.bid_volumes)]
+        }
+
+    def to_kis(self, depth: int = 5) -> Dict:
+        """KisKR.GetOrderBook 반환 형식 (호가 건수는 잔량 100주당 1건으로 추정)"""
+        levels = []
+        for i in range(min(depth, DEFAULT_DEPTH, len(self.ask_prices), len(self.bid_prices))):
+            ask_volume, bid_volume = int(self.ask_volumes[i]), int(self.bid_volumes[i])
+            levels.append({
+                'ask_price': float(self.ask_prices[i]),
+                'ask_volume': ask_volume,
+                'bid_price': float(self.bid_prices[i]),
+                'bid_volume': bid_volume,
+                'ask_cnt': max(1, ask_volume // 100),
+                'bid_cnt': max(1, bid_volume // 100)
+            })
+        ask_volumes = self.ask_volumes.astype(np.int64)
+        bid_volumes = self.bid_volumes.astype(np.int64)
+        return {
+            'total_ask_cnt': int(np.maximum(1, ask_volumes // 100).sum()),
+            'total_bid_cnt': int(np.maximum(1, bid_volumes // 100).sum()),
+            'total_ask_rem': int(ask_volumes.sum()),
+            'total_bid_rem': int(bid_volumes.sum()),
+            'levels': levels
+        }
+
+    @property
+    def best_ask(self) -> float:
+        return float(self.ask_prices[0]) if len(self.ask_prices) else np.nan
+
+    @property
+    def best_bid(self) -> float:
+        return float(self.bid_prices[0]) if len(self.bid_prices) else np.nan
+
+    @property
+    def mid(self) -> float:
+        return (self.best_ask + self.best_bid) / 2
+
+    def liquidity(self, side: str) -> Tuple[np.ndarray, np.ndarray]:
+        """시장가 주문이 소진하는 반대편 호가 (매수 → 매도호가, 매도 → 매수호가)"""
+        if side_sign(side) > 0:
+            return self.ask_prices, self.ask_volumes
+        return self.bid_prices, self.bid_volumes
+
+    def resting_volume(self, side: str, price: float) -> float:
+        """같은 방향 지정가 주문 앞에 쌓여 있는 잔량 (해당 가격 단계가 없으면 0)"""
+        prices, volumes = (self.bid_prices, self.bid_volumes) if side_sign(side) > 0 else (self.ask_prices, self.ask_volumes)
+        matched = np.flatnonzero(np.isclose(prices, price))
+        return float(volumes[matched[0]]) if len(matched) else 0.0
+
+def synthetic_order_book(price: float, high: float, low: float, level_volume: float,
+                         depth: int = DEFAULT_DEPTH, timestamp=None) -> OrderBookSnapshot:
+    """봉 정보로 호가 합성 - 종가가 고가에 가까울수록 매수잔량 우세, 단계별 잔량 level_volume
+
+    매도 1호가 = 가격 + 1틱, 매수 1호가 = 가격 (마지막 체결가가 매수 1호가에 있었다고 가정)
+    """
+    bid_share = (price - low) / (high - low) if high > low else 0.5
+    bid_share = min(max(bid_share, 0.1), 0.9)
+
+    level_volume = max(float(level_volume), 1.0)
+    tick = tick_size(price)
+    steps = np.arange(1, depth + 1)
+    return OrderBookSnapshot(
+        ask_prices=price + tick * steps,
+        ask_volumes=np.full(depth, int(level_volume * (1 - bid_share)), dtype=np.float64),
+        bid_prices=np.maximum(price - tick * (steps - 1), tick),
+        bid_volumes=np.full(depth, int(level_volume * bid_share), dtype=np.float64),
+        timestamp=timestamp
+    )
+
+def bar_value(bar, key: str) -> float:
+    """봉 정보(dict / pandas Series, 소문자·대문자 컬럼 모두 허용)에서 값 조회 (없으면 NaN)"""
+    if bar is None:
+        return np.nan
+    value = bar.get(key)
+    if value is None:
+        value = bar.get(key.capitalize())
+    return float(value) if value is not None else np.nan
+
+def walk_book(prices: np.ndarray, volumes: np.ndarray, quantity: int,
+              limit_price: Optional[float] = None, sign: int = 1) -> Tuple[int, float, int]:
+    """호가를 1단계부터 소진 → (체결 수량, 체결 금액, 사용한 호가 단계 수)
+
+    limit_price가 있으면 지정가보다 불리한 단계(매수: 더 비싼 매도호가, 매도: 더 싼 매수호가)는 제외
+    """
+    if limit_price is not None:
+        usable = (prices <= limit_price) if sign > 0 else (prices >= limit_price)
+        prices, volumes = prices[usable], volumes[usable]
+
+    before = np.cumsum(volumes) - volumes
+    taken = np.clip(quantity - before, 0, volumes).astype(np.int64)
+    filled = int(taken.sum())
+    return filled, float((taken * prices).sum()), int(np.count_nonzero(taken))
+
+################################### 체결 결과 ##################################
+
+class Fill:
+    """주문 체결 결과 (price는 평균 체결가, slippage는 기준가 대비 주당 불리한 금액)"""
+
+    def __init__(self, side: str, requested: int, quantity: int, price: float,
+                 reference_price: float, levels: int = 0):
+        self.side = side
+        self.requested = int(requested)
+        self.quantity = int(quantity)
+        self.price = float(price) if quantity > 0 else float(reference_price)
+        self.reference_price = float(reference_price)
+        self.levels = levels
+
+    @property
+    def remaining(self) -> int:
+        return self.requested - self.quantity
+
+    @property
+    def is_partial(self) -> bool:
+        return 0 < self.quantity < self.requested
+
+    @property
+    def slippage(self) -> float:
+        return (self.price - self.reference_price) * side_sign(self.side)
+
+    @property
+    def slippage_rate(self) -> float:
+        return self.slippage / self.reference_price if self.reference_price > 0 else 0.0
+
+    def __repr__(self):
+        return (f"Fill({self.side} {self.quantity}/{self.requested}주 @ {self.price:,.2f}, "
+                f"슬리피지 {self.slippage_rate * 100:+.3f}%)")
+
+################################### 체결 모델 ##################################
+
+class CloseFillModel:
+    """기존 방식 - 기준가(종가) 전량 체결 (기본값)"""
+
+    name = 'close'
+
+    def execute(self, side: str, quantity: int, price: float, bar=None,
+                stock_code: Optional[str] = None, timestamp=None) -> Fill:
+        return Fill(side, quantity, quantity, price, price)
+
+class OrderBookFillModel:
+    """호가 소진 체결 - 기록된 호가 스냅샷 우선, 없으면 봉 정보로 합성
+
+    Args:
+        snapshot_store: DepthSnapshotStore (없으면 항상 합성 호가)
+        depth: 합성 호가 단계 수
+        session_minutes: 합성 호가 단계별 잔량 = 봉 거래량 / session_minutes (일봉 기준 분당 평균 거래량,
+                         분봉이면 1로 지정)
+        max_levels: 시장가 주문이 소진할 최대 호가 단계 수 (None이면 스냅샷 전체)
+    """
+
+    name = 'order_book'
+
+    def __init__(self, snapshot_store: Optional['DepthSnapshotStore'] = None, depth: int = DEFAULT_DEPTH,
+                 session_minutes: float = SESSION_MINUTES, max_levels: Optional[int] = None):
+        self.snapshot_store = snapshot_store
+        self.depth = depth
+        self.session_minutes = session_minutes
+        self.max_levels = max_levels
+
+    def snapshot(self, price: float, bar=None, stock_code: Optional[str] = None,
+                 timestamp=None) -> OrderBookSnapshot:
+        """주문 시점 호가 (기록된 스냅샷 → 봉 합성 순)"""
+        if self.snapshot_store is not None and stock_code is not None and timestamp is not None:
+            recorded = self.snapshot_store.snapshot_at(stock_code, timestamp)
+            if recorded is not None:
+                return recorded
+
+        high, low, volume = bar_value(bar, 'high'), bar_value(bar, 'low'), bar_value(bar, 'volume')
+        if np.isnan(high) or np.isnan(low):
+            high = low = price
+        level_volume = volume / self.session_minutes if not np.isnan(volume) else 1.0
+        return synthetic_order_book(price, high, low, level_volume, self.depth, timestamp)
+
+    def execute(self, side: str, quantity: int, price: float, bar=None,
+                stock_code: Optional[str] = None, timestamp=None) -> Fill:
+        """시장가 주문 - 반대편 호가를 소진하며 체결, 남는 수량은 미체결 (부분체결)"""
+        if quantity <= 0:
+            return Fill(side, quantity, 0, price, price)
+
+        book = self.snapshot(price, bar, stock_code, timestamp)
+        prices, volumes = book.liquidity(side)
+        if self.max_levels is not None:
+            prices, volumes = prices[:self.max_levels], volumes[:self.max_levels]
+
+        filled, notional, levels = walk_book(prices, volumes, int(quantity), sign=side_sign(side))
+        return Fill(side, quantity, filled, notional / filled if filled else price, price, levels)
+
+    def place_limit(self, side: str, quantity: int, limit_price: float, book: OrderBookSnapshot) -> 'LimitOrder':
+        """지정가 주문 - 즉시 체결 가능한 호가는 바로 체결, 나머지는 대기열 맨 뒤에 등록"""
+        order = LimitOrder(side, quantity, limit_price)
+        prices, volumes = book.liquidity(side)
+        filled, notional, _ = walk_book(prices, volumes, int(quantity), limit_price, side_sign(side))
+        order.add_fill(filled, notional)
+        order.queue_ahead = book.resting_volume(side, limit_price)
+        return order
+
+class LimitOrder:
+    """대기 중인 지정가 주문 - 같은 가격의 앞선 잔량(queue_ahead)이 체결된 뒤부터 체결
+
+    on_bar()로 이후 봉을 넘겨주면:
+    - 지정가를 뚫고 거래되면(매수: 저가 < 지정가) 남은 수량 전량 지정가 체결
+    - 지정가에 닿기만 하면 봉 거래량을 고가~저가 틱 수로 나눈 만큼이 그 가격에서 거래됐다고 보고
+      대기열 앞 잔량을 먼저 소진한 뒤 남는 거래량으로 체결
+    """
+
+    def __init__(self, side: str, quantity: int, limit_price: float, queue_ahead: float = 0.0):
+        self.side = side
+        self.sign = side_sign(side)
+        self.quantity = int(quantity)
+        self.limit_price = float(limit_price)
+        self.queue_ahead = float(queue_ahead)
+        self.filled = 0
+        self.notional = 0.0
+
+    def add_fill(self, quantity: int, notional: float):
+        self.filled += int(quantity)
+        self.notional += notional
+
+    @property
+    def remaining(self) -> int:
+        return self.quantity - self.filled
+
+    @property
+    def is_done(self) -> bool:
+        return self.remaining <= 0
+
+    @property
+    def avg_price(self) -> float:
+        return self.notional / self.filled if self.filled else self.limit_price
+
+    def on_bar(self, high: float, low: float, volume: float) -> int:
+        """봉 하나 진행 → 이번 봉에서 체결된 수량"""
+        if self.is_done:
+            return 0
+
+        touched = low <= self.limit_price if self.sign > 0 else high >= self.limit_price
+        if not touched:
+            return 0
+
+        traded_through = low < self.limit_price if self.sign > 0 else high > self.limit_price
+        if traded_through:
+            quantity = self.remaining
+        else:
+            ticks = max(1, int(round((high - low) / tick_size(self.limit_price))) + 1)
+            traded_at_price = volume / ticks
+            consumed = min(self.queue_ahead, traded_at_price)
+            self.queue_ahead -= consumed
+            quantity = min(self.remaining, int(traded_at_price - consumed))
+
+        self.add_fill(quantity, quantity * self.limit_price)
+        return quantity
+
+    def to_fill(self) -> Fill:
+        return Fill(self.side, self.quantity, self.filled, self.avg_price, self.limit_price)
+
+class ImpactFillModel:
+    """벡터화 근사 체결 (호가 스냅샷 없이 봉 정보만 사용 - 긴 일봉 백테스트용)
+
+    체결 수량 = min(주문 수량, 봉 거래량 × max_participation)
+    체결가 = 기준가 ± (반 스프레드 + impact_coefficient × 봉 변동성 × √(체결 수량 / 봉 거래량) × 기준가)
+    봉 변동성은 고가/저가 Parkinson 추정치 (고가/저가가 없으면 default_volatility)
+
+    Args:
+        spread_ticks: 호가 스프레드 (틱 수)
+        impact_coefficient: 제곱근 시장충격 계수
+        max_participation: 봉 거래량 대비 최대 체결 비율 (None이면 제한 없음)
+        default_volatility: 고가/저가가 없을 때 사용할 봉 변동성
+    """
+
+    name = 'impact'
+
+    def __init__(self, spread_ticks: float = 1.0, impact_coefficient: float = 0.5,
+                 max_participation: Optional[float] = 0.1, default_volatility: float = 0.02):
+        self.spread_ticks = spread_ticks
+        self.impact_coefficient = impact_coefficient
+        self.max_participation = max_participation
+        self.default_volatility = default_volatility
+
+    def estimate(self, sides, quantities, prices, volumes, highs=None, lows=None) -> Tuple[np.ndarray, np.ndarray]:
+        """여러 주문을 한 번에 계산 → (체결 수량 배열, 체결가 배열)
+
+        Args:
+            sides: +1(매수) / -1(매도) 배열 또는 스칼라
+            quantities, prices, volumes: 주문 수량 / 기준가 / 봉 거래량 (거래량 NaN이면 참여율 제한·충격 없음)
+            highs, lows: 봉 고가 / 저가 (변동성 추정용, 생략 가능)
+        """
+        sides = np.asarray(sides, dtype=np.float64)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+
+        filled = quantities
+        if self.max_participation is not None:
+            cap = np.floor(volumes * self.max_participation)
+            filled = np.where(np.isnan(cap), quantities, np.minimum(quantities, cap))
+        filled = np.maximum(filled, 0)
+
+        volatility = np.full(np.broadcast(prices, volumes).shape, self.default_volatility)
+        if highs is not None and lows is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                parkinson = np.log(np.asarray(highs, dtype=np.float64) / np.asarray(lows, dtype=np.float64)) \
+                    / np.sqrt(4 * np.log(2))
+            volatility = np.where(np.isfinite(parkinson) & (parkinson > 0), parkinson, volatility)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            participation = np.where(volumes > 0, filled / volumes, 0.0)
+        cost = tick_sizes(prices) * self.spread_ticks / 2 \
+            + self.impact_coefficient * volatility * np.sqrt(participation) * prices
+        return filled.astype(np.int64), prices + sides * cost
+
+    def execute(self, side: str, quantity: int, price: float, bar=None,
+                stock_code: Optional[str] = None, timestamp=None) -> Fill:
+        filled, fill_price = self.estimate(side_sign(side), quantity, price, bar_value(bar, 'volume'),
+                                           bar_value(bar, 'high'), bar_value(bar, 'low'))
+        return Fill(side, quantity, int(filled), float(fill_price), price)
+
+FILL_MODELS = {
+    CloseFillModel.name: CloseFillModel,
+    OrderBookFillModel.name: OrderBookFillModel,
+    ImpactFillModel.name: ImpactFillModel
+}
+
+def create_fill_model(name: Optional[str] = None, **kwargs):
+    """이름으로 체결 모델 생성 ('close' / 'order_book' / 'impact', None이면 'close')"""
+    name = name or CloseFillModel.name
+    if name not in FILL_MODELS:
+        raise ValueError(f"알 수 없는 체결 모델: {name} (사용 가능: {', '.join(FILL_MODELS)})")
+    return FILL_MODELS[name](**kwargs)
+
+################################### 호가 기록 ##################################
+
+class DepthSnapshotStore:
+    """호가 스냅샷 저장소 (depth/<YYYYMMDD>/<종목코드>.jsonl, 한 줄에 스냅샷 하나)
+
+    KIS/키움 호가 API는 현재 호가만 제공하므로 장중에 record()를 주기적으로 실행해 적재한다.
+    일봉 백테스트에서는 해당 거래일의 마지막 스냅샷(장 마감 무렵 호가)을 사용한다.
+    """
+
+    def __init__(self, root_dir: str = "backtest_data", fetcher: Optional[Callable] = None,
+                 request_interval: float = 0.1):
+        """
+        Args:
+            root_dir: 저장 폴더 (일봉/분봉 저장소와 같은 폴더 사용)
+            fetcher: fetcher(stock_code) → OrderBookSnapshot (기본값: KIS GetOrderBook 10단계)
+            request_interval: 종목별 조회 사이 대기 시간 (초)
+        """
+        self.depth_dir = os.path.join(root_dir, "depth")
+        self.fetcher = fetcher
+        self.request_interval = request_interval
+        self._days = {}  # {(YYYYMMDD, 종목코드): (타임스탬프 배열, 스냅샷 리스트)}
+        os.makedirs(self.depth_dir, exist_ok=True)
+
+    @staticmethod
+    def _date_key(trade_date) -> str:
+        return pd.Timestamp(trade_date).strftime('%Y%m%d')
+
+    def _path(self, trade_date, stock_code: str) -> str:
+        return os.path.join(self.depth_dir, self._date_key(trade_date), f"{stock_code}.jsonl")
+
+    def available_dates(self) -> List[str]:
+        """호가가 저장된 거래일 목록 (YYYYMMDD, 오름차순)"""
+        return sorted(name for name in os.listdir(self.depth_dir) if len(name) == 8 and name.isdigit())
+
+    def append(self, stock_code: str, snapshot: OrderBookSnapshot):
+        """스냅샷 한 건 추가 (timestamp 없으면 현재 시각)"""
+        if snapshot.timestamp is None:
+            snapshot.timestamp = pd.Timestamp.now().floor('s')
+        path = self._path(snapshot.timestamp, stock_code)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(snapshot.to_dict(), ensure_ascii=False) + "\n")
+        self._days.pop((self._date_key(snapshot.timestamp), stock_code), None)
+
+    def load(self, trade_date, stock_code: str) -> List[OrderBookSnapshot]:
+        """거래일 종목 스냅샷 전체 (시각 오름차순, 없으면 빈 리스트)"""
+        return self._load_day(trade_date, stock_code)[1]
+
+    def _load_day(self, trade_date, stock_code: str) -> Tuple[np.ndarray, List[OrderBookSnapshot]]:
+        key = (self._date_key(trade_date), stock_code)
+        if key not in self._days:
+            snapshots = []
+            path = self._path(trade_date, stock_code)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            snapshots.append(OrderBookSnapshot.from_dict(json.loads(line)))
+                        except (ValueError, KeyError, TypeError) as e:
+                            logger.warning(f"⚠️ {stock_code} 호가 기록 파싱 실패: {e}")
+            snapshots.sort(key=lambda snapshot: snapshot.timestamp)
+            times = np.array([snapshot.timestamp.value for snapshot in snapshots], dtype=np.int64)
+            self._days[key] = (times, snapshots)
+        return self._days[key]
+
+    def snapshot_at(self, stock_code: str, timestamp) -> Optional[OrderBookSnapshot]:
+        """timestamp 이전 마지막 스냅샷 (같은 거래일 안에서만, 날짜만 주면 그날 마지막 스냅샷)"""
+        if isinstance(timestamp, datetime.date) and not isinstance(timestamp, datetime.datetime):
+            timestamp = pd.Timestamp(timestamp) + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+        else:
+            timestamp = pd.Timestamp(timestamp)
+            if timestamp == timestamp.normalize():
+                timestamp = timestamp + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+
+        times, snapshots = self._load_day(timestamp, stock_code)
+        pos = int(np.searchsorted(times, timestamp.value, side='right')) - 1
+        return snapshots[pos] if pos >= 0 else None
+
+    def record(self, stock_codes: List[str]) -> int:
+        """현재 호가 조회 후 저장 - 장중 주기적으로 실행 (저장 종목 수 반환)"""
+        fetcher = self.fetcher or kis_depth_fetcher
+        saved = 0
+        for stock_code in stock_codes:
+            try:
+                snapshot = fetcher(stock_code)
+                if snapshot is not None and len(snapshot.ask_prices) and len(snapshot.bid_prices):
+                    self.append(stock_code, snapshot)
+                    saved += 1
+                else:
+                    logger.info(f"{stock_code}: 저장할 호가 없음")
+            except Exception as e:
+                logger.warning(f"⚠️ {stock_code} 호가 기록 실패: {e}")
+            time.sleep(self.request_interval)
+
+        logger.info(f"📥 호가 기록 완료: {saved}/{len(stock_codes)}종목")
+        return saved
+
+def kis_depth_fetcher(stock_code: str) -> Optional[OrderBookSnapshot]:
+    """KIS 현재 호가 10단계 조회"""
+    import KIS_API_Helper_KR as KisKR
+    orderbook = KisKR.GetOrderBook(stock_code, depth=DEFAULT_DEPTH)
+    if not orderbook:
+        return None
+    return OrderBookSnapshot.from_kis(orderbook, pd.Timestamp.now().floor('s'))
+
+def kiwoom_depth_fetcher(kiwoom) -> Callable:
+    """키움 GetHoga(ka10004) 기반 fetcher 생성 (kiwoom: Kiwoom_Common 객체)"""
+    def fetch(stock_code: str) -> Optional[OrderBookSnapshot]:
+        hoga = kiwoom.GetHoga(stock_code)
+        if not hoga:
+            return None
+        return OrderBookSnapshot.from_kiwoom(hoga, pd.Timestamp.now().floor('s'))
+    return fetch
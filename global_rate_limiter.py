@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+KIS API 글로벌 호출 제한 (global_rate_limiter.py)
+- 전역 토큰 버킷: 프로세스 전체의 초당 호출 수 제한 (실전 / 모의 계좌별 기본값)
+- 엔드포인트별 세마포어: 분봉/일봉/시세/호가/주문/계좌 조회별 동시 실행 수 제한
+  (단일 락으로 전부 직렬화하지 않고, 서로 다른 종목 조회는 한도 안에서 겹쳐 실행)
+- 세마포어/토큰 대기 시간을 엔드포인트별로 기록해 경합 정도를 로그로 확인
+- RateLimitedModule: KisKR/Common 모듈을 감싸 지정한 함수만 제한을 거쳐 호출 (나머지는 그대로 전달)
+
+사용 예:
+    import global_rate_limiter
+    limiter = global_rate_limiter.get_rate_limiter(is_virtual=False)
+    KisKR = global_rate_limiter.RateLimitedModule(KisKR, limiter, global_rate_limiter.KIS_KR_ENDPOINTS)
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+def set_logger(external_logger):
+    """외부 로거를 설정하는 함수"""
+    global logger
+    logger = external_logger
+
+################################### 설정 ##################################
+
+REAL_CALLS_PER_SECOND = 18      # 실전 계좌 초당 호출 수 (KIS 한도 20건에서 여유분 제외)
+VIRTUAL_CALLS_PER_SECOND = 2    # 모의 계좌 초당 호출 수
+STATS_LOG_INTERVAL = 600        # 통계 로그 주기 (초)
+DEFAULT_ENDPOINT_LIMIT = 2      # 목록에 없는 엔드포인트의 동시 실행 수
+
+# 엔드포인트별 동시 실행 수
+ENDPOINT_LIMITS = {
+    'minute_ohlcv': 3,
+    'daily_ohlcv': 3,
+    'quote': 4,
+    'order_book': 2,
+    'account': 2,
+    'order': 1
+}
+
+# KIS_API_Helper_KR 함수 → 엔드포인트 (여기 없는 함수는 제한 없이 그대로 호출)
+KIS_KR_ENDPOINTS = {
+    'GetOhlcvMinute': 'minute_ohlcv',
+    'GetOhlcv': 'daily_ohlcv',
+    'GetOhlcvNew': 'daily_ohlcv',
+    'GetStockOpenPrice': 'daily_ohlcv',
+    'GetCurrentPrice': 'quote',
+    'GetCurrentQuote': 'quote',
+    'GetCurrentStatus': 'quote',
+    'GetOrderBook': 'order_book',
+    'GetBalance': 'account',
+    'GetMyStockList': 'account',
+    'GetOrderList': 'account',
+    'MakeBuyMarketOrder': 'order',
+    'MakeSellMarketOrder': 'order',
+    'MakeBuyLimitOrder': 'order',
+    'MakeSellLimitOrder': 'order',
+    'CancelModifyOrder': 'order'
+}
+
+# KIS_Common 함수 → 엔드포인트
+KIS_COMMON_ENDPOINTS = {
+    'GetOhlcv': 'daily_ohlcv'
+}
+
+################################### 토큰 버킷 ##################################
+
+class TokenBucket:
+    """초당 rate개씩 채워지는 토큰 버킷 (최대 capacity개까지 연속 호출 허용)"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """토큰을 얻을 때까지 대기하고 대기한 시간(초) 반환"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                shortage = (tokens - self._tokens) / self.rate
+            time.sleep(shortage)
+            waited += shortage
+
+################################### 호출 제한 ##################################
+
+class GlobalRateLimiter:
+    """전역 토큰 버킷 + 엔드포인트별 세마포어
+
+    Args:
+        calls_per_second: 전역 초당 호출 수 (None이면 토큰 버킷 없이 세마포어만 적용)
+        endpoint_limits: {엔드포인트: 동시 실행 수} (ENDPOINT_LIMITS를 덮어씀)
+    """
+
+    def __init__(self, calls_per_second: Optional[float] = REAL_CALLS_PER_SECOND,
+                 endpoint_limits: Optional[Dict[str, int]] = None):
+        self.bucket = TokenBucket(calls_per_second) if calls_per_second else None
+        self.endpoint_limits = dict(ENDPOINT_LIMITS, **(endpoint_limits or {}))
+        self._semaphores = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._last_stats_log = time.monotonic()
+        self.calls_total = 0
+
+    def _endpoint(self, endpoint: str):
+        with self._lock:
+            semaphore = self._semaphores.get(endpoint)
+            if semaphore is None:
+                limit = max(1, int(self.endpoint_limits.get(endpoint, DEFAULT_ENDPOINT_LIMIT)))
+                semaphore = self._semaphores[endpoint] = threading.BoundedSemaphore(limit)
+                self._stats[endpoint] = {
+                    'limit': limit, 'calls': 0, 'active': 0, 'peak_active': 0, 'errors': 0,
+                    'slot_wait': 0.0, 'token_wait': 0.0, 'max_wait': 0.0, 'contended': 0, 'busy': 0.0
+                }
+            return semaphore, self._stats[endpoint]
+
+    @contextmanager
+    def limit(self, endpoint: str):
+        """엔드포인트 동시 실행 슬롯 → 전역 토큰 순으로 얻은 뒤 실행 (대기 시간 기록)"""
+        semaphore, stats = self._endpoint(endpoint)
+
+        started = time.monotonic()
+        semaphore.acquire()
+        slot_wait = time.monotonic() - started
+        try:
+            token_wait = self.bucket.acquire() if self.bucket is not None else 0.0
+            with self._lock:
+                self.calls_total += 1
+                stats['calls'] += 1
+                stats['active'] += 1
+                stats['peak_active'] = max(stats['peak_active'], stats['active'])
+                stats['slot_wait'] += slot_wait
+                stats['token_wait'] += token_wait
+                stats['max_wait'] = max(stats['max_wait'], slot_wait + token_wait)
+                if slot_wait + token_wait > 0.001:
+                    stats['contended'] += 1
+
+            run_started = time.monotonic()
+            try:
+                yield
+            except Exception:
+                with self._lock:
+                    stats['errors'] += 1
+                raise
+            finally:
+                with self._lock:
+                    stats['active'] -= 1
+                    stats['busy'] += time.monotonic() - run_started
+        finally:
+            semaphore.release()
+
+    def call(self, endpoint: str, func: Callable, *args, **kwargs):
+        """제한을 거쳐 func 호출"""
+        with self.limit(endpoint):
+            return func(*args, **kwargs)
+
+    def stats(self) -> Dict[str, Dict]:
+        """엔드포인트별 호출 수, 대기 시간(슬롯/토큰), 최대 동시 실행 수"""
+        with self._lock:
+            result = {}
+            for endpoint, stats in self._stats.items():
+                item = dict(stats)
+                calls = max(1, stats['calls'])
+                item['avg_wait'] = (stats['slot_wait'] + stats['token_wait']) / calls
+                item['contention_rate'] = round(stats['contended'] / calls * 100, 1)
+                result[endpoint] = item
+            return result
+
+    def log_stats(self, force: bool = False):
+        """대기 시간 통계 로그 (STATS_LOG_INTERVAL마다, 호출이 있었던 엔드포인트만)"""
+        now = time.monotonic()
+        if not force and now - self._last_stats_log < STATS_LOG_INTERVAL:
+            return
+        self._last_stats_log = now
+
+        lines = []
+        for endpoint, stats in sorted(self.stats().items()):
+            if stats['calls'] == 0:
+                continue
+            lines.append(f"  {endpoint}: {stats['calls']}회 (동시 {stats['peak_active']}/{stats['limit']}), "
+                         f"대기 {stats['contention_rate']}% 평균 {stats['avg_wait'] * 1000:.0f}ms "
+                         f"최대 {stats['max_wait'] * 1000:.0f}ms "
+                         f"(슬롯 {stats['slot_wait']:.1f}s / 토큰 {stats['token_wait']:.1f}s), 에러 {stats['errors']}")
+        if lines:
+            logger.info("🚦 API 호출 제한 현황\n" + "\n".join(lines))
+
+class RateLimitedModule:
+    """모듈 대체 - endpoints에 있는 함수는 limiter를 거쳐 호출, 나머지 속성은 원래 모듈 그대로"""
+
+    def __init__(self, module, limiter: GlobalRateLimiter, endpoints: Dict[str, str]):
+        self._module = module
+        self._limiter = limiter
+        self._endpoints = endpoints
+        self._wrapped = {}
+
+    def __getattr__(self, name):
+        attr = getattr(self._module, name)
+        endpoint = self._endpoints.get(name)
+        if endpoint is None or not callable(attr):
+            return attr
+
+        wrapped = self._wrapped.get(name)
+        if wrapped is None or wrapped[0] is not attr:
+            limiter = self._limiter
+
+            def limited(*args, **kwargs):
+                with limiter.limit(endpoint):
+                    return attr(*args, **kwargs)
+
+            limited.__name__ = name
+            wrapped = self._wrapped[name] = (attr, limited)
+        return wrapped[1]
+
+################################### 싱글톤 ##################################
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter(is_virtual: bool = False) -> GlobalRateLimiter:
+    """프로세스 공용 GlobalRateLimiter (처음 호출 시 계좌 종류에 맞는 초당 호출 수로 생성)"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            calls_per_second = VIRTUAL_CALLS_PER_SECOND if is_virtual else REAL_CALLS_PER_SECOND
+            _rate_limiter = GlobalRateLimiter(calls_per_second)
+            logger.info(f"🚦 글로벌 Rate Limiter 생성 ({'모의' if is_virtual else '실전'}, 초당 {calls_per_second}건)")
+        return _rate_limiter
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+메인 루프 구간 프로파일러 (loop_profiler.py)
+- main() 루프의 각 구간(휴장일 체크, 상태 로드, 미체결 취소, 뉴스, 스캔, 포지션 점검, 보고 등)별
+  경과 시간(wall), CPU 시간, API 호출 수를 기록
+- 루프 1회 = JSONL 한 줄 (max_bytes 초과 시 .1로 넘기고 새 파일)
+- summary_every 루프마다 최근 window 루프 기준 구간별 p50/p90/p99 요약을 로그 + 요약 JSON 파일로 저장
+- 비활성화 시 phase()/span()은 바로 반환 (프로파일러 자체 소요 시간도 요약에 overhead로 표시)
+
+사용 예:
+    profiler = loop_profiler.LoopProfiler("LoopProfile_BOT.jsonl", enabled=True, api_call_counter=lambda: limiter.calls_total)
+    while True:
+        profiler.start_loop('holiday_check')   # 이전 루프 기록 후 새 루프 시작
+        ...
+        profiler.phase('scan')                 # 이전 구간 종료 + 'scan' 구간 시작
+        ...
+        with profiler.span('report'):          # 중첩 구간 (이름은 '상위/하위')
+            ...
+"""
+
+import os
+import json
+import time
+import logging
+import datetime
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def set_logger(external_logger):
+    """외부 로거를 설정하는 함수"""
+    global logger
+    logger = external_logger
+
+################################### 프로파일러 ##################################
+
+class LoopProfiler:
+    """main 루프 구간별 시간/API 호출 수 기록
+
+    Args:
+        timeline_path: 루프별 JSONL 기록 파일 (요약은 같은 이름의 .summary.json)
+        enabled: 기록 여부 (False면 모든 호출이 바로 반환)
+        api_call_counter: () -> 지금까지의 누적 API 호출 수 (구간 전후 차이로 구간별 호출 수 계산)
+        summary_every: 요약 로그 주기 (루프 수)
+        window: 요약 백분위 계산에 쓰는 최근 루프 수
+        max_bytes: 타임라인 파일 최대 크기 (초과 시 .1로 넘김)
+    """
+
+    def __init__(self, timeline_path: str, enabled: bool = False, api_call_counter: Optional[Callable[[], int]] = None,
+                 summary_every: int = 20, window: int = 200, max_bytes: int = 5 * 1024 * 1024):
+        self.timeline_path = timeline_path
+        self.summary_path = os.path.splitext(timeline_path)[0] + '.summary.json'
+        self.enabled = enabled
+        self.api_call_counter = api_call_counter
+        self.summary_every = summary_every
+        self.max_bytes = max_bytes
+
+        self.loop_count = 0
+        self._loop = None
+        self._current = None
+        self._history = defaultdict(lambda: deque(maxlen=window))
+        self._overhead = deque(maxlen=window)
+
+    ################ 구간 표시 ################
+
+    def start_loop(self, first_phase: Optional[str] = None):
+        """진행 중인 루프를 기록하고 새 루프 시작"""
+        if not self.enabled:
+            return
+        if self._loop is not None:
+            self.end_loop()
+
+        started = time.perf_counter()
+        self._loop = {
+            'wall': time.perf_counter(),
+            'cpu': time.process_time(),
+            'api': self._api_calls(),
+            'started_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'phases': {},
+            'overhead': time.perf_counter() - started
+        }
+        if first_phase:
+            self._open(first_phase)
+
+    def phase(self, name: str):
+        """현재 구간을 끝내고 name 구간 시작 (같은 이름이 다시 나오면 누적)"""
+        if not self.enabled or self._loop is None:
+            return
+        started = time.perf_counter()
+        self._close()
+        self._open(name)
+        self._loop['overhead'] += time.perf_counter() - started
+
+    @contextmanager
+    def span(self, name: str):
+        """현재 구간 안의 중첩 구간 ('상위/하위' 이름으로 따로 기록, 상위 구간 시간에도 포함)"""
+        if not self.enabled or self._loop is None:
+            yield
+            return
+        parent = self._current['name'] if self._current else None
+        full_name = f"{parent}/{name}" if parent else name
+        mark = self._mark()
+        try:
+            yield
+        finally:
+            self._add(full_name, mark)
+
+    def end_loop(self):
+        """진행 중인 루프를 타임라인에 기록 (보통 다음 start_loop에서 자동 호출)"""
+        if not self.enabled or self._loop is None:
+            return
+        started = time.perf_counter()
+        self._close()
+        loop = self._loop
+        self._loop = None
+        self.loop_count += 1
+
+        wall = time.perf_counter() - loop['wall']
+        record = {
+            'loop': self.loop_count,
+            'started_at': loop['started_at'],
+            'wall': round(wall, 4),
+            'cpu': round(time.process_time() - loop['cpu'], 4),
+            'api_calls': self._api_calls() - loop['api'],
+            'phases': {name: {'wall': round(stats['wall'], 4), 'cpu': round(stats['cpu'], 4), 'api_calls': stats['api_calls']}
+                       for name, stats in loop['phases'].items()}
+        }
+        for name, stats in loop['phases'].items():
+            self._history[name].append((stats['wall'], stats['cpu'], stats['api_calls']))
+        self._history['__loop__'].append((record['wall'], record['cpu'], record['api_calls']))
+
+        try:
+            self._write(record)
+        except Exception as e:
+            logger.error(f"루프 프로파일 기록 실패: {str(e)}")
+
+        self._overhead.append((loop['overhead'] + time.perf_counter() - started, wall))
+
+        if self.summary_every and self.loop_count % self.summary_every == 0:
+            self.log_summary()
+
+    ################ 요약 ################
+
+    def summary(self) -> Dict:
+        """최근 루프 기준 구간별 p50/p90/p99 경과 시간, 평균 CPU 시간/API 호출 수"""
+        phases = {}
+        for name, samples in self._history.items():
+            if not samples:
+                continue
+            values = np.array(samples, dtype=float)
+            wall = values[:, 0]
+            phases[name] = {
+                'count': len(samples),
+                'wall_p50': round(float(np.percentile(wall, 50)), 4),
+                'wall_p90': round(float(np.percentile(wall, 90)), 4),
+                'wall_p99': round(float(np.percentile(wall, 99)), 4),
+                'wall_max': round(float(wall.max()), 4),
+                'cpu_mean': round(float(values[:, 1].mean()), 4),
+                'api_calls_mean': round(float(values[:, 2].mean()), 2)
+            }
+
+        overhead = sum(item[0] for item in self._overhead)
+        total = sum(item[1] for item in self._overhead)
+        return {
+            'loops': self.loop_count,
+            'updated_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'overhead_pct': round(overhead / total * 100, 4) if total > 0 else 0.0,
+            'phases': phases
+        }
+
+    def log_summary(self):
+        """요약 로그 + 요약 JSON 파일 저장"""
+        if not self.enabled:
+            return
+        summary = self.summary()
+        loop = summary['phases'].pop('__loop__', None)
+
+        lines = []
+        if loop:
+            lines.append(f"  루프 전체: p50 {loop['wall_p50']:.2f}s / p90 {loop['wall_p90']:.2f}s / p99 {loop['wall_p99']:.2f}s, "
+                         f"API {loop['api_calls_mean']:.1f}회")
+        for name, stats in sorted(summary['phases'].items(), key=lambda item: -item[1]['wall_p90']):
+            lines.append(f"  {name}: p50 {stats['wall_p50']:.2f}s / p90 {stats['wall_p90']:.2f}s / p99 {stats['wall_p99']:.2f}s, "
+                         f"CPU {stats['cpu_mean']:.2f}s, API {stats['api_calls_mean']:.1f}회")
+        logger.info(f"📈 메인 루프 구간 요약 (최근 {loop['count'] if loop else 0}회, 프로파일러 부하 {summary['overhead_pct']:.3f}%)\n"
+                    + "\n".join(lines))
+
+        if loop:
+            summary['phases']['__loop__'] = loop
+        try:
+            with open(self.summary_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.error(f"루프 프로파일 요약 저장 실패: {str(e)}")
+
+    ################ 내부 처리 ################
+
+    def _api_calls(self) -> int:
+        if self.api_call_counter is None:
+            return 0
+        try:
+            return int(self.api_call_counter())
+        except Exception:
+            return 0
+
+    def _mark(self) -> Dict:
+        return {'wall': time.perf_counter(), 'cpu': time.process_time(), 'api': self._api_calls()}
+
+    def _open(self, name: str):
+        self._current = dict(self._mark(), name=name)
+
+    def _close(self):
+        if self._current is not None:
+            self._add(self._current['name'], self._current)
+            self._current = None
+
+    def _add(self, name: str, mark: Dict):
+        stats = self._loop['phases'].setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'api_calls': 0})
+        stats['wall'] += time.perf_counter() - mark['wall']
+        stats['cpu'] += time.process_time() - mark['cpu']
+        stats['api_calls'] += self._api_calls() - mark['api']
+
+    def _write(self, record: Dict):
+        if os.path.exists(self.timeline_path) and os.path.getsize(self.timeline_path) >= self.max_bytes:
+            os.replace(self.timeline_path, self.timeline_path + '.1')
+        with open(self.timeline_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
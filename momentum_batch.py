@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+모멘텀 점수 일괄 계산 (momentum_batch.py)
+- day_trading.check_momentum_conditions의 점수 규칙(MACD 30 / 이동평균 20 / 거래량 25 / RSI 15)을
+  종목별 스칼라 분기 대신 후보 전체 특성표(종목 1행)에 NumPy 배열 연산으로 한 번에 적용
+- 특성 추출(extract_feature_frame)은 길이가 같은 종목끼리 종목=열인 표로 묶어 EWM/rolling을 한 번에 계산
+  (종목별 Series 계산과 같은 pandas 연산이라 값이 같음, 묶음 계산 실패 시 종목별 extract_momentum_features로 대체)
+- 점수/통과 판정(score_momentum_batch)은 check_momentum_conditions와 같은 값이 나오도록 유지
+  → 규칙을 바꾸면 양쪽을 함께 수정 (day_trading.MOMENTUM_BATCH_PARITY_CHECK로 스칼라 경로와 대조 가능)
+
+사용 예:
+    features = momentum_batch.extract_feature_frame({code: (df, None) for code, df in frames.items()})
+    scored = momentum_batch.score_momentum_batch(features, False, True, required_score=38, rsi_bounds=(30, 72))
+    scored.loc[code, ['momentum_score', 'passed']]
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+def set_logger(external_logger):
+    """외부 로거를 설정하는 함수"""
+    global logger
+    logger = external_logger
+
+################################### 특성 추출 ##################################
+
+# 특성표 컬럼 (*_ok: 해당 구간 계산 성공 여부, 실패 구간은 0점 - 스칼라 경로의 구간별 예외 처리와 동일)
+FEATURE_COLUMNS = [
+    'rows', 'macd_ok', 'macd_diff', 'macd_change',
+    'ma_ok', 'close', 'ma5', 'ma20', 'bullish_ratio',
+    'volume_ok', 'volume_ratio',
+    'rsi_ok', 'rsi_available', 'rsi', 'rsi_rising'
+]
+
+def extract_momentum_features(df: pd.DataFrame, minute_df: Optional[pd.DataFrame] = None,
+                              is_early_morning: bool = False) -> Dict:
+    """일봉(df)과 분봉(minute_df, 10개 이상일 때만 MACD에 사용)에서 점수 계산에 쓰는 값만 추출"""
+    features = {column: np.nan for column in FEATURE_COLUMNS}
+    features['rows'] = len(df) if df is not None else 0
+    for column in ('macd_ok', 'ma_ok', 'volume_ok', 'rsi_ok', 'rsi_available', 'rsi_rising'):
+        features[column] = False
+    if df is None or len(df) == 0:
+        return features
+
+    # MACD - 분봉이 있으면 단타용 짧은 주기(4/9/3), 없으면 일봉 주기(장초반 8/17, 그 외 12/26, 시그널 9)
+    try:
+        if minute_df is not None and len(minute_df) >= 10:
+            exp1 = minute_df['close'].ewm(span=4, adjust=False).mean()
+            exp2 = minute_df['close'].ewm(span=9, adjust=False).mean()
+            macd = exp1 - exp2
+            signal = macd.ewm(span=3, adjust=False).mean()
+        else:
+            exp1 = df['close'].ewm(span=8 if is_early_morning else 12, adjust=False).mean()
+            exp2 = df['close'].ewm(span=17 if is_early_morning else 26, adjust=False).mean()
+            macd = exp1 - exp2
+            signal = macd.ewm(span=9, adjust=False).mean()
+
+        macd_current = macd.iloc[-1] if not pd.isna(macd.iloc[-1]) else 0
+        macd_prev = macd.iloc[-2] if len(macd) > 1 and not pd.isna(macd.iloc[-2]) else 0
+        signal_current = signal.iloc[-1] if not pd.isna(signal.iloc[-1]) else 0
+        features.update(macd_ok=True, macd_diff=macd_current - signal_current, macd_change=macd_current - macd_prev)
+    except Exception as e:
+        logger.debug(f"MACD 특성 추출 실패: {str(e)}")
+
+    # 이동평균 (min_periods=1, NaN은 현재가로 대체)
+    try:
+        current_price = df['close'].iloc[-1]
+        ma5 = df['close'].rolling(window=5, min_periods=1).mean().iloc[-1]
+        ma20 = df['close'].rolling(window=20, min_periods=1).mean().iloc[-1]
+        features.update(
+            ma_ok=True,
+            close=current_price,
+            ma5=ma5 if not pd.isna(ma5) else current_price,
+            ma20=ma20 if not pd.isna(ma20) else current_price,
+            bullish_ratio=len(df[df['close'] > df['open']]) / len(df)
+        )
+    except Exception as e:
+        logger.debug(f"이동평균 특성 추출 실패: {str(e)}")
+
+    # 거래량 (5일 평균 대비, 평균이 0 이하이면 1로 나눔)
+    try:
+        current_volume = df['volume'].iloc[-1] if not pd.isna(df['volume'].iloc[-1]) else 0
+        volume_ma5 = df['volume'].rolling(window=5, min_periods=1).mean().iloc[-1]
+        volume_ma5 = volume_ma5 if not pd.isna(volume_ma5) else 1
+        if volume_ma5 <= 0:
+            volume_ma5 = 1
+        features.update(volume_ok=True, volume_ratio=current_volume / volume_ma5)
+    except Exception as e:
+        logger.debug(f"거래량 특성 추출 실패: {str(e)}")
+
+    # RSI (14, 15개 이상일 때만 점수 반영)
+    try:
+        if len(df) >= 15:
+            delta = df['close'].diff().fillna(0)
+            avg_gain = delta.clip(lower=0).rolling(window=14, min_periods=1).mean()
+            avg_loss = (-delta.clip(upper=0)).rolling(window=14, min_periods=1).mean()
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss.replace(0, 0.00001)))
+
+            current_rsi = rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50
+            rsi_rising = True
+            if len(rsi) >= 2 and not pd.isna(rsi.iloc[-2]):
+                rsi_rising = current_rsi > rsi.iloc[-2]
+            features.update(rsi_available=True, rsi=current_rsi, rsi_rising=bool(rsi_rising))
+        features['rsi_ok'] = True
+    except Exception as e:
+        logger.debug(f"RSI 특성 추출 실패: {str(e)}")
+
+    return features
+
+def _wide(frames: List[pd.DataFrame], column: str) -> pd.DataFrame:
+    # 종목=열 (열마다 원래 dtype 유지 - 종목별 Series 계산과 같은 결과가 나오도록)
+    return pd.DataFrame({position: frame[column].to_numpy() for position, frame in enumerate(frames)})
+
+def _last(frame: pd.DataFrame, offset: int = 1) -> np.ndarray:
+    return frame.iloc[-offset].to_numpy(dtype=float)
+
+def _extract_group(frames: List[pd.DataFrame], minute_frames: Optional[List[pd.DataFrame]],
+                   is_early_morning: bool) -> Dict[str, np.ndarray]:
+    """같은 길이 종목 묶음의 특성 (extract_momentum_features와 같은 계산을 열 단위로)"""
+    rows = len(frames[0])
+    close = _wide(frames, 'close')
+
+    # MACD
+    if minute_frames is not None:
+        macd_close = _wide(minute_frames, 'close')
+        exp1 = macd_close.ewm(span=4, adjust=False).mean()
+        exp2 = macd_close.ewm(span=9, adjust=False).mean()
+        macd = exp1 - exp2
+        signal = macd.ewm(span=3, adjust=False).mean()
+    else:
+        exp1 = close.ewm(span=8 if is_early_morning else 12, adjust=False).mean()
+        exp2 = close.ewm(span=17 if is_early_morning else 26, adjust=False).mean()
+        macd = exp1 - exp2
+        signal = macd.ewm(span=9, adjust=False).mean()
+    macd_current = np.nan_to_num(_last(macd), nan=0.0)
+    macd_prev = np.nan_to_num(_last(macd, 2), nan=0.0) if len(macd) > 1 else np.zeros(len(frames))
+    signal_current = np.nan_to_num(_last(signal), nan=0.0)
+
+    # 이동평균
+    current_price = _last(close)
+    ma5 = _last(close.rolling(window=5, min_periods=1).mean())
+    ma20 = _last(close.rolling(window=20, min_periods=1).mean())
+    bullish_count = (close > _wide(frames, 'open')).sum(axis=0).to_numpy()
+
+    # 거래량
+    volume = _wide(frames, 'volume')
+    current_volume = np.nan_to_num(_last(volume), nan=0.0)
+    volume_ma5 = np.nan_to_num(_last(volume.rolling(window=5, min_periods=1).mean()), nan=1.0)
+    volume_ma5 = np.where(volume_ma5 <= 0, 1, volume_ma5)
+
+    group = {
+        'rows': np.full(len(frames), rows),
+        'macd_ok': np.ones(len(frames), dtype=bool),
+        'macd_diff': macd_current - signal_current,
+        'macd_change': macd_current - macd_prev,
+        'ma_ok': np.ones(len(frames), dtype=bool),
+        'close': current_price,
+        'ma5': np.where(np.isnan(ma5), current_price, ma5),
+        'ma20': np.where(np.isnan(ma20), current_price, ma20),
+        'bullish_ratio': bullish_count / rows,
+        'volume_ok': np.ones(len(frames), dtype=bool),
+        'volume_ratio': current_volume / volume_ma5,
+        'rsi_ok': np.ones(len(frames), dtype=bool),
+        'rsi_available': np.full(len(frames), rows >= 15),
+        'rsi': np.full(len(frames), np.nan),
+        'rsi_rising': np.zeros(len(frames), dtype=bool)
+    }
+
+    # RSI
+    if rows >= 15:
+        delta = close.diff().fillna(0)
+        avg_gain = delta.clip(lower=0).rolling(window=14, min_periods=1).mean()
+        avg_loss = (-delta.clip(upper=0)).rolling(window=14, min_periods=1).mean()
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss.replace(0, 0.00001)))
+        current_rsi = np.nan_to_num(_last(rsi), nan=50.0)
+        prev_rsi = _last(rsi, 2)
+        group['rsi'] = current_rsi
+        group['rsi_rising'] = np.where(np.isnan(prev_rsi), True, current_rsi > prev_rsi)
+    return group
+
+def extract_feature_frame(items: Dict[str, Tuple[pd.DataFrame, Optional[pd.DataFrame]]],
+                          is_early_morning: bool = False) -> pd.DataFrame:
+    """{종목코드: (일봉, 분봉 또는 None)} → 특성표 (일봉 길이, MACD에 쓰는 분봉 길이가 같은 종목끼리 묶어 계산)"""
+    rows = {}
+    groups = defaultdict(list)
+    for stock_code, (df, minute_df) in items.items():
+        if df is None or len(df) == 0:
+            rows[stock_code] = extract_momentum_features(df, minute_df, is_early_morning)
+            continue
+        minute_rows = len(minute_df) if minute_df is not None and len(minute_df) >= 10 else 0
+        groups[(len(df), minute_rows)].append(stock_code)
+
+    for (_, minute_rows), codes in groups.items():
+        try:
+            group = _extract_group([items[code][0] for code in codes],
+                                   [items[code][1] for code in codes] if minute_rows else None,
+                                   is_early_morning)
+            for position, stock_code in enumerate(codes):
+                rows[stock_code] = {column: group[column][position] for column in FEATURE_COLUMNS}
+        except Exception as e:
+            logger.debug(f"모멘텀 특성 묶음 계산 실패 ({len(codes)}종목), 종목별 계산으로 대체: {str(e)}")
+            for stock_code in codes:
+                df, minute_df = items[stock_code]
+                rows[stock_code] = extract_momentum_features(df, minute_df, is_early_morning)
+
+    return build_feature_frame({stock_code: rows[stock_code] for stock_code in items})
+
+def build_feature_frame(rows: Dict[str, Dict]) -> pd.DataFrame:
+    """{종목코드: 특성} → 종목코드 인덱스의 특성표"""
+    frame = pd.DataFrame.from_dict(rows, orient='index', columns=FEATURE_COLUMNS)
+    for column in ('macd_ok', 'ma_ok', 'volume_ok', 'rsi_ok', 'rsi_available', 'rsi_rising'):
+        frame[column] = frame[column].fillna(False).astype(bool)
+    frame['rows'] = frame['rows'].fillna(0).astype(int)
+    return frame
+
+################################### 일괄 점수 계산 ##################################
+
+def score_momentum_batch(features: pd.DataFrame, is_early_morning: bool, is_morning_session: bool,
+                         required_score: float, rsi_bounds: Tuple[float, float]) -> pd.DataFrame:
+    """특성표 전체의 구간별 점수, 모멘텀 점수, 통과 기준, 통과 여부 계산
+
+    required_score: 시간대별 기본 기준 점수 (RSI 65 초과 가산은 여기서 반영)
+    rsi_bounds: RSI 적정 구간 (하한, 상한) - 경계값은 제외
+    반환 컬럼: macd_score, ma_score, volume_score, rsi_score, momentum_score, required_score, passed
+    """
+    morning = bool(is_morning_session)
+
+    # MACD (30점)
+    macd_diff = features['macd_diff'].to_numpy(dtype=float)
+    macd_change = features['macd_change'].to_numpy(dtype=float)
+    macd_score = (np.where(macd_diff > 0, 15, np.where(morning & (macd_diff > -0.3), 10, 0))
+                  + np.where(macd_change > 0, 10, 0))
+    macd_score = np.where(features['macd_ok'].to_numpy(), macd_score, 0)
+
+    # 이동평균 (20점)
+    close = features['close'].to_numpy(dtype=float)
+    ma5 = features['ma5'].to_numpy(dtype=float)
+    ma20 = features['ma20'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ma5_ratio = np.where(ma5 > 0, close / ma5, 1)
+        ma20_ratio = np.where(ma20 > 0, close / ma20, 1)
+    above_ma20 = close > ma20
+    ma_score = (np.where(ma5_ratio > 1.001, 10, np.where(morning & (ma5_ratio > 0.995) & (ma5_ratio <= 1.001), 5, 0))
+                + np.where(above_ma20, 10, np.where(morning & (ma20_ratio > 0.99) & (ma20_ratio <= 1), 5, 0))
+                + np.where(above_ma20 & (features['bullish_ratio'].to_numpy(dtype=float) > 0.6), 5, 0))
+    ma_score = np.where(features['ma_ok'].to_numpy(), ma_score, 0)
+
+    # 거래량 (25점) - 기준 배수 이상이면 int(15 * 추세 인자), 상한 25
+    volume_ratio = features['volume_ratio'].to_numpy(dtype=float)
+    volume_threshold = 1.5 if is_early_morning else 1.8
+    with np.errstate(invalid='ignore'):
+        volume_points = np.trunc(15 * (1 + (volume_ratio - 1) * 1.5))
+    volume_score = np.minimum(np.where(volume_ratio >= volume_threshold, volume_points, 0), 25)
+    volume_score = np.where(features['volume_ok'].to_numpy(), volume_score, 0)
+
+    # RSI (15점) - 적정 구간 +10(70 초과 시 -5) +10, 상승 중 +5
+    rsi = features['rsi'].to_numpy(dtype=float)
+    rsi_available = features['rsi_available'].to_numpy() & features['rsi_ok'].to_numpy()
+    rsi_in_range = (rsi > rsi_bounds[0]) & (rsi < rsi_bounds[1])
+    rsi_score = (np.where(rsi_in_range, 20 - np.where(rsi > 70, 5, 0), 0)
+                 + np.where(features['rsi_rising'].to_numpy(), 5, 0))
+    rsi_score = np.where(rsi_available, rsi_score, 0)
+
+    momentum_score = (macd_score + ma_score + volume_score + rsi_score).astype(np.int64)
+
+    # 통과 기준 - 오전장이 아니면 RSI 65 초과 시 +10, 데이터 부족 시 0점 미달, 거래량 점수 부족 시 미달
+    required = np.where(rsi_available & (rsi > 65) & (not morning), required_score + 10, required_score)
+    min_rows = 3 if is_early_morning else 8
+    enough_rows = features['rows'].to_numpy() >= min_rows
+    volume_gate = (volume_score < 10) & (not is_early_morning) & (momentum_score < 60)
+
+    momentum_score = np.where(enough_rows, momentum_score, 0)
+    passed = enough_rows & ~volume_gate & (momentum_score >= required)
+
+    return pd.DataFrame({
+        'macd_score': macd_score.astype(np.int64),
+        'ma_score': ma_score.astype(np.int64),
+        'volume_score': volume_score.astype(np.int64),
+        'rsi_score': rsi_score.astype(np.int64),
+        'momentum_score': momentum_score,
+        'required_score': required,
+        'passed': passed
+    }, index=features.index)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+뉴스 기사 / AI 분석 결과 디스크 저장소 (news_store.py)
+- 기사: 기사 URL(없으면 제목) 해시를 키로 저장, 종목별 마지막 조회 시각과 선택된 기사 목록 기록
+  → 재시작해도 refresh_seconds 안에 조회한 종목은 뉴스 API를 다시 부르지 않음
+- 분석: 종목명 + 기사 내용(제목/요약) 해시를 키로 저장
+  → 기사 구성이 같으면 재시작 후에도 AI 분석을 다시 요청하지 않고, 바뀐 종목만 분석 요청에 포함
+- 파일은 JSON 하나 (임시 파일에 쓴 뒤 os.replace로 교체), 오래된 기사/분석은 저장 시 정리
+
+사용 예:
+    store = news_store.NewsStore("NewsStore_BOT.json")
+    articles = store.fresh_articles(stock_code, refresh_seconds=3600)   # None이면 새로 조회
+    store.record_fetch(stock_code, fetched_articles)
+    digest = news_store.content_hash(stock_name, articles)
+    analysis = store.get_analysis(digest)                              # None이면 분석 요청 대상
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def set_logger(external_logger):
+    """외부 로거를 설정하는 함수"""
+    global logger
+    logger = external_logger
+
+################################### 키 계산 ##################################
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def article_key(article: Dict) -> str:
+    """기사 키 - 원문 URL → 네이버 URL → 제목 순으로 있는 값의 해시"""
+    source = article.get('originallink') or article.get('link') or article.get('title', '')
+    return _digest(str(source))
+
+def content_hash(stock_name: str, articles: List[Dict]) -> str:
+    """종목의 분석 입력(종목명 + 기사 제목/요약) 해시 - 기사 순서와 무관"""
+    items = sorted((article.get('title', ''), article.get('description', '')) for article in articles)
+    return _digest(json.dumps([stock_name, items], ensure_ascii=False))
+
+################################### 저장소 ##################################
+
+class NewsStore:
+    """뉴스 기사 / 분석 결과 JSON 저장소
+
+    Args:
+        path: 저장 파일 경로
+        article_ttl: 기사 보관 시간 (초, 마지막으로 조회된 시각 기준)
+        analysis_ttl: 분석 결과 보관 시간 (초)
+    """
+
+    def __init__(self, path: str, article_ttl: float = 48 * 3600, analysis_ttl: float = 7 * 24 * 3600):
+        self.path = path
+        self.article_ttl = article_ttl
+        self.analysis_ttl = analysis_ttl
+
+        self._data = None
+        self._lock = threading.RLock()
+        self.stats = {'fetch_hits': 0, 'fetches': 0, 'new_articles': 0,
+                      'analysis_hits': 0, 'analysis_misses': 0, 'saves': 0}
+
+    ################ 기사 ################
+
+    def fresh_articles(self, stock_code: str, refresh_seconds: float) -> Optional[List[Dict]]:
+        """refresh_seconds 안에 조회한 종목이면 그때 선택된 기사 목록, 아니면 None"""
+        with self._lock:
+            data = self._load()
+            fetch = data['fetches'].get(stock_code)
+            if not fetch or time.time() - fetch['fetched_at'] >= refresh_seconds:
+                return None
+
+            articles = []
+            for key in fetch['articles']:
+                article = data['articles'].get(key)
+                if article is None:
+                    # 기사가 정리되어 없으면 새로 조회
+                    return None
+                articles.append({'title': article['title'], 'description': article['description']})
+            self.stats['fetch_hits'] += 1
+            return articles
+
+    def record_fetch(self, stock_code: str, articles: List[Dict]) -> int:
+        """조회 결과 기록 (articles: 'title', 'description', 'link'/'originallink' 포함), 처음 본 기사 수 반환"""
+        now = time.time()
+        with self._lock:
+            data = self._load()
+            keys = []
+            new_count = 0
+            for article in articles:
+                key = article_key(article)
+                stored = data['articles'].get(key)
+                if stored is None:
+                    new_count += 1
+                    stored = data['articles'][key] = {
+                        'stock_code': stock_code,
+                        'title': article.get('title', ''),
+                        'description': article.get('description', ''),
+                        'link': article.get('originallink') or article.get('link', ''),
+                        'first_seen': now
+                    }
+                stored['last_seen'] = now
+                keys.append(key)
+
+            data['fetches'][stock_code] = {'fetched_at': now, 'articles': keys}
+            self.stats['fetches'] += 1
+            self.stats['new_articles'] += new_count
+            self._save()
+            return new_count
+
+    ################ 분석 ################
+
+    def get_analysis(self, digest: str) -> Optional[Dict]:
+        """내용 해시에 해당하는 분석 결과 ('decision', 'percentage', 'reason'), 없으면 None"""
+        with self._lock:
+            entry = self._load()['analyses'].get(digest)
+            if entry is None or time.time() - entry['analyzed_at'] >= self.analysis_ttl:
+                self.stats['analysis_misses'] += 1
+                return None
+            self.stats['analysis_hits'] += 1
+            return {'decision': entry['decision'], 'percentage': entry['percentage'], 'reason': entry['reason']}
+
+    def put_analyses(self, analyses: Dict[str, Dict]):
+        """{내용 해시: 분석 결과} 저장"""
+        if not analyses:
+            return
+        now = time.time()
+        with self._lock:
+            data = self._load()
+            for digest, analysis in analyses.items():
+                data['analyses'][digest] = {
+                    'decision': analysis['decision'],
+                    'percentage': analysis['percentage'],
+                    'reason': analysis['reason'],
+                    'analyzed_at': now
+                }
+            self._save()
+
+    ################ 내부 처리 ################
+
+    def _load(self) -> Dict:
+        if self._data is not None:
+            return self._data
+
+        data = None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"뉴스 저장소 읽기 실패 ({self.path}): {str(e)} - 새로 시작")
+
+        if not isinstance(data, dict):
+            data = {}
+        for section in ('articles', 'fetches', 'analyses'):
+            if not isinstance(data.get(section), dict):
+                data[section] = {}
+        self._data = data
+        return data
+
+    def _prune(self, now: float):
+        data = self._data
+        data['articles'] = {key: article for key, article in data['articles'].items()
+                            if now - article.get('last_seen', 0) < self.article_ttl}
+        data['fetches'] = {code: fetch for code, fetch in data['fetches'].items()
+                           if now - fetch.get('fetched_at', 0) < self.article_ttl}
+        data['analyses'] = {digest: entry for digest, entry in data['analyses'].items()
+                            if now - entry.get('analyzed_at', 0) < self.analysis_ttl}
+
+    def _save(self):
+        self._prune(time.time())
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+            self.stats['saves'] += 1
+        except Exception as e:
+            logger.error(f"뉴스 저장소 저장 실패 ({self.path}): {str(e)}")
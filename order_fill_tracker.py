@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+주문 체결 추적 (order_fill_tracker.py)
+- 주문마다 잔고/주문내역을 따로 반복 조회하던 방식 대신, 추적 중인 모든 주문을 주기마다
+  주문내역 1회 + 잔고 1회 조회로 함께 확인하고 주문별 Future를 완료 처리
+- 실시간 체결통보(H0STCNI0 등)를 받는 쪽에서 on_execution_notice()로 넘기면 조회 없이 바로 완료
+- 호출자는 wait()로 기다리거나(대기 중 on_idle 콜백 실행), Future.done()/poll()로 막힘 없이 확인
+
+체결 판단 순서
+1. 주문내역: 주문번호(OrderNum2)가 같은 주문, 없으면 추적 시작 이후 같은 종목/방향 주문이 완료(Close, 취소 아님)
+   수량은 실제 체결 수량(OrderExecAmt), 없으면 OrderResultAmt(KIS는 체결 + 취소 확인 수량)를 잔고 변동 수량으로 상한
+2. 잔고: 추적 시작 시 보유 수량 대비 매수는 증가, 매도는 감소한 수량 (같은 종목/방향 주문은 한 번에 하나만 추적한다고 가정)
+3. 대기 시간 초과: 잔고 변화가 있으면 그 수량으로(부분 체결), 없으면 미체결(가격 0, 수량 0)로 완료
+"""
+
+import logging
+import datetime
+import threading
+import time as _time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def set_logger(external_logger):
+    """외부 로거를 설정하는 함수"""
+    global logger
+    logger = external_logger
+
+################################### 주문내역 해석 ##################################
+
+def _order_status(order: Dict) -> str:
+    # KIS_API_Helper_KR.GetOrderList는 'OrderSatus' 키로 반환
+    return str(order.get('OrderStatus', order.get('OrderSatus', ''))).upper()
+
+def _order_side(order: Dict) -> str:
+    return str(order.get('OrderSide', '')).upper()
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+################################### 체결 추적 ##################################
+
+class OrderFillTracker:
+    """미체결 주문 체결 추적
+
+    Args:
+        order_list_fetcher: () -> 당일 전체 주문내역 리스트 (KisKR.GetOrderList 형식)
+        balance_fetcher: () -> 보유 종목 리스트 (KisKR.GetMyStockList 형식)
+        poll_interval: 주문내역/잔고 조회 최소 간격 (초)
+        clock: 현재 시각 함수 (datetime 반환)
+        sleeper: 대기 함수 (초)
+    """
+
+    def __init__(self, order_list_fetcher: Callable, balance_fetcher: Callable, poll_interval: float = 2.0,
+                 clock: Optional[Callable] = None, sleeper: Optional[Callable] = None):
+        self.order_list_fetcher = order_list_fetcher
+        self.balance_fetcher = balance_fetcher
+        self.poll_interval = poll_interval
+        self.clock = clock or datetime.datetime.now
+        self.sleeper = sleeper or _time.sleep
+
+        self._orders = {}
+        self._next_id = 0
+        self._lock = threading.RLock()
+        self._poll_lock = threading.Lock()
+        self._last_poll = None
+        self._balance = {}
+        self._balance_time = None
+
+        self.stats = {'tracked': 0, 'filled': 0, 'partial': 0, 'unfilled': 0, 'notices': 0,
+                      'polls': 0, 'order_list_calls': 0, 'balance_calls': 0}
+
+    ################ 주문 등록 / 조회 ################
+
+    def track(self, stock_code: str, side: str, order_amount: int, initial_amount: Optional[int] = None,
+              order_price: Optional[float] = None, order_no: Optional[str] = None, timeout: float = 45,
+              price_resolver: Optional[Callable] = None) -> Future:
+        """주문 추적 시작, 결과 Future 반환
+
+        Future 결과: {'price', 'amount', 'source'} (source: notice / order_list / balance / timeout)
+        initial_amount가 없으면 지금 잔고를 조회해 기준 수량으로 사용
+        price_resolver(order, holding): 잔고 변화로 체결을 판단했을 때의 체결가 결정 함수
+        """
+        side = side.upper()
+        if initial_amount is None:
+            holding = self.holding(stock_code, refresh=True)
+            initial_amount = int(_to_float(holding.get('StockAmt', 0))) if holding else 0
+
+        now = self.clock()
+        future = Future()
+        with self._lock:
+            self._next_id += 1
+            self._orders[self._next_id] = {
+                'id': self._next_id,
+                'stock_code': stock_code,
+                'side': side,
+                'order_amount': int(order_amount),
+                'initial_amount': int(initial_amount),
+                'order_price': order_price,
+                'order_no': str(order_no) if order_no else None,
+                'started': now,
+                'started_hms': now.strftime('%H%M%S'),
+                'deadline': now + datetime.timedelta(seconds=timeout),
+                'price_resolver': price_resolver,
+                'notice_amount': 0,
+                'notice_value': 0.0,
+                'future': future
+            }
+            self.stats['tracked'] += 1
+        return future
+
+    def is_tracking(self, stock_code: str) -> bool:
+        """해당 종목에 체결 대기 중인 주문이 있는지"""
+        with self._lock:
+            return any(order['stock_code'] == stock_code for order in self._orders.values())
+
+    def outstanding(self) -> int:
+        with self._lock:
+            return len(self._orders)
+
+    def holding(self, stock_code: str, refresh: bool = False) -> Optional[Dict]:
+        """마지막 잔고 조회 결과에서 종목 보유 정보 (refresh=True면 지금 다시 조회)"""
+        if refresh or self._balance_time is None:
+            self._refresh_balance()
+        return self._balance.get(stock_code)
+
+    def latest_balance(self) -> Dict[str, Dict]:
+        """마지막 잔고 조회 결과 {종목코드: 보유 정보} (체결 대기 중 다른 종목 점검용)"""
+        if self._balance_time is None:
+            self._refresh_balance()
+        return dict(self._balance)
+
+    ################ 대기 / 확인 ################
+
+    def poll(self, force: bool = False) -> int:
+        """추적 중인 주문 전체를 한 번에 확인 (poll_interval 이내 재호출은 건너뜀), 완료한 주문 수 반환"""
+        if not self.outstanding():
+            return 0
+        if not self._poll_lock.acquire(blocking=False):
+            # 다른 스레드가 조회 중 - 그 결과를 그대로 사용
+            return 0
+        try:
+            now = self.clock()
+            if not force and self._last_poll is not None and (now - self._last_poll).total_seconds() < self.poll_interval:
+                return 0
+            self._last_poll = now
+            self.stats['polls'] += 1
+
+            orders = []
+            try:
+                self.stats['order_list_calls'] += 1
+                orders = self.order_list_fetcher() or []
+                if not isinstance(orders, list):
+                    orders = []
+            except Exception as e:
+                logger.error(f"체결 추적 주문내역 조회 실패: {str(e)}")
+            self._refresh_balance()
+
+            resolved = 0
+            now = self.clock()
+            with self._lock:
+                pending = list(self._orders.values())
+            for order in pending:
+                result = self._match_order_list(order, orders) or self._match_balance(order)
+                if result is None and now >= order['deadline']:
+                    result = {'price': 0, 'amount': 0, 'source': 'timeout'}
+                if result is not None and self._resolve(order, result):
+                    resolved += 1
+            return resolved
+        finally:
+            self._poll_lock.release()
+
+    def wait(self, future: Future, on_idle: Optional[Callable] = None) -> Dict:
+        """Future가 완료될 때까지 조회하며 대기, 각 대기 사이에 on_idle() 실행 (다른 포지션 점검 등)"""
+        while not future.done():
+            self.poll()
+            if future.done():
+                break
+            if on_idle is not None:
+                try:
+                    on_idle()
+                except Exception as e:
+                    logger.error(f"체결 대기 중 점검 작업 오류: {str(e)}")
+            if not future.done():
+                self.sleeper(self.poll_interval)
+        return future.result()
+
+    def on_execution_notice(self, stock_code: str, side: str, amount: int, price: float,
+                            order_no: Optional[str] = None) -> bool:
+        """실시간 체결통보 반영 - 누적 체결 수량이 주문량에 도달하면 완료, 완료 여부 반환"""
+        side = side.upper()
+        with self._lock:
+            self.stats['notices'] += 1
+            candidates = [order for order in self._orders.values()
+                          if order['stock_code'] == stock_code and order['side'] == side
+                          and (order_no is None or order['order_no'] in (None, str(order_no)))]
+            if not candidates:
+                return False
+            order = candidates[0]
+            order['notice_amount'] += int(amount)
+            order['notice_value'] += float(price) * int(amount)
+            if order['notice_amount'] < order['order_amount']:
+                return False
+            result = {'price': order['notice_value'] / order['notice_amount'],
+                      'amount': order['notice_amount'], 'source': 'notice'}
+        return self._resolve(order, result)
+
+    def cancel_all(self):
+        """추적 중인 주문 전부 미체결로 완료 (종료 시)"""
+        with self._lock:
+            pending = list(self._orders.values())
+        for order in pending:
+            self._resolve(order, {'price': 0, 'amount': 0, 'source': 'cancelled'})
+
+    ################ 내부 처리 ################
+
+    def _refresh_balance(self):
+        try:
+            self.stats['balance_calls'] += 1
+            stocks = self.balance_fetcher() or []
+            if isinstance(stocks, list):
+                self._balance = {stock['StockCode']: stock for stock in stocks if 'StockCode' in stock}
+                self._balance_time = self.clock()
+        except Exception as e:
+            logger.error(f"체결 추적 잔고 조회 실패: {str(e)}")
+
+    def _match_order_list(self, order: Dict, orders: List[Dict]) -> Optional[Dict]:
+        for item in orders:
+            if order['order_no']:
+                if str(item.get('OrderNum2', '')) != order['order_no']:
+                    continue
+            elif (item.get('OrderStock') != order['stock_code'] or _order_side(item) != order['side']
+                  or str(item.get('OrderTime', '')) < order['started_hms']):
+                continue
+
+            if _order_status(item) != 'CLOSE' or str(item.get('OrderIsCancel', 'N')).upper() == 'Y':
+                continue
+            if item.get('OrderExecAmt') is not None:
+                amount = int(_to_float(item['OrderExecAmt']))
+            else:
+                # 체결 + 취소 합산 수량일 수 있으므로 (일부 체결 후 잔량 취소) 잔고 변동 수량을 넘지 않게
+                amount = min(int(_to_float(item.get('OrderResultAmt', item.get('OrderAmt', 0)))),
+                             self._balance_change(order))
+            price = _to_float(item.get('OrderAvgPrice', 0))
+            if amount > 0 and price > 0:
+                return {'price': price, 'amount': amount, 'source': 'order_list'}
+        return None
+
+    def _balance_change(self, order: Dict) -> int:
+        """추적 시작 이후 주문 방향으로 바뀐 보유 수량 (매수는 증가, 매도는 감소분)"""
+        holding = self._balance.get(order['stock_code'])
+        current_amount = int(_to_float(holding.get('StockAmt', 0))) if holding else 0
+        if order['side'] == 'BUY':
+            return current_amount - order['initial_amount']
+        return order['initial_amount'] - current_amount
+
+    def _match_balance(self, order: Dict) -> Optional[Dict]:
+        changed_amount = self._balance_change(order)
+        if changed_amount <= 0:
+            return None
+        holding = self._balance.get(order['stock_code'])
+
+        price = 0.0
+        if order['price_resolver'] is not None:
+            try:
+                price = _to_float(order['price_resolver'](order, holding))
+            except Exception as e:
+                logger.error(f"{order['stock_code']} 체결가 결정 실패: {str(e)}")
+        if price <= 0 and holding and order['side'] == 'BUY':
+            price = _to_float(holding.get('AvrPrice', 0))
+        if price <= 0:
+            price = _to_float(order['order_price'])
+        return {'price': price, 'amount': changed_amount, 'source': 'balance'}
+
+    def _resolve(self, order: Dict, result: Dict) -> bool:
+        with self._lock:
+            if self._orders.pop(order['id'], None) is None:
+                return False
+            if result['amount'] <= 0:
+                self.stats['unfilled'] += 1
+            elif result['amount'] < order['order_amount']:
+                self.stats['partial'] += 1
+            else:
+                self.stats['filled'] += 1
+        elapsed = (self.clock() - order['started']).total_seconds()
+        result = dict(result, elapsed=elapsed)
+        order['future'].set_result(result)
+        return True
@@ -0,0 +1,618 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+멀티 봇 포트폴리오 백테스트 (portfolio_backtest.py)
+- 실전처럼 bb_trading / SmartMagicSplit / VolumeBased 봇이 하나의 KIS 계좌(현금)를 나눠 쓰는 상황을 재현
+- 전 전략 종목(+봇이 조회하는 벤치마크)의 일봉을 BacktestDataStore에서 한 번만 읽어 SharedPricePanel로 공유
+  · 각 전략 엔진은 패널의 DataFrame을 그대로 받아 자체 지표/신호만 계산 (엔진별 데이터 재조회 없음)
+- 거래일마다 전략 슬리브를 목록 순서대로 하루씩 진행 (lockstep), 현금은 CashLedger 하나로 관리
+  · 슬리브는 진행 전 공유 현금과 다른 슬리브 평가금액(계좌 전체 잔고)을 받고, 진행 후 현금 증감만 원장에 반영
+- 예산 규칙은 실전 봇과 동일
+  · bb: bb_trading.get_available_budget (absolute_budget 전략, 이미 투자된 금액 차감, RemainMoney 한도)
+  · SmartMagicSplit: 봇의 calculate_dynamic_budget이 재생 계좌 GetBalance(계좌 전체 기준)를 그대로 사용
+  · VolumeBased: trading_budget / max_positions 포지션 크기, RemainMoney가 부족하면 매수 안 함
+
+단순화:
+- 같은 날 슬리브 간 순서는 sleeves 목록 순서 (앞 슬리브의 체결이 뒤 슬리브의 잔고에 먼저 반영)
+- 같은 종목을 여러 슬리브가 보유해도 수량은 슬리브별로 관리 (실전 계좌 잔고는 합산)
+- VolumeBased의 시장 상황별 포지션 배율(get_market_condition_multiplier)은 적용하지 않음 (엔진과 동일)
+- 종료일 정산: bb / VolumeBased 엔진은 단독 실행과 같이 보유 종목을 강제 매도, SmartMagicSplit은 평가금액으로 계산
+
+사용 예:
+    python portfolio_backtest.py 2024-01-01 2024-12-31 --cash 30000000 --volume-stocks 005930,000660
+    python portfolio_backtest.py 2024-01-01 2024-12-31 --sleeves bb,smart
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import datetime
+from contextlib import ExitStack, contextmanager
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from backtest_data_store import BacktestDataStore, get_default_store
+from backtest_replay import replaced_attributes, replaced_items
+from backtest_result_store import ColumnarBuffer, write_results
+
+logger = logging.getLogger('PortfolioBacktest')
+
+# 시작일 이전에 로드할 일봉 기간 (달력일, 전 엔진 지표 계산용 이력 중 가장 긴 것 기준)
+PANEL_HISTORY_DAYS = 400
+
+# bb_backtest.get_kis_api_data와 같은 지표 계산용 이력 (시작일 90일 전부터, 60봉 초과 종목만)
+BB_HISTORY_DAYS = 90
+BB_MIN_BARS = 60
+
+# VolumeBacktestingEngine.get_historical_data와 같은 최소 봉 수
+VOLUME_MIN_BARS = 50
+
+DEFAULT_SLEEVES = ['bb', 'smart', 'volume']
+
+################################### 공유 가격 패널 ##################################
+
+class SharedPricePanel:
+    """전 전략 종목 일봉 공유 패널
+
+    - frames: {종목코드: 저장소 일봉 DataFrame (DatetimeIndex, open/high/low/close/volume)}
+    - dates: 전 종목 거래일 합집합 (DatetimeIndex)
+    - last_close[t, j]: t일 j종목 종가 (데이터 없는 날은 직전 종가) - 슬리브 평가금액 계산용
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        self.frames = {code: df for code, df in frames.items() if df is not None and not df.empty}
+        self.stock_codes = list(self.frames)
+        self.col = {code: j for j, code in enumerate(self.stock_codes)}
+
+        dates = pd.DatetimeIndex([])
+        for df in self.frames.values():
+            dates = dates.union(df.index)
+        self.dates = dates
+
+        close = np.full((len(dates), len(self.stock_codes)), np.nan)
+        for j, code in enumerate(self.stock_codes):
+            df = self.frames[code]
+            close[dates.get_indexer(df.index), j] = df['close'].to_numpy(dtype=float)
+        self.last_close = pd.DataFrame(close).ffill().to_numpy()
+
+    @classmethod
+    def load(cls, store: BacktestDataStore, stock_codes: List[str], start_date, end_date,
+             history_days: int = PANEL_HISTORY_DAYS) -> 'SharedPricePanel':
+        """저장소에서 전 종목 일봉을 한 번에 로드 (시작일 history_days일 전부터)"""
+        history_start = pd.Timestamp(start_date) - pd.Timedelta(days=history_days)
+        frames = store.load_universe(stock_codes, start_date=history_start, end_date=end_date)
+        return cls(frames)
+
+    def __contains__(self, stock_code: str) -> bool:
+        return stock_code in self.frames
+
+    def frame(self, stock_code: str, start_date=None, end_date=None) -> Optional[pd.DataFrame]:
+        """종목 일봉 구간 (없으면 None)"""
+        df = self.frames.get(stock_code)
+        if df is None:
+            return None
+        if start_date is not None:
+            df = df[df.index >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            df = df[df.index <= pd.Timestamp(end_date)]
+        return df
+
+    def date_range(self, start_date, end_date):
+        """[start_date, end_date] 구간의 패널 오프셋 범위"""
+        start = int(self.dates.searchsorted(pd.Timestamp(start_date), side='left'))
+        end = int(self.dates.searchsorted(pd.Timestamp(end_date), side='right'))
+        return start, end
+
+    def value(self, holdings: Dict[str, int], t: int) -> float:
+        """보유 수량 {종목코드: 수량}의 t일 평가금액"""
+        total = 0.0
+        for code, amount in holdings.items():
+            j = self.col.get(code)
+            if j is not None and amount:
+                price = self.last_close[t, j]
+                if not np.isnan(price):
+                    total += amount * price
+        return total
+
+################################### 공유 현금 원장 ##################################
+
+class CashLedger:
+    """하나의 계좌 현금을 여러 슬리브가 나눠 쓰는 원장
+
+    - flows[슬리브]: 누적 현금 증감 (매수 지출 -, 매도 회수 +, 수수료/세금 포함)
+    - 슬리브 손익 = 누적 현금 증감 + 현재 보유 평가금액
+    """
+
+    def __init__(self, initial_cash: float, sleeve_names: List[str]):
+        self.initial_cash = float(initial_cash)
+        self.cash = float(initial_cash)
+        self.flows = {name: 0.0 for name in sleeve_names}
+
+        schema = {'date': 'str', 'cash': 'float', 'stock_value': 'float', 'total_value': 'float'}
+        for name in sleeve_names:
+            schema[f'{name}_value'] = 'float'
+            schema[f'{name}_pnl'] = 'float'
+        self.history = ColumnarBuffer(schema)
+
+    def balance(self, stock_money: float) -> Dict:
+        """GetBalance 형식 계좌 잔고"""
+        return {
+            'TotalMoney': self.cash + stock_money,
+            'StockMoney': stock_money,
+            'RemainMoney': self.cash
+        }
+
+    def settle(self, name: str, cash_after: float):
+        """슬리브 진행 후 현금을 원장에 반영"""
+        self.flows[name] += cash_after - self.cash
+        self.cash = float(cash_after)
+        if self.cash < -1:
+            logger.warning(f"⚠️ {name} 진행 후 공유 현금 음수: {self.cash:,.0f}원")
+
+    def record(self, day: pd.Timestamp, values: Dict[str, float]):
+        stock_value = sum(values.values())
+        row = {
+            'date': day.strftime('%Y-%m-%d'),
+            'cash': self.cash,
+            'stock_value': stock_value,
+            'total_value': self.cash + stock_value
+        }
+        for name, value in values.items():
+            row[f'{name}_value'] = value
+            row[f'{name}_pnl'] = self.flows[name] + value
+        self.history.append(row)
+
+class AccountBalanceView:
+    """KisKR 대체 - 포트폴리오 계좌 잔고만 응답 (bb_trading.get_available_budget 호출용)"""
+
+    def __init__(self, balance: Dict):
+        self._balance = balance
+
+    def GetBalance(self, *args, **kwargs):
+        return dict(self._balance)
+
+    def __getattr__(self, name):
+        raise RuntimeError(f"포트폴리오 백테스트에서 지원하지 않는 KIS API: KisKR.{name}")
+
+################################### 전략 슬리브 ##################################
+
+class PortfolioSleeve:
+    """전략 엔진 하나를 공유 현금으로 하루씩 진행시키는 슬리브 기본 클래스"""
+
+    name = 'sleeve'
+
+    def stock_codes(self) -> List[str]:
+        """공유 패널에 필요한 종목 (벤치마크 포함)"""
+        raise NotImplementedError
+
+    def prepare(self, panel: SharedPricePanel, start_date, end_date, initial_cash: float):
+        """공유 패널로 엔진 데이터/상태 준비 (initial_cash: 계좌 초기 자산, 성과 기반 예산의 기준)"""
+        raise NotImplementedError
+
+    @contextmanager
+    def session(self, first_day: pd.Timestamp):
+        """재생 기간 전체에 걸친 준비/원복 (봇 모듈 교체 등)"""
+        yield
+
+    def step(self, day: pd.Timestamp, t: int, cash: float, other_stock_money: float) -> float:
+        """하루 진행 → 진행 후 공유 현금
+
+        Args:
+            cash: 현재 공유 현금 (RemainMoney)
+            other_stock_money: 다른 슬리브 보유 평가금액 (계좌 TotalMoney 계산용)
+        """
+        raise NotImplementedError
+
+    def finish(self, day: pd.Timestamp, t: int, cash: float) -> float:
+        """종료일 정산 → 정산 후 공유 현금"""
+        return cash
+
+    def holdings(self) -> Dict[str, int]:
+        """현재 보유 수량 {종목코드: 수량}"""
+        raise NotImplementedError
+
+    def summary(self) -> Dict:
+        return {}
+
+class BBSleeve(PortfolioSleeve):
+    """bb_trading 전략 (bb_backtest.AccurateBacktest.simulate_day)"""
+
+    name = 'bb'
+
+    def __init__(self, config_path: str = "target_stock_config.json"):
+        import bb_backtest
+        self.engine = bb_backtest.AccurateBacktest(config_path)
+        # bb_trading 함수를 쓸 수 있으면 실전 get_available_budget으로 예산 계산
+        self.bb_trading = None
+        if bb_backtest.BB_FUNCTIONS_AVAILABLE:
+            import bb_trading
+            self.bb_trading = bb_trading
+        self.panel = None
+        self.timelines = {}
+        self.initial_cash = 0.0
+
+    def stock_codes(self) -> List[str]:
+        return [code for code, target_config in self.engine.trading_config.target_stocks.items()
+                if target_config.get('enabled', True)]
+
+    def prepare(self, panel, start_date, end_date, initial_cash):
+        self.panel = panel
+        self.initial_cash = initial_cash
+        history_start = pd.Timestamp(start_date) - pd.Timedelta(days=BB_HISTORY_DAYS)
+
+        stock_data_dict = {}
+        for stock_code in self.stock_codes():
+            df = panel.frame(stock_code, history_start, end_date)
+            if df is not None and len(df) > BB_MIN_BARS:
+                stock_data_dict[stock_code] = df
+
+        _, self.timelines = self.engine.prepare_timelines(stock_data_dict, start_date, end_date)
+        self.engine.reset_state(initial_cash)
+
+    @contextmanager
+    def session(self, first_day):
+        # 성과 기반(proportional) 예산은 계좌 초기 자산 기준, bb_trading 로그는 경고 이상만
+        config = self.engine.trading_config.config
+        bb_logger = self.bb_trading.logger if self.bb_trading is not None else None
+        original_level = bb_logger.level if bb_logger is not None else None
+
+        with replaced_items(config, {'initial_total_asset': self.initial_cash}):
+            if bb_logger is not None:
+                bb_logger.setLevel(logging.WARNING)
+            try:
+                yield
+            finally:
+                if bb_logger is not None:
+                    bb_logger.setLevel(original_level)
+
+    def available_budget(self, cash: float, stock_money: float) -> float:
+        """계좌 전체 잔고 기준 bb_trading 예산"""
+        balance = {'TotalMoney': cash + stock_money, 'StockMoney': stock_money, 'RemainMoney': cash}
+        if self.bb_trading is not None:
+            with replaced_attributes(self.bb_trading, {'KisKR': AccountBalanceView(balance)}):
+                return self.bb_trading.get_available_budget({'positions': self.engine.positions})
+
+        invested = sum(pos['entry_price'] * pos['amount'] for pos in self.engine.positions.values())
+        budget = self.engine.simulate_available_budget_accurate(balance['TotalMoney'], self.initial_cash, cash)
+        return max(0, min(budget - invested, cash))
+
+    def step(self, day, t, cash, other_stock_money):
+        own_value = self.panel.value(self.holdings(), t)
+        self.engine.cash = cash
+        budget = self.available_budget(cash, own_value + other_stock_money)
+        self.engine.simulate_day(day.date(), self.timelines, available_budget=budget)
+        return self.engine.cash
+
+    def finish(self, day, t, cash):
+        self.engine.cash = cash
+        self.engine.settle_positions(day.date())
+        return self.engine.cash
+
+    def holdings(self):
+        return {code: position['amount'] for code, position in self.engine.positions.items()}
+
+    def summary(self):
+        engine = self.engine
+        return {
+            'trades': engine.total_trades,
+            'winning_trades': engine.winning_trades,
+            'win_rate': engine.winning_trades / max(engine.total_trades, 1) * 100,
+            'realized_profit': float(engine.total_profit)
+        }
+
+class VolumeSleeve(PortfolioSleeve):
+    """VolumeBased 전략 (VolumeBacktestingEngine.run_day)"""
+
+    name = 'volume'
+
+    def __init__(self, stock_list: List[str], trading_budget: float = 5000000, max_positions: int = 5,
+                 commission_rate: float = 0.00015, config_overrides: Optional[Dict] = None):
+        """
+        Args:
+            stock_list: 대상 종목
+            trading_budget / max_positions: VolumeBasedTradingBot 설정과 같은 의미 (포지션 크기 = 예산 / 최대 보유 수)
+            config_overrides: VolumeBacktestingEngine.apply_config_overrides 인자
+        """
+        from VolumeBacktestingEngine import VolumeBacktestingEngine
+        self.stock_list = list(stock_list)
+        self.engine = VolumeBacktestingEngine(initial_capital=trading_budget, max_positions=max_positions,
+                                              commission_rate=commission_rate)
+        if config_overrides:
+            self.engine.apply_config_overrides(config_overrides)
+        self.frames = {}
+        self.volume_panel = None
+        self.offsets = {}
+        self.last_t = None
+
+    def stock_codes(self):
+        return list(self.stock_list)
+
+    def prepare(self, panel, start_date, end_date, initial_cash):
+        for stock_code in self.stock_list:
+            df = panel.frame(stock_code, end_date=end_date)
+            if df is not None and len(df) >= VOLUME_MIN_BARS:
+                self.frames[stock_code] = self.engine.prepare_frame(df)
+
+        if self.frames:
+            self.volume_panel = self.engine.build_price_panel(self.frames)
+            self.offsets = {date: t for t, date in enumerate(self.volume_panel.dates)}
+
+    def step(self, day, t, cash, other_stock_money):
+        volume_t = self.offsets.get(day.strftime('%Y-%m-%d'))
+        if volume_t is None:
+            return cash
+
+        self.engine.current_cash = cash
+        self.engine.run_day(self.volume_panel, volume_t, self.frames)
+        self.last_t = volume_t
+        return self.engine.current_cash
+
+    def finish(self, day, t, cash):
+        if self.last_t is None:
+            return cash
+        self.engine.current_cash = cash
+        self.engine.close_positions(self.volume_panel, self.last_t, self.frames)
+        return self.engine.current_cash
+
+    def holdings(self):
+        return {code: position['amount'] for code, position in self.engine.positions.items()}
+
+    def summary(self):
+        trades = self.engine.trade_history.to_frame()
+        sells = trades[trades['type'] == 'SELL'] if not trades.empty else trades
+        return {
+            'trades': int(len(sells)),
+            'winning_trades': int((sells['profit'] > 0).sum()) if not sells.empty else 0,
+            'win_rate': float((sells['profit'] > 0).mean() * 100) if not sells.empty else 0.0,
+            'realized_profit': float(sells['profit'].sum()) if not sells.empty else 0.0
+        }
+
+class SmartSplitSleeve(PortfolioSleeve):
+    """SmartMagicSplit 계열 봇 (smart_split_backtest.SmartSplitBacktest.run_day 리플레이)"""
+
+    name = 'smart'
+
+    def __init__(self, bot_module: str = 'SmartMagicSplitBotNew_KR', checks_per_day: int = 4,
+                 history_days: int = 120, bot_log_level: int = logging.WARNING):
+        from smart_split_backtest import SmartSplitBacktest
+        self.backtest = SmartSplitBacktest(bot_module, checks_per_day=checks_per_day,
+                                           history_days=history_days, bot_log_level=bot_log_level)
+        self.trade_dates = set()
+        self.initial_cash = 0.0
+
+    def stock_codes(self):
+        return list(self.backtest.target_stocks) + self.backtest.profile['benchmarks']
+
+    def prepare(self, panel, start_date, end_date, initial_cash):
+        backtest = self.backtest
+        self.initial_cash = initial_cash
+        backtest.initial_capital = initial_cash
+        history_start = pd.Timestamp(start_date) - pd.Timedelta(days=int(backtest.history_days * 1.6))
+        backtest.market.load({code: panel.frame(code, history_start, end_date)
+                              for code in self.stock_codes() if code in panel})
+        self.trade_dates = set(backtest.market.trade_dates(list(backtest.target_stocks), start_date, end_date))
+
+    @contextmanager
+    def session(self, first_day):
+        # 봇의 calculate_dynamic_budget 성과율은 계좌 초기 자산 기준
+        with self.backtest.bot_replay(), \
+                replaced_items(self.backtest.config.config, {'initial_total_asset': self.initial_cash}):
+            self.backtest.start_bot(first_day)
+            yield
+
+    def step(self, day, t, cash, other_stock_money):
+        if day not in self.trade_dates:
+            return cash
+
+        broker = self.backtest.broker
+        broker.cash = cash
+        broker.external_stock_money = other_stock_money
+        self.backtest.run_day(day)
+        return broker.cash
+
+    def holdings(self):
+        return {code: holding['amount'] for code, holding in self.backtest.broker.holdings.items()}
+
+    def summary(self):
+        fills = pd.DataFrame(self.backtest.broker.fills)
+        sells = fills[fills['side'] == 'SELL'] if not fills.empty else fills
+        return {
+            'trades': int(len(sells)),
+            'buy_fills': int((fills['side'] == 'BUY').sum()) if not fills.empty else 0,
+            'winning_trades': int((sells['realized'] > 0).sum()) if not sells.empty else 0,
+            'win_rate': float((sells['realized'] > 0).mean() * 100) if not sells.empty else 0.0,
+            'realized_profit': float(sells['realized'].sum()) if not sells.empty else 0.0,
+            'errors': len(self.backtest.errors)
+        }
+
+################################### 포트폴리오 실행 ##################################
+
+class PortfolioBacktest:
+    """여러 전략 슬리브를 하나의 계좌 현금으로 동시에 진행하는 포트폴리오 백테스트"""
+
+    def __init__(self, sleeves: List[PortfolioSleeve], initial_cash: float = 30000000,
+                 daily_store: Optional[BacktestDataStore] = None, history_days: int = PANEL_HISTORY_DAYS,
+                 settle_at_end: bool = True):
+        """
+        Args:
+            sleeves: 전략 슬리브 (같은 날 진행 순서 = 목록 순서)
+            initial_cash: 계좌 초기 현금 (전 슬리브 공유)
+            daily_store: 일봉 저장소 (없으면 공용 저장소)
+            history_days: 시작일 이전에 로드할 이력 (달력일)
+            settle_at_end: 종료일에 엔진별 최종 정산(강제 매도) 실행 여부
+        """
+        names = [sleeve.name for sleeve in sleeves]
+        if len(set(names)) != len(names):
+            raise ValueError(f"슬리브 이름 중복: {names}")
+
+        self.sleeves = sleeves
+        self.initial_cash = float(initial_cash)
+        self.daily_store = daily_store or get_default_store()
+        self.history_days = history_days
+        self.settle_at_end = settle_at_end
+        self.ledger = CashLedger(initial_cash, names)
+        self.panel = None
+
+    def sleeve_values(self, t: int) -> Dict[str, float]:
+        return {sleeve.name: self.panel.value(sleeve.holdings(), t) for sleeve in self.sleeves}
+
+    def run(self, start_date, end_date) -> Dict:
+        start_time = time.time()
+        stock_codes = list(dict.fromkeys(code for sleeve in self.sleeves for code in sleeve.stock_codes()))
+        self.panel = SharedPricePanel.load(self.daily_store, stock_codes, start_date, end_date, self.history_days)
+
+        for sleeve in self.sleeves:
+            sleeve.prepare(self.panel, start_date, end_date, self.initial_cash)
+
+        start_t, end_t = self.panel.date_range(start_date, end_date)
+        if start_t >= end_t:
+            logger.warning(f"⚠️ {start_date} ~ {end_date}: 재생할 일봉 없음")
+            return self.summarize(time.time() - start_time)
+
+        dates = self.panel.dates
+        logger.info(f"🚀 포트폴리오 백테스트: {dates[start_t].date()} ~ {dates[end_t - 1].date()} "
+                    f"({end_t - start_t}일, 슬리브 {', '.join(s.name for s in self.sleeves)}, "
+                    f"종목 {len(self.panel.stock_codes)}개)")
+
+        with ExitStack() as stack:
+            for sleeve in self.sleeves:
+                stack.enter_context(sleeve.session(dates[start_t]))
+
+            for t in range(start_t, end_t):
+                day = dates[t]
+                for sleeve in self.sleeves:
+                    values = self.sleeve_values(t)
+                    other_stock_money = sum(values.values()) - values[sleeve.name]
+                    self.ledger.settle(sleeve.name, sleeve.step(day, t, self.ledger.cash, other_stock_money))
+
+                if self.settle_at_end and t == end_t - 1:
+                    for sleeve in self.sleeves:
+                        self.ledger.settle(sleeve.name, sleeve.finish(day, t, self.ledger.cash))
+
+                self.ledger.record(day, self.sleeve_values(t))
+                day_count = t - start_t + 1
+                if day_count % 20 == 0:
+                    logger.info(f"   📅 {day.date()} 까지 {day_count}/{end_t - start_t}일, "
+                                f"총자산 {self.ledger.history[-1]['total_value']:,.0f}원, "
+                                f"현금 {self.ledger.cash:,.0f}원")
+
+        return self.summarize(time.time() - start_time)
+
+    def summarize(self, elapsed_sec: float = 0.0) -> Dict:
+        """계좌/슬리브별 성과 요약"""
+        history = self.ledger.history
+        if len(history):
+            values = history.column('total_value')
+            cash = history.column('cash')
+            final_value = float(values[-1])
+            max_drawdown = float((values / np.maximum.accumulate(values) - 1).min() * 100)
+            min_cash = float(cash.min())
+        else:
+            final_value, max_drawdown, min_cash = self.initial_cash, 0.0, self.initial_cash
+
+        sleeves = {}
+        for sleeve in self.sleeves:
+            value = float(history.column(f'{sleeve.name}_value')[-1]) if len(history) else 0.0
+            pnl = self.ledger.flows[sleeve.name] + value
+            sleeves[sleeve.name] = {
+                'final_value': value,
+                'pnl': pnl,
+                'contribution': pnl / self.initial_cash * 100,
+                **sleeve.summary()
+            }
+
+        return {
+            'trade_days': len(history),
+            'initial_cash': self.initial_cash,
+            'final_value': final_value,
+            'final_cash': self.ledger.cash,
+            'total_return': (final_value / self.initial_cash - 1) * 100,
+            'max_drawdown': max_drawdown,
+            'min_cash': min_cash,
+            'stock_count': len(self.panel.stock_codes) if self.panel is not None else 0,
+            'sleeves': sleeves,
+            'elapsed_sec': elapsed_sec
+        }
+
+    def print_summary(self, summary: Dict):
+        print("\n" + "=" * 60)
+        print("📊 멀티 봇 포트폴리오 백테스트 결과")
+        print("=" * 60)
+        print(f"거래일: {summary['trade_days']}일, 공유 종목: {summary['stock_count']}개 (소요 {summary['elapsed_sec']:.1f}초)")
+        print(f"초기 자산: {summary['initial_cash']:,.0f}원 → 최종 자산: {summary['final_value']:,.0f}원")
+        print(f"총 수익률: {summary['total_return']:+.2f}%, 최대 낙폭: {summary['max_drawdown']:.2f}%, "
+              f"최저 현금: {summary['min_cash']:,.0f}원")
+        print("-" * 60)
+        for name, result in summary['sleeves'].items():
+            print(f"[{name}] 손익 {result['pnl']:+,.0f}원 (기여 {result['contribution']:+.2f}%p), "
+                  f"평가금액 {result['final_value']:,.0f}원, 매도 {result.get('trades', 0)}건 "
+                  f"승률 {result.get('win_rate', 0):.1f}%")
+        print("=" * 60)
+
+    def save_results(self, summary: Dict) -> Dict[str, str]:
+        """일별 계좌/슬리브 자산 테이블 (Parquet) + 요약 JSON 저장"""
+        os.makedirs('backtest_results', exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+        prefix = f"backtest_results/portfolio_{timestamp}"
+        files = {
+            'equity': write_results(self.ledger.history, f'{prefix}_equity.parquet'),
+            'summary': f'{prefix}_summary.json'
+        }
+        with open(files['summary'], 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'files': files}, f, ensure_ascii=False, indent=2, default=str)
+        print(f"✅ 결과 저장 완료: {files['equity']}, {files['summary']}")
+        return files
+
+################################### CLI ##################################
+
+def build_sleeves(names: List[str], args) -> List[PortfolioSleeve]:
+    sleeves = []
+    for name in names:
+        if name == 'bb':
+            sleeves.append(BBSleeve(args.bb_config))
+        elif name == 'smart':
+            sleeves.append(SmartSplitSleeve(args.smart_bot, checks_per_day=args.checks_per_day))
+        elif name == 'volume':
+            if not args.volume_stocks:
+                raise ValueError("volume 슬리브는 --volume-stocks 종목 목록이 필요합니다")
+            sleeves.append(VolumeSleeve(args.volume_stocks.split(','), trading_budget=args.volume_budget,
+                                        max_positions=args.volume_max_positions))
+        else:
+            raise ValueError(f"지원하지 않는 슬리브: {name} (지원: {', '.join(DEFAULT_SLEEVES)})")
+    return sleeves
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="멀티 봇 포트폴리오 백테스트 (공유 계좌 현금)")
+    parser.add_argument('start_date')
+    parser.add_argument('end_date')
+    parser.add_argument('--cash', type=float, default=30000000, help="계좌 초기 현금")
+    parser.add_argument('--sleeves', default=','.join(DEFAULT_SLEEVES), help="진행 순서대로 쉼표 구분")
+    parser.add_argument('--bb-config', default="target_stock_config.json")
+    parser.add_argument('--smart-bot', default='SmartMagicSplitBotNew_KR')
+    parser.add_argument('--checks-per-day', type=int, default=4)
+    parser.add_argument('--volume-stocks', default="")
+    parser.add_argument('--volume-budget', type=float, default=5000000)
+    parser.add_argument('--volume-max-positions', type=int, default=5)
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.sleeves.split(',') if name.strip()]
+    if not args.volume_stocks and 'volume' in names:
+        names.remove('volume')
+        print("⚠️ --volume-stocks 미지정: volume 슬리브 제외")
+
+    backtest = PortfolioBacktest(build_sleeves(names, args), initial_cash=args.cash)
+    summary = backtest.run(args.start_date, args.end_date)
+    backtest.print_summary(summary)
+    if not args.no_save:
+        backtest.save_results(summary)
+    return summary
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main(sys.argv[1:])
@@ -0,0 +1,419 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SignalMonitor 신호 리플레이 성과 분석 (signal_replay_backtest.py)
+- SignalMonitor_KR의 signal_history.json (최근 history_max_days일)과 signal_archive.jsonl (정리 시 옮겨 둔 누적 보관본)을
+  저장 일봉/분봉으로 재평가
+  · track_signal_performance는 실시간 현재가로 1/3/5일 후 수익률을 채우므로 과거 신호를 다시 평가할 수 없음
+- 일봉 수익률: 신호 발생 거래일 기준 h거래일 후 종가 / 진입가 (진입가 = 신호 시점 현재가, 없으면 당일 종가)
+  · 전 종목 일봉을 하나의 배열로 이어 붙이고(종목 사이 NaN 패딩) 신호별 인덱스 연산으로 한 번에 계산
+  · 최대 상승(MFE) / 최대 하락(MAE): 이후 max(horizons)거래일 고가/저가 기준
+- 분봉 수익률: MinuteBarStore에 신호 당일 분봉이 있으면 m분 후 종가 기준 (없으면 NaN)
+- 방향 보정 수익률(edge): 매도 신호(SELL/STRONG_SELL)는 하락이 적중이므로 부호 반전, 승률은 edge > 0 비율
+- 신호 유형 / 섹터 / 점수 구간별 집계, 점수 임계값별 누적 성과(signal_threshold 튜닝용)
+
+사용 예:
+    python signal_replay_backtest.py signal_history.json signal_archive.jsonl --horizons 1,3,5 --minutes 30,60
+    python signal_replay_backtest.py signal_archive.jsonl --thresholds 60:95:5 --horizon 3
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from backtest_data_store import BacktestDataStore, MinuteBarStore, get_default_store
+from backtest_result_store import write_results
+
+logger = logging.getLogger('SignalReplayBacktest')
+
+DEFAULT_HISTORY_FILE = "signal_history.json"
+DEFAULT_ARCHIVE_FILE = "signal_archive.jsonl"
+
+# track_signal_performance와 같은 1/3/5거래일 후 수익률
+DEFAULT_HORIZONS = [1, 3, 5]
+DEFAULT_MINUTE_HORIZONS = [30, 60]
+
+# analyze_timing 신호 판단 구간 (25/40/60/75) + STRONG_BUY 세부 구간
+SCORE_BINS = [0, 25, 40, 60, 75, 80, 85, 90, 100]
+
+SIGNAL_DIRECTION = {'STRONG_BUY': 1, 'BUY': 1, 'HOLD': 1, 'SELL': -1, 'STRONG_SELL': -1}
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+################################### 신호 로드 ##################################
+
+def read_signal_records(path: str) -> List[Dict]:
+    """신호 파일 읽기 (.json: 리스트, .jsonl: 한 줄에 신호 하나)"""
+    if path.endswith(".jsonl"):
+        records = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+        return records
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else list(data.values())
+
+def signals_to_frame(records: Iterable[Dict]) -> pd.DataFrame:
+    """신호 레코드 → 분석용 DataFrame (종목/시각/신호 기준 중복 제거, 시각순 정렬)"""
+    rows = []
+    for record in records:
+        stock_info = (record.get('details') or {}).get('stock_info') or {}
+        rows.append((
+            record.get('stock_code'),
+            record.get('stock_name', ''),
+            record.get('sector', ''),
+            record.get('signal', ''),
+            record.get('score', np.nan),
+            record.get('confidence', np.nan),
+            record.get('timestamp'),
+            stock_info.get('current_price', 0) or 0
+        ))
+
+    df = pd.DataFrame(rows, columns=['stock_code', 'stock_name', 'sector', 'signal', 'score',
+                                     'confidence', 'timestamp', 'entry_price'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format=TIMESTAMP_FORMAT, errors='coerce')
+    df = df.dropna(subset=['stock_code', 'timestamp'])
+    df['score'] = pd.to_numeric(df['score'], errors='coerce')
+    df['confidence'] = pd.to_numeric(df['confidence'], errors='coerce')
+    df['entry_price'] = pd.to_numeric(df['entry_price'], errors='coerce').fillna(0.0)
+
+    df = df.drop_duplicates(subset=['stock_code', 'timestamp', 'signal'], keep='last')
+    return df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+def load_signals(paths: Sequence[str]) -> pd.DataFrame:
+    """여러 신호 파일(히스토리 + 보관본)을 합쳐 로드"""
+    records = []
+    for path in paths:
+        if not os.path.exists(path):
+            logger.warning(f"⚠️ 신호 파일 없음: {path}")
+            continue
+        file_records = read_signal_records(path)
+        logger.info(f"📂 {path}: {len(file_records)}건")
+        records.extend(file_records)
+    return signals_to_frame(records)
+
+################################### 수익률 계산 ##################################
+
+class DailyBarIndex:
+    """전 종목 일봉을 하나의 배열로 이어 붙인 인덱스
+
+    종목 블록 뒤에 pad개 NaN을 붙여 g + h (h <= pad) 인덱스가 다른 종목으로 넘어가지 않게 한다.
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], pad: int):
+        self.pad = pad
+        self.blocks = {}    # {종목코드: (시작 오프셋, 봉 개수, 날짜 배열)}
+        close, high, low = [], [], []
+        offset = 0
+        for code, df in frames.items():
+            if df is None or df.empty:
+                continue
+            n = len(df)
+            day_values = df.index.values.astype('datetime64[D]')
+            self.blocks[code] = (offset, n, day_values)
+            padding = np.full(pad, np.nan)
+            close.append(np.concatenate([df['close'].to_numpy(dtype=float), padding]))
+            high.append(np.concatenate([df['high'].to_numpy(dtype=float), padding]))
+            low.append(np.concatenate([df['low'].to_numpy(dtype=float), padding]))
+            offset += n + pad
+
+        self.close = np.concatenate(close) if close else np.array([])
+        self.high = np.concatenate(high) if high else np.array([])
+        self.low = np.concatenate(low) if low else np.array([])
+
+    def locate(self, codes: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """신호별 기준 봉 전역 인덱스 (신호일 이전 마지막 거래일, 없으면 -1)"""
+        result = np.full(len(codes), -1, dtype=np.int64)
+        for code in pd.unique(codes):
+            block = self.blocks.get(code)
+            if block is None:
+                continue
+            offset, n, block_days = block
+            mask = codes == code
+            pos = np.searchsorted(block_days, days[mask], side='right') - 1
+            result[mask] = np.where(pos >= 0, offset + pos, -1)
+        return result
+
+def daily_forward_returns(signals: pd.DataFrame, frames: Dict[str, pd.DataFrame],
+                          horizons: Sequence[int] = DEFAULT_HORIZONS) -> pd.DataFrame:
+    """신호별 h거래일 후 수익률(%) / MFE / MAE 컬럼 추가 (진입가 없으면 기준일 종가)"""
+    horizons = sorted(set(int(h) for h in horizons))
+    max_h = horizons[-1]
+    index = DailyBarIndex(frames, pad=max_h)
+
+    codes = signals['stock_code'].to_numpy(dtype=object)
+    days = signals['timestamp'].to_numpy().astype('datetime64[D]')
+    base = index.locate(codes, days)
+    valid = base >= 0
+    safe_base = np.where(valid, base, 0)
+
+    entry = signals['entry_price'].to_numpy(dtype=float).copy()
+    missing_entry = ~(entry > 0)
+    if len(index.close):
+        entry[missing_entry] = index.close[safe_base[missing_entry]]
+    entry[~valid | ~(entry > 0)] = np.nan
+
+    result = signals.copy()
+    result['entry_price'] = entry
+    if not len(index.close):
+        for h in horizons:
+            result[f'ret_{h}d'] = np.nan
+        result['mfe'] = np.nan
+        result['mae'] = np.nan
+        return result
+
+    forward = index.close[safe_base[:, None] + np.array(horizons)]
+    returns = (forward / entry[:, None] - 1) * 100
+    returns[~valid] = np.nan
+    for k, h in enumerate(horizons):
+        result[f'ret_{h}d'] = returns[:, k]
+
+    window = safe_base[:, None] + np.arange(1, max_h + 1)
+    result['mfe'] = np.where(valid, (np.fmax.reduce(index.high[window], axis=1) / entry - 1) * 100, np.nan)
+    result['mae'] = np.where(valid, (np.fmin.reduce(index.low[window], axis=1) / entry - 1) * 100, np.nan)
+    return result
+
+def minute_forward_returns(signals: pd.DataFrame, minute_store: MinuteBarStore,
+                           minutes: Sequence[int] = DEFAULT_MINUTE_HORIZONS) -> pd.DataFrame:
+    """신호 당일 분봉으로 m분 후 수익률(%) 컬럼 추가 (분봉 없거나 장 마감 이후면 NaN)"""
+    result = signals.copy()
+    columns = {m: np.full(len(result), np.nan) for m in minutes}
+    available = set(minute_store.available_dates())
+
+    trade_keys = result['timestamp'].dt.strftime('%Y%m%d')
+    for (date_key, code), group in result.groupby([trade_keys, 'stock_code'], sort=False):
+        if date_key not in available:
+            continue
+        bars = minute_store.load(date_key, code)
+        if bars is None or bars.empty:
+            continue
+
+        times = bars.index.values
+        close = bars['close'].to_numpy(dtype=float)
+        signal_times = group['timestamp'].to_numpy()
+        rows = result.index.get_indexer(group.index)
+
+        entry = group['entry_price'].to_numpy(dtype=float).copy()
+        pos = np.searchsorted(times, signal_times, side='right') - 1
+        missing_entry = ~(entry > 0) & (pos >= 0)
+        entry[missing_entry] = close[pos[missing_entry]]
+        entry[~(entry > 0)] = np.nan
+
+        for m in minutes:
+            target = signal_times + np.timedelta64(int(m), 'm')
+            target_pos = np.searchsorted(times, target, side='right') - 1
+            in_session = target <= times[-1]
+            values = np.where(in_session & (target_pos >= 0),
+                              close[np.clip(target_pos, 0, len(close) - 1)], np.nan)
+            columns[m][rows] = (values / entry - 1) * 100
+
+    for m in minutes:
+        result[f'ret_{m}m'] = columns[m]
+    return result
+
+def add_edge_columns(outcomes: pd.DataFrame, return_columns: Sequence[str]) -> pd.DataFrame:
+    """방향 보정 수익률(edge_*) / 점수 구간 컬럼 추가"""
+    direction = outcomes['signal'].map(SIGNAL_DIRECTION).fillna(1).to_numpy()
+    for column in return_columns:
+        outcomes[column.replace('ret_', 'edge_')] = outcomes[column].to_numpy() * direction
+    labels = [f"{lo}-{hi}" for lo, hi in zip(SCORE_BINS[:-1], SCORE_BINS[1:])]
+    outcomes['score_bucket'] = pd.cut(outcomes['score'], bins=SCORE_BINS, labels=labels,
+                                      right=False, include_lowest=True)
+    return outcomes
+
+################################### 집계 ##################################
+
+def summarize_outcomes(outcomes: pd.DataFrame, by, return_columns: Sequence[str]) -> pd.DataFrame:
+    """그룹별 신호 수 / 평균 수익률 / 승률(edge > 0) / 평균 edge"""
+    frame = outcomes[[*([by] if isinstance(by, str) else by), *return_columns]].copy()
+    aggregations = {'count': (return_columns[0], 'size')}
+    for column in return_columns:
+        edge = outcomes[column.replace('ret_', 'edge_')]
+        frame[f'{column}_win'] = (edge > 0).where(edge.notna())
+        frame[f'{column}_edge'] = edge
+        aggregations[f'{column}_n'] = (column, 'count')
+        aggregations[f'{column}_mean'] = (column, 'mean')
+        aggregations[f'{column}_edge'] = (f'{column}_edge', 'mean')
+        aggregations[f'{column}_win_rate'] = (f'{column}_win', 'mean')
+
+    summary = frame.groupby(by, observed=True, sort=True).agg(**aggregations)
+    for column in return_columns:
+        summary[f'{column}_win_rate'] = summary[f'{column}_win_rate'] * 100
+    return summary
+
+def threshold_sweep(outcomes: pd.DataFrame, thresholds: Sequence[float], return_column: str = 'ret_3d',
+                    side: str = 'buy') -> pd.DataFrame:
+    """점수 임계값별 누적 성과 (buy: 매수 신호 중 score >= t, sell: 매도 신호 중 score < t)
+
+    점수로 한 번 정렬한 뒤 누적합으로 모든 임계값을 한 번에 계산한다.
+    """
+    edge_column = return_column.replace('ret_', 'edge_')
+    if side == 'buy':
+        subset = outcomes[outcomes['signal'].map(SIGNAL_DIRECTION).fillna(1) > 0]
+    else:
+        subset = outcomes[outcomes['signal'].map(SIGNAL_DIRECTION).fillna(1) < 0]
+    subset = subset[subset[edge_column].notna() & subset['score'].notna()]
+
+    scores = subset['score'].to_numpy(dtype=float)
+    order = np.argsort(scores, kind='stable')
+    scores = scores[order]
+    edge = subset[edge_column].to_numpy(dtype=float)[order]
+    raw = subset[return_column].to_numpy(dtype=float)[order]
+
+    cum_edge = np.concatenate([[0.0], np.cumsum(edge)])
+    cum_raw = np.concatenate([[0.0], np.cumsum(raw)])
+    cum_win = np.concatenate([[0], np.cumsum(edge > 0)])
+
+    thresholds = np.asarray(thresholds, dtype=float)
+    cut = np.searchsorted(scores, thresholds, side='left')
+    total = len(scores)
+    if side == 'buy':
+        count = total - cut
+        edge_sum, raw_sum, wins = cum_edge[-1] - cum_edge[cut], cum_raw[-1] - cum_raw[cut], cum_win[-1] - cum_win[cut]
+    else:
+        count = cut
+        edge_sum, raw_sum, wins = cum_edge[cut], cum_raw[cut], cum_win[cut]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            'threshold': thresholds,
+            'count': count,
+            'mean_return': np.where(count > 0, raw_sum / count, np.nan),
+            'mean_edge': np.where(count > 0, edge_sum / count, np.nan),
+            'win_rate': np.where(count > 0, wins / count * 100, np.nan),
+            'total_edge': edge_sum
+        })
+
+################################### 실행 ##################################
+
+class SignalReplayEvaluator:
+    """신호 파일 → 일봉/분봉 재평가 → 유형/섹터/점수 구간/임계값별 집계"""
+
+    def __init__(self, daily_store: Optional[BacktestDataStore] = None,
+                 minute_store: Optional[MinuteBarStore] = None,
+                 horizons: Sequence[int] = DEFAULT_HORIZONS,
+                 minute_horizons: Sequence[int] = DEFAULT_MINUTE_HORIZONS):
+        self.daily_store = daily_store or get_default_store()
+        self.minute_store = minute_store
+        self.horizons = sorted(set(int(h) for h in horizons))
+        self.minute_horizons = sorted(set(int(m) for m in minute_horizons)) if minute_store is not None else []
+        self.outcomes = pd.DataFrame()
+
+    @property
+    def return_columns(self) -> List[str]:
+        return [f'ret_{h}d' for h in self.horizons] + [f'ret_{m}m' for m in self.minute_horizons]
+
+    def evaluate(self, signals: pd.DataFrame) -> pd.DataFrame:
+        """신호별 수익률 계산 (종목 일봉은 저장소에서 한 번에 로드)"""
+        start_time = time.time()
+        if signals.empty:
+            logger.warning("⚠️ 평가할 신호 없음")
+            self.outcomes = signals
+            return signals
+
+        start_date = signals['timestamp'].min().normalize() - pd.Timedelta(days=10)
+        codes = list(pd.unique(signals['stock_code']))
+        frames = self.daily_store.load_universe(codes, start_date=start_date)
+
+        outcomes = daily_forward_returns(signals, frames, self.horizons)
+        if self.minute_store is not None and self.minute_horizons:
+            outcomes = minute_forward_returns(outcomes, self.minute_store, self.minute_horizons)
+        self.outcomes = add_edge_columns(outcomes, self.return_columns)
+
+        logger.info(f"✅ 신호 {len(signals):,}건 / {len(codes)}종목 평가: {time.time() - start_time:.2f}초")
+        return self.outcomes
+
+    def report(self, thresholds: Sequence[float], sweep_column: str = 'ret_3d') -> Dict[str, pd.DataFrame]:
+        columns = self.return_columns
+        return {
+            'by_signal': summarize_outcomes(self.outcomes, 'signal', columns),
+            'by_sector': summarize_outcomes(self.outcomes, 'sector', columns),
+            'by_score': summarize_outcomes(self.outcomes, 'score_bucket', columns),
+            'buy_thresholds': threshold_sweep(self.outcomes, thresholds, sweep_column, 'buy'),
+            'sell_thresholds': threshold_sweep(self.outcomes, thresholds, sweep_column, 'sell')
+        }
+
+    def print_report(self, report: Dict[str, pd.DataFrame], sweep_column: str = 'ret_3d'):
+        display_columns = ['count']
+        for column in self.return_columns:
+            display_columns += [f'{column}_mean', f'{column}_win_rate']
+
+        with pd.option_context('display.width', 160, 'display.max_columns', 30, 'display.float_format', '{:,.2f}'.format):
+            print("\n" + "=" * 70)
+            print(f"📊 신호 리플레이 성과 ({len(self.outcomes):,}건, 수익률 %, 승률은 방향 보정 기준)")
+            print("=" * 70)
+            for title, key in [("신호 유형별", 'by_signal'), ("섹터별", 'by_sector'), ("점수 구간별", 'by_score')]:
+                print(f"\n[ {title} ]")
+                print(report[key][display_columns].to_string())
+            print(f"\n[ 매수 신호 점수 임계값별 ({sweep_column}) ]")
+            print(report['buy_thresholds'].to_string(index=False))
+            if report['sell_thresholds']['count'].max() > 0:
+                print(f"\n[ 매도 신호 점수 임계값별 ({sweep_column}, score < 임계값) ]")
+                print(report['sell_thresholds'].to_string(index=False))
+            print("=" * 70)
+
+    def save_results(self, report: Dict[str, pd.DataFrame]) -> Dict[str, str]:
+        """신호별 결과 테이블 (Parquet) + 집계 CSV 저장"""
+        os.makedirs('backtest_results', exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+        prefix = f"backtest_results/signal_replay_{timestamp}"
+        outcomes = self.outcomes.copy()
+        outcomes['score_bucket'] = outcomes['score_bucket'].astype(str)
+        files = {'outcomes': write_results(outcomes, f'{prefix}_outcomes.parquet')}
+        for key, table in report.items():
+            files[key] = f'{prefix}_{key}.csv'
+            table.to_csv(files[key], encoding='utf-8-sig')
+        print(f"✅ 결과 저장 완료: {prefix}_*")
+        return files
+
+def parse_thresholds(text: str) -> List[float]:
+    """'60:95:5' (시작:끝:간격, 끝 포함) 또는 '60,70,75' 형식"""
+    if ':' in text:
+        start, end, step = (float(x) for x in text.split(':'))
+        return list(np.arange(start, end + step / 2, step))
+    return [float(x) for x in text.split(',') if x]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SignalMonitor 신호 리플레이 성과 분석")
+    parser.add_argument('files', nargs='*', default=[DEFAULT_HISTORY_FILE, DEFAULT_ARCHIVE_FILE])
+    parser.add_argument('--horizons', default=','.join(str(h) for h in DEFAULT_HORIZONS), help="거래일 (쉼표 구분)")
+    parser.add_argument('--minutes', default=','.join(str(m) for m in DEFAULT_MINUTE_HORIZONS),
+                        help="분 단위 (분봉 저장소에 있는 날만, 빈 문자열이면 생략)")
+    parser.add_argument('--thresholds', default="60:95:5")
+    parser.add_argument('--horizon', type=int, default=3, help="임계값 분석 기준 거래일")
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args(argv)
+
+    horizons = [int(h) for h in args.horizons.split(',') if h]
+    if args.horizon not in horizons:
+        horizons.append(args.horizon)
+    minutes = [int(m) for m in args.minutes.split(',') if m]
+
+    evaluator = SignalReplayEvaluator(minute_store=MinuteBarStore() if minutes else None,
+                                      horizons=horizons, minute_horizons=minutes)
+    evaluator.evaluate(load_signals(args.files))
+    if evaluator.outcomes.empty:
+        return None
+
+    sweep_column = f'ret_{args.horizon}d'
+    report = evaluator.report(parse_thresholds(args.thresholds), sweep_column)
+    evaluator.print_report(report, sweep_column)
+    if not args.no_save:
+        evaluator.save_results(report)
+    return report
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main(sys.argv[1:])
@@ -0,0 +1,756 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SmartMagicSplit 계열 봇 리플레이 백테스트 (smart_split_backtest.py)
+- 실전 봇 모듈(SmartMagicSplitBotNew_KR / SmartGoldTradingBot_KR / SmartMagicSplitBot_US)을 그대로 import 해서
+  SmartMagicSplit.process_trading()을 수정 없이 호출 (GoldBacktesting_KR처럼 로직을 다시 구현하지 않음)
+- 재생 중에는 봇 모듈 전역의 KisKR / KisUS / SafeKisUS / Common / datetime / time / discord_alert를 재생용 객체로 교체
+  · 시세/잔고/주문은 BacktestDataStore 일봉 + 모의 계좌(SimulatedBroker)로 응답, 그 외 KIS API 호출은 예외 발생
+  · datetime.now(), time.time()은 재생 시각, time.sleep()은 대기 없이 재생 시각만 진행 (체결 대기 루프 포함)
+- save_split_data / load_split_data 및 성과 파일은 메모리로 연결 (실전 JSON 파일을 건드리지 않음)
+- 하루는 일봉을 시가 → 저가/고가 → 종가 경로로 보간한 checks_per_day개 시점으로 재생
+
+단순화:
+- 장중 가격 경로는 일봉 보간 (양봉: 시가→저가→고가→종가, 음봉: 시가→고가→저가→종가)
+- 시장가로 체결 가능한 지정가 주문은 즉시 현재가 체결, 나머지는 당일 경로에서 지정가 도달 시 체결, 장 마감 시 취소
+  (fill_model에 OrderBookFillModel을 주면 호가 소진 즉시 체결 + 대기열 위치/부분체결을 반영한 fill_model.LimitOrder로 체결)
+- 뉴스 분석 / AI Cash Target Seller / 외국인·기관 분석은 재생 중 비활성화
+
+사용 예:
+    python smart_split_backtest.py SmartMagicSplitBotNew_KR 2024-01-01 2024-12-31
+    python smart_split_backtest.py SmartMagicSplitBotNew_KR 2024-01-01 2024-12-31 order_book
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import datetime
+import importlib
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+
+from backtest_data_store import PRICE_COLUMNS, BacktestDataStore, get_default_store
+from backtest_replay import ReplayClock, ReplayDatetime, ReplayTime, SilentAlert, replaced_attributes
+from fill_model import create_fill_model
+
+logger = logging.getLogger('SmartSplitBacktest')
+
+# 봇 모듈별 시장 설정 (session: 현지 시각 기준 장 시간, benchmarks: 봇이 조회하는 지수/ETF)
+BOT_PROFILES = {
+    'SmartMagicSplitBotNew_KR': {'market': 'KR', 'benchmarks': ['KOSPI']},
+    'SmartGoldTradingBot_KR': {'market': 'KR', 'benchmarks': ['KOSPI']},
+    'SmartMagicSplitBot_US': {'market': 'US', 'benchmarks': ['SPY']},
+}
+
+MARKET_PROFILES = {
+    'KR': {'tz': 'Asia/Seoul', 'session': ("09:00", "15:30"), 'checks': ("09:10", "15:20"),
+           'default_capital': 10000000},
+    'US': {'tz': 'America/New_York', 'session': ("09:30", "16:00"), 'checks': ("09:40", "15:50"),
+           'default_capital': 10000},
+}
+
+# 봇 서버 시간대 (naive datetime.now() 기준)
+LOCAL_TZ = 'Asia/Seoul'
+
+# 재생 중 비활성화할 외부 연동 플래그 (뉴스/AI 매도/수급 분석은 실시간 데이터 필요)
+DISABLED_FEATURE_FLAGS = ['NEWS_ANALYSIS_AVAILABLE', 'CASH_TARGET_ENABLED', 'FI_ANALYZER_AVAILABLE']
+
+# 일봉 보간 경로 위치 (시가, 첫 극값, 둘째 극값, 종가)
+PATH_POINTS = np.array([0.0, 1 / 3, 2 / 3, 1.0])
+
+################################### 시세 재생 ##################################
+
+class ReplayMarket:
+    """저장 일봉으로 재생 시점의 현재가 / 당일 누적 봉 / 일봉 이력 제공"""
+
+    def __init__(self, market: str, names: Optional[Dict[str, str]] = None):
+        self.market = market
+        self.names = names or {}
+        self.bars = {}          # {종목코드: {'index': DatetimeIndex, 컬럼: ndarray}}
+        self.pos = {}           # {종목코드: 당일 이전 봉 개수}
+        self.has_bar = {}       # {종목코드: 당일 봉 존재 여부}
+        self.today = {}         # {종목코드: {'open', 'high', 'low', 'close', 'volume'}} 재생 시점까지 누적
+        self.fraction = 0.0
+        self.in_session = False
+        self._daily_cache = {}
+
+    def load(self, frames: Dict[str, pd.DataFrame]):
+        for code, df in frames.items():
+            if df is None or df.empty:
+                continue
+            self.bars[code] = {'index': df.index}
+            self.bars[code].update({col: df[col].to_numpy(dtype=float) for col in PRICE_COLUMNS})
+
+    def trade_dates(self, codes: List[str], start_date, end_date) -> pd.DatetimeIndex:
+        """대상 종목 중 하나라도 봉이 있는 날짜"""
+        dates = pd.DatetimeIndex([])
+        for code in codes:
+            if code in self.bars:
+                dates = dates.union(self.bars[code]['index'])
+        return dates[(dates >= pd.Timestamp(start_date)) & (dates <= pd.Timestamp(end_date))]
+
+    def set_day(self, day: pd.Timestamp):
+        for code, bars in self.bars.items():
+            pos = int(bars['index'].searchsorted(day))
+            self.pos[code] = pos
+            self.has_bar[code] = pos < len(bars['index']) and bars['index'][pos] == day
+        self.set_fraction(0.0, in_session=False)
+
+    def set_fraction(self, fraction: float, in_session: bool = True):
+        """장중 진행률(0~1) 시점의 당일 누적 봉 계산"""
+        self.fraction = fraction
+        self.in_session = in_session
+        self._daily_cache = {}
+        self.today = {}
+        for code, bars in self.bars.items():
+            if not self.has_bar[code]:
+                continue
+            i = self.pos[code]
+            o, h, l, c = bars['open'][i], bars['high'][i], bars['low'][i], bars['close'][i]
+            path = np.array([o, l, h, c] if c >= o else [o, h, l, c])
+            price = float(np.interp(fraction, PATH_POINTS, path))
+            visited = np.append(path[PATH_POINTS <= fraction], price)
+            self.today[code] = {
+                'open': o,
+                'high': float(visited.max()),
+                'low': float(visited.min()),
+                'close': price,
+                'volume': bars['volume'][i] * fraction
+            }
+
+    def price(self, stock_code: str) -> float:
+        bar = self.today.get(stock_code)
+        if bar is not None:
+            price = bar['close']
+        else:
+            bars = self.bars.get(stock_code)
+            pos = self.pos.get(stock_code, 0)
+            if bars is None or pos == 0:
+                return 0
+            price = bars['close'][pos - 1]
+        return int(round(price)) if self.market == 'KR' else round(float(price), 2)
+
+    def daily_ohlcv(self, stock_code: str, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """전일까지 일봉 + 재생 시점까지 누적된 당일 봉 (재생 시점별 1회 생성)"""
+        bars = self.bars.get(stock_code)
+        if bars is None:
+            return None
+
+        df = self._daily_cache.get(stock_code)
+        if df is None:
+            pos = self.pos[stock_code]
+            columns = {col: bars[col][:pos] for col in PRICE_COLUMNS}
+            index = bars['index'][:pos]
+            if stock_code in self.today:
+                today = self.today[stock_code]
+                columns = {col: np.append(values, today[col]) for col, values in columns.items()}
+                index = bars['index'][:pos + 1]
+            df = pd.DataFrame(columns, index=index)
+            df.index.name = 'Date'
+            df['value'] = df['close'] * df['volume']
+            df['change'] = df['close'].pct_change()
+            self._daily_cache[stock_code] = df
+
+        return df.tail(limit) if limit else df
+
+    def name(self, stock_code: str) -> str:
+        return self.names.get(stock_code, stock_code)
+
+################################### 모의 계좌 ##################################
+
+class SimulatedBroker:
+    """모의 계좌 - 지정가 주문 체결, 보유/주문 내역을 KIS API 형식으로 제공
+
+    fill_model이 지정가 대기열을 지원하면(place_limit, 예: OrderBookFillModel) 주문 시점 호가로 즉시 체결분을 정하고,
+    남은 수량은 LimitOrder로 대기열 앞 잔량을 소진하며 체크 시점 사이 구간 봉마다 부분체결
+    (없으면 지정가 도달 시 현재가 전량 체결)
+    """
+
+    def __init__(self, initial_cash: float, clock: ReplayClock, market: ReplayMarket, fill_model=None):
+        self.cash = float(initial_cash)
+        self.clock = clock
+        self.market = market
+        self.fill_model = fill_model if hasattr(fill_model, 'place_limit') else None
+        self.fee_fn: Optional[Callable] = None   # (price, quantity, is_buy) → 수수료, 봇 생성 후 연결
+        self.external_stock_money = 0.0          # 같은 계좌를 쓰는 다른 봇의 평가금액 (포트폴리오 백테스트)
+        self.holdings = {}      # {종목코드: {'amount': 수량, 'avg_price': 평균단가, 'cost': 매수 수수료 포함 원가}}
+        self.orders = []        # KIS 주문 내역 형식 (최신 주문이 뒤)
+        self.open_orders = []
+        self.fills = []
+        self._order_seq = 0
+        self._limit_orders = {}  # {OrderNum2: (LimitOrder, 직전 체크 시점 당일 누적 봉)}
+
+    def _fee(self, price: float, amount: int, is_buy: bool) -> float:
+        return float(self.fee_fn(price, amount, is_buy)) if self.fee_fn else 0.0
+
+    def submit(self, side: str, stock_code: str, amount, price):
+        """지정가 주문 접수 → 주문 정보 dict (실패 시 오류 문자열, KIS 응답과 같은 방식)"""
+        amount, price = int(amount), float(price)
+        if amount < 1 or price <= 0:
+            return "INVALID_ORDER"
+        if side == 'SELL' and self.holdings.get(stock_code, {}).get('amount', 0) < amount:
+            return "INSUFFICIENT_STOCK"
+        if side == 'BUY' and price * amount + self._fee(price, amount, True) > self.cash:
+            return "INSUFFICIENT_CASH"
+
+        self._order_seq += 1
+        now = self.clock.now
+        order = {
+            'OrderNum': f"{self._order_seq:05d}",
+            'OrderNum2': f"{self._order_seq:010d}",
+            'OrderNo': f"{self._order_seq:010d}",
+            'OrderTime': now.strftime('%H%M%S'),
+            'OrderDate': now.strftime('%Y%m%d'),
+            'OrderStock': stock_code,
+            'OrderSide': side,
+            'OrderAmt': amount,
+            'OrderPrice': price,
+            'OrderResultAmt': 0,
+            'OrderAvgPrice': 0,
+            'OrderSatus': 'Open'
+        }
+        self.orders.append(order)
+        self.open_orders.append(order)
+        self.match()
+        return {key: order[key] for key in ('OrderNum', 'OrderNum2', 'OrderNo', 'OrderTime')}
+
+    def match(self):
+        """지정가에 도달한 미체결 주문 체결 (체결가는 현재가, 대기열 체결 모델이면 지정가)"""
+        for order in list(self.open_orders):
+            code = order['OrderStock']
+            price = self.market.price(code)
+            if not self.market.in_session or price <= 0:
+                continue
+            if self.fill_model is not None:
+                self._match_queued(order, code, price)
+            elif order['OrderSide'] == 'BUY' and price <= order['OrderPrice']:
+                self._fill(order, price)
+            elif order['OrderSide'] == 'SELL' and price >= order['OrderPrice']:
+                self._fill(order, price)
+
+    def _match_queued(self, order: Dict, code: str, price: float):
+        """대기열 체결 - 첫 체크는 호가 소진 즉시 체결, 이후는 직전 체크 이후 구간 봉으로 LimitOrder.on_bar"""
+        bar = self.market.today.get(code)
+        if bar is None:
+            return
+
+        key = order['OrderNum2']
+        state = self._limit_orders.get(key)
+        if state is None:
+            book = self.fill_model.snapshot(price, bar, code, self.clock.now)
+            limit = self.fill_model.place_limit(order['OrderSide'], order['OrderAmt'], order['OrderPrice'], book)
+            quantity, fill_price = limit.filled, limit.avg_price
+        else:
+            limit, last = state
+            # 보간 경로는 극값 사이에서 단조이므로 구간 고가/저가는 새 극값 또는 구간 양 끝 가격
+            high = bar['high'] if bar['high'] > last['high'] else max(last['close'], bar['close'])
+            low = bar['low'] if bar['low'] < last['low'] else min(last['close'], bar['close'])
+            quantity = limit.on_bar(high, low, bar['volume'] - last['volume'])
+            fill_price = limit.limit_price
+        self._limit_orders[key] = (limit, dict(bar))
+
+        if quantity > 0:
+            self._fill(order, fill_price, quantity)
+
+    def _close_order(self, order: Dict, status: str):
+        self.open_orders.remove(order)
+        self._limit_orders.pop(order['OrderNum2'], None)
+        order['OrderSatus'] = status
+
+    def _fill(self, order: Dict, price: float, amount: Optional[int] = None):
+        """주문 체결 (amount 생략 시 남은 수량 전량, 일부면 부분체결로 주문은 계속 대기)"""
+        code, is_buy = order['OrderStock'], order['OrderSide'] == 'BUY'
+        remaining = order['OrderAmt'] - order['OrderResultAmt']
+        amount = remaining if amount is None else min(int(amount), remaining)
+        holding = self.holdings.get(code, {'amount': 0, 'avg_price': 0.0, 'cost': 0.0})
+        fee = self._fee(price, amount, is_buy)
+
+        if is_buy and price * amount + fee > self.cash:
+            self._close_order(order, 'Cancel')
+            return
+        if not is_buy and holding['amount'] < amount:
+            self._close_order(order, 'Cancel')
+            return
+
+        # 실현 손익/수익률은 체결가와 매수·매도 수수료 기준 (매수 수수료 포함 원가 대비, 현금 증감과 일치)
+        realized = 0.0
+        profit_rate = 0.0
+        if is_buy:
+            self.cash -= price * amount + fee
+            total_cost = holding['avg_price'] * holding['amount'] + price * amount
+            holding['amount'] += amount
+            holding['avg_price'] = total_cost / holding['amount']
+            holding['cost'] += price * amount + fee
+            self.holdings[code] = holding
+        else:
+            self.cash += price * amount - fee
+            entry_cost = holding['cost'] * amount / holding['amount']
+            realized = price * amount - fee - entry_cost
+            profit_rate = realized / entry_cost * 100 if entry_cost > 0 else 0.0
+            holding['cost'] -= entry_cost
+            holding['amount'] -= amount
+            if holding['amount'] == 0:
+                del self.holdings[code]
+
+        filled = order['OrderResultAmt'] + amount
+        order['OrderAvgPrice'] = (order['OrderAvgPrice'] * order['OrderResultAmt'] + price * amount) / filled
+        order['OrderResultAmt'] = filled
+        if filled >= order['OrderAmt']:
+            self._close_order(order, 'Close')
+        self.fills.append({'time': self.clock.now, 'code': code, 'side': order['OrderSide'],
+                           'price': price, 'amount': amount, 'fee': fee, 'realized': realized,
+                           'profit_rate': profit_rate})
+
+    def cancel_open_orders(self):
+        """장 마감 미체결 주문 취소"""
+        for order in self.open_orders:
+            order['OrderSatus'] = 'Cancel'
+        self.open_orders = []
+        self._limit_orders = {}
+
+    def order_list(self, stock_code: str = "", side: str = "ALL", status: str = "ALL", limit: int = 1) -> List[Dict]:
+        """주문 내역 (최신순, limit일 이내)"""
+        since = (self.clock.now - datetime.timedelta(days=max(1, int(limit)) - 1)).strftime('%Y%m%d')
+        status_map = {'CLOSE': 'Close', 'OPEN': 'Open'}
+        result = []
+        for order in reversed(self.orders):
+            if order['OrderDate'] < since:
+                break
+            if stock_code and order['OrderStock'] != stock_code:
+                continue
+            if side in ('BUY', 'SELL') and order['OrderSide'] != side:
+                continue
+            if status in status_map and order['OrderSatus'] != status_map[status]:
+                continue
+            result.append(dict(order))
+        return result
+
+    def stock_value(self) -> float:
+        return sum(self.market.price(code) * holding['amount'] for code, holding in self.holdings.items())
+
+    def balance(self) -> Dict:
+        """GetBalance 형식 (계좌 전체 기준이라 다른 봇 평가금액 포함)"""
+        stock_money = self.stock_value()
+        cost = sum(holding['avg_price'] * holding['amount'] for holding in self.holdings.values())
+        return {
+            'TotalMoney': self.cash + stock_money + self.external_stock_money,
+            'StockMoney': stock_money + self.external_stock_money,
+            'StockRevenue': stock_money - cost,
+            'RemainMoney': self.cash
+        }
+
+    def stock_list(self) -> List[Dict]:
+        """GetMyStockList 형식 (API와 같이 문자열 값)"""
+        result = []
+        for code, holding in self.holdings.items():
+            now_price = self.market.price(code)
+            ori_money = holding['avg_price'] * holding['amount']
+            now_money = now_price * holding['amount']
+            result.append({
+                'StockCode': code,
+                'StockName': self.market.name(code),
+                'StockAmt': str(holding['amount']),
+                'StockAvgPrice': str(holding['avg_price']),
+                'StockOriMoney': str(ori_money),
+                'StockNowMoney': str(now_money),
+                'StockNowPrice': str(now_price),
+                'StockRevenueRate': str((now_money / ori_money - 1) * 100 if ori_money > 0 else 0),
+                'StockRevenueMoney': str(now_money - ori_money)
+            })
+        return result
+
+################################### KIS API 대체 ##################################
+
+class ReplayKisKR:
+    """KisKR 대체 - 봇이 사용하는 시세/잔고/주문 API만 제공"""
+
+    def __init__(self, market: ReplayMarket, broker: SimulatedBroker):
+        self._market = market
+        self._broker = broker
+
+    def GetBalance(self, *args, **kwargs):
+        return self._broker.balance()
+
+    def GetMyStockList(self, *args, **kwargs):
+        return self._broker.stock_list()
+
+    def GetCurrentPrice(self, stock_code):
+        return self._market.price(stock_code)
+
+    def GetCurrentStatus(self, stock_code):
+        return {'StockCode': stock_code, 'StockName': self._market.name(stock_code),
+                'StockNowPrice': self._market.price(stock_code)}
+
+    def GetOhlcvNew(self, stock_code, p_code="D", get_count=100, adj_ok="1"):
+        return self._market.daily_ohlcv(stock_code, get_count)
+
+    def IsTodayOpenCheck(self):
+        return 'Y'
+
+    def MarketStatus(self, stock_code='069500'):
+        return {'Status': '2' if self._market.in_session else '3'}
+
+    def MakeBuyLimitOrder(self, stockcode, amt, price, *args, **kwargs):
+        return self._broker.submit('BUY', stockcode, amt, price)
+
+    def MakeSellLimitOrder(self, stockcode, amt, price, *args, **kwargs):
+        return self._broker.submit('SELL', stockcode, amt, price)
+
+    def GetOrderList(self, stockcode="", side="ALL", status="ALL", limit=1, *args, **kwargs):
+        return self._broker.order_list(stockcode, side, status, limit)
+
+    def __getattr__(self, name):
+        raise RuntimeError(f"백테스트 재생 중 지원하지 않는 KIS API 호출: KisKR.{name}")
+
+class ReplayKisUS(ReplayKisKR):
+    """KisUS 대체 (통화 인자는 무시)"""
+
+    def IsMarketOpen(self):
+        return self._market.in_session
+
+    def __getattr__(self, name):
+        raise RuntimeError(f"백테스트 재생 중 지원하지 않는 KIS API 호출: KisUS.{name}")
+
+class ReplaySafeKisUS:
+    """api_resilience.SafeKisUS 대체 - 재시도 없이 ReplayKisUS 호출"""
+
+    def __init__(self, kis_us: ReplayKisUS, broker: SimulatedBroker):
+        self._kis = kis_us
+        self._broker = broker
+
+    def safe_get_balance(self, currency="USD"):
+        return self._kis.GetBalance(currency)
+
+    def safe_get_my_stock_list(self, currency="USD"):
+        return self._kis.GetMyStockList(currency)
+
+    def safe_get_current_price(self, stock_code):
+        return self._kis.GetCurrentPrice(stock_code)
+
+    def safe_get_ohlcv_new(self, stock_code, period="D", count=100, *args, **kwargs):
+        return self._kis.GetOhlcvNew(stock_code, period, count)
+
+    def safe_get_order_list(self, stock_code="", side="ALL", status="ALL", limit=1):
+        return self._kis.GetOrderList(stock_code, side, status, limit)
+
+    def safe_is_market_open(self):
+        return self._kis.IsMarketOpen()
+
+    def safe_make_buy_limit_order(self, stock_code, amount, price, *args, **kwargs):
+        return self._kis.MakeBuyLimitOrder(stock_code, amount, price)
+
+    def safe_make_sell_limit_order(self, stock_code, amount, price, *args, **kwargs):
+        return self._kis.MakeSellLimitOrder(stock_code, amount, price)
+
+    def safe_sell_stock(self, stock_code, amount, price, order_type="LIMIT", *args, **kwargs):
+        """긴급 청산용 매도 (LOC 등 주문 유형과 관계없이 현재가 기준 체결)"""
+        result = self._broker.submit('SELL', stock_code, amount, min(float(price), self._kis.GetCurrentPrice(stock_code)))
+        if isinstance(result, dict):
+            return {'success': True, **result}
+        return {'success': False, 'error': result}
+
+    def __getattr__(self, name):
+        raise RuntimeError(f"백테스트 재생 중 지원하지 않는 KIS API 호출: SafeKisUS.{name}")
+
+class ReplayCommon:
+    """Common 대체 - 일봉 조회만 재생 데이터로 연결, 알림은 전송 안 함"""
+
+    def __init__(self, market: ReplayMarket, common):
+        self._market = market
+        self._common = common
+
+    def GetOhlcv(self, area, stock_code, limit=500, adj_ok="1"):
+        return self._market.daily_ohlcv(stock_code, limit)
+
+    def SendMessage(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._common, name)
+
+class SplitDataMemory:
+    """save_split_data / load_split_data 대체 - JSON 문자열로 메모리에 보관 (파일 저장과 같은 직렬화 검증)"""
+
+    def __init__(self, initial_data: Optional[List[Dict]] = None):
+        self.saved = json.dumps(initial_data or [], ensure_ascii=False)
+        self.save_count = 0
+
+    def save(self, split_data_list: List[Dict]):
+        self.saved = json.dumps(split_data_list, ensure_ascii=False)
+        self.save_count += 1
+
+    def load(self) -> List[Dict]:
+        return json.loads(self.saved)
+
+################################### 백테스트 엔진 ##################################
+
+class SmartSplitBacktest:
+    """SmartMagicSplit 봇 process_trading 리플레이 백테스트"""
+
+    def __init__(self, bot_module: str = 'SmartMagicSplitBotNew_KR', initial_capital: Optional[float] = None,
+                 daily_store: Optional[BacktestDataStore] = None, checks_per_day: int = 4,
+                 history_days: int = 120, initial_split_data: Optional[List[Dict]] = None,
+                 bot_log_level: int = logging.WARNING, fill_model=None):
+        """
+        Args:
+            bot_module: 재생할 봇 모듈 이름 (BOT_PROFILES 참고)
+            initial_capital: 초기 현금 (없으면 봇 설정의 absolute_budget)
+            daily_store: 일봉 저장소 (없으면 시장별 공용 저장소)
+            checks_per_day: 하루 process_trading 호출 횟수 (실전은 30초 간격)
+            history_days: 시작일 이전에 준비할 일봉 수 (봇 지표 계산용)
+            initial_split_data: 시작 시점 split 데이터 (없으면 빈 상태에서 시작)
+            bot_log_level: 재생 중 봇 로거 레벨
+            fill_model: 지정가 체결 모델 (fill_model.py, OrderBookFillModel이면 대기열/부분체결 반영, 기본값은 지정가 도달 시 전량 체결)
+        """
+        if bot_module not in BOT_PROFILES:
+            raise ValueError(f"지원하지 않는 봇 모듈: {bot_module} (지원: {', '.join(BOT_PROFILES)})")
+
+        self.bot_module_name = bot_module
+        self.bot_module = importlib.import_module(bot_module)
+        self.profile = BOT_PROFILES[bot_module]
+        self.market_profile = MARKET_PROFILES[self.profile['market']]
+
+        self.config = self.bot_module.config
+        self.target_stocks = dict(self.config.target_stocks)
+        self.initial_capital = float(initial_capital or getattr(self.config, 'absolute_budget', 0)
+                                     or self.market_profile['default_capital'])
+        self.daily_store = daily_store or self._default_store()
+        self.checks_per_day = max(1, int(checks_per_day))
+        self.history_days = history_days
+        self.bot_log_level = bot_log_level
+
+        names = {code: info.get('name', code) for code, info in self.target_stocks.items()}
+        self.clock = ReplayClock(tz=LOCAL_TZ)
+        self.market = ReplayMarket(self.profile['market'], names)
+        self.broker = SimulatedBroker(self.initial_capital, self.clock, self.market, fill_model)
+        self.split_memory = SplitDataMemory(initial_split_data)
+        self.performance_records = []
+
+        self.bot = None
+        self.equity = []
+        self.daily_results = []
+        self.errors = []
+
+    def _default_store(self) -> BacktestDataStore:
+        if self.profile['market'] == 'KR':
+            return get_default_store()
+        common = self.bot_module.Common
+        return BacktestDataStore(root_dir=os.path.join("backtest_data", "us"),
+                                 fetcher=lambda code, count: common.GetOhlcv("US", code, count))
+
+    ################################### 봇 모듈 교체 ##################################
+
+    @contextmanager
+    def bot_replay(self):
+        """봇 모듈 전역/영속화 메서드를 재생용으로 교체 (종료 시 원복)"""
+        module = self.bot_module
+        memory = self.split_memory
+        ReplayDatetime.clock = self.clock
+
+        replacements = {
+            'Common': ReplayCommon(self.market, module.Common),
+            'datetime': ReplayDatetime,
+            'time': ReplayTime(self.clock, advance_on_sleep=True),
+            'discord_alert': SilentAlert()
+        }
+        if self.profile['market'] == 'KR':
+            replacements['KisKR'] = ReplayKisKR(self.market, self.broker)
+        else:
+            kis_us = ReplayKisUS(self.market, self.broker)
+            replacements['KisUS'] = kis_us
+            replacements['SafeKisUS'] = ReplaySafeKisUS(kis_us, self.broker)
+        for flag in DISABLED_FEATURE_FLAGS:
+            if hasattr(module, flag):
+                replacements[flag] = False
+
+        split_methods = {
+            'load_split_data': lambda bot: memory.load(),
+            'save_split_data': lambda bot: memory.save(bot.split_data_list)
+        }
+        original_level = module.logger.level
+
+        with ExitStack() as stack:
+            stack.enter_context(replaced_attributes(module, replacements))
+            stack.enter_context(replaced_attributes(module.SmartMagicSplit, split_methods))
+            stack.enter_context(replaced_attributes(self.config, {'save_config': lambda: None}))
+            tracker = getattr(module, 'IndependentPerformanceTracker', None)
+            if tracker is not None:
+                stack.enter_context(replaced_attributes(tracker, {
+                    'initialize_performance_file': lambda tracker_self: None,
+                    'save_performance_data': lambda tracker_self, perf_data: self.performance_records.append(perf_data),
+                    'load_bot_data': lambda tracker_self: memory.load()
+                }))
+            module.logger.setLevel(self.bot_log_level)
+            try:
+                yield
+            finally:
+                module.logger.setLevel(original_level)
+
+    ################################### 재생 일정 ##################################
+
+    def _session_checks(self, day: pd.Timestamp) -> List[tuple]:
+        """(현지 시각, 장중 진행률) 목록 - checks 구간을 균등 분할"""
+        profile = self.market_profile
+        session_open, session_close = (pd.Timestamp(f"{day.date()} {hhmm}") for hhmm in profile['session'])
+        first, last = (pd.Timestamp(f"{day.date()} {hhmm}") for hhmm in profile['checks'])
+        times = pd.date_range(first, last, periods=self.checks_per_day) if self.checks_per_day > 1 else [last]
+        session_minutes = (session_close - session_open).total_seconds()
+        market_tz = ZoneInfo(profile['tz'])
+        return [(t.to_pydatetime().replace(tzinfo=market_tz),
+                 (t - session_open).total_seconds() / session_minutes) for t in times]
+
+    def _load_data(self, start_date, end_date) -> pd.DatetimeIndex:
+        history_start = pd.Timestamp(start_date) - pd.Timedelta(days=int(self.history_days * 1.6))
+        codes = list(self.target_stocks) + self.profile['benchmarks']
+        frames = {code: self.daily_store.get_daily(code, start_date=history_start, end_date=end_date) for code in codes}
+        self.market.load(frames)
+
+        missing = [code for code in self.target_stocks if code not in self.market.bars]
+        if missing:
+            logger.warning(f"⚠️ 일봉 없는 종목 제외: {missing}")
+        return self.market.trade_dates(list(self.target_stocks), start_date, end_date)
+
+    ################################### 실행 ##################################
+
+    def run_day(self, day: pd.Timestamp):
+        """거래일 1일 재생 (checks_per_day회 process_trading)"""
+        self.market.set_day(day)
+        start_equity = self.broker.balance()['TotalMoney']
+        fills_before = len(self.broker.fills)
+
+        for local_time, fraction in self._session_checks(day):
+            self.clock.set(local_time)
+            self.market.set_fraction(fraction)
+            self.broker.match()
+            try:
+                self.bot.process_trading()
+            except Exception as e:
+                # 실전 메인 루프와 같이 사이클 오류는 기록 후 다음 사이클 진행
+                self.errors.append({'time': self.clock.now, 'error': str(e)})
+                logger.error(f"❌ {day.date()} process_trading 오류: {str(e)}")
+
+        self.broker.cancel_open_orders()
+        self.market.set_fraction(1.0, in_session=False)
+        end_equity = self.broker.balance()['TotalMoney']
+        self.equity.append({
+            'date': day.strftime('%Y-%m-%d'),
+            'equity': end_equity,
+            'cash': self.broker.cash,
+            'stock_value': end_equity - self.broker.cash
+        })
+        self.daily_results.append({
+            'date': day.strftime('%Y-%m-%d'),
+            'fills': len(self.broker.fills) - fills_before,
+            'daily_return': (end_equity / start_equity - 1) * 100 if start_equity > 0 else 0
+        })
+
+    def start_bot(self, first_day: pd.Timestamp):
+        """첫 거래일 장 시작 시각으로 맞추고 봇 인스턴스 생성 (bot_replay 안에서 호출)"""
+        self.market.set_day(first_day)
+        self.clock.set(self._session_checks(first_day)[0][0])
+        if self.bot is None:
+            self.bot = self.bot_module.SmartMagicSplit()
+            self.broker.fee_fn = self.bot.calculate_trading_fee
+
+    def run(self, start_date, end_date) -> Dict:
+        """기간 재생 (봇 인스턴스는 실전처럼 기간 내내 유지)"""
+        start_time = time.time()
+        trade_dates = self._load_data(start_date, end_date)
+        if len(trade_dates) == 0:
+            logger.warning(f"⚠️ {start_date} ~ {end_date}: 재생할 일봉 없음")
+            return self.summarize(time.time() - start_time)
+
+        logger.info(f"🚀 {self.bot_module_name} 리플레이: {trade_dates[0].date()} ~ {trade_dates[-1].date()} "
+                    f"({len(trade_dates)}일 × {self.checks_per_day}회)")
+
+        with self.bot_replay():
+            self.start_bot(trade_dates[0])
+
+            for i, day in enumerate(trade_dates):
+                self.run_day(day)
+                if (i + 1) % 20 == 0:
+                    logger.info(f"   📅 {day.date()} 까지 {i + 1}/{len(trade_dates)}일, "
+                                f"자산 {self.equity[-1]['equity']:,.2f}")
+
+        return self.summarize(time.time() - start_time)
+
+    def summarize(self, elapsed_sec: float = 0.0) -> Dict:
+        """자산/체결 요약 지표"""
+        equity = pd.DataFrame(self.equity)
+        fills = pd.DataFrame(self.broker.fills)
+        sells = fills[fills['side'] == 'SELL'] if not fills.empty else fills
+
+        final_equity = float(equity['equity'].iloc[-1]) if not equity.empty else self.initial_capital
+        if not equity.empty:
+            values = equity['equity'].to_numpy()
+            max_drawdown = float((values / np.maximum.accumulate(values) - 1).min() * 100)
+        else:
+            max_drawdown = 0.0
+
+        split_data = self.split_memory.load()
+        return {
+            'bot_module': self.bot_module_name,
+            'trade_days': len(self.equity),
+            'checks_per_day': self.checks_per_day,
+            'initial_capital': self.initial_capital,
+            'final_equity': final_equity,
+            'total_return': (final_equity / self.initial_capital - 1) * 100,
+            'max_drawdown': max_drawdown,
+            'buy_fills': int((fills['side'] == 'BUY').sum()) if not fills.empty else 0,
+            'sell_fills': int(len(sells)),
+            'win_rate': float((sells['realized'] > 0).mean() * 100) if not sells.empty else 0.0,
+            'realized_profit': float(sells['realized'].sum()) if not sells.empty else 0.0,
+            'total_fee': float(fills['fee'].sum()) if not fills.empty else 0.0,
+            'bot_realized_pnl': float(sum(stock.get('RealizedPNL', 0) for stock in split_data)),
+            'split_saves': self.split_memory.save_count,
+            'errors': len(self.errors),
+            'elapsed_sec': elapsed_sec
+        }
+
+    def print_summary(self, summary: Dict):
+        print("\n" + "=" * 60)
+        print(f"📊 {summary['bot_module']} 리플레이 백테스트 결과")
+        print("=" * 60)
+        print(f"재생 거래일: {summary['trade_days']}일 × {summary['checks_per_day']}회 (소요 {summary['elapsed_sec']:.1f}초)")
+        print(f"초기 자산: {summary['initial_capital']:,.2f} → 최종 자산: {summary['final_equity']:,.2f}")
+        print(f"총 수익률: {summary['total_return']:+.2f}%, 최대 낙폭: {summary['max_drawdown']:.2f}%")
+        print(f"체결: 매수 {summary['buy_fills']}건, 매도 {summary['sell_fills']}건, 매도 승률 {summary['win_rate']:.1f}%")
+        print(f"실현 손익: {summary['realized_profit']:,.2f} (봇 기록 {summary['bot_realized_pnl']:,.2f}, "
+              f"수수료/세금 {summary['total_fee']:,.2f})")
+        print(f"split 데이터 저장: {summary['split_saves']}회, 사이클 오류: {summary['errors']}건")
+
+    def save_results(self, summary: Dict) -> Dict[str, str]:
+        """체결 내역 CSV / 일별 자산 CSV / 요약 JSON (최종 split 데이터 포함) 저장"""
+        os.makedirs('backtest_results', exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+        prefix = f"backtest_results/smart_split_{self.bot_module_name}"
+        files = {
+            'fills': f'{prefix}_fills_{timestamp}.csv',
+            'equity': f'{prefix}_equity_{timestamp}.csv',
+            'summary': f'{prefix}_summary_{timestamp}.json'
+        }
+        pd.DataFrame(self.broker.fills).to_csv(files['fills'], index=False, encoding='utf-8-sig')
+        pd.DataFrame(self.equity).to_csv(files['equity'], index=False, encoding='utf-8-sig')
+        with open(files['summary'], 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'split_data': self.split_memory.load(), 'errors': self.errors},
+                      f, ensure_ascii=False, indent=2, default=str)
+        print(f"✅ 결과 저장 완료: {files['fills']}, {files['equity']}, {files['summary']}")
+        return files
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if len(sys.argv) < 4:
+        print(f"사용법: python smart_split_backtest.py <{'|'.join(BOT_PROFILES)}> <시작일> <종료일> [close|order_book]")
+        sys.exit(1)
+
+    backtest = SmartSplitBacktest(sys.argv[1], fill_model=create_fill_model(sys.argv[4]) if len(sys.argv) > 4 else None)
+    result = backtest.run(sys.argv[2], sys.argv[3])
+    backtest.print_summary(result)
+    backtest.save_results(result)
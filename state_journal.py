@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+트레이딩 상태 메모리 보관 + 변경분 저널 (state_journal.py)
+- 상태의 기준본은 메모리에 두고, 저장 시에는 이전 상태와 달라진 경로만 저널 파일(JSON Lines)에 한 줄로 추가
+- 저널 fsync는 묶어서 수행 (sync_interval마다, 또는 durable=True 저장 시 즉시)
+- 일정 기록 수/시간마다 전체 상태를 스냅샷 파일(기존 상태 JSON 파일과 같은 이름/형식)로 압축 저장하고 저널 비움
+- 포지션 변경(snapshot_when) 또는 snapshot=True 저장은 바로 스냅샷 압축 → 상태 파일을 직접 읽는 외부(대시보드 등)에도 즉시 반영
+- 시작 시(첫 load) 스냅샷 + 저널 재생으로 복구 (마지막 줄이 잘린 경우 그 앞까지만 적용)
+
+저널 한 줄: {"ops": [["set", [키 경로...], 값], ["del", [키 경로...]]]}
+set/del은 경로에 최종 값을 쓰는 연산이라, 스냅샷 저장 직후 저널을 비우기 전에 종료되어 같은 저널이 다시 재생돼도 결과는 같음
+
+사용 예:
+    store = state_journal.JournaledStateStore("KrStock_BOT.json", default_factory=lambda: {'positions': {}})
+    state = store.load()          # 메모리 상태 사본
+    state['positions'][code] = {...}
+    store.save(state)             # 바뀐 경로만 저널에 기록
+"""
+
+import os
+import copy
+import json
+import time
+import atexit
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def set_logger(external_logger):
+    """외부 로거를 설정하는 함수"""
+    global logger
+    logger = external_logger
+
+################################### 변경분 계산 ##################################
+
+def _encode(value, default: Optional[Callable] = None) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, default=default)
+
+def diff_state(old, new, default: Optional[Callable] = None, path: Optional[List[str]] = None, ops: Optional[List] = None) -> List:
+    """old(메모리 기준본) → new 로 바꾸는 set/del 연산 목록 (dict는 키 단위로 내려가고 그 외 값은 통째로 비교)"""
+    path = path or []
+    ops = [] if ops is None else ops
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        # JSON 저장 시 키는 문자열이 되므로 문자열 키로 비교
+        new_items = {key if isinstance(key, str) else str(key): value for key, value in new.items()}
+        for key in old:
+            if key not in new_items:
+                ops.append(['del', path + [key]])
+        for key, value in new_items.items():
+            if key not in old:
+                ops.append(['set', path + [key], value])
+            else:
+                diff_state(old[key], value, default, path + [key], ops)
+    elif _encode(old) != _encode(new, default):
+        ops.append(['set', path, new])
+    return ops
+
+def changes_positions(ops: List, key: str = 'positions', fields=('amount',)) -> bool:
+    """포지션 추가/삭제 또는 수량 변경 연산 포함 여부 (snapshot_when 기본 판정)"""
+    for op in ops:
+        path = op[1]
+        if not path:
+            return True
+        if path[0] != key:
+            continue
+        if len(path) <= 2 or path[2] in fields:
+            return True
+    return False
+
+def apply_ops(state: Dict, ops: List) -> Dict:
+    """set/del 연산을 state에 적용 (중간 경로가 없으면 dict로 생성, 없는 경로 삭제는 무시)"""
+    for op in ops:
+        action, path = op[0], op[1]
+        if not path:
+            state = op[2] if action == 'set' else {}
+            continue
+
+        parent = state
+        for key in path[:-1]:
+            child = parent.get(key) if isinstance(parent, dict) else None
+            if not isinstance(child, dict):
+                if action == 'del':
+                    parent = None
+                    break
+                child = parent[key] = {}
+            parent = child
+        if parent is None:
+            continue
+
+        if action == 'set':
+            parent[path[-1]] = op[2]
+        else:
+            parent.pop(path[-1], None)
+    return state
+
+################################### 상태 저장소 ##################################
+
+class JournaledStateStore:
+    """메모리 기준 상태 + 변경분 저널 + 주기적 스냅샷
+
+    Args:
+        path: 스냅샷 파일 경로 (기존 상태 JSON 파일), 저널은 path + '.journal'
+        default_factory: 파일이 없을 때의 초기 상태 생성 함수
+        serializer: json default 함수 (numpy 타입 변환 등)
+        snapshot_kwargs: 스냅샷 json.dump 추가 인자 (indent 등 기존 파일 형식 유지용)
+        sync_interval: 저널 fsync 최소 간격 (초)
+        compact_records: 저널 기록이 이 수를 넘으면 스냅샷 압축
+        compact_interval: 마지막 압축 후 이 시간(초)이 지나면 스냅샷 압축
+        snapshot_when: (저장 연산 목록) -> True면 바로 스냅샷 압축 (예: changes_positions)
+    """
+
+    def __init__(self, path: str, default_factory: Callable[[], Dict], serializer: Optional[Callable] = None,
+                 snapshot_kwargs: Optional[Dict] = None, sync_interval: float = 1.0,
+                 compact_records: int = 500, compact_interval: float = 300,
+                 snapshot_when: Optional[Callable[[List], bool]] = None):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.default_factory = default_factory
+        self.serializer = serializer
+        self.snapshot_kwargs = snapshot_kwargs or {}
+        self.sync_interval = sync_interval
+        self.compact_records = compact_records
+        self.compact_interval = compact_interval
+        self.snapshot_when = snapshot_when
+
+        self._state = None
+        self._journal = None
+        self._lock = threading.RLock()
+        self._records = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._last_compact = time.monotonic()
+
+        self.stats = {'saves': 0, 'unchanged_saves': 0, 'records': 0, 'journal_bytes': 0,
+                      'fsyncs': 0, 'compactions': 0, 'replayed': 0}
+        atexit.register(self.close)
+
+    ################ 조회 / 저장 ################
+
+    def load(self) -> Dict:
+        """메모리 상태 사본 반환 (처음 호출 시 스냅샷 + 저널로 복구)"""
+        with self._lock:
+            self._ensure_loaded()
+            return copy.deepcopy(self._state)
+
+    def save(self, state: Dict, durable: bool = False, snapshot: bool = False) -> int:
+        """바뀐 경로만 저널에 기록하고 메모리 기준본 갱신, 기록한 연산 수 반환
+
+        durable=True이면 즉시 fsync (주문 체결 등 유실되면 안 되는 변경)
+        snapshot=True이면 저장 후 바로 스냅샷 압축 (상태 파일 자체에 반영)
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self.stats['saves'] += 1
+
+            ops = diff_state(self._state, state, self.serializer)
+            if not ops:
+                self.stats['unchanged_saves'] += 1
+                if snapshot and self._records:
+                    self.compact()
+                elif durable:
+                    self.flush()
+                return 0
+
+            line = json.dumps({'ops': ops}, ensure_ascii=False, default=self.serializer)
+            self._append(line, durable)
+            # 저널에 쓴 그대로(JSON 타입으로) 메모리에 반영 - 재생 결과와 항상 같도록
+            self._state = apply_ops(self._state, json.loads(line)['ops'])
+
+            if (snapshot
+                    or (self.snapshot_when is not None and self.snapshot_when(ops))
+                    or self._records >= self.compact_records
+                    or time.monotonic() - self._last_compact >= self.compact_interval):
+                self.compact()
+            return len(ops)
+
+    def flush(self):
+        """아직 fsync되지 않은 저널 기록을 디스크에 반영"""
+        with self._lock:
+            if self._journal is not None and self._unsynced:
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+                self._unsynced = 0
+                self._last_sync = time.monotonic()
+                self.stats['fsyncs'] += 1
+
+    def compact(self):
+        """전체 상태를 스냅샷 파일로 원자적으로 저장하고 저널 비우기"""
+        with self._lock:
+            if self._state is None:
+                return
+            self._write_snapshot(self._state)
+
+            if self._journal is not None:
+                self._journal.close()
+            self._journal = open(self.journal_path, 'w', encoding='utf-8')
+            os.fsync(self._journal.fileno())
+
+            self._records = 0
+            self._unsynced = 0
+            self._last_compact = time.monotonic()
+            self.stats['compactions'] += 1
+            logger.debug(f"🗜️ 상태 스냅샷 압축 완료: {self.path}")
+
+    def close(self):
+        """종료 시 스냅샷 압축 후 저널 닫기"""
+        with self._lock:
+            if self._state is None:
+                return
+            try:
+                if self._records:
+                    self.compact()
+                else:
+                    self.flush()
+            except Exception as e:
+                logger.error(f"상태 저장소 종료 처리 실패 ({self.path}): {str(e)}")
+            finally:
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+
+    def read_snapshot(self) -> Dict:
+        """디스크의 스냅샷 파일 내용 (저장 검증용 - 아직 압축되지 않은 저널 변경분은 빠짐)"""
+        with self._lock:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+    def exists(self) -> bool:
+        """스냅샷 또는 저널 파일 존재 여부"""
+        return os.path.exists(self.path) or os.path.exists(self.journal_path)
+
+    ################ 내부 처리 ################
+
+    def _ensure_loaded(self):
+        if self._state is not None:
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            state = self.default_factory()
+        except Exception as e:
+            logger.error(f"상태 스냅샷 읽기 실패 ({self.path}): {str(e)} - 저널만으로 복구")
+            state = self.default_factory()
+        state = json.loads(json.dumps(state, ensure_ascii=False, default=self.serializer))
+
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        ops = json.loads(line)['ops']
+                    except Exception:
+                        # 기록 도중 종료되어 잘린 마지막 줄 - 이후는 버림
+                        logger.warning(f"⚠️ 상태 저널 {line_no}번째 줄 손상 - 그 앞까지만 복구 ({self.journal_path})")
+                        break
+                    state = apply_ops(state, ops)
+                    replayed += 1
+
+        self._state = state
+        self.stats['replayed'] = replayed
+        if replayed:
+            logger.info(f"♻️ 상태 저널 {replayed}건 재생 복구: {self.path}")
+            # 복구한 상태로 스냅샷을 새로 쓰고 저널 비움
+            self.compact()
+        else:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def _append(self, line: str, durable: bool):
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal.write(line + '\n')
+        # 프로세스가 죽어도 OS 버퍼에는 남도록 매번 flush, fsync는 묶어서
+        self._journal.flush()
+
+        self._records += 1
+        self._unsynced += 1
+        self.stats['records'] += 1
+        self.stats['journal_bytes'] += len(line.encode('utf-8')) + 1
+
+        if durable or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.flush()
+
+    def _write_snapshot(self, state: Dict):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, default=self.serializer, **self.snapshot_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+daily_bar_memo 테스트 - 오늘 봉이 빠지는 경우(장 시작 전, 직전 거래일 시세)에도 일봉 count개 유지
+"""
+
+import datetime
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import daily_bar_memo
+
+COUNT = 60
+
+def make_bars(days: int = 100) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    dates = pd.bdate_range('2024-01-02', periods=days)
+    close = (10000 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))).round()
+    return pd.DataFrame({
+        'open': (close * 0.99).round(),
+        'high': (close * 1.02).round(),
+        'low': (close * 0.97).round(),
+        'close': close,
+        'volume': rng.integers(1000, 9000, days)
+    }, index=dates.strftime('%Y-%m-%d'))
+
+def make_memo(bars: pd.DataFrame, now: datetime.datetime, quote: dict):
+    requested = []
+
+    def history_fetcher(stock_code, count):
+        requested.append(count)
+        return bars.tail(count)
+
+    memo = daily_bar_memo.DailyBarMemo(
+        count=COUNT,
+        history_fetcher=history_fetcher,
+        quote_fetcher=lambda stock_code: quote,
+        clock=lambda: now,
+        settings=daily_bar_memo.IndicatorSettings(ma_windows=(5, 20, 60))
+    )
+    return memo, requested
+
+def quote_from(bar: pd.Series, **overrides) -> dict:
+    quote = {column: bar[column] for column in ('open', 'high', 'low', 'close', 'volume')}
+    quote.update(overrides)
+    return quote
+
+def test_pre_open_keeps_count_completed_bars():
+    bars = make_bars()
+    today = pd.Timestamp(bars.index[-1]) + pd.offsets.BDay(1)
+    now = today.to_pydatetime().replace(hour=8)
+    # 장 시작 전: 거래량 0 시세
+    memo, requested = make_memo(bars, now, quote_from(bars.iloc[-1], volume=0))
+
+    df, quote = memo.get('005930')
+
+    assert requested == [COUNT + 1]
+    assert len(df) == COUNT
+    assert df.index[-1] == bars.index[-1]
+    assert pd.notna(df['MA60'].iloc[-1])
+    assert quote['volume'] == 0
+
+def test_stale_quote_without_date_keeps_count_completed_bars():
+    bars = make_bars()
+    today = pd.Timestamp(bars.index[-1]) + pd.offsets.BDay(1)
+    # 휴장일/장 시작 전 - 시세가 마지막 완료 일봉과 같음
+    memo, _ = make_memo(bars, today.to_pydatetime().replace(hour=10), quote_from(bars.iloc[-1]))
+
+    df, _ = memo.get('005930')
+
+    assert len(df) == COUNT
+    assert df.index[-1] == bars.index[-1]
+    assert not df.index.duplicated().any()
+    assert pd.notna(df['MA60'].iloc[-1])
+
+def test_stale_quote_with_date_keeps_count_completed_bars():
+    bars = make_bars()
+    today = pd.Timestamp(bars.index[-1]) + pd.offsets.BDay(1)
+    quote = quote_from(bars.iloc[-1], close=bars['close'].iloc[-1] + 10, date=pd.Timestamp(bars.index[-1]))
+    memo, _ = make_memo(bars, today.to_pydatetime().replace(hour=10), quote)
+
+    df, _ = memo.get('005930')
+
+    assert len(df) == COUNT
+    assert df.index[-1] == bars.index[-1]
+    assert pd.notna(df['MA60'].iloc[-1])
+
+def test_intraday_replaces_partial_bar_with_quote():
+    bars = make_bars()
+    # 조회 결과에 오늘 진행 중인 봉이 포함된 장중
+    today = pd.Timestamp(bars.index[-1])
+    quote = quote_from(bars.iloc[-1], close=bars['close'].iloc[-1] + 50, volume=int(bars['volume'].iloc[-1]) + 100)
+    memo, _ = make_memo(bars, today.to_pydatetime().replace(hour=10), quote)
+
+    df, _ = memo.get('005930')
+
+    assert len(df) == COUNT
+    assert df.index[-1] == bars.index[-1]
+    assert df.index[-2] == bars.index[-2]
+    assert df['close'].iloc[-1] == quote['close']
+    assert pd.notna(df['MA60'].iloc[-1])
+
+    expected = bars.iloc[:-1].tail(COUNT - 1)['close'].tolist() + [quote['close']]
+    assert np.isclose(df['MA60'].iloc[-1], np.mean(expected))